@@ -1,10 +1,12 @@
 from collections import defaultdict
+from collections.abc import Iterator
 from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
 from typing import Any
 
 import pytz
 from django.conf import settings
-from django.db.models import QuerySet
 from django.utils.timezone import get_default_timezone, make_aware
 
 from cl.alerts.models import (
@@ -22,6 +24,7 @@ from cl.stats.utils import tally_stat
 
 DAYS_TO_DELETE = 90
 DELETE_BATCH_SIZE = 5_000
+READ_CHUNK_SIZE = 2_000
 
 
 def json_date_parser(dct):
@@ -107,6 +110,31 @@ def merge_alert_child_documents(
     return main_document
 
 
+def iter_scheduled_hits_by_user(
+    rate: str,
+) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    """Read the scheduled hits of a rate in one pass, grouped by user.
+
+    Hits are streamed from a server-side cursor in user order, so only the
+    hits of one user are in memory at a time.
+
+    :param rate: The alert rate to send Alerts.
+    :return: An iterator of tuples of a user ID and the user's hits, as dicts
+    with the hit's pk, alert_id and document_content, in the order they were
+    scheduled.
+    """
+    hits = (
+        ScheduledAlertHit.objects.filter(
+            alert__rate=rate, hit_status=SCHEDULED_ALERT_HIT_STATUS.SCHEDULED
+        )
+        .order_by("user_id", "pk")
+        .values("pk", "user_id", "alert_id", "document_content")
+        .iterator(chunk_size=READ_CHUNK_SIZE)
+    )
+    for user_id, user_hits in groupby(hits, key=itemgetter("user_id")):
+        yield user_id, list(user_hits)
+
+
 def query_and_send_alerts_by_rate(rate: str) -> None:
     """Query and send alerts per user.
 
@@ -116,26 +144,17 @@ def query_and_send_alerts_by_rate(rate: str) -> None:
 
     alerts_sent_count = 0
     now_time = datetime.now()
-    # Get unique alert users with scheduled alert hits
-    user_ids = list(
-        ScheduledAlertHit.objects.filter(
-            alert__rate=rate, hit_status=SCHEDULED_ALERT_HIT_STATUS.SCHEDULED
-        )
-        .values_list("user", flat=True)
-        .distinct()
-    )
-    logger.info("Processing %s alerts for %s users.", rate, len(user_ids))
-
-    for user_id in user_ids:
-        # Query ScheduledAlertHits for every user.
-        scheduled_hits = ScheduledAlertHit.objects.filter(
-            user_id=user_id,
-            alert__rate=rate,
-            hit_status=SCHEDULED_ALERT_HIT_STATUS.SCHEDULED,
-        ).select_related("user", "alert")
-        hits_count = scheduled_hits.count()
+    logger.info("Processing %s alerts.", rate)
+
+    for user_id, scheduled_hits in iter_scheduled_hits_by_user(rate):
         logger.info(
-            "User %s: loading %s scheduled %s hits.", user_id, hits_count, rate
+            "User %s: loading %s scheduled %s hits.",
+            user_id,
+            len(scheduled_hits),
+            rate,
+        )
+        alerts = Alert.objects.in_bulk(
+            {hit["alert_id"] for hit in scheduled_hits}
         )
 
         # Group scheduled hits by Alert and the main_doc_id
@@ -144,9 +163,12 @@ def query_and_send_alerts_by_rate(rate: str) -> None:
         ] = defaultdict(lambda: defaultdict(list))
         alerts_to_update = set()
         for hit in scheduled_hits:
-            alert = hit.alert
-            doc_content = json_date_parser(hit.document_content)
-            match hit.alert.alert_type:
+            alert = alerts.get(hit["alert_id"])
+            if alert is None:
+                # The alert was deleted after its hits were read.
+                continue
+            doc_content = json_date_parser(hit["document_content"])
+            match alert.alert_type:
                 case SEARCH_TYPES.RECAP | SEARCH_TYPES.DOCKETS:
                     main_doc_id = doc_content.get("docket_id")
                 case SEARCH_TYPES.ORAL_ARGUMENT:
@@ -203,8 +225,11 @@ def query_and_send_alerts_by_rate(rate: str) -> None:
             date_last_hit=now_time
         )
 
-        # Update Scheduled alert hits status to "SENT" for this user
-        scheduled_hits.update(hit_status=SCHEDULED_ALERT_HIT_STATUS.SENT)
+        # Update Scheduled alert hits status to "SENT" for this user. Hits
+        # scheduled while the user was processed are left for the next run.
+        ScheduledAlertHit.objects.filter(
+            pk__in=[hit["pk"] for hit in scheduled_hits]
+        ).update(hit_status=SCHEDULED_ALERT_HIT_STATUS.SENT)
 
     # Remove old Scheduled alert hits sent, daily.
     if rate == Alert.DAILY:
@@ -230,27 +255,45 @@ def send_scheduled_alerts(rate: str) -> None:
     query_and_send_alerts_by_rate(rate)
 
 
-def delete_scheduled_hits_in_batches(
-    hits: QuerySet[ScheduledAlertHit],
+def delete_scheduled_hits_by_pk_range(
+    older_than: datetime,
+    hit_status: int,
     batch_size: int = DELETE_BATCH_SIZE,
 ) -> int:
-    """Delete a queryset of ScheduledAlertHit rows in bounded batches.
-
-    Deleting a very large queryset in a single call loads every matching row
-    into Django's in-memory collector, which can exhaust memory. Delete a
-    slice of primary keys at a time instead, so peak memory stays bounded by
-    ``batch_size``. Deleted rows drop out of the filter, so re-querying
-    eventually empties the queryset and ends the loop.
-
-    :param hits: The queryset of ScheduledAlertHit rows to delete.
-    :param batch_size: The maximum number of rows to delete per batch.
+    """Delete the hits with a status created before a date, in pk ranges.
+
+    Hits are created in primary key order, so the old ones sit below the pk
+    of the first hit created after the date. Deleting consecutive pk ranges
+    below it makes every batch a single DELETE over an index range. It
+    doesn't select the pks to delete first, nor rescan the dead rows left by
+    earlier batches, so a batch costs the same at the end of a large cleanup
+    as at its start.
+
+    :param older_than: Delete hits created before this date.
+    :param hit_status: The status of the hits to delete.
+    :param batch_size: The size of the pk ranges to delete at a time.
     :return: The total number of rows deleted.
     """
 
+    hits = ScheduledAlertHit.objects.filter(
+        date_created__lt=older_than, hit_status=hit_status
+    )
+    first_pk = hits.order_by("pk").values_list("pk", flat=True).first()
+    if first_pk is None:
+        return 0
+    end_pk = (
+        ScheduledAlertHit.objects.filter(date_created__gte=older_than)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if end_pk is None:
+        end_pk = hits.order_by("-pk").values_list("pk", flat=True)[0] + 1
+
     total_deleted = 0
-    while batch_pks := list(hits.values_list("pk", flat=True)[:batch_size]):
-        deleted, _ = ScheduledAlertHit.objects.filter(
-            pk__in=batch_pks
+    for start_pk in range(first_pk, end_pk, batch_size):
+        deleted, _ = hits.filter(
+            pk__gte=start_pk, pk__lt=min(start_pk + batch_size, end_pk)
         ).delete()
         total_deleted += deleted
     return total_deleted
@@ -265,11 +308,8 @@ def delete_old_scheduled_alerts() -> int:
     # Delete SENT ScheduledAlertHits after DAYS_TO_DELETE
     sent_older_than = datetime.now() - timedelta(days=DAYS_TO_DELETE)
     logger.info("Deleting SENT hits older than %s...", sent_older_than.date())
-    sent_deleted = delete_scheduled_hits_in_batches(
-        ScheduledAlertHit.objects.filter(
-            date_created__lt=sent_older_than,
-            hit_status=SCHEDULED_ALERT_HIT_STATUS.SENT,
-        )
+    sent_deleted = delete_scheduled_hits_by_pk_range(
+        sent_older_than, SCHEDULED_ALERT_HIT_STATUS.SENT
     )
 
     # Delete SCHEDULED ScheduledAlertHits after 2 * DAYS_TO_DELETE
@@ -277,11 +317,8 @@ def delete_old_scheduled_alerts() -> int:
     logger.info(
         "Deleting SCHEDULED hits older than %s...", unsent_older_than.date()
     )
-    unsent_deleted = delete_scheduled_hits_in_batches(
-        ScheduledAlertHit.objects.filter(
-            date_created__lt=unsent_older_than,
-            hit_status=SCHEDULED_ALERT_HIT_STATUS.SCHEDULED,
-        )
+    unsent_deleted = delete_scheduled_hits_by_pk_range(
+        unsent_older_than, SCHEDULED_ALERT_HIT_STATUS.SCHEDULED
     )
     return sent_deleted + unsent_deleted
 
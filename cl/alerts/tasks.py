@@ -1,7 +1,9 @@
 import copy
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from importlib import import_module
+from itertools import batched
 from urllib.parse import urlencode
 
 from celery import Task
@@ -10,6 +12,7 @@ from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
 from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
 from django.template import loader
 from django.urls import reverse
 from django.utils.timezone import now
@@ -125,12 +128,15 @@ def get_docket_alert_recipients(
             webhook_recipients_list.append(da.user.pk)
 
     # Get recap email recipients and create new docket alerts objects
+    user_profiles = {
+        user_profile.recap_email: user_profile
+        for user_profile in UserProfile.objects.select_related("user").filter(
+            recap_email__in=recap_email_recipients
+        )
+    }
     for email_address in recap_email_recipients:
-        try:
-            user_profile = UserProfile.objects.select_related("user").get(
-                recap_email=email_address
-            )
-        except UserProfile.DoesNotExist:
+        user_profile = user_profiles.get(email_address)
+        if user_profile is None:
             recap_email_user_does_not_exist_list.append(email_address)
             continue
 
@@ -200,17 +206,55 @@ def get_docket_notes_and_tags_by_user(
     return notes, user_tags
 
 
-def make_alert_messages(
+def get_docket_notes_and_tags_by_users(
+    d_pk: int, user_pks: list[int]
+) -> dict[int, tuple[str | None, list[UserTag]]]:
+    """Get the notes and tags of many users for a docket at once.
+
+    :param d_pk: Docket primary key
+    :param user_pks: The User primary keys
+    :return: A dict mapping each User primary key to a two tuple of docket
+    notes or None if not available, and a list of tags assigned to the docket.
+    """
+
+    notes: dict[int, str] = {}
+    user_notes = (
+        Note.objects.filter(docket_id=d_pk, user_id__in=user_pks)
+        .order_by("pk")
+        .values_list("user_id", "notes")
+    )
+    for user_pk, note in user_notes:
+        # Like get_docket_notes_and_tags_by_user, only use a user's first note.
+        notes.setdefault(user_pk, note)
+
+    tags: dict[int, list[UserTag]] = {}
+    for tag in UserTag.objects.filter(
+        user_id__in=user_pks, dockets__id=d_pk
+    ).order_by("pk"):
+        tags.setdefault(tag.user_id, []).append(tag)
+
+    return {
+        user_pk: (notes.get(user_pk) or None, tags.get(user_pk, []))
+        for user_pk in user_pks
+    }
+
+
+def make_alert_message_batches(
     d: Docket,
     new_des: list[DocketEntry],
     da_recipients: list[DocketAlertRecipient],
-) -> list[EmailMultiAlternatives]:
-    """Make docket alert messages that can be sent to users
+    batch_size: int,
+) -> Iterator[list[EmailMultiAlternatives]]:
+    """Make docket alert messages that can be sent to users, in batches
+
+    The new docket entries are rendered once and shared by every message.
+    The notes and tags of the recipients are fetched for a batch at a time.
 
     :param d: The docket to work on
     :param new_des: The new docket entries
     :param da_recipients: A list of DocketAlertRecipients objects
-    :return: A list of email messages to send
+    :param batch_size: The number of messages in each batch
+    :return: An iterator of lists of email messages to send
     """
 
     case_name = trunc(best_case_name(d), 100, ellipsis="...")
@@ -218,6 +262,19 @@ def make_alert_messages(
     html_template = loader.get_template("docket_alert_email.html")
     subject_template = loader.get_template("docket_alert_subject.txt")
     de_count = len(new_des)
+    timezone = COURT_TIMEZONES.get(d.court_id, "US/Eastern")
+    prefetch_related_objects(new_des, "recap_documents")
+    entries_context = {
+        "new_des": new_des,
+        "docket": d,
+        "timezone": timezone,
+    }
+    txt_entries = loader.render_to_string(
+        "includes/docket_alert_entries.txt", entries_context
+    )
+    html_entries = loader.render_to_string(
+        "includes/docket_alert_entries.html", entries_context
+    )
     subject_context = {
         "docket": d,
         "count": de_count,
@@ -228,45 +285,50 @@ def make_alert_messages(
         "count": de_count,
         "docket": d,
         "docket_alert_secret_key": None,
-        "timezone": COURT_TIMEZONES.get(d.court_id, "US/Eastern"),
+        "timezone": timezone,
         "recap_alerts_banner": switch_is_active("recap-alerts-email-banner"),
         # Emails render without request context processors, so the wiki URL
         # must be injected here for the tag/note help links.
         "WIKI_HELP_URL": settings.WIKI_HELP_BASE_URL,
     }
-    messages = []
-    for recipient in da_recipients:
-        notes, tags = get_docket_notes_and_tags_by_user(
-            d.pk, recipient.user_pk
-        )
-        unsubscribe_url = reverse(
-            "one_click_docket_alert_unsubscribe", args=[recipient.secret_key]
-        )
-        email_context["notes"] = notes
-        email_context["tags"] = tags
-        email_context["username"] = recipient.username
-        email_context["docket_alert_secret_key"] = recipient.secret_key
-        email_context["first_email"] = recipient.first_email
-        subject_context["first_email"] = recipient.first_email
-        email_context["auto_subscribe"] = recipient.auto_subscribe
-        subject_context["auto_subscribe"] = recipient.auto_subscribe
-        subject = subject_template.render(subject_context).strip()  # Remove
-        # newlines that editors can insist on adding.
-        msg = EmailMultiAlternatives(
-            subject=subject,
-            body=txt_template.render(email_context),
-            from_email=settings.DEFAULT_ALERTS_EMAIL,
-            to=[recipient.email_address],
-            headers={
-                "X-Entity-Ref-ID": f"docket.alert:{d.pk}",
-                "List-Unsubscribe-Post": "List-Unsubscribe=One-Click",
-                "List-Unsubscribe": f"<https://www.courtlistener.com{unsubscribe_url}>",
-            },
+    for recipients in batched(da_recipients, batch_size):
+        notes_and_tags = get_docket_notes_and_tags_by_users(
+            d.pk, [recipient.user_pk for recipient in recipients]
         )
-        html = html_template.render(email_context)
-        msg.attach_alternative(html, "text/html")
-        messages.append(msg)
-    return messages
+        messages = []
+        for recipient in recipients:
+            notes, tags = notes_and_tags[recipient.user_pk]
+            unsubscribe_url = reverse(
+                "one_click_docket_alert_unsubscribe",
+                args=[recipient.secret_key],
+            )
+            email_context["notes"] = notes
+            email_context["tags"] = tags
+            email_context["username"] = recipient.username
+            email_context["docket_alert_secret_key"] = recipient.secret_key
+            email_context["first_email"] = recipient.first_email
+            subject_context["first_email"] = recipient.first_email
+            email_context["auto_subscribe"] = recipient.auto_subscribe
+            subject_context["auto_subscribe"] = recipient.auto_subscribe
+            # Remove newlines that editors can insist on adding.
+            subject = subject_template.render(subject_context).strip()
+            email_context["entries"] = txt_entries
+            msg = EmailMultiAlternatives(
+                subject=subject,
+                body=txt_template.render(email_context),
+                from_email=settings.DEFAULT_ALERTS_EMAIL,
+                to=[recipient.email_address],
+                headers={
+                    "X-Entity-Ref-ID": f"docket.alert:{d.pk}",
+                    "List-Unsubscribe-Post": "List-Unsubscribe=One-Click",
+                    "List-Unsubscribe": f"<https://www.courtlistener.com{unsubscribe_url}>",
+                },
+            )
+            email_context["entries"] = html_entries
+            html = html_template.render(email_context)
+            msg.attach_alternative(html, "text/html")
+            messages.append(msg)
+        yield messages
 
 
 # Ignore the result or else we'll use a lot of memory.
@@ -350,7 +412,7 @@ def send_alert_and_webhook(
 
     d = Docket.objects.get(pk=d_pk)
     if des_pks is not None:
-        new_des = DocketEntry.objects.filter(pk__in=des_pks)
+        new_des = list(DocketEntry.objects.filter(pk__in=des_pks))
     else:
         new_des = list(
             DocketEntry.objects.filter(date_created__gte=since, docket=d)
@@ -361,14 +423,20 @@ def send_alert_and_webhook(
         delete_redis_semaphore("ALERTS", make_alert_key(d_pk))
         return
 
-    messages = make_alert_messages(d, new_des, da_recipients)
+    # Send the messages in batches over one connection, so memory stays
+    # bounded on dockets with many subscribers.
     connection = get_connection()
-    connection.send_messages(messages)
+    messages_count = 0
+    for messages in make_alert_message_batches(
+        d, new_des, da_recipients, settings.DOCKET_ALERT_SEND_BATCH_SIZE
+    ):
+        connection.send_messages(messages)
+        messages_count += len(messages)
 
     # Work completed. Tally, log, and clean up
     tally_stat(
         StatMetric.ALERTS_SENT,
-        inc=len(messages),
+        inc=messages_count,
         labels={"alert_type": StatAlertType.DOCKET},
     )
     DocketAlert.objects.filter(docket=d).update(date_last_hit=now())
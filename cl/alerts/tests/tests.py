@@ -29,6 +29,7 @@ from cl.alerts.factories import AlertFactory, DocketAlertWithParentsFactory
 from cl.alerts.forms import CreateAlertForm
 from cl.alerts.management.commands.cl_send_scheduled_alerts import (
     DAYS_TO_DELETE,
+    delete_scheduled_hits_by_pk_range,
 )
 from cl.alerts.management.commands.handle_old_docket_alerts import (
     build_user_report,
@@ -42,6 +43,7 @@ from cl.alerts.models import (
 )
 from cl.alerts.tasks import (
     get_docket_notes_and_tags_by_user,
+    get_docket_notes_and_tags_by_users,
     send_alert_and_webhook,
 )
 from cl.alerts.utils import (
@@ -939,6 +941,47 @@ class AlertHitsSetCleanupTest(TestCase):
         )
 
 
+class ScheduledAlertHitsCleanupTest(TestCase):
+    """Are old scheduled alert hits deleted by pk ranges?"""
+
+    def test_delete_scheduled_hits_by_pk_range(self) -> None:
+        """Do we only delete the hits with the status created before the
+        cut-off date, across several ranges?"""
+
+        alert = AlertFactory(
+            rate=Alert.DAILY,
+            name="Test Alert cleanup",
+            query="q=cleanup&type=oa",
+            alert_type=SEARCH_TYPES.ORAL_ARGUMENT,
+        )
+        cut_off = now() - timedelta(days=DAYS_TO_DELETE)
+
+        def make_hit(hit_status: int) -> ScheduledAlertHit:
+            return ScheduledAlertHit.objects.create(
+                alert=alert,
+                user=alert.user,
+                document_content={},
+                hit_status=hit_status,
+            )
+
+        with time_machine.travel(cut_off - timedelta(days=1), tick=False):
+            for _ in range(3):
+                make_hit(SCHEDULED_ALERT_HIT_STATUS.SENT)
+            old_scheduled = make_hit(SCHEDULED_ALERT_HIT_STATUS.SCHEDULED)
+            make_hit(SCHEDULED_ALERT_HIT_STATUS.SENT)
+        new_sent = make_hit(SCHEDULED_ALERT_HIT_STATUS.SENT)
+
+        deleted = delete_scheduled_hits_by_pk_range(
+            cut_off, SCHEDULED_ALERT_HIT_STATUS.SENT, batch_size=2
+        )
+
+        self.assertEqual(deleted, 4)
+        self.assertEqual(
+            set(ScheduledAlertHit.objects.values_list("pk", flat=True)),
+            {old_scheduled.pk, new_sent.pk},
+        )
+
+
 class DocketAlertTest(TestCase):
     """Do docket alerts work properly?"""
 
@@ -3448,6 +3491,21 @@ class DocketAlertGetNotesTagsTests(TestCase):
         self.assertEqual(notes_docket_3_user_1, None)
         self.assertEqual(tags_docket_3_user_1, [])
 
+    def test_get_docket_notes_and_tags_by_users(self) -> None:
+        """Do we get the same notes and tags for many users at once?"""
+        user_pks = [self.user_1.pk, self.user_2.pk]
+        for docket in (self.docket_1, self.docket_2, self.docket_3):
+            with self.assertNumQueries(2):
+                notes_and_tags = get_docket_notes_and_tags_by_users(
+                    docket.pk, user_pks
+                )
+            for user_pk in user_pks:
+                with self.subTest(docket=docket.pk, user=user_pk):
+                    self.assertEqual(
+                        notes_and_tags[user_pk],
+                        get_docket_notes_and_tags_by_user(docket.pk, user_pk),
+                    )
+
 
 @mock.patch("cl.search.tasks.percolator_alerts_models_supported", new=[Audio])
 @mock.patch(
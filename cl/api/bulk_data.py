@@ -0,0 +1,1432 @@
+"""Incremental exports of the bulk data tables.
+
+A full export writes every row of each table. A delta export only writes the
+rows whose `date_modified` changed since the previous export, along with the
+ids deleted since then according to the pghistory event tables. Tables
+without a `date_modified` column are always exported in full.
+
+`date_modified` is set when a row is saved, not when it's committed, so a
+slow transaction can commit a row dated before the end of the previous
+window after that export ran. Delta windows therefore start `DELTA_OVERLAP`
+before the end of the previous export, and consumers must upsert and delete
+by id, which makes rows exported twice harmless.
+
+Every table of a run is read from the same database snapshot, so the files
+of an export are consistent with each other. Each table is exported by its
+own worker into bz2 compressed CSV chunks, and every run writes a manifest
+with the row counts and checksums of its files, so downstream users can
+verify them and apply the deltas in order. Full exports also write a script
+that loads their files into PostgreSQL.
+
+Full exports can also write the largest tables as Parquet datasets
+partitioned by court and year, so analytics consumers can read only the
+columns and partitions they need.
+"""
+
+import bz2
+import hashlib
+import json
+import logging
+import os
+import shlex
+import tempfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import batched, groupby
+from operator import itemgetter
+from typing import IO, Any, TypedDict
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dateutil import parser
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db import connection, transaction
+from django.db.models import Model
+from django.db.models.functions import ExtractYear
+
+from cl.search.models import (
+    Court,
+    Docket,
+    DocketEntry,
+    OpinionsCited,
+    RECAPDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+BULK_DATA_PREFIX = "bulk-data"
+LATEST_EXPORT_PATH = f"{BULK_DATA_PREFIX}/latest-export.json"
+COPY_OPTIONS = "FORMAT csv, ENCODING utf8, ESCAPE '\\', FORCE_QUOTE *"
+DEFAULT_ROWS_PER_FILE = 1_000_000
+DEFAULT_ROW_GROUP_SIZE = 100_000
+PARQUET_COMPRESSION = "zstd"
+DELTA_OVERLAP = timedelta(hours=1)
+LOAD_COPY_OPTIONS = "FORMAT csv, ENCODING utf8, ESCAPE '\\', HEADER"
+LOAD_SCRIPT_HEADER = """#!/bin/bash
+set -e
+# Load a full bulk data export into PostgreSQL.
+#
+# Download the files of the export to BULK_DIR, keeping their paths relative
+# to this script, and set BULK_DB_HOST, BULK_DB_USER and BULK_DB_PASSWORD.
+# Set BULK_SCHEMA_FILE to the path of the schema file to create the tables
+# before loading them.
+
+for var in BULK_DIR BULK_DB_HOST BULK_DB_USER BULK_DB_PASSWORD; do
+  if [[ -z ${!var} ]]; then
+    echo "Variable having name '$var' is not set."
+    exit 1
+  fi
+done
+
+# Default from schema is 'courtlistener'
+export BULK_DB_NAME=courtlistener
+export PGPASSWORD=$BULK_DB_PASSWORD
+
+if [[ -n ${BULK_SCHEMA_FILE} ]]; then
+  echo "Loading schema to database: $BULK_SCHEMA_FILE"
+  psql -f "$BULK_SCHEMA_FILE" --host "$BULK_DB_HOST" --username "$BULK_DB_USER" --dbname "$BULK_DB_NAME"
+fi
+"""
+
+
+class BulkExportKind:
+    FULL = "full"
+    DELTA = "delta"
+
+
+@dataclass(frozen=True)
+class BulkTable:
+    table: str
+    file_prefix: str
+    fields: tuple[str, ...]
+
+    @property
+    def has_date_modified(self) -> bool:
+        return "date_modified" in self.fields
+
+
+# The tables and fields of the bulk data, also used to make the load script of
+# full exports. This ordering is important. Tables with foreign key
+# constraints must be loaded in order.
+BULK_DATA_TABLES: list[BulkTable] = [
+    BulkTable(
+        "people_db_person",
+        "people-db-people",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "date_completed",
+            "fjc_id",
+            "slug",
+            "name_first",
+            "name_middle",
+            "name_last",
+            "name_suffix",
+            "date_dob",
+            "date_granularity_dob",
+            "date_dod",
+            "date_granularity_dod",
+            "dob_city",
+            "dob_state",
+            "dob_country",
+            "dod_city",
+            "dod_state",
+            "dod_country",
+            "gender",
+            "religion",
+            "ftm_total_received",
+            "ftm_eid",
+            "has_photo",
+            "is_alias_of_id",
+        ),
+    ),
+    BulkTable(
+        "people_db_race",
+        "people_db_race",
+        ("id", "race"),
+    ),
+    BulkTable(
+        "people_db_school",
+        "people-db-schools",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "name",
+            "ein",
+            "is_alias_of_id",
+        ),
+    ),
+    BulkTable(
+        "search_court",
+        "courts",
+        (
+            "id",
+            "pacer_court_id",
+            "pacer_has_rss_feed",
+            "pacer_rss_entry_types",
+            "date_last_pacer_contact",
+            "fjc_court_id",
+            "date_modified",
+            "in_use",
+            "has_opinion_scraper",
+            "has_oral_argument_scraper",
+            "position",
+            "citation_string",
+            "short_name",
+            "full_name",
+            "url",
+            "start_date",
+            "end_date",
+            "jurisdiction",
+            "notes",
+            "parent_court_id",
+        ),
+    ),
+    BulkTable(
+        "people_db_position",
+        "people-db-positions",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "position_type",
+            "job_title",
+            "sector",
+            "organization_name",
+            "location_city",
+            "location_state",
+            "date_nominated",
+            "date_elected",
+            "date_recess_appointment",
+            "date_referred_to_judicial_committee",
+            "date_judicial_committee_action",
+            "judicial_committee_action",
+            "date_hearing",
+            "date_confirmation",
+            "date_start",
+            "date_granularity_start",
+            "date_termination",
+            "termination_reason",
+            "date_granularity_termination",
+            "date_retirement",
+            "nomination_process",
+            "vote_type",
+            "voice_vote",
+            "votes_yes",
+            "votes_no",
+            "votes_yes_percent",
+            "votes_no_percent",
+            "how_selected",
+            "has_inferred_values",
+            "appointer_id",
+            "court_id",
+            "person_id",
+            "predecessor_id",
+            "school_id",
+            "supervisor_id",
+        ),
+    ),
+    BulkTable(
+        "recap_fjcintegrateddatabase",
+        "fjc-integrated-database",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "dataset_source",
+            "office",
+            "docket_number",
+            "origin",
+            "date_filed",
+            "jurisdiction",
+            "nature_of_suit",
+            "title",
+            "section",
+            "subsection",
+            "diversity_of_residence",
+            "class_action",
+            "monetary_demand",
+            "county_of_residence",
+            "arbitration_at_filing",
+            "arbitration_at_termination",
+            "multidistrict_litigation_docket_number",
+            "plaintiff",
+            "defendant",
+            "date_transfer",
+            "transfer_office",
+            "transfer_docket_number",
+            "transfer_origin",
+            "date_terminated",
+            "termination_class_action_status",
+            "procedural_progress",
+            "disposition",
+            "nature_of_judgement",
+            "amount_received",
+            "judgment",
+            "pro_se",
+            "year_of_tape",
+            "nature_of_offense",
+            "version",
+            "circuit_id",
+            "district_id",
+        ),
+    ),
+    BulkTable(
+        "search_originatingcourtinformation",
+        "originating-court-information",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "docket_number",
+            "assigned_to_str",
+            "ordering_judge_str",
+            "court_reporter",
+            "date_disposed",
+            "date_filed",
+            "date_judgment",
+            "date_judgment_eod",
+            "date_filed_noa",
+            "date_received_coa",
+            "assigned_to_id",
+            "ordering_judge_id",
+            "docket_number_raw",
+        ),
+    ),
+    BulkTable(
+        "search_docket",
+        "dockets",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "source",
+            "appeal_from_str",
+            "assigned_to_str",
+            "referred_to_str",
+            "panel_str",
+            "date_last_index",
+            "date_cert_granted",
+            "date_cert_denied",
+            "date_argued",
+            "date_reargued",
+            "date_reargument_denied",
+            "date_filed",
+            "date_terminated",
+            "date_last_filing",
+            "case_name_short",
+            "case_name",
+            "case_name_full",
+            "slug",
+            "docket_number",
+            "docket_number_core",
+            "pacer_case_id",
+            "cause",
+            "nature_of_suit",
+            "jury_demand",
+            "jurisdiction_type",
+            "appellate_fee_status",
+            "appellate_case_type_information",
+            "mdl_status",
+            "filepath_local",
+            "filepath_ia",
+            "filepath_ia_json",
+            "ia_upload_failure_count",
+            "ia_needs_upload",
+            "ia_date_first_change",
+            "view_count",
+            "date_blocked",
+            "blocked",
+            "appeal_from_id",
+            "assigned_to_id",
+            "court_id",
+            "idb_data_id",
+            "originating_court_information_id",
+            "referred_to_id",
+            "federal_dn_case_type",
+            "federal_dn_office_code",
+            "federal_dn_judge_initials_assigned",
+            "federal_dn_judge_initials_referred",
+            "federal_defendant_number",
+            "parent_docket_id",
+            "docket_number_raw",
+            "docket_number_source",
+        ),
+    ),
+    BulkTable(
+        "search_opinioncluster",
+        "opinion-clusters",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "judges",
+            "date_filed",
+            "date_filed_is_approximate",
+            "slug",
+            "case_name_short",
+            "case_name",
+            "case_name_full",
+            "scdb_id",
+            "scdb_decision_direction",
+            "scdb_votes_majority",
+            "scdb_votes_minority",
+            "source",
+            "procedural_history",
+            "attorneys",
+            "nature_of_suit",
+            "posture",
+            "syllabus",
+            "headnotes",
+            "summary",
+            "disposition",
+            "history",
+            "other_dates",
+            "cross_reference",
+            "correction",
+            "citation_count",
+            "precedential_status",
+            "date_blocked",
+            "blocked",
+            "filepath_json_harvard",
+            "filepath_pdf_harvard",
+            "docket_id",
+            "arguments",
+            "headmatter",
+        ),
+    ),
+    BulkTable(
+        "search_opinioncluster_panel",
+        "search_opinioncluster_panel",
+        ("id", "opinioncluster_id", "person_id"),
+    ),
+    BulkTable(
+        "search_opinioncluster_non_participating_judges",
+        "search_opinioncluster_non_participating_judges",
+        ("id", "opinioncluster_id", "person_id"),
+    ),
+    BulkTable(
+        "search_opinion",
+        "opinions",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "author_str",
+            "per_curiam",
+            "joined_by_str",
+            "type",
+            "sha1",
+            "page_count",
+            "download_url",
+            "local_path",
+            "plain_text",
+            "html",
+            "html_lawbox",
+            "html_columbia",
+            "html_anon_2020",
+            "xml_harvard",
+            "xml_scan",
+            "html_with_citations",
+            "extracted_by_ocr",
+            "author_id",
+            "cluster_id",
+        ),
+    ),
+    BulkTable(
+        "search_opinion_joined_by",
+        "search_opinion_joined_by",
+        ("id", "opinion_id", "person_id"),
+    ),
+    BulkTable(
+        "search_courthouse",
+        "courthouses",
+        (
+            "id",
+            "court_seat",
+            "building_name",
+            "address1",
+            "address2",
+            "city",
+            "county",
+            "state",
+            "zip_code",
+            "country_code",
+            "court_id",
+        ),
+    ),
+    BulkTable(
+        "search_court_appeals_to",
+        "court-appeals-to",
+        ("id", "from_court_id", "to_court_id"),
+    ),
+    BulkTable(
+        "search_opinionscited",
+        "citation-map",
+        ("id", "depth", "cited_opinion_id", "citing_opinion_id"),
+    ),
+    BulkTable(
+        "search_citation",
+        "citations",
+        (
+            "id",
+            "volume",
+            "reporter",
+            "page",
+            "type",
+            "cluster_id",
+            "date_created",
+            "date_modified",
+        ),
+    ),
+    BulkTable(
+        "search_parenthetical",
+        "parentheticals",
+        (
+            "id",
+            "text",
+            "score",
+            "described_opinion_id",
+            "describing_opinion_id",
+            "group_id",
+        ),
+    ),
+    BulkTable(
+        "audio_audio",
+        "oral-arguments",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "source",
+            "case_name_short",
+            "case_name",
+            "case_name_full",
+            "judges",
+            "sha1",
+            "download_url",
+            "local_path_mp3",
+            "local_path_original_file",
+            "filepath_ia",
+            "ia_upload_failure_count",
+            "duration",
+            "processing_complete",
+            "date_blocked",
+            "blocked",
+            "stt_status",
+            "stt_transcript",
+            "stt_source",
+            "docket_id",
+        ),
+    ),
+    BulkTable(
+        "people_db_retentionevent",
+        "people-db-retention-events",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "retention_type",
+            "date_retention",
+            "votes_yes",
+            "votes_no",
+            "votes_yes_percent",
+            "votes_no_percent",
+            "unopposed",
+            "won",
+            "position_id",
+        ),
+    ),
+    BulkTable(
+        "people_db_education",
+        "people-db-educations",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "degree_level",
+            "degree_detail",
+            "degree_year",
+            "person_id",
+            "school_id",
+        ),
+    ),
+    BulkTable(
+        "people_db_politicalaffiliation",
+        "people-db-political-affiliations",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "political_party",
+            "source",
+            "date_start",
+            "date_granularity_start",
+            "date_end",
+            "date_granularity_end",
+            "person_id",
+        ),
+    ),
+    BulkTable(
+        "people_db_person_race",
+        "people-db-races",
+        ("id", "person_id", "race_id"),
+    ),
+    BulkTable(
+        "disclosures_financialdisclosure",
+        "financial-disclosures",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "year",
+            "download_filepath",
+            "filepath",
+            "thumbnail",
+            "thumbnail_status",
+            "page_count",
+            "sha1",
+            "report_type",
+            "is_amended",
+            "addendum_content_raw",
+            "addendum_redacted",
+            "has_been_extracted",
+            "person_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_investment",
+        "financial-disclosure-investments",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "page_number",
+            "description",
+            "redacted",
+            "income_during_reporting_period_code",
+            "income_during_reporting_period_type",
+            "gross_value_code",
+            "gross_value_method",
+            "transaction_during_reporting_period",
+            "transaction_date_raw",
+            "transaction_date",
+            "transaction_value_code",
+            "transaction_gain_code",
+            "transaction_partner",
+            "has_inferred_values",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_position",
+        "financial-disclosures-positions",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "position",
+            "organization_name",
+            "redacted",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_agreement",
+        "financial-disclosures-agreements",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "date_raw",
+            "parties_and_terms",
+            "redacted",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_noninvestmentincome",
+        "financial-disclosures-non-investment-income",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "date_raw",
+            "source_type",
+            "income_amount",
+            "redacted",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_spouseincome",
+        "financial-disclosures-spousal-income",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "source_type",
+            "date_raw",
+            "redacted",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_reimbursement",
+        "financial-disclosures-reimbursements",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "source",
+            "date_raw",
+            "location",
+            "purpose",
+            "items_paid_or_provided",
+            "redacted",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_gift",
+        "financial-disclosures-gifts",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "source",
+            "description",
+            "value",
+            "redacted",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "disclosures_debt",
+        "financial-disclosures-debts",
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "creditor_name",
+            "description",
+            "value_code",
+            "redacted",
+            "financial_disclosure_id",
+        ),
+    ),
+    BulkTable(
+        "citations_unmatchedcitation",
+        "unmatched-citations",
+        (
+            "id",
+            "volume",
+            "reporter",
+            "page",
+            "type",
+            "status",
+            "citation_string",
+            "court_id",
+            "year",
+            "citing_opinion_id",
+        ),
+    ),
+]
+
+
+@dataclass(frozen=True)
+class ParquetDataset:
+    """A table exported as a Parquet dataset partitioned by court and year.
+
+    `court_lookup` and `date_lookup` are the ORM lookups used to get the
+    court and the date whose year partitions each row.
+    """
+
+    name: str
+    model: type[Model]
+    fields: tuple[str, ...]
+    court_lookup: str
+    date_lookup: str
+
+
+PARQUET_DATASETS: list[ParquetDataset] = [
+    ParquetDataset(
+        "dockets",
+        Docket,
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "source",
+            "court_id",
+            "appeal_from_id",
+            "assigned_to_id",
+            "referred_to_id",
+            "idb_data_id",
+            "date_filed",
+            "date_terminated",
+            "date_last_filing",
+            "case_name",
+            "case_name_short",
+            "docket_number",
+            "docket_number_core",
+            "pacer_case_id",
+            "cause",
+            "nature_of_suit",
+            "jury_demand",
+            "jurisdiction_type",
+            "date_blocked",
+            "blocked",
+        ),
+        "court_id",
+        "date_filed",
+    ),
+    ParquetDataset(
+        "docket-entries",
+        DocketEntry,
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "docket_id",
+            "date_filed",
+            "time_filed",
+            "entry_number",
+            "recap_sequence_number",
+            "pacer_sequence_number",
+            "description",
+        ),
+        "docket__court_id",
+        "date_filed",
+    ),
+    ParquetDataset(
+        "recap-documents",
+        RECAPDocument,
+        (
+            "id",
+            "date_created",
+            "date_modified",
+            "date_upload",
+            "docket_entry_id",
+            "document_type",
+            "document_number",
+            "attachment_number",
+            "pacer_doc_id",
+            "is_available",
+            "is_free_on_pacer",
+            "is_sealed",
+            "sha1",
+            "page_count",
+            "file_size",
+            "filepath_local",
+            "filepath_ia",
+            "ocr_status",
+            "description",
+        ),
+        "docket_entry__docket__court_id",
+        "docket_entry__date_filed",
+    ),
+    ParquetDataset(
+        "citation-map",
+        OpinionsCited,
+        ("id", "depth", "cited_opinion_id", "citing_opinion_id"),
+        "citing_opinion__cluster__docket__court_id",
+        "citing_opinion__cluster__date_filed",
+    ),
+]
+
+# Arrow types for the Django internal field types. Anything else is exported
+# as a string.
+ARROW_TYPES: dict[str, pa.DataType] = {
+    "AutoField": pa.int32(),
+    "BigAutoField": pa.int64(),
+    "BigIntegerField": pa.int64(),
+    "IntegerField": pa.int32(),
+    "PositiveIntegerField": pa.int64(),
+    "SmallIntegerField": pa.int16(),
+    "PositiveSmallIntegerField": pa.int32(),
+    "BooleanField": pa.bool_(),
+    "FloatField": pa.float64(),
+    "DateField": pa.date32(),
+    "DateTimeField": pa.timestamp("us", tz="UTC"),
+    "TimeField": pa.time64("us"),
+}
+
+
+class BulkFile(TypedDict):
+    name: str
+    rows: int
+    size: int
+    sha256: str
+
+
+class ParquetDatasetManifest(TypedDict):
+    name: str
+    fields: list[str]
+    files: list[BulkFile]
+
+
+class BulkTableManifest(TypedDict):
+    table: str
+    kind: str
+    fields: list[str]
+    files: list[BulkFile]
+    deleted_files: list[BulkFile]
+
+
+class ChunkedCSVWriter:
+    """Write CSV rows into bz2 compressed files of at most `rows_per_file`
+    rows each. Every file starts with the CSV header and is saved to storage
+    as soon as it's complete, along with its size and sha256 checksum.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        path_prefix: str,
+        header: str,
+        rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+    ):
+        self.storage = storage
+        self.path_prefix = path_prefix
+        self.header = header.encode()
+        self.rows_per_file = rows_per_file
+        self.files: list[BulkFile] = []
+        self._tmp: IO[bytes] | None = None
+
+    def _open(self) -> None:
+        self._tmp = tempfile.TemporaryFile()
+        self._compressor = bz2.BZ2Compressor()
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._rows = 0
+        self._compress(self.header)
+
+    def _compress(self, data: bytes) -> None:
+        self._emit(self._compressor.compress(data))
+
+    def _emit(self, compressed: bytes) -> None:
+        if not compressed:
+            return
+        assert self._tmp is not None
+        self._tmp.write(compressed)
+        self._hash.update(compressed)
+        self._size += len(compressed)
+
+    def _save(self) -> None:
+        assert self._tmp is not None
+        self._emit(self._compressor.flush())
+        self._tmp.seek(0)
+        name = f"{self.path_prefix}-{len(self.files) + 1:05d}.csv.bz2"
+        name = self.storage.save(name, File(self._tmp))
+        self._tmp.close()
+        self._tmp = None
+        self.files.append(
+            {
+                "name": name,
+                "rows": self._rows,
+                "size": self._size,
+                "sha256": self._hash.hexdigest(),
+            }
+        )
+
+    def write_row(self, row: bytes) -> None:
+        if self._tmp is None:
+            self._open()
+        self._compress(row)
+        self._rows += 1
+        if self._rows >= self.rows_per_file:
+            self._save()
+
+    def close(self) -> list[BulkFile]:
+        """Save the file in progress, if any.
+
+        :return: The list of files written.
+        """
+        if self._tmp is not None:
+            self._save()
+        return self.files
+
+
+def copy_rows(query: str, params: list[Any]) -> Iterator[bytes]:
+    """Stream the rows of a query as CSV lines using COPY.
+
+    :param query: The SELECT query to export.
+    :param params: The parameters of the query.
+    :return: A generator of CSV encoded rows, one per COPY message.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL statement_timeout TO 0")
+        with cursor.cursor.copy(
+            f"COPY ({query}) TO STDOUT WITH ({COPY_OPTIONS})", params
+        ) as copy:
+            for row in copy:
+                yield bytes(row)
+
+
+@contextmanager
+def export_snapshot() -> Iterator[tuple[str | None, datetime]]:
+    """Open the transaction that an export run reads its rows from.
+
+    The transaction stays open until the run is done so worker threads can
+    import its snapshot. The watermark is read along with the snapshot, so
+    every row dated up to it and committed by then is part of the export.
+
+    When already inside a transaction, as in tests, that transaction is used
+    and no snapshot is exported, since Postgres can't export one from a
+    savepoint. The run must then read every table from the current thread.
+
+    :return: A context manager yielding the snapshot id, if any, and the
+    watermark.
+    """
+    is_outermost = not connection.in_atomic_block
+    with transaction.atomic(), connection.cursor() as cursor:
+        if is_outermost:
+            cursor.execute(
+                "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"
+            )
+            cursor.execute("SELECT pg_export_snapshot(), clock_timestamp()")
+        else:
+            cursor.execute("SELECT NULL, clock_timestamp()")
+        snapshot, watermark = cursor.fetchone()
+        yield snapshot, watermark
+
+
+@contextmanager
+def snapshot_transaction(snapshot: str) -> Iterator[None]:
+    """Open a transaction on a worker thread that sees the same rows as the
+    transaction that exported the snapshot.
+
+    :param snapshot: The id of the snapshot returned by `export_snapshot`.
+    :return: A context manager running the transaction.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"
+            )
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", [snapshot])
+        yield
+
+
+def get_deletion_events_table(table: str) -> str | None:
+    """Get the pghistory event table that tracks deletions for a table.
+
+    :param table: The name of the tracked table.
+    :return: The name of the event table, or None if there's no event table
+    that links its events to the deleted rows.
+    """
+    events_table = f"{table}event"
+    with connection.cursor() as cursor:
+        if events_table not in connection.introspection.table_names(cursor):
+            return None
+        columns = {
+            column.name
+            for column in connection.introspection.get_table_description(
+                cursor, events_table
+            )
+        }
+    if {"pgh_obj_id", "pgh_label", "pgh_created_at"} <= columns:
+        return events_table
+    return None
+
+
+def export_table(
+    bulk_table: BulkTable,
+    kind: str,
+    since: datetime | None,
+    until: datetime,
+    storage: Storage,
+    run_prefix: str,
+    rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+) -> BulkTableManifest:
+    """Export a single table to compressed CSV chunks.
+
+    :param bulk_table: The table to export.
+    :param kind: The kind of the export run, full or delta.
+    :param since: The start of the delta window, exclusive. It already
+    includes the overlap with the previous window.
+    :param until: The end of the delta window, inclusive.
+    :param storage: The storage where the files are saved.
+    :param run_prefix: The path prefix of the export run.
+    :param rows_per_file: The maximum number of rows per file.
+    :return: The manifest entry of the table.
+    """
+    qn = connection.ops.quote_name
+    is_delta = kind == BulkExportKind.DELTA and bulk_table.has_date_modified
+    columns = ", ".join(qn(field) for field in bulk_table.fields)
+    query = f"SELECT {columns} FROM {qn(bulk_table.table)}"
+    params: list[Any] = []
+    if is_delta:
+        query += " WHERE date_modified > %s AND date_modified <= %s"
+        params = [since, until]
+    query += " ORDER BY id"
+
+    path_prefix = (
+        f"{run_prefix}/{bulk_table.file_prefix}/{bulk_table.file_prefix}"
+    )
+    writer = ChunkedCSVWriter(
+        storage, path_prefix, f"{','.join(bulk_table.fields)}\n", rows_per_file
+    )
+    for row in copy_rows(query, params):
+        writer.write_row(row)
+    files = writer.close()
+
+    deleted_files: list[BulkFile] = []
+    if is_delta and (
+        events_table := get_deletion_events_table(bulk_table.table)
+    ):
+        deleted_writer = ChunkedCSVWriter(
+            storage, f"{path_prefix}-deleted", "id\n", rows_per_file
+        )
+        deleted_query = (
+            f"SELECT DISTINCT pgh_obj_id FROM {qn(events_table)} "
+            "WHERE pgh_label = 'delete' "
+            "AND pgh_created_at > %s AND pgh_created_at <= %s "
+            "ORDER BY pgh_obj_id"
+        )
+        for row in copy_rows(deleted_query, [since, until]):
+            deleted_writer.write_row(row)
+        deleted_files = deleted_writer.close()
+
+    logger.info(
+        "Exported %s rows from %s in %s files.",
+        sum(f["rows"] for f in files),
+        bulk_table.table,
+        len(files),
+    )
+    return {
+        "table": bulk_table.table,
+        "kind": BulkExportKind.DELTA if is_delta else BulkExportKind.FULL,
+        "fields": list(bulk_table.fields),
+        "files": files,
+        "deleted_files": deleted_files,
+    }
+
+
+def _export_table_in_thread(snapshot: str, *args: Any) -> BulkTableManifest:
+    """Export a table from a worker thread in the snapshot of the export run,
+    closing the thread's own DB connection once it's done.
+    """
+    try:
+        with snapshot_transaction(snapshot):
+            return export_table(*args)
+    finally:
+        connection.close()
+
+
+def save_json(storage: Storage, name: str, data: dict[str, Any]) -> str:
+    """Save a JSON document to storage, atomically replacing any previous
+    version so readers never find it missing or half written.
+
+    S3 replaces objects atomically, so our S3 storages, which overwrite
+    files, save it in place. On a local file system, the document is written
+    to a temporary file next to it and renamed over it.
+
+    :param storage: The storage where the document is saved.
+    :param name: The path of the document.
+    :param data: The data to serialize.
+    :return: The name of the saved file.
+    """
+    content = json.dumps(data, indent=2, default=str).encode()
+    if not isinstance(storage, FileSystemStorage):
+        return storage.save(name, ContentFile(content))
+
+    path = storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path), delete=False
+    ) as f:
+        f.write(content)
+    os.chmod(f.name, storage.file_permissions_mode or 0o644)
+    os.replace(f.name, path)
+    return name
+
+
+def make_load_script(
+    table_manifests: list[BulkTableManifest], run_prefix: str
+) -> str:
+    """Make a bash script that loads the files of a full export into
+    PostgreSQL, table by table in the export order.
+
+    :param table_manifests: The manifest entries of the exported tables.
+    :param run_prefix: The path prefix of the export run. File paths in the
+    script are relative to it.
+    :return: The content of the script.
+    """
+    lines = [LOAD_SCRIPT_HEADER]
+    for table_manifest in table_manifests:
+        columns = ", ".join(table_manifest["fields"])
+        command = (
+            f"\\COPY public.{table_manifest['table']} ({columns}) "
+            f"FROM PSTDIN WITH ({LOAD_COPY_OPTIONS})"
+        )
+        for bulk_file in table_manifest["files"]:
+            path = os.path.relpath(bulk_file["name"], run_prefix)
+            lines.append(
+                f'echo "Loading {path} to database"\n'
+                f'bunzip2 -c "$BULK_DIR"/{shlex.quote(path)} | '
+                f'psql --command "{command}" '
+                '--host "$BULK_DB_HOST" --username "$BULK_DB_USER" '
+                '--dbname "$BULK_DB_NAME"\n'
+            )
+    return "\n".join(lines)
+
+
+def get_last_export_date(storage: Storage) -> datetime | None:
+    """Get the end of the window covered by the latest export.
+
+    :param storage: The storage where the exports are saved.
+    :return: The date of the latest export or None if there's none.
+    """
+    if not storage.exists(LATEST_EXPORT_PATH):
+        return None
+    with storage.open(LATEST_EXPORT_PATH) as f:
+        latest = json.load(f)
+    return parser.parse(latest["until"])
+
+
+def export_bulk_data(
+    kind: str,
+    storage: Storage,
+    tables: list[BulkTable] | None = None,
+    since: datetime | None = None,
+    workers: int = 4,
+    rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+    parquet_datasets: list[ParquetDataset] | None = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    overlap: timedelta = DELTA_OVERLAP,
+) -> dict[str, Any]:
+    """Run a full or delta export of the bulk data tables and save its
+    manifest.
+
+    :param kind: The kind of the export run, full or delta.
+    :param storage: The storage where the files are saved.
+    :param tables: The tables to export. Defaults to every bulk data table.
+    :param since: The start of the delta window. Defaults to the end of the
+    latest export. The window starts `overlap` earlier.
+    :param workers: The number of tables to export in parallel. With one
+    worker or when called inside a transaction, tables are exported in the
+    current thread.
+    :param rows_per_file: The maximum number of rows per file.
+    :param parquet_datasets: The Parquet datasets to export alongside the
+    CSV files. Only supported in full exports.
+    :param row_group_size: The number of rows in each Parquet row group.
+    :param overlap: How far before `since` the delta window starts, to catch
+    rows committed after the previous export but dated before its end.
+    :return: The manifest of the export run.
+    """
+    if parquet_datasets and kind != BulkExportKind.FULL:
+        raise ValueError("Parquet datasets are only exported in full.")
+
+    if kind == BulkExportKind.DELTA and since is None:
+        since = get_last_export_date(storage)
+        if since is None:
+            raise ValueError(
+                "No previous export found. Run a full export or provide the "
+                "start date of the delta."
+            )
+    window_start = since - overlap if since else None
+
+    tables = tables or BULK_DATA_TABLES
+    with export_snapshot() as (snapshot, until):
+        run_prefix = f"{BULK_DATA_PREFIX}/{kind}/{until:%Y-%m-%dT%H%M%S}"
+        args = [
+            (
+                table,
+                kind,
+                window_start,
+                until,
+                storage,
+                run_prefix,
+                rows_per_file,
+            )
+            for table in tables
+        ]
+        if workers > 1 and snapshot:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                table_manifests = list(
+                    executor.map(
+                        lambda a: _export_table_in_thread(snapshot, *a), args
+                    )
+                )
+        else:
+            table_manifests = [export_table(*a) for a in args]
+
+        parquet_args = [
+            (dataset, storage, run_prefix, row_group_size)
+            for dataset in parquet_datasets or []
+        ]
+        if workers > 1 and snapshot and parquet_args:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parquet_manifests = list(
+                    executor.map(
+                        lambda a: _export_parquet_dataset_in_thread(
+                            snapshot, *a
+                        ),
+                        parquet_args,
+                    )
+                )
+        else:
+            parquet_manifests = [
+                export_parquet_dataset(*a) for a in parquet_args
+            ]
+
+    manifest = {
+        "kind": kind,
+        "since": since.isoformat() if since else None,
+        "window_start": window_start.isoformat() if window_start else None,
+        "until": until.isoformat(),
+        "tables": table_manifests,
+        "parquet": parquet_manifests,
+        "load_script": None,
+    }
+    if kind == BulkExportKind.FULL:
+        manifest["load_script"] = storage.save(
+            f"{run_prefix}/load-bulk-data.sh",
+            ContentFile(
+                make_load_script(table_manifests, run_prefix).encode()
+            ),
+        )
+    manifest_name = save_json(storage, f"{run_prefix}/manifest.json", manifest)
+    save_json(
+        storage,
+        LATEST_EXPORT_PATH,
+        {"kind": kind, "until": until.isoformat(), "manifest": manifest_name},
+    )
+    return manifest
+
+
+def get_arrow_schema(model: type[Model], fields: Iterable[str]) -> pa.Schema:
+    """Build the Arrow schema for some fields of a model.
+
+    :param model: The model the fields belong to.
+    :param fields: The field names or attnames, e.g.: docket_id.
+    :return: The Arrow schema.
+    """
+    arrow_fields = []
+    for name in fields:
+        field = model._meta.get_field(name)
+        if field.is_relation:
+            field = field.target_field  # type: ignore[union-attr]
+        arrow_type = ARROW_TYPES.get(field.get_internal_type(), pa.string())
+        arrow_fields.append(pa.field(name, arrow_type))
+    return pa.schema(arrow_fields)
+
+
+def write_parquet_file(
+    storage: Storage,
+    name: str,
+    schema: pa.Schema,
+    rows: Iterable[tuple[Any, ...]],
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> BulkFile:
+    """Write rows to a compressed and dictionary encoded Parquet file.
+
+    :param storage: The storage where the file is saved.
+    :param name: The path of the file.
+    :param schema: The Arrow schema of the rows.
+    :param rows: The rows to write, with values in the schema order.
+    :param row_group_size: The number of rows in each row group.
+    :return: The file entry for the manifest.
+    """
+    row_count = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "part.parquet")
+        with pq.ParquetWriter(
+            path, schema, compression=PARQUET_COMPRESSION, use_dictionary=True
+        ) as writer:
+            for batch in batched(rows, row_group_size):
+                columns = zip(*batch)
+                writer.write_table(
+                    pa.Table.from_arrays(
+                        [
+                            pa.array(column, type=field.type)
+                            for column, field in zip(columns, schema)
+                        ],
+                        schema=schema,
+                    )
+                )
+                row_count += len(batch)
+        with open(path, "rb") as f:
+            sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+            f.seek(0)
+            name = storage.save(name, File(f))
+        size = os.path.getsize(path)
+    return {"name": name, "rows": row_count, "size": size, "sha256": sha256}
+
+
+def export_parquet_dataset(
+    dataset: ParquetDataset,
+    storage: Storage,
+    run_prefix: str,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> ParquetDatasetManifest:
+    """Export a table as a Parquet dataset partitioned by court and year.
+
+    Rows are read court by court from a server-side cursor, sorted by year
+    so each partition is written in a single pass.
+
+    :param dataset: The dataset to export.
+    :param storage: The storage where the files are saved.
+    :param run_prefix: The path prefix of the export run.
+    :param row_group_size: The number of rows in each row group.
+    :return: The manifest entry of the dataset.
+    """
+    schema = get_arrow_schema(dataset.model, dataset.fields)
+    files: list[BulkFile] = []
+    court_ids = Court.objects.order_by("pk").values_list("pk", flat=True)
+    for court_id in court_ids:
+        rows = (
+            dataset.model.objects.filter(**{dataset.court_lookup: court_id})  # type: ignore[attr-defined]
+            .annotate(partition_year=ExtractYear(dataset.date_lookup))
+            .order_by("partition_year", "pk")
+            .values_list("partition_year", *dataset.fields)
+            .iterator(chunk_size=row_group_size)
+        )
+        for year, year_rows in groupby(rows, key=itemgetter(0)):
+            name = (
+                f"{run_prefix}/parquet/{dataset.name}/court_id={court_id}/"
+                f"year={year or 'unknown'}/part-00001.parquet"
+            )
+            files.append(
+                write_parquet_file(
+                    storage,
+                    name,
+                    schema,
+                    (row[1:] for row in year_rows),
+                    row_group_size,
+                )
+            )
+
+    logger.info(
+        "Exported %s rows from %s in %s Parquet files.",
+        sum(f["rows"] for f in files),
+        dataset.name,
+        len(files),
+    )
+    return {
+        "name": dataset.name,
+        "fields": list(dataset.fields),
+        "files": files,
+    }
+
+
+def _export_parquet_dataset_in_thread(
+    snapshot: str, *args: Any
+) -> ParquetDatasetManifest:
+    """Export a Parquet dataset from a worker thread in the snapshot of the
+    export run, closing the thread's own DB connection once it's done.
+    """
+    try:
+        with snapshot_transaction(snapshot):
+            return export_parquet_dataset(*args)
+    finally:
+        connection.close()
@@ -0,0 +1,108 @@
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError
+
+from cl.api.bulk_data import (
+    BULK_DATA_TABLES,
+    DEFAULT_ROW_GROUP_SIZE,
+    DEFAULT_ROWS_PER_FILE,
+    PARQUET_DATASETS,
+    BulkExportKind,
+    export_bulk_data,
+)
+from cl.lib.argparse_types import valid_date_time
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.lib.storage import BulkDataAWSStorage
+
+
+class Command(VerboseCommand):
+    help = (
+        "Export the bulk data tables to compressed CSV files. A full export "
+        "writes every row, while a delta export only writes the rows "
+        "changed or deleted since the latest export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            choices=[BulkExportKind.FULL, BulkExportKind.DELTA],
+            default=BulkExportKind.DELTA,
+            help="The kind of export to run.",
+        )
+        parser.add_argument(
+            "--since",
+            type=valid_date_time,
+            help="The start of the delta window. Defaults to the end of the "
+            "latest export.",
+        )
+        parser.add_argument(
+            "--tables",
+            nargs="+",
+            choices=[t.table for t in BULK_DATA_TABLES],
+            help="The tables to export. Defaults to every bulk data table.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="The number of tables to export in parallel.",
+        )
+        parser.add_argument(
+            "--rows-per-file",
+            type=int,
+            default=DEFAULT_ROWS_PER_FILE,
+            help="The maximum number of rows in each file.",
+        )
+        parser.add_argument(
+            "--parquet",
+            nargs="+",
+            choices=[d.name for d in PARQUET_DATASETS],
+            help="Also export these tables as Parquet datasets partitioned "
+            "by court and year. Only supported in full exports.",
+        )
+        parser.add_argument(
+            "--row-group-size",
+            type=int,
+            default=DEFAULT_ROW_GROUP_SIZE,
+            help="The number of rows in each Parquet row group.",
+        )
+        parser.add_argument(
+            "--output-dir",
+            help="Save the files to this local directory instead of S3.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        if options["parquet"] and options["kind"] != BulkExportKind.FULL:
+            raise CommandError("Parquet datasets are only exported in full.")
+
+        storage = (
+            FileSystemStorage(location=options["output_dir"])
+            if options["output_dir"]
+            else BulkDataAWSStorage()
+        )
+        tables = parquet_datasets = None
+        if options["parquet"]:
+            parquet_datasets = [
+                d for d in PARQUET_DATASETS if d.name in options["parquet"]
+            ]
+        if options["tables"]:
+            tables = [
+                t for t in BULK_DATA_TABLES if t.table in options["tables"]
+            ]
+
+        manifest = export_bulk_data(
+            options["kind"],
+            storage,
+            tables=tables,
+            since=options["since"],
+            workers=options["workers"],
+            rows_per_file=options["rows_per_file"],
+            parquet_datasets=parquet_datasets,
+            row_group_size=options["row_group_size"],
+        )
+        logger.info(
+            "Finished %s export of %s tables until %s.",
+            manifest["kind"],
+            len(manifest["tables"]),
+            manifest["until"],
+        )
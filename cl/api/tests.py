@@ -1,4 +1,9 @@
+import bz2
+import csv
+import hashlib
+import io
 import json
+import tempfile
 import time
 from collections import OrderedDict, defaultdict
 from datetime import UTC, date, datetime, timedelta
@@ -8,6 +13,7 @@ from unittest import mock
 from unittest.mock import MagicMock, patch
 from urllib.parse import parse_qs, urlparse
 
+import pyarrow.parquet as pq
 import time_machine
 from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth.hashers import make_password
@@ -17,6 +23,7 @@ from django.contrib.humanize.templatetags.humanize import intcomma, ordinal
 from django.contrib.sites.models import Site
 from django.core.cache import caches
 from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
 from django.core.management import call_command
 from django.db import IntegrityError, connection
 from django.test import RequestFactory, SimpleTestCase, override_settings
@@ -25,6 +32,7 @@ from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 from django.utils.xmlutils import UnserializableContentError
+from redis import ConnectionError as RedisConnectionError
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import NotFound, Throttled
@@ -37,6 +45,15 @@ from waffle.testutils import override_switch
 
 from cl.alerts.api_views import DocketAlertViewSet, SearchAlertViewSet
 from cl.api.api_permissions import V3APIPermission
+from cl.api.bulk_data import (
+    BULK_DATA_TABLES,
+    DELTA_OVERLAP,
+    PARQUET_DATASETS,
+    BulkExportKind,
+    ChunkedCSVWriter,
+    export_bulk_data,
+    get_last_export_date,
+)
 from cl.api.constants import LEVEL_TO_RATES, TIER_3_RATES
 from cl.api.factories import (
     APIThrottleFactory,
@@ -56,18 +73,27 @@ from cl.api.utils import (
     ExceptionalUserRateThrottle,
     FetchRateThrottle,
     LoggingMixin,
+    api_stats_buffer,
     apply_membership_throttles,
     clear_membership_throttles,
     detect_unknown_filter_params,
     get_all_throttle_overrides,
+    get_crossed_milestones,
+    get_current_throttle_usage,
     get_logging_prefix,
+    get_recent_api_request_count,
+    get_throttle_windows_key,
     get_user_api_usage,
     invert_user_logs,
     is_valid_filter_param,
     promo_doubling_applies,
     promo_switch_is_active,
 )
-from cl.api.views import make_court_variable
+from cl.api.views import (
+    fetch_first_last_date_filed,
+    get_cached_court_counts,
+    make_court_variable,
+)
 from cl.api.webhooks import send_webhook_event
 from cl.audio.api_views import AudioViewSet
 from cl.audio.audio_sources import AudioSources
@@ -92,9 +118,20 @@ from cl.donate.models import (
     NeonMembershipLevel,
 )
 from cl.favorites.api_views import DocketTagViewSet, UserTagViewSet
+from cl.favorites.counters import (
+    FLUSHES_LABEL,
+    annotate_docket_views,
+    flush_event_counts,
+    increment_event_count,
+)
 from cl.favorites.models import GenericCount
 from cl.lib.decorators import clear_tiered_cache
-from cl.lib.redis_utils import get_redis_interface
+from cl.lib.redis_utils import (
+    get_redis_interface,
+    make_coverage_key,
+    make_event_counts_key,
+)
+from cl.lib.storage import BulkDataAWSStorage
 from cl.lib.test_helpers import AudioTestCase, SimpleUserDataMixin
 from cl.lib.url_utils import BASE_URL
 from cl.people_db.api_views import (
@@ -142,6 +179,12 @@ from cl.search.api_views import (
     RECAPDocumentViewSet,
     TagViewSet,
 )
+from cl.search.coverage import (
+    FIRST_FIELD,
+    LAST_FIELD,
+    rebuild_opinion_coverage,
+    update_opinion_coverage,
+)
 from cl.search.factories import (
     BankruptcyInformationFactory,
     CourtFactory,
@@ -540,6 +583,90 @@ class CoverageTests(ESIndexTestCase, TestCase):
             if court.pk == self.court_cand.pk:
                 self.assertEqual(1, court.count)
 
+    @override_settings(COVERAGE_STATS_ENABLED=True)
+    def test_coverage_stats_store(self) -> None:
+        """Are court counts and first/last dates read from the coverage
+        store, and updated as opinions are added and removed?
+        """
+        r = get_redis_interface("CACHE")
+
+        def delete_coverage_keys():
+            keys = r.keys(make_coverage_key(SEARCH_TYPES.OPINION, "*"))
+            r.delete(make_coverage_key(SEARCH_TYPES.OPINION), *keys)
+
+        self.addCleanup(delete_coverage_keys)
+        rebuild_opinion_coverage()
+        courts = Court.objects.all()
+
+        with self.assertNumQueries(0):
+            counts = async_to_sync(get_cached_court_counts)(courts)
+            dates = async_to_sync(fetch_first_last_date_filed)(
+                self.court_scotus.pk
+            )
+        self.assertEqual(counts[self.court_scotus.pk], 2)
+        self.assertEqual(counts[self.court_cand.pk], 1)
+        self.assertEqual(dates, (date(2000, 8, 15), date(2024, 6, 15)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            opinion = OpinionWithParentsFactory(cluster=self.c_cand_1)
+        counts = async_to_sync(get_cached_court_counts)(courts)
+        self.assertEqual(counts[self.court_cand.pk], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            opinion.delete()
+            Opinion.objects.filter(cluster=self.c_scotus_2).delete()
+        counts = async_to_sync(get_cached_court_counts)(courts)
+        self.assertEqual(counts[self.court_cand.pk], 1)
+        self.assertEqual(counts[self.court_scotus.pk], 1)
+        dates = async_to_sync(fetch_first_last_date_filed)(
+            self.court_scotus.pk
+        )
+        self.assertEqual(
+            dates,
+            (date(2000, 8, 15), date(2024, 6, 15)),
+            msg="The last date should be looked up again from the clusters.",
+        )
+
+    @override_settings(COVERAGE_STATS_ENABLED=True)
+    def test_coverage_dates_never_move_backwards(self) -> None:
+        """Are the first and last dates only extended, whatever order the
+        updates and database lookups land in?
+        """
+        r = get_redis_interface("CACHE")
+        key = make_coverage_key(SEARCH_TYPES.OPINION, self.court_scotus.pk)
+
+        def delete_coverage_keys():
+            keys = r.keys(make_coverage_key(SEARCH_TYPES.OPINION, "*"))
+            r.delete(make_coverage_key(SEARCH_TYPES.OPINION), *keys)
+
+        self.addCleanup(delete_coverage_keys)
+        rebuild_opinion_coverage()
+
+        update_opinion_coverage(self.court_scotus.pk, date(2025, 3, 1), 1)
+        update_opinion_coverage(self.court_scotus.pk, date(2025, 1, 1), 1)
+        update_opinion_coverage(self.court_scotus.pk, date(1999, 1, 1), 1)
+        update_opinion_coverage(self.court_scotus.pk, date(1999, 6, 1), 1)
+        self.assertEqual(
+            r.hmget(key, FIRST_FIELD, LAST_FIELD), ["1999-01-01", "2025-03-01"]
+        )
+        self.assertEqual(r.hget(key, "2025-01"), "1")
+
+        # An opinion saved while the first date is looked up again keeps its
+        # later last date.
+        r.hdel(key, FIRST_FIELD)
+        dates = async_to_sync(fetch_first_last_date_filed)(
+            self.court_scotus.pk
+        )
+        self.assertEqual(dates, (date(2000, 8, 15), date(2024, 6, 15)))
+        self.assertEqual(
+            r.hmget(key, FIRST_FIELD, LAST_FIELD), ["2000-08-15", "2025-03-01"]
+        )
+
+        update_opinion_coverage(self.court_scotus.pk, date(2025, 3, 1), -1)
+        self.assertEqual(
+            r.hmget(key, FIRST_FIELD, LAST_FIELD), ["2000-08-15", None]
+        )
+
 
 @mock.patch(
     "cl.api.utils.get_logging_prefix",
@@ -906,6 +1033,80 @@ class ApiEventCreationTestCase(TestCase):
             int(self.r.get("api:v4-Test.timing")), 10, delta=2000
         )
 
+    @mock.patch(
+        "cl.api.utils.get_logging_prefix",
+        return_value="api:Test",
+    )
+    @mock.patch.object(LoggingMixin, "milestones", new=[2])
+    @override_settings(
+        API_STATS_FLUSH_MAX_REQUESTS=3, API_STATS_FLUSH_INTERVAL=3600
+    )
+    async def test_buffered_stats_and_milestones(
+        self, mock_logging_prefix
+    ) -> None:
+        """Are stats buffered until the flush threshold is reached, and are
+        the milestones crossed by the batched counts detected?
+        """
+        await sync_to_async(api_stats_buffer.flush)()
+        await self.hit_the_api("v3")
+        await self.hit_the_api("v3")
+        self.assertIsNone(self.r.get("api:Test.count"))
+        self.assertEqual(await Event.objects.acount(), 0)
+
+        await self.hit_the_api("v3")
+        self.assertEqual(int(self.r.get("api:Test.count")), 3)
+        self.assertEqual(
+            self.r.zscore("api:Test.user.counts", self.user.pk), 3
+        )
+        self.assertEqual(
+            self.r.zscore("api:Test.endpoint.counts", self.endpoint_name), 3
+        )
+        event_descriptions = {
+            event.description async for event in Event.objects.all()
+        }
+        self.assertEqual(
+            event_descriptions,
+            {
+                "API v3 has logged 1 total requests.",
+                f"User '{self.user.username}' has placed their 2nd API v3 request.",
+            },
+        )
+
+    @mock.patch(
+        "cl.api.utils.get_logging_prefix",
+        return_value="api:Test",
+    )
+    @override_settings(
+        API_STATS_FLUSH_MAX_REQUESTS=2, API_STATS_FLUSH_INTERVAL=3600
+    )
+    async def test_failed_flush_keeps_stats(self, mock_logging_prefix) -> None:
+        """Are the stats of a flush that fails to reach Redis kept for the
+        next flush?
+        """
+        await sync_to_async(api_stats_buffer.flush)()
+        await self.hit_the_api("v3")
+        with mock.patch("cl.api.utils.get_redis_interface") as mock_redis:
+            mock_redis.return_value.pipeline.return_value.execute.side_effect = RedisConnectionError
+            with self.assertRaises(RedisConnectionError):
+                await sync_to_async(api_stats_buffer.flush)()
+        self.assertIsNone(self.r.get("api:Test.count"))
+
+        await self.hit_the_api("v3")
+        self.assertEqual(int(self.r.get("api:Test.count")), 2)
+        self.assertEqual(
+            self.r.zscore("api:Test.user.counts", self.user.pk), 2
+        )
+
+
+class CrossedMilestonesTest(SimpleTestCase):
+    def test_get_crossed_milestones(self) -> None:
+        """Are the milestones between the old and new counts returned?"""
+        milestones = [1, 5, 10, 25]
+        self.assertEqual(get_crossed_milestones(1, 1, milestones), [1])
+        self.assertEqual(get_crossed_milestones(4, 1, milestones), [])
+        self.assertEqual(get_crossed_milestones(12, 8, milestones), [5, 10])
+        self.assertEqual(get_crossed_milestones(10, 0, milestones), [])
+
 
 @override_settings(BLOCK_NEW_V3_USERS=True)
 @mock.patch(
@@ -4095,6 +4296,91 @@ class EventCountApiTest(TestCase):
         # Assert that the value of the event record has been incremented by 1
         self.assertEqual(event_record.value, 4)
 
+    @override_settings(EVENT_COUNTS_WRITE_BEHIND=True)
+    def test_write_behind_event_counts(self):
+        """Are buffered events counted in responses and saved on flush?"""
+        r = get_redis_interface("CACHE")
+        keys = [
+            make_event_counts_key(s)
+            for s in ("pending", "flushing", "totals", "flushes")
+        ]
+        r.delete(*keys)
+        self.addCleanup(r.delete, *keys)
+        docket = DocketFactory()
+        label = f"d.{docket.pk}:view"
+        GenericCount.objects.create(label=label, value=3)
+
+        for expected_value in (3, 4):
+            response = self.client.post(
+                self.increment_event_v4, {"label": label}
+            )
+            self.assertEqual(response.status_code, HTTPStatus.ACCEPTED)
+            self.assertEqual(response.data["value"], expected_value)
+
+        # Nothing is saved until the counts are flushed.
+        self.assertEqual(GenericCount.objects.get(label=label).value, 3)
+        # Reads add the increments that weren't saved yet to the dockets
+        # they're asked for.
+        dockets = Docket.objects.filter(pk=docket.pk)
+        self.assertEqual(
+            dockets.annotate(views=annotate_docket_views("pk", [docket.pk]))
+            .get()
+            .views,
+            5,
+        )
+        self.assertEqual(
+            dockets.annotate(views=annotate_docket_views("pk")).get().views,
+            3,
+        )
+        self.assertEqual(flush_event_counts(), 1)
+        self.assertEqual(GenericCount.objects.get(label=label).value, 5)
+
+        # Once a label is seeded, its count is served from Redis.
+        with self.assertNumQueries(0):
+            self.assertEqual(increment_event_count(label), 5)
+        call_command("flush_event_counts", daemon=True, testing_iterations=1)
+        self.assertEqual(GenericCount.objects.get(label=label).value, 6)
+
+        # New labels are created and there's nothing left to flush twice.
+        self.client.post(self.increment_event_v4, {"label": "d.568:view"})
+        self.assertEqual(flush_event_counts(), 1)
+        self.assertEqual(GenericCount.objects.get(label="d.568:view").value, 1)
+        self.assertEqual(flush_event_counts(), 0)
+
+    @override_settings(EVENT_COUNTS_WRITE_BEHIND=True)
+    def test_event_counts_seeded_during_a_flush(self):
+        """Are increments a flush saved but didn't remove yet counted once,
+        and left out of the next flush?
+        """
+        r = get_redis_interface("CACHE")
+        keys = [
+            make_event_counts_key(s)
+            for s in ("pending", "flushing", "totals", "flushes")
+        ]
+        r.delete(*keys)
+        self.addCleanup(r.delete, *keys)
+        label = "d.569:view"
+        GenericCount.objects.create(label=label, value=3)
+        increment_event_count(label)
+        self.assertEqual(flush_event_counts(), 1)
+        increment_event_count(label)
+        increment_event_count(label)
+
+        # Stop a flush between saving its increments and removing them, and
+        # seed the label again meanwhile.
+        r.rename(keys[0], keys[1])
+        GenericCount.objects.filter(label=label).update(value=6)
+        GenericCount.objects.filter(label=FLUSHES_LABEL).update(value=2)
+        r.delete(keys[2])
+        self.assertEqual(increment_event_count(label), 6)
+
+        self.assertEqual(flush_event_counts(), 1)
+        self.assertEqual(GenericCount.objects.get(label=label).value, 7)
+        self.assertEqual(
+            GenericCount.objects.get(label=FLUSHES_LABEL).value, 3
+        )
+        self.assertEqual(r.get(keys[3]), "3")
+
 
 class DeferredDocketEntryTestMixin:
     def list(self, request, *args, **kwargs):
@@ -4685,6 +4971,391 @@ class BankruptcyInformationAPITests(TestCase):
         self.assertIsNotNone(docket_with_bankruptcy["bankruptcy_information"])
 
 
+class BatchRetrieveAPITests(TestCase):
+    """Tests for the V4 batch retrieval action on the dockets, docket entries
+    and RECAP documents endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_1 = UserProfileWithParentsFactory.create(
+            user__username="recap-user",
+            user__password=make_password("password"),
+        )
+        ps = Permission.objects.filter(codename="has_recap_api_access")
+        cls.user_1.user.user_permissions.add(*ps)
+        cls.court = CourtFactory(id="canb", jurisdiction="FB")
+        cls.docket_1 = DocketFactory(
+            source=Docket.RECAP, court=cls.court, pacer_case_id="104490"
+        )
+        cls.docket_2 = DocketFactory(
+            source=Docket.RECAP, court=cls.court, pacer_case_id="104491"
+        )
+        cls.de = DocketEntryFactory(docket=cls.docket_1, entry_number=1)
+        cls.rd = RECAPDocumentFactory(
+            docket_entry=cls.de, document_number="1", pacer_doc_id="0001"
+        )
+
+    async def _batch_request(self, endpoint, params, version="v4"):
+        url = reverse(endpoint, kwargs={"version": version})
+        api_client = await sync_to_async(make_client)(self.user_1.user.pk)
+        return await api_client.get(url, params)
+
+    async def test_batch_returns_objects_in_requested_order(self) -> None:
+        """Are objects returned in the requested order, with unknown ids
+        listed as missing?
+        """
+        ids = [self.docket_2.pk, 999_999, self.docket_1.pk, self.docket_2.pk]
+        r = await self._batch_request(
+            "docket-batch", {"ids": ",".join(map(str, ids))}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertEqual(r.data["count"], 2)
+        self.assertEqual(r.data["missing"], [999_999])
+        self.assertEqual(
+            [d["id"] for d in r.data["results"]],
+            [self.docket_2.pk, self.docket_1.pk],
+        )
+
+    async def test_batch_supports_fields_and_omit(self) -> None:
+        """Can the fields and omit parameters be used in batch requests?"""
+        r = await self._batch_request(
+            "docketentry-batch",
+            {"ids": str(self.de.pk), "fields": "id,entry_number"},
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            set(r.data["results"][0].keys()), {"id", "entry_number"}
+        )
+
+        r = await self._batch_request(
+            "recapdocument-batch",
+            {"ids": str(self.rd.pk), "omit": "plain_text"},
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertEqual(r.data["results"][0]["id"], self.rd.pk)
+        self.assertNotIn("plain_text", r.data["results"][0])
+
+    async def test_batch_rejects_invalid_requests(self) -> None:
+        """Are invalid ids, too many ids and V3 requests rejected?"""
+        r = await self._batch_request("docket-batch", {"ids": "1,foo"})
+        self.assertEqual(r.status_code, HTTPStatus.BAD_REQUEST)
+
+        r = await self._batch_request("docket-batch", {})
+        self.assertEqual(r.status_code, HTTPStatus.BAD_REQUEST)
+
+        with mock.patch.object(DocketViewSet, "max_batch_ids", 1):
+            r = await self._batch_request(
+                "docket-batch",
+                {"ids": f"{self.docket_1.pk},{self.docket_2.pk}"},
+            )
+        self.assertEqual(r.status_code, HTTPStatus.BAD_REQUEST)
+
+        r = await self._batch_request(
+            "docket-batch", {"ids": str(self.docket_1.pk)}, version="v3"
+        )
+        self.assertEqual(r.status_code, HTTPStatus.NOT_FOUND)
+
+
+class NDJSONStreamAPITests(TestCase):
+    """Tests for the V4 NDJSON stream action of the DB endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_1 = UserProfileWithParentsFactory.create(
+            user__username="recap-user",
+            user__password=make_password("password"),
+        )
+        cls.court = CourtFactory(id="canb", jurisdiction="FB")
+        cls.court_2 = CourtFactory(id="cand", jurisdiction="FD")
+        cls.dockets = [
+            DocketFactory(source=Docket.RECAP, court=cls.court)
+            for _ in range(3)
+        ]
+        cls.other_docket = DocketFactory(
+            source=Docket.RECAP, court=cls.court_2
+        )
+
+    async def _stream_request(self, params, version="v4"):
+        url = reverse("docket-stream", kwargs={"version": version})
+        api_client = await sync_to_async(make_client)(self.user_1.user.pk)
+        return await api_client.get(url, params)
+
+    @staticmethod
+    async def _read_chunks(response) -> list[bytes]:
+        return [chunk async for chunk in response.streaming_content]
+
+    async def _parse_rows(self, response) -> list[dict[str, Any]]:
+        content = b"".join(await self._read_chunks(response)).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    async def test_stream_filtered_rows_in_id_order(self) -> None:
+        """Does the stream emit the filtered rows as NDJSON in id order?"""
+        r = await self._stream_request({"court": self.court.pk})
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertEqual(r["Content-Type"], "application/x-ndjson")
+        rows = await self._parse_rows(r)
+        self.assertEqual(
+            [row["id"] for row in rows], [d.pk for d in self.dockets]
+        )
+
+    async def test_stream_sends_rows_chunk_by_chunk(self) -> None:
+        """Is each chunk of rows sent as it's read under ASGI, instead of
+        buffering the whole stream?"""
+        with mock.patch.object(DocketViewSet, "stream_chunk_size", 1):
+            r = await self._stream_request({"court": self.court.pk})
+            chunks = await self._read_chunks(r)
+        self.assertEqual(len(chunks), len(self.dockets))
+        self.assertEqual(
+            [json.loads(chunk)["id"] for chunk in chunks],
+            [d.pk for d in self.dockets],
+        )
+
+    async def test_stream_resume_and_row_limit(self) -> None:
+        """Can a stream be resumed with after_id, and is it capped to
+        stream_max_rows?
+        """
+        with mock.patch.object(DocketViewSet, "stream_max_rows", 1):
+            r = await self._stream_request({"court": self.court.pk})
+            rows = await self._parse_rows(r)
+            self.assertEqual([row["id"] for row in rows], [self.dockets[0].pk])
+
+            r = await self._stream_request(
+                {"court": self.court.pk, "after_id": rows[-1]["id"]}
+            )
+            rows = await self._parse_rows(r)
+            self.assertEqual([row["id"] for row in rows], [self.dockets[1].pk])
+
+    async def test_after_id_is_only_valid_for_streams(self) -> None:
+        """Is after_id rejected as an unknown filter outside of streams?"""
+        url = reverse("docket-list", kwargs={"version": "v4"})
+        api_client = await sync_to_async(make_client)(self.user_1.user.pk)
+        r = await api_client.get(url, {"after_id": 1})
+        self.assertEqual(r.status_code, HTTPStatus.BAD_REQUEST)
+
+    async def test_stream_supports_fields(self) -> None:
+        """Are the fields parameter honored, and is the id field required?"""
+        r = await self._stream_request({"fields": "id,court_id"})
+        rows = await self._parse_rows(r)
+        self.assertEqual(set(rows[0].keys()), {"id", "court_id"})
+
+        r = await self._stream_request({"fields": "court_id"})
+        self.assertEqual(r.status_code, HTTPStatus.BAD_REQUEST)
+
+    async def test_stream_requires_authentication_and_v4(self) -> None:
+        """Are anonymous and V3 stream requests rejected?"""
+        url = reverse("docket-stream", kwargs={"version": "v4"})
+        r = await self.async_client.get(url)
+        self.assertIn(
+            r.status_code, [HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN]
+        )
+
+        r = await self._stream_request({}, version="v3")
+        self.assertEqual(r.status_code, HTTPStatus.NOT_FOUND)
+
+
+class BulkDataExportTest(TestCase):
+    """Tests for the full and delta bulk data exports."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.court = CourtFactory(id="canb", jurisdiction="FB")
+        cls.dockets = [
+            DocketFactory(source=Docket.RECAP, court=cls.court)
+            for _ in range(3)
+        ]
+        cls.docket_table = next(
+            t for t in BULK_DATA_TABLES if t.table == "search_docket"
+        )
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = FileSystemStorage(location=self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_bulk_data_storage_cache_headers(self) -> None:
+        """Are manifests and load scripts revalidated by caches, unlike the
+        data files?"""
+        storage = BulkDataAWSStorage()
+        for name in ("bulk-data/latest-export.json", "run/load-bulk-data.sh"):
+            params = storage.get_object_parameters(name)
+            self.assertEqual(params["CacheControl"], "no-cache")
+            self.assertNotIn("Expires", params)
+        params = storage.get_object_parameters("run/search_docket-0.csv.bz2")
+        self.assertEqual(params["CacheControl"], "max-age=315360000")
+
+    def _read_csv_ids(self, bulk_file) -> list[int]:
+        with self.storage.open(bulk_file["name"]) as f:
+            content = f.read()
+        self.assertEqual(
+            hashlib.sha256(content).hexdigest(), bulk_file["sha256"]
+        )
+        self.assertEqual(len(content), bulk_file["size"])
+        rows = list(
+            csv.DictReader(io.StringIO(bz2.decompress(content).decode()))
+        )
+        self.assertEqual(len(rows), bulk_file["rows"])
+        return [int(row["id"]) for row in rows]
+
+    def test_chunked_csv_writer_splits_files(self) -> None:
+        """Does the writer split rows into files with their own header?"""
+        writer = ChunkedCSVWriter(self.storage, "test/rows", "id\n", 2)
+        for i in range(5):
+            writer.write_row(f'"{i}"\n'.encode())
+        files = writer.close()
+        self.assertEqual([f["rows"] for f in files], [2, 2, 1])
+        self.assertEqual(self._read_csv_ids(files[2]), [4])
+
+    def test_full_and_delta_exports(self) -> None:
+        """Does a full export include every row, and the next delta only the
+        rows changed since then?
+        """
+        manifest = export_bulk_data(
+            BulkExportKind.FULL,
+            self.storage,
+            tables=[self.docket_table],
+            workers=1,
+            rows_per_file=2,
+        )
+        table_manifest = manifest["tables"][0]
+        self.assertEqual(table_manifest["kind"], BulkExportKind.FULL)
+        self.assertEqual(len(table_manifest["files"]), 2)
+        exported_ids = [
+            pk for f in table_manifest["files"] for pk in self._read_csv_ids(f)
+        ]
+        self.assertEqual(exported_ids, sorted(d.pk for d in self.dockets))
+        self.assertEqual(
+            get_last_export_date(self.storage).isoformat(), manifest["until"]
+        )
+
+        new_docket = DocketFactory(source=Docket.RECAP, court=self.court)
+        manifest = export_bulk_data(
+            BulkExportKind.DELTA,
+            self.storage,
+            tables=[self.docket_table],
+            workers=1,
+            overlap=timedelta(0),
+        )
+        table_manifest = manifest["tables"][0]
+        self.assertEqual(table_manifest["kind"], BulkExportKind.DELTA)
+        exported_ids = [
+            pk for f in table_manifest["files"] for pk in self._read_csv_ids(f)
+        ]
+        self.assertEqual(exported_ids, [new_docket.pk])
+
+    def test_delta_window_overlaps_the_previous_export(self) -> None:
+        """Does a delta window start before the end of the previous export,
+        so rows committed late are exported again instead of lost?
+        """
+        export_bulk_data(
+            BulkExportKind.FULL,
+            self.storage,
+            tables=[self.docket_table],
+            workers=1,
+        )
+        manifest = export_bulk_data(
+            BulkExportKind.DELTA,
+            self.storage,
+            tables=[self.docket_table],
+            workers=1,
+        )
+        self.assertEqual(
+            datetime.fromisoformat(manifest["window_start"]),
+            datetime.fromisoformat(manifest["since"]) - DELTA_OVERLAP,
+        )
+        exported_ids = [
+            pk
+            for f in manifest["tables"][0]["files"]
+            for pk in self._read_csv_ids(f)
+        ]
+        self.assertEqual(exported_ids, sorted(d.pk for d in self.dockets))
+
+    def test_full_export_writes_load_script(self) -> None:
+        """Does a full export write a script loading each of its files, and
+        replace the latest export pointer in place?
+        """
+        manifest = export_bulk_data(
+            BulkExportKind.FULL,
+            self.storage,
+            tables=[self.docket_table],
+            workers=1,
+            rows_per_file=2,
+        )
+        with self.storage.open(manifest["load_script"]) as f:
+            script = f.read().decode()
+        self.assertIn("\\COPY public.search_docket (id, ", script)
+        self.assertIn('"$BULK_DIR"/dockets/dockets-00001.csv.bz2', script)
+        self.assertIn('"$BULK_DIR"/dockets/dockets-00002.csv.bz2', script)
+
+        manifest = export_bulk_data(
+            BulkExportKind.DELTA,
+            self.storage,
+            tables=[self.docket_table],
+            workers=1,
+        )
+        self.assertIsNone(manifest["load_script"])
+        self.assertEqual(
+            get_last_export_date(self.storage).isoformat(), manifest["until"]
+        )
+        self.assertEqual(
+            self.storage.listdir("bulk-data")[1], ["latest-export.json"]
+        )
+
+    def test_parquet_dataset_partitioned_by_court_and_year(self) -> None:
+        """Are Parquet datasets partitioned by court and year, with one row
+        per row of the table?
+        """
+        DocketEntryFactory(
+            docket=self.dockets[0], entry_number=1, date_filed=date(2020, 1, 2)
+        )
+        DocketEntryFactory(
+            docket=self.dockets[1], entry_number=1, date_filed=date(2021, 1, 2)
+        )
+        DocketEntryFactory(
+            docket=self.dockets[1], entry_number=2, date_filed=date(2021, 3, 4)
+        )
+        dataset = next(
+            d for d in PARQUET_DATASETS if d.name == "docket-entries"
+        )
+        manifest = export_bulk_data(
+            BulkExportKind.FULL,
+            self.storage,
+            tables=[self.docket_table],
+            workers=1,
+            parquet_datasets=[dataset],
+        )
+        files = manifest["parquet"][0]["files"]
+        self.assertEqual(len(files), 2)
+        self.assertIn("/court_id=canb/year=2020/", files[0]["name"])
+        self.assertIn("/court_id=canb/year=2021/", files[1]["name"])
+
+        table = pq.read_table(self.storage.path(files[1]["name"]))
+        self.assertEqual(table.num_rows, files[1]["rows"])
+        self.assertEqual(table.column_names, list(dataset.fields))
+        self.assertEqual(table.column("entry_number").to_pylist(), [1, 2])
+
+        with self.assertRaises(ValueError):
+            export_bulk_data(
+                BulkExportKind.DELTA,
+                self.storage,
+                tables=[self.docket_table],
+                workers=1,
+                parquet_datasets=[dataset],
+            )
+
+    def test_delta_requires_a_previous_export(self) -> None:
+        """Is a delta without a previous export or start date rejected?"""
+        with self.assertRaises(ValueError):
+            export_bulk_data(
+                BulkExportKind.DELTA,
+                self.storage,
+                tables=[self.docket_table],
+                workers=1,
+            )
+
+
 class UnknownFilterParameterBlockingTests(TestCase):
     """Integration tests for unknown filter parameter blocking."""
 
@@ -5405,6 +6076,112 @@ class MultiRateThrottleTest(TestCase):
         self.assertIn("blocked", str(ctx.exception.detail).lower())
 
 
+@override_settings(API_THROTTLE_REDIS_COUNTERS=True)
+@override_switch(DOUBLE_API_THROTTLES_SWITCH, active=False)
+@mock.patch("cl.api.utils.get_all_throttle_overrides")
+class WindowCounterThrottleTest(TestCase):
+    """Tests for the bucketed Redis counter backend of the user throttle."""
+
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+        self.r = get_redis_interface("CACHE")
+        self.key = get_throttle_windows_key(f"throttle_user_{self.user.pk}")
+        self.r.delete(self.key)
+        self.t0 = datetime(2026, 4, 23, 12, 0, 0, tzinfo=UTC)
+
+    def tearDown(self) -> None:
+        self.r.delete(self.key)
+
+    def _set_rates(self, mock_overrides: mock.MagicMock, rates: list[str]):
+        mock_overrides.side_effect = lambda throttle_type: (
+            {self.user.username: rates}
+            if throttle_type == ThrottleType.API
+            else {}
+        )
+
+    def test_strictest_rate_wins(self, mock_overrides) -> None:
+        """The 6th request in a minute fails 5/min with a bucket-end wait."""
+        self._set_rates(mock_overrides, ["5/min", "50/hour"])
+        with time_machine.travel(self.t0, tick=False):
+            for _ in range(5):
+                throttle = ExceptionalUserRateThrottle()
+                self.assertTrue(throttle.allow_request(self.request, None))
+
+            throttle = ExceptionalUserRateThrottle()
+            with self.assertRaises(Throttled) as ctx:
+                throttle.allow_request(self.request, view=None)
+        self.assertIn("5/min", str(ctx.exception.detail))
+        # The 1s bucket holding all five requests ends at t0+1, so the
+        # window admits a request again at t0+61.
+        self.assertEqual(ctx.exception.wait, 61)
+
+    def test_rates_with_the_same_duration(self, mock_overrides) -> None:
+        """Rates sharing a duration are each enforced on their own."""
+        self._set_rates(mock_overrides, ["5/min", "10/60s"])
+        with time_machine.travel(self.t0, tick=False):
+            for _ in range(5):
+                throttle = ExceptionalUserRateThrottle()
+                self.assertTrue(throttle.allow_request(self.request, None))
+
+            throttle = ExceptionalUserRateThrottle()
+            with self.assertRaises(Throttled) as ctx:
+                throttle.allow_request(self.request, view=None)
+        self.assertIn("5/min", str(ctx.exception.detail))
+
+    def test_zero_rate_blocks_without_wait(self, mock_overrides) -> None:
+        """A 0/min rate blocks outright and reports no Retry-After."""
+        self._set_rates(mock_overrides, ["0/min"])
+        throttle = ExceptionalUserRateThrottle()
+        with self.assertRaises(Throttled) as ctx:
+            throttle.allow_request(self.request, view=None)
+        self.assertIn("blocked", str(ctx.exception.detail))
+        self.assertIsNone(ctx.exception.wait)
+
+    def test_window_slides_and_state_stays_bounded(
+        self, mock_overrides
+    ) -> None:
+        """Old buckets expire and are pruned, so state never outgrows them."""
+        self._set_rates(mock_overrides, ["1000/hour"])
+        # Two hours of traffic, one request every 30 seconds.
+        for i in range(240):
+            with time_machine.travel(
+                self.t0 + timedelta(seconds=30 * i), tick=False
+            ):
+                throttle = ExceptionalUserRateThrottle()
+                self.assertTrue(throttle.allow_request(self.request, None))
+        # One-minute buckets for an hour window, plus the current one.
+        self.assertLessEqual(self.r.hlen(self.key), 61)
+
+    def test_usage_reporting_matches_enforcement(self, mock_overrides) -> None:
+        """Usage rows and the recent count read the same counters."""
+        self._set_rates(mock_overrides, ["10/min", "100/hour"])
+        for i in range(10):
+            with time_machine.travel(
+                self.t0 + timedelta(seconds=i), tick=False
+            ):
+                throttle = ExceptionalUserRateThrottle()
+                self.assertTrue(throttle.allow_request(self.request, None))
+
+        with time_machine.travel(self.t0 + timedelta(seconds=30), tick=False):
+            rows = {
+                row["rate"]: row
+                for row in get_current_throttle_usage(self.user)
+                if row["scope"] == "user"
+            }
+            recent_count = get_recent_api_request_count(self.user, 5 * 60)
+        self.assertEqual(rows["10/min"]["used"], 10)
+        self.assertEqual(rows["10/min"]["remaining"], 0)
+        self.assertEqual(rows["100/hour"]["used"], 10)
+        self.assertEqual(recent_count, 10)
+        # The oldest request sits in the bucket ending at t0+1.
+        self.assertEqual(
+            rows["10/min"]["reset_at"],
+            (self.t0 + timedelta(seconds=61)).isoformat(),
+        )
+
+
 @override_settings(
     CACHES={
         "default": {
@@ -1,13 +1,19 @@
+import atexit
+import json
 import logging
+import threading
 import time
 import warnings
-from collections import OrderedDict, defaultdict
-from collections.abc import Callable
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
 from datetime import UTC, date, datetime, timedelta
-from itertools import batched, chain
+from itertools import batched, chain, islice
 from typing import Any, TypedDict
 
 import eyecite
+from asgiref.sync import sync_to_async
 from celery import chain as celery_chain
 from dateutil import parser
 from dateutil.rrule import DAILY, rrule
@@ -17,9 +23,10 @@ from django.contrib.humanize.templatetags.humanize import intcomma, ordinal
 from django.core.cache import cache as default_cache
 from django.core.cache import caches
 from django.core.cache.backends.base import BaseCache
-from django.db import transaction
+from django.db import close_old_connections, transaction
 from django.db.models import F, Model, Prefetch, Q, QuerySet
 from django.db.models.constants import LOOKUP_SEP
+from django.http import StreamingHttpResponse
 from django.urls import resolve
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_str
@@ -31,12 +38,14 @@ from django_ratelimit.core import get_header
 from eyecite.tokenizers import HyperscanTokenizer
 from requests import Response
 from rest_framework import serializers
-from rest_framework.exceptions import Throttled, ValidationError
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, Throttled, ValidationError
 from rest_framework.metadata import SimpleMetadata
-from rest_framework.permissions import DjangoModelPermissions
+from rest_framework.permissions import DjangoModelPermissions, IsAuthenticated
 from rest_framework.request import clone_request
 from rest_framework.response import Response as DRFResponse
 from rest_framework.throttling import UserRateThrottle
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework_filters import FilterSet, RelatedFilter
 from rest_framework_filters.backends import RestFrameworkFilterBackend
 from rest_framework_filters.filterset import related
@@ -135,6 +144,12 @@ VALID_FRAMEWORK_PARAMS: frozenset[str] = frozenset(
     }
 )
 
+# Query parameters that are only valid for a specific viewset action
+VALID_ACTION_PARAMS: dict[str, frozenset[str]] = {
+    # Resuming NDJSON streams (v4)
+    "stream": frozenset({"after_id"}),
+}
+
 
 # Maximum allowed depth for nested filter validation to prevent DOS attacks
 # via circular filter references (e.g., clusters__docket__clusters__docket__...)
@@ -194,16 +209,19 @@ def is_valid_filter_param(
 def detect_unknown_filter_params(
     query_params: dict[str, str],
     filterset_class: type[FilterSet] | None,
+    action: str | None = None,
 ) -> set[str]:
     """Detect unknown filter parameters in the request.
 
     :param query_params: The query parameters from the request.
     :param filterset_class: The FilterSet class for validation.
+    :param action: The viewset action handling the request, if any.
     :return: Set of unknown parameter names.
     """
+    action_params = VALID_ACTION_PARAMS.get(action or "", frozenset())
     unknown_params: set[str] = set()
     for param in query_params:
-        if param in VALID_FRAMEWORK_PARAMS:
+        if param in VALID_FRAMEWORK_PARAMS or param in action_params:
             continue
         if not is_valid_filter_param(param, filterset_class):
             unknown_params.add(param)
@@ -250,7 +268,9 @@ class UnknownFilterParamValidationBackend(RestFrameworkFilterBackend):
         # that use their own form-based validation)
         if filterset_class is not None:
             if unknown_params := detect_unknown_filter_params(
-                request.query_params, filterset_class
+                request.query_params,
+                filterset_class,
+                getattr(view, "action", None),
             ):
                 raise ValidationError(
                     {
@@ -493,6 +513,318 @@ def get_logging_prefix(api_version: str) -> str:
     return f"api:{api_version}"
 
 
+def get_crossed_milestones(
+    new_count: float, increment: float, milestones: list[float]
+) -> list[float]:
+    """Get the milestones reached by a counter after it was incremented.
+
+    :param new_count: The value of the counter after the increment.
+    :param increment: The amount the counter was incremented by.
+    :param milestones: The milestones to check.
+    :return: The milestones between the old (excluded) and the new (included)
+    values of the counter.
+    """
+    old_count = new_count - increment
+    return [m for m in milestones if old_count < m <= new_count]
+
+
+def handle_api_milestones(
+    api_version: str,
+    total_milestones: list[float],
+    user: User | None = None,
+    user_milestones: list[float] | None = None,
+) -> None:
+    """Create the events for the API request milestones reached, and sync
+    the request count of users reaching a milestone in V4 to Zoho.
+
+    :param api_version: The API version the requests were made to.
+    :param total_milestones: The milestones reached by the total count.
+    :param user: The user whose request count reached a milestone, if any.
+    :param user_milestones: The milestones reached by the user's count.
+    :return: None
+    """
+    for total_count in total_milestones:
+        Event.objects.create(
+            description=f"API {api_version} has logged {int(total_count)} total requests."
+        )
+
+    if not user or not user_milestones:
+        return
+
+    for user_count in user_milestones:
+        Event.objects.create(
+            description=f"User '{user.username}' has placed their {intcomma(ordinal(int(user_count)))} API {api_version} request.",
+            user=user,
+        )
+
+    # Only v4 triggers Zoho updates
+    if api_version != "v4":
+        return
+
+    user_count = int(max(user_milestones))
+    membership = getattr(user, "membership", None)
+    is_active_member = membership and membership.is_active
+
+    if is_active_member:
+        celery_chain(
+            create_or_update_zoho_account.s(user.pk, user_count),
+            tag_zoho_record.s(membership.level),
+        ).apply_async()
+    else:
+        create_or_update_zoho_account.si(user.pk, user_count).apply_async(
+            ignore_result=True
+        )
+
+
+@dataclass
+class PendingAPIStats:
+    """The API request stats aggregated since the last flush to Redis."""
+
+    requests: int = 0
+    # Key -> amount, for the plain counters.
+    counters: Counter[str] = dataclass_field(default_factory=Counter)
+    # Key -> member -> amount, for the sorted sets.
+    sorted_sets: defaultdict[str, Counter[str | int]] = dataclass_field(
+        default_factory=lambda: defaultdict(Counter)
+    )
+    # Key -> IP address -> user pk, for the daily IP maps.
+    ip_maps: defaultdict[str, dict[str, str | int]] = dataclass_field(
+        default_factory=lambda: defaultdict(dict)
+    )
+    # API prefix -> API version.
+    versions: dict[str, str] = dataclass_field(default_factory=dict)
+    # (API prefix, user pk) -> (user, milestones to check).
+    users: dict[tuple[str, int], tuple[User, list[float]]] = dataclass_field(
+        default_factory=dict
+    )
+
+    def merge(self, newer: "PendingAPIStats") -> None:
+        """Add the stats of a newer buffer to these ones. Values that aren't
+        counts, like IP maps, are taken from the newer buffer.
+
+        :param newer: The stats buffered after these ones.
+        :return: None
+        """
+        self.requests += newer.requests
+        self.counters.update(newer.counters)
+        for key, members in newer.sorted_sets.items():
+            self.sorted_sets[key].update(members)
+        for key, mapping in newer.ip_maps.items():
+            self.ip_maps[key].update(mapping)
+        self.versions.update(newer.versions)
+        self.users.update(newer.users)
+
+
+class APIStatsBuffer:
+    """Per-process buffer for the API request stats logged by LoggingMixin.
+
+    Requests are aggregated in memory and written to Redis in a single
+    pipeline once API_STATS_FLUSH_MAX_REQUESTS requests are buffered or
+    API_STATS_FLUSH_INTERVAL seconds have passed since the last flush. The
+    keys written are the same as when logging each request on its own, so
+    readers like invert_user_logs and get_user_api_usage are unaffected.
+
+    Since counters can go up by more than one in a flush, milestones are
+    detected at flush time by checking which ones the counters crossed.
+
+    A background thread flushes the stats of processes that stop getting
+    requests, and the web workers flush what's left when they exit. If
+    writing to Redis fails, the stats are kept for the next flush.
+    """
+
+    ip_map_expiration = 60 * 60 * 24 * 14  # Two weeks
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending = PendingAPIStats()
+        self._last_flush = time.monotonic()
+        self._flusher: threading.Thread | None = None
+
+    def _start_flusher(self) -> None:
+        """Start the thread that flushes idle buffers, unless it's running.
+        Threads don't survive a fork, so this is checked on every request.
+
+        :return: None
+        """
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        self._flusher = threading.Thread(
+            target=self._flush_when_idle, name="api-stats-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_when_idle(self) -> None:
+        """Flush the buffer whenever the flush interval passes without a
+        request flushing it.
+
+        :return: None
+        """
+        while True:
+            interval = settings.API_STATS_FLUSH_INTERVAL  # type: ignore[misc]
+            time.sleep(interval)
+            if time.monotonic() - self._last_flush < interval:
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                logger.exception("Unable to flush API stats: %s", e)
+            finally:
+                close_old_connections()
+
+    def add(
+        self,
+        api_prefix: str,
+        api_version: str,
+        user: User,
+        client_ip: str | None,
+        endpoint: str,
+        response_ms: int,
+        milestones: list[float],
+    ) -> None:
+        """Buffer the stats of a single API request.
+
+        :param api_prefix: The prefix of the Redis keys to update.
+        :param api_version: The API version the request was made to.
+        :param user: The user who made the request.
+        :param client_ip: The IP address of the client, if known.
+        :param endpoint: The name of the endpoint requested.
+        :param response_ms: The response time in milliseconds.
+        :param milestones: The user milestones to check for the request.
+        :return: None
+        """
+        d = date.today().isoformat()
+        user_pk = user.pk or "AnonymousUser"
+        with self._lock:
+            self._start_flusher()
+            pending = self._pending
+            pending.requests += 1
+            pending.versions[api_prefix] = api_version
+
+            # Global and daily tallies for all URLs.
+            pending.counters[f"{api_prefix}.count"] += 1
+            pending.counters[f"{api_prefix}.d:{d}.count"] += 1
+            pending.counters[f"{api_prefix}.timing"] += response_ms
+            pending.counters[f"{api_prefix}.d:{d}.timing"] += response_ms
+
+            # Use a sorted set to store the user stats, with the score
+            # representing the number of queries the user made total or on a
+            # given day.
+            pending.sorted_sets[f"{api_prefix}.user.counts"][user_pk] += 1
+            pending.sorted_sets[f"{api_prefix}.user.d:{d}.counts"][
+                user_pk
+            ] += 1
+
+            # Use a hash to store a per-day map between IP addresses and user
+            # pks. Get a user pk with:
+            # `hget api:v3.d:2022-05-18.ip_map 172.19.0.1`
+            if client_ip is not None:
+                pending.ip_maps[f"{api_prefix}.d:{d}.ip_map"][client_ip] = (
+                    user_pk
+                )
+
+            # Use a sorted set to store all the endpoints with score
+            # representing the number of queries the endpoint received total
+            # or on a given day.
+            pending.sorted_sets[f"{api_prefix}.endpoint.counts"][endpoint] += 1
+            pending.sorted_sets[f"{api_prefix}.endpoint.d:{d}.counts"][
+                endpoint
+            ] += 1
+
+            # We create a per-day key in redis for timings. Inside the key we
+            # have members for every endpoint, with score of the total time.
+            # So to get the average for an endpoint you need to get the
+            # number of requests and the total time for the endpoint and
+            # divide.
+            pending.sorted_sets[f"{api_prefix}.endpoint.d:{d}.timings"][
+                endpoint
+            ] += response_ms
+
+            if user.is_authenticated:
+                pending.users[(api_prefix, user.pk)] = (user, milestones)
+
+    def should_flush(self) -> bool:
+        """Whether the buffered stats are due to be written to Redis."""
+        max_requests = settings.API_STATS_FLUSH_MAX_REQUESTS  # type: ignore[misc]
+        interval = settings.API_STATS_FLUSH_INTERVAL  # type: ignore[misc]
+        return (
+            self._pending.requests >= max_requests
+            or time.monotonic() - self._last_flush >= interval
+        )
+
+    def flush(self, handle_milestones: bool = True) -> None:
+        """Write the buffered stats to Redis in a single pipeline, then
+        handle the milestones reached.
+
+        If the pipeline fails, the stats are put back in the buffer so the
+        next flush writes them.
+
+        :param handle_milestones: Whether to log the milestones reached and
+        update Zoho. Disable it when the process is shutting down.
+        :return: None
+        """
+        with self._lock:
+            pending, self._pending = self._pending, PendingAPIStats()
+            self._last_flush = time.monotonic()
+        if not pending.requests:
+            return
+
+        r = get_redis_interface("STATS")
+        pipe = r.pipeline()
+        # Keep track of the pipeline results needed to check milestones.
+        result_indexes: dict[tuple[str, str | int], int] = {}
+        for key, amount in pending.counters.items():
+            result_indexes[(key, "")] = len(pipe)
+            pipe.incrby(key, amount)
+        for key, members in pending.sorted_sets.items():
+            for member, amount in members.items():
+                result_indexes[(key, member)] = len(pipe)
+                pipe.zincrby(key, amount, member)
+        for key, mapping in pending.ip_maps.items():
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self.ip_map_expiration)
+        try:
+            results = pipe.execute()
+        except Exception:
+            with self._lock:
+                pending.merge(self._pending)
+                self._pending = pending
+            raise
+
+        if not handle_milestones:
+            return
+
+        for api_prefix, api_version in pending.versions.items():
+            total_key = f"{api_prefix}.count"
+            total_milestones = get_crossed_milestones(
+                results[result_indexes[(total_key, "")]],
+                pending.counters[total_key],
+                MILESTONES_FLAT,
+            )
+            handle_api_milestones(api_version, total_milestones)
+
+        for (api_prefix, user_pk), (user, milestones) in pending.users.items():
+            user_key = f"{api_prefix}.user.counts"
+            user_milestones = get_crossed_milestones(
+                results[result_indexes[(user_key, user_pk)]],
+                pending.sorted_sets[user_key][user_pk],
+                milestones,
+            )
+            if user_milestones:
+                handle_api_milestones(
+                    pending.versions[api_prefix],
+                    [],
+                    user,
+                    user_milestones,
+                )
+
+
+api_stats_buffer = APIStatsBuffer()
+# Web workers flush the buffer when they exit, see cl.workers. This is a last
+# resort for other processes, skipping milestones since the ORM and Celery
+# can't be relied on while the interpreter shuts down.
+atexit.register(api_stats_buffer.flush, handle_milestones=False)
+
+
 class LoggingMixin:
     """Log requests to Redis
 
@@ -502,6 +834,9 @@ class LoggingMixin:
     The big distinctions, however, are that this code uses Redis for greater
     speed, and that it logs significantly less information.
 
+    Stats are aggregated in the APIStatsBuffer of the process and written to
+    Redis in batches.
+
     We want to know:
      - How many queries in last X days, total?
      - How many queries ever, total?
@@ -522,12 +857,14 @@ class LoggingMixin:
             request, response, *args, **kwargs
         )
 
-        if not response.exception:
+        # Streaming responses are not DRF Responses and lack `exception`.
+        if not getattr(response, "exception", False):
             # Don't log things like 401, 403, etc.,
             # noinspection PyBroadException
             try:
-                results = self._log_request(request)
-                self._handle_events(results, request.user, request.version)
+                self._log_request(request)
+                if api_stats_buffer.should_flush():
+                    api_stats_buffer.flush()
             except Exception as e:
                 logger.exception(
                     "Unable to log API response timing info: %s", e
@@ -544,88 +881,20 @@ class LoggingMixin:
 
         return max(response_ms, 0)
 
-    def _log_request(self, request):
-        d = date.today().isoformat()
-        user = request.user
+    def _log_request(self, request) -> None:
         client_ip = get_header(request, "CloudFront-Viewer-Address").split(
             ":"
         )[0]
-        endpoint = resolve(request.path_info).url_name
-        response_ms = self._get_response_ms()
-
-        r = get_redis_interface("STATS")
-        pipe = r.pipeline()
-        api_prefix = get_logging_prefix(request.version)
-
-        # Global and daily tallies for all URLs.
-        pipe.incr(f"{api_prefix}.count")
-        pipe.incr(f"{api_prefix}.d:{d}.count")
-        pipe.incr(f"{api_prefix}.timing", response_ms)
-        pipe.incr(f"{api_prefix}.d:{d}.timing", response_ms)
-
-        # Use a sorted set to store the user stats, with the score representing
-        # the number of queries the user made total or on a given day.
-        user_pk = user.pk or "AnonymousUser"
-        pipe.zincrby(f"{api_prefix}.user.counts", 1, user_pk)
-        pipe.zincrby(f"{api_prefix}.user.d:{d}.counts", 1, user_pk)
-
-        # Use a hash to store a per-day map between IP addresses and user pks
-        # Get a user pk with: `hget api:v3.d:2022-05-18.ip_map 172.19.0.1`
-        if client_ip is not None:
-            ip_key = f"{api_prefix}.d:{d}.ip_map"
-            pipe.hset(ip_key, client_ip, user_pk)
-            pipe.expire(ip_key, 60 * 60 * 24 * 14)  # Two weeks
-
-        # Use a sorted set to store all the endpoints with score representing
-        # the number of queries the endpoint received total or on a given day.
-        pipe.zincrby(f"{api_prefix}.endpoint.counts", 1, endpoint)
-        pipe.zincrby(f"{api_prefix}.endpoint.d:{d}.counts", 1, endpoint)
-
-        # We create a per-day key in redis for timings. Inside the key we have
-        # members for every endpoint, with score of the total time. So to get
-        # the average for an endpoint you need to get the number of requests
-        # and the total time for the endpoint and divide.
-        timing_key = f"{api_prefix}.endpoint.d:{d}.timings"
-        pipe.zincrby(timing_key, response_ms, endpoint)
-
-        results = pipe.execute()
-        return results
-
-    def _handle_events(self, results, user, api_version):
-        total_count = results[0]
-        user_count = results[4]
-
-        if total_count in MILESTONES_FLAT:
-            Event.objects.create(
-                description=f"API {api_version} has logged {total_count} total requests."
-            )
-
-        # Skip user-specific logic if not authenticated or not at a milestone.
-        if not user.is_authenticated or user_count not in self.milestones:
-            return
-
-        Event.objects.create(
-            description=f"User '{user.username}' has placed their {intcomma(ordinal(user_count))} API {api_version} request.",
-            user=user,
+        api_stats_buffer.add(
+            api_prefix=get_logging_prefix(request.version),
+            api_version=request.version,
+            user=request.user,
+            client_ip=client_ip,
+            endpoint=resolve(request.path_info).url_name,
+            response_ms=self._get_response_ms(),
+            milestones=self.milestones,
         )
 
-        # Only v4 triggers Zoho updates
-        if api_version != "v4":
-            return
-
-        membership = getattr(user, "membership", None)
-        is_active_member = membership and membership.is_active
-
-        if is_active_member:
-            celery_chain(
-                create_or_update_zoho_account.s(user.pk, int(user_count)),
-                tag_zoho_record.s(membership.level),
-            ).apply_async()
-        else:
-            create_or_update_zoho_account.si(
-                user.pk, int(user_count)
-            ).apply_async(ignore_result=True)
-
 
 class CacheListMixin:
     """Cache listed results"""
@@ -949,13 +1218,26 @@ def get_recent_api_request_count(user: User, window_seconds: int) -> int:
     populates on every authenticated API hit, keyed as
     ``throttle_user_<user_pk>``. The cache TTL equals the longest configured
     throttle window (currently a day), so any ``window_seconds`` shorter than
-    that returns an accurate count.
+    that returns an accurate count. With ``API_THROTTLE_REDIS_COUNTERS`` on,
+    the count comes from the bucketed window counters instead, so it is
+    accurate to one bucket of the window used.
     """
     key = UserRateThrottle.cache_format % {"scope": "user", "ident": user.pk}
     if promo_doubling_applies(user):
         key = f"{key}_promo2x"
-    history: list[float] = default_cache.get(key, [])
     cutoff = time.time() - window_seconds
+    if settings.API_THROTTLE_REDIS_COUNTERS:
+        windows = get_throttle_windows(key)
+        if not windows:
+            return 0
+        # Count from the finest-grained window that still spans the request.
+        rates = sorted(windows, key=lambda rate: parse_rate(rate)[1])
+        rate = next(
+            (r for r in rates if parse_rate(r)[1] >= window_seconds),
+            rates[-1],
+        )
+        return sum(w for w, ts in windows[rate] if ts > cutoff)
+    history: list[float] = default_cache.get(key, [])
     return sum(1 for ts in history if ts > cutoff)
 
 
@@ -998,6 +1280,7 @@ def _next_available_at(
     used: int,
     limit: int,
     duration: int,
+    scale_oversized: bool = True,
 ) -> float | None:
     """When the window will next admit a request that it won't admit now.
 
@@ -1009,6 +1292,9 @@ def _next_available_at(
     :param used: Total weight currently in the window.
     :param limit: Requests (or citations) the rate allows per window.
     :param duration: Window length in seconds.
+    :param scale_oversized: Whether an entry heavier than the limit holds its
+    slot proportionally longer. Counter buckets aggregate many one-weight
+    requests, so they're never scaled.
     :return: Unix timestamp, or None if no expiry would admit a request.
     """
     if not in_window or limit == 0:
@@ -1026,7 +1312,8 @@ def _next_available_at(
     for weight, timestamp in sorted(in_window, key=lambda entry: entry[1]):
         # An oversized entry occupies proportionally more of the window, so it
         # holds its slot proportionally longer — matches throttle_request.
-        expiry = timestamp + max(weight / limit, 1) * duration
+        scale = max(weight / limit, 1) if scale_oversized else 1
+        expiry = timestamp + scale * duration
         expired += weight
         if expired >= needed:
             break
@@ -1035,25 +1322,150 @@ def _next_available_at(
     return expiry
 
 
+# Evaluates every rate window of one throttle key in a single round trip. The
+# key is a hash of "<rate>:<bucket index>" fields holding the weight recorded
+# in that bucket, so rates sharing a duration keep separate counters. ARGV is
+# the current time, the weight to record, then a (rate, limit, duration,
+# bucket size) tuple per window, tightest window first. A
+# bucket counts while its end is inside the window, so a request is held up to
+# one bucket longer than its exact expiry, never released early. Returns
+# {0, {}} when the request was recorded, or the 1-based index of the failing
+# window with its live "bucket, weight" pairs when it wasn't.
+THROTTLE_WINDOWS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local weight = tonumber(ARGV[2])
+local windows = {}
+local by_rate = {}
+local ttl = 0
+for i = 3, #ARGV, 4 do
+  local window = {
+    rate = ARGV[i],
+    limit = tonumber(ARGV[i + 1]),
+    duration = tonumber(ARGV[i + 2]),
+    bucket_size = tonumber(ARGV[i + 3]),
+    used = 0,
+    live = {},
+  }
+  windows[#windows + 1] = window
+  by_rate[window.rate] = window
+  ttl = math.max(ttl, window.duration + window.bucket_size)
+end
+
+local stored = redis.call("HGETALL", KEYS[1])
+for i = 1, #stored, 2 do
+  local rate, bucket = string.match(stored[i], "^(.+):(%d+)$")
+  local window = rate and by_rate[rate]
+  if window and (tonumber(bucket) + 1) * window.bucket_size > now - window.duration then
+    window.used = window.used + tonumber(stored[i + 1])
+    table.insert(window.live, bucket)
+    table.insert(window.live, stored[i + 1])
+  else
+    redis.call("HDEL", KEYS[1], stored[i])
+  end
+end
+
+for i, window in ipairs(windows) do
+  if window.used >= window.limit then
+    return {i, window.live}
+  end
+end
+
+if weight > 0 then
+  local recorded = {}
+  for _, window in ipairs(windows) do
+    local field = window.rate .. ":" .. math.floor(now / window.bucket_size)
+    if not recorded[field] then
+      recorded[field] = true
+      redis.call("HINCRBY", KEYS[1], field, weight)
+    end
+  end
+  redis.call("EXPIRE", KEYS[1], ttl)
+end
+return {0, {}}
+"""
+throttle_windows_script = get_redis_interface("CACHE").register_script(
+    THROTTLE_WINDOWS_SCRIPT
+)
+
+
+def get_throttle_windows_key(key: str) -> str:
+    """The Redis key holding the window counters for a throttle cache key."""
+    return f"{key}:windows"
+
+
+def get_throttle_bucket_size(duration: int) -> int:
+    """Length in seconds of each counter bucket for a rate window."""
+    return max(duration // settings.API_THROTTLE_BUCKETS_PER_WINDOW, 1)
+
+
+def _bucket_history(
+    buckets: list[tuple[int, int]], bucket_size: int
+) -> list[tuple[int, float]]:
+    """Convert ``(bucket index, weight)`` counters to ``(weight, timestamp)``.
+
+    Each bucket is stamped with its end time, which is how the throttle script
+    decides whether the bucket is still inside a window.
+    """
+    return [
+        (weight, float((bucket + 1) * bucket_size))
+        for bucket, weight in buckets
+    ]
+
+
+def get_throttle_windows(key: str) -> dict[str, list[tuple[int, float]]]:
+    """Read the window counters recorded for a throttle cache key.
+
+    :param key: The throttle cache key, e.g. ``throttle_user_<pk>``.
+    :return: ``(weight, timestamp)`` entries per rate, e.g. ``5/min``.
+    Entries may include expired buckets the script hasn't pruned yet, so
+    callers filter them by window like cached history.
+    """
+    r = get_redis_interface("CACHE")
+    buckets: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    for field, weight in r.hgetall(get_throttle_windows_key(key)).items():
+        rate, bucket = field.rsplit(":", 1)
+        buckets[rate].append((int(bucket), int(weight)))
+    return {
+        rate: _bucket_history(
+            entries, get_throttle_bucket_size(parse_rate(rate)[1])
+        )
+        for rate, entries in buckets.items()
+    }
+
+
 def _build_usage_rows(
     scope: str,
     rates: list[str],
     now: float,
-    weighted_history: list[tuple[int, float]],
+    weighted_history: list[tuple[int, float]]
+    | dict[str, list[tuple[int, float]]],
 ) -> list[ThrottleUsageRow]:
     """Build throttle usage rows for a scope from cached request history.
 
     History contains ``(weight, timestamp)`` pairs, where the weight is one
     request for API throttles or the citation count for citation throttles.
+    It's either one list shared by every rate, or the window counters from
+    ``get_throttle_windows`` keyed by rate.
     """
     usage_rows: list[ThrottleUsageRow] = []
     for rate in rates:
         limit, duration = parse_rate(rate)
         cutoff = now - duration
-        in_window = [(w, ts) for w, ts in weighted_history if ts > cutoff]
+        history = (
+            weighted_history.get(rate, [])
+            if isinstance(weighted_history, dict)
+            else weighted_history
+        )
+        in_window = [(w, ts) for w, ts in history if ts > cutoff]
         used = sum(w for w, _ in in_window)
 
-        next_at = _next_available_at(in_window, used, limit, duration)
+        next_at = _next_available_at(
+            in_window,
+            used,
+            limit,
+            duration,
+            scale_oversized=not isinstance(weighted_history, dict),
+        )
         reset_at = (
             None
             if next_at is None
@@ -1075,6 +1487,16 @@ def _build_usage_rows(
     return usage_rows
 
 
+def _request_usage_rows(
+    scope: str, rates: list[str], key: str, now: float
+) -> list[ThrottleUsageRow]:
+    """Usage rows for a scope that counts one per request, from its backend."""
+    if settings.API_THROTTLE_REDIS_COUNTERS:
+        return _build_usage_rows(scope, rates, now, get_throttle_windows(key))
+    history: list[float] = default_cache.get(key, [])
+    return _build_usage_rows(scope, rates, now, [(1, ts) for ts in history])
+
+
 def get_current_throttle_usage(user: User) -> list[ThrottleUsageRow]:
     """Per-(scope, rate) live throttle usage for an authenticated user.
 
@@ -1101,10 +1523,7 @@ def get_current_throttle_usage(user: User) -> list[ThrottleUsageRow]:
     if promo_doubling_applies(user):
         api_rates = [double_rate(r) for r in api_rates]
         api_key = f"{api_key}_promo2x"
-    api_history: list[float] = default_cache.get(api_key, [])
-    usage_rows += _build_usage_rows(
-        "user", api_rates, now, [(1, ts) for ts in api_history]
-    )
+    usage_rows += _request_usage_rows("user", api_rates, api_key, now)
 
     # --- Citations scope: history is [citation_count, timestamp] -------
     citation_rates = _effective_rates(
@@ -1122,14 +1541,8 @@ def get_current_throttle_usage(user: User) -> list[ThrottleUsageRow]:
 
     # --- API usage scope: this endpoint's own limit -------------------
     api_usage_rates = _coerce_rate_list(default_rates.get("api_usage"))
-    api_usage_history: list[float] = default_cache.get(
-        f"throttle_api_usage_{user.pk}", []
-    )
-    usage_rows += _build_usage_rows(
-        "api_usage",
-        api_usage_rates,
-        now,
-        [(1, ts) for ts in api_usage_history],
+    usage_rows += _request_usage_rows(
+        "api_usage", api_usage_rates, f"throttle_api_usage_{user.pk}", now
     )
 
     # --- Fetch scope ("fetch"): one timestamp per request ---------------
@@ -1137,11 +1550,8 @@ def get_current_throttle_usage(user: User) -> list[ThrottleUsageRow]:
     fetch_rates = _effective_rates(
         ThrottleType.RECAP_FETCH, username, default_rates, "fetch"
     )
-    fetch_history: list[float] = default_cache.get(
-        f"throttle_fetch_{user.pk}", []
-    )
-    usage_rows += _build_usage_rows(
-        "fetch", fetch_rates, now, [(1, ts) for ts in fetch_history]
+    usage_rows += _request_usage_rows(
+        "fetch", fetch_rates, f"throttle_fetch_{user.pk}", now
     )
 
     # Limit closest to being hit first; blocked rows float to the top.
@@ -1190,6 +1600,8 @@ class ExceptionalUserRateThrottle(UserRateThrottle):
 
     # The APIThrottle type whose per-user overrides this throttle reads.
     throttle_type = ThrottleType.API
+    # Live counters of the failing window, set when the counter backend throttles.
+    window_buckets: list[tuple[int, float]] | None = None
 
     def __init__(self):
         raw = self.THROTTLE_RATES.get(self.scope)
@@ -1241,10 +1653,64 @@ class ExceptionalUserRateThrottle(UserRateThrottle):
         if self.key is None:
             return True
 
-        self.history = self.cache.get(self.key, [])
+        return self._check_rates(self.get_effective_rates(request))
+
+    def _check_rates(self, rates: list[str]) -> bool:
+        """Enforce rates with the configured backend.
+
+        The counter backend keeps a fixed number of buckets per window in
+        Redis, so its cost doesn't grow with the user's request volume. The
+        default backend keeps one cached timestamp per request.
+        """
         self.now = self.timer()
+        if settings.API_THROTTLE_REDIS_COUNTERS:
+            return self._check_window_counters(rates)
+        self.history = self.cache.get(self.key, [])
+        return self._check_multi_rate(rates)
+
+    def _check_window_counters(self, rates: list[str]) -> bool:
+        """Enforce multiple rate windows against bucketed Redis counters.
 
-        return self._check_multi_rate(self.get_effective_rates(request))
+        All windows are checked and, if none fails, the request is recorded in
+        each of them by one atomic script call.
+
+        :param rates: List of rate strings, e.g. ['5/min', '50/hour'].
+        :return: True if allowed, False if throttled.
+        """
+        parsed: list[tuple[int, int, str]] = sorted(
+            (
+                (n, d, r)
+                for r in rates
+                for n, d in [self.parse_rate(r)]
+                if n is not None and d is not None
+            ),
+            key=lambda p: p[1],
+        )
+        args: list[float | str] = [self.now, 1]
+        for num_requests, duration, rate in parsed:
+            args += [
+                rate,
+                num_requests,
+                duration,
+                get_throttle_bucket_size(duration),
+            ]
+
+        failed, live = throttle_windows_script(
+            keys=[get_throttle_windows_key(self.key)],
+            args=args,
+            client=get_redis_interface("CACHE"),
+        )
+        if not failed:
+            return True
+
+        self.num_requests, self.duration, self.failing_rate = parsed[
+            failed - 1
+        ]
+        self.window_buckets = _bucket_history(
+            [(int(b), int(w)) for b, w in batched(live, 2)],
+            get_throttle_bucket_size(self.duration),
+        )
+        return self.throttle_failure()
 
     def _check_multi_rate(self, rates: list[str]) -> bool:
         """Enforce multiple rate windows against one shared timestamp history.
@@ -1301,6 +1767,16 @@ class ExceptionalUserRateThrottle(UserRateThrottle):
         if self.duration is None or self.num_requests is None:
             return None
 
+        if self.window_buckets is not None:
+            next_at = _next_available_at(
+                self.window_buckets,
+                sum(w for w, _ in self.window_buckets),
+                self.num_requests,
+                self.duration,
+                scale_oversized=False,
+            )
+            return None if next_at is None else max(next_at - self.now, 0.0)
+
         window_start = self.now - self.duration
         window_requests = [ts for ts in self.history if ts > window_start]
 
@@ -1369,9 +1845,7 @@ class AlertThrottle(ExceptionalUserRateThrottle):
             # alert creation isn't rate-limited beyond the global throttle.
             return True
 
-        self.history = self.cache.get(self.key, [])
-        self.now = self.timer()
-        return self._check_multi_rate(rates)
+        return self._check_rates(rates)
 
 
 class FetchRateThrottle(ExceptionalUserRateThrottle):
@@ -1558,6 +2032,20 @@ class ApiUsageRateThrottle(ExceptionalUserRateThrottle):
         return self.default_rates
 
 
+class StreamRateThrottle(ExceptionalUserRateThrottle):
+    """Dedicated throttle for the NDJSON stream actions (scope 'stream').
+
+    Each stream can emit many thousands of rows, so it runs on its own small
+    rate in addition to the regular user throttle, and per-user API overrides
+    don't raise it.
+    """
+
+    scope = "stream"
+
+    def get_effective_rates(self, request) -> list[str]:
+        return self.default_rates
+
+
 class RECAPUsersReadOnly(DjangoModelPermissions):
     """Provides access to users with the right permissions.
 
@@ -2549,3 +3037,162 @@ class DeferredFieldsMixin:
             nested_prefetches + existing_simple_lookups
         )
         return new_qs
+
+
+class BatchRetrieveMixin:
+    """ViewSet Mixin that adds a V4 `batch` action to retrieve many objects
+    by id in a single request, e.g.: `/api/rest/v4/dockets/batch/?ids=1,2,3`
+
+    All the objects are fetched with a single query built from the view's
+    queryset, so it should be combined with DeferredFieldsMixin to support
+    the `fields` and `omit` parameters. Results are returned in the order the
+    ids were requested, and ids that don't exist are listed in `missing`.
+    """
+
+    batch_ids_param = "ids"
+    max_batch_ids = 500
+
+    def _get_batch_ids(self, request) -> list[int]:
+        """Parse and validate the comma-separated ids from the request.
+
+        :param request: The DRF request object.
+        :return: A list of unique ids, in the order they were requested.
+        """
+        raw_ids = request.query_params.get(self.batch_ids_param, "")
+        try:
+            ids = [int(pk) for pk in raw_ids.split(",") if pk.strip()]
+        except ValueError:
+            raise ValidationError(
+                {
+                    self.batch_ids_param: [
+                        "Ids must be comma-separated integers."
+                    ]
+                }
+            )
+        # Remove duplicates while keeping the requested order.
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ValidationError(
+                {self.batch_ids_param: ["At least one id is required."]}
+            )
+        if len(ids) > self.max_batch_ids:
+            raise ValidationError(
+                {
+                    self.batch_ids_param: [
+                        f"A maximum of {self.max_batch_ids} ids can be "
+                        f"requested at once."
+                    ]
+                }
+            )
+        return ids
+
+    @action(detail=False, methods=["get"], url_path="batch")
+    def batch(self, request, *args, **kwargs):
+        if request.version != "v4":
+            raise NotFound(detail="Batch retrieval is only available in V4.")
+
+        ids = self._get_batch_ids(request)
+        queryset = self.get_queryset().filter(pk__in=ids).order_by()  # type: ignore[attr-defined]
+        objects_by_id = {obj.pk: obj for obj in queryset}
+        results = [objects_by_id[pk] for pk in ids if pk in objects_by_id]
+        serializer = self.get_serializer(results, many=True)  # type: ignore[attr-defined]
+        return DRFResponse(
+            {
+                "count": len(results),
+                "missing": [pk for pk in ids if pk not in objects_by_id],
+                "results": serializer.data,
+            }
+        )
+
+
+class NDJSONStreamMixin:
+    """ViewSet Mixin that adds a V4 `stream` action to export the filtered
+    queryset as newline-delimited JSON, e.g.:
+    `/api/rest/v4/recap-documents/stream/?docket_entry__docket__court=dcd`
+
+    Rows are read from a server-side cursor in ascending id order and
+    serialized a chunk at a time, so memory use is bounded regardless of the
+    size of the result set. A stream emits at most `stream_max_rows` rows; clients
+    resume it by passing the last id they received as `after_id`.
+
+    Only authenticated users can use it, and it's throttled by the
+    StreamRateThrottle on top of the regular user throttle.
+    """
+
+    stream_chunk_size = 1000
+    stream_max_rows = 100_000
+
+    def get_permissions(self):
+        permissions = super().get_permissions()  # type: ignore[misc]
+        if getattr(self, "action", None) == "stream":
+            permissions.append(IsAuthenticated())
+        return permissions
+
+    def _get_stream_after_id(self, request) -> int:
+        """Validate the stream parameters and return the id to resume from.
+
+        :param request: The DRF request object.
+        :return: The id after which rows should be emitted, or 0.
+        """
+        fields = request.query_params.get("fields")
+        omit = request.query_params.get("omit")
+        if (fields and "id" not in fields.split(",")) or (
+            omit and "id" in omit.split(",")
+        ):
+            raise ValidationError(
+                {"fields": ["The id field is required to resume streams."]}
+            )
+        try:
+            return int(request.query_params.get("after_id", 0))
+        except ValueError:
+            raise ValidationError({"after_id": ["Must be an integer."]})
+
+    async def _stream_rows(
+        self, queryset: QuerySet, serializer
+    ) -> AsyncIterator[str]:
+        """Yield the serialized rows of the queryset as NDJSON lines.
+
+        The rows are read and serialized one chunk at a time in a sync
+        thread, so under ASGI each chunk is sent before the next one is read
+        instead of buffering the whole stream.
+
+        :param queryset: The keyset ordered queryset to stream.
+        :param serializer: A serializer instance used to render each row.
+        :return: An async generator of NDJSON encoded chunks of lines.
+        """
+        rows = None
+
+        def serialize_next_chunk() -> str:
+            nonlocal rows
+            if rows is None:
+                rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+            return "".join(
+                json.dumps(serializer.to_representation(obj), cls=JSONEncoder)
+                + "\n"
+                for obj in islice(rows, self.stream_chunk_size)
+            )
+
+        while chunk := await sync_to_async(serialize_next_chunk)():
+            yield chunk
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="stream",
+        throttle_classes=[ExceptionalUserRateThrottle, StreamRateThrottle],
+    )
+    def stream(self, request, *args, **kwargs):
+        if request.version != "v4":
+            raise NotFound(detail="Streaming is only available in V4.")
+
+        after_id = self._get_stream_after_id(request)
+        queryset = (
+            self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+            .filter(pk__gt=after_id)
+            .order_by("pk")[: self.stream_max_rows]
+        )
+        serializer = self.get_serializer()  # type: ignore[attr-defined]
+        return StreamingHttpResponse(
+            self._stream_rows(queryset, serializer),
+            content_type="application/x-ndjson",
+        )
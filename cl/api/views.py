@@ -31,6 +31,10 @@ from cl.favorites.utils import get_lifetime_prayer_stats
 from cl.lib.elasticsearch_utils import get_court_opinions_counts
 from cl.lib.url_utils import BASE_URL
 from cl.people_db.models import Person
+from cl.search.coverage import (
+    get_court_opinion_counts,
+    get_first_last_date_filed,
+)
 from cl.search.documents import (
     OpinionClusterDocument,
 )
@@ -44,11 +48,15 @@ logger = logging.getLogger(__name__)
 
 
 async def get_cached_court_counts(courts_queryset: QuerySet) -> dict[str, int]:
-    """Fetch court counts from cache or ES if not available.
+    """Fetch court counts from the coverage store if it's enabled, or from
+    cache or ES if not available.
     :return: A dict mapping court IDs to their respective counts of
     opinions, or None if no counts are available.
     """
 
+    if settings.COVERAGE_STATS_ENABLED:
+        return await sync_to_async(get_court_opinion_counts)()
+
     cache_key = "court_counts_o"
     court_counts = cache.get(cache_key)
     if court_counts:
@@ -99,6 +107,9 @@ async def fetch_first_last_date_filed(
     :param court_id: Court object id
     :return: First/last date filed, if any
     """
+    if settings.COVERAGE_STATS_ENABLED:
+        return await sync_to_async(get_first_last_date_filed)(court_id)
+
     query = OpinionCluster.objects.filter(docket__court=court_id).order_by(
         "date_filed"
     )
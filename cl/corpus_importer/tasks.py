@@ -160,6 +160,7 @@ from cl.lib.pacer_session import (
     SessionData,
     get_or_cache_pacer_cookies,
     get_pacer_cookie_from_cache,
+    get_pacer_session,
 )
 from cl.lib.recap_utils import (
     get_bucket_name,
@@ -1141,9 +1142,7 @@ def get_pacer_case_id_and_title(
             "user_pk is unavailable, cookies cannot be retrieved from cache"
         )
 
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     report = PossibleCaseNumberApi(map_cl_to_pacer_id(court_id), s)
     msg = ""
     try:
@@ -1208,9 +1207,7 @@ def do_case_query_by_pacer_case_id(
     saving it in the DB.
     :return: A dict with the pacer_case_id and docket_pk values.
     """
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     if data is None:
         logger.info("Empty data argument. Terminating chains and exiting.")
         self.request.chain = None
@@ -1840,9 +1837,7 @@ def get_docket_by_pacer_case_id(
 
     logging_id = f"{court_id}.{pacer_case_id}"
     logger.info("Querying docket report %s", logging_id)
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     report = DocketReport(map_cl_to_pacer_id(court_id), s)
     try:
         report.query(pacer_case_id, **kwargs)
@@ -1917,9 +1912,7 @@ def get_appellate_docket_by_docket_number(
     :param kwargs: A variety of keyword args to pass to DocketReport.query().
     """
 
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     report = AppellateDocketReport(court_id, s)
     logging_id = f"{court_id} - {docket_number}"
     logger.info("Querying docket report %s", logging_id)
@@ -1988,9 +1981,7 @@ def get_att_report_by_rd(
     if not rd.pacer_doc_id:
         return None
 
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     pacer_court_id = map_cl_to_pacer_id(rd.docket_entry.docket.court_id)
     is_appellate_case = is_appellate_court(pacer_court_id)
     is_acms_document = rd.is_acms_document()
@@ -2093,9 +2084,7 @@ def get_bankr_claims_registry(
     registry information in the DB.
     """
 
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     if data is None or data.get("docket_pk") is None:
         logger.warning(
             "Empty data argument or parameter. Terminating chains and exiting."
@@ -2236,7 +2225,8 @@ def download_acms_pdf_by_rd(
     court_id: str,
     acms_entry_id: str,
     acms_doc_id: str,
-    session_data: SessionData,
+    session_data: SessionData | None = None,
+    session: ProxyPacerSession | None = None,
 ) -> tuple[Response | None, str]:
     """Download a PDF document from ACMS given its entry and document IDs.
 
@@ -2245,19 +2235,60 @@ def download_acms_pdf_by_rd(
     :param acms_doc_id: The ACMS document ID to download.
     :param session_data: A SessionData object containing the session's cookies
         and proxy information.
+    :param session: A logged-in session to reuse instead of creating one from
+        session_data.
     :return: A two-tuple of requests.Response object usually containing a PDF,
     or None if that wasn't possible, and a string representing the error if
     there was one.
     """
     pacer_court_id = map_cl_to_pacer_id(court_id)
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = session or get_pacer_session(session_data)
     report = ACMSDocketReport(pacer_court_id, s)
     r, r_msg = report.download_pdf(acms_entry_id, acms_doc_id)
     return r, r_msg
 
 
+def download_pacer_pdf(
+    session: ProxyPacerSession,
+    court_id: str,
+    pacer_case_id: str,
+    pacer_doc_id: str,
+    attachment_number: int | None,
+    magic_number: str | None = None,
+    de_seq_num: str | None = None,
+) -> tuple[Response | None, str]:
+    """Download a PACER PDF with an existing session.
+
+    :param session: A logged-in ProxyPacerSession.
+    :param court_id: The CourtListener ID of the court.
+    :param pacer_case_id: The internal PACER case ID number
+    :param pacer_doc_id: The internal PACER document ID to download
+    :param attachment_number: The attachment number of the document, if any.
+    :param magic_number: The magic number to fetch PACER documents for free
+    this is an optional field, only used by RECAP Email documents
+    :param de_seq_num: The sequential number assigned by the PACER system to
+     identify the docket entry within a case.
+    :return: A two-tuple of requests.Response object usually containing a PDF,
+    or None if that wasn't possible, and a string representing the error if
+    there was one.
+    """
+    pacer_court_id = map_cl_to_pacer_id(court_id)
+    if is_appellate_court(pacer_court_id):
+        report = AppellateDocketReport(pacer_court_id, session)
+        pacer_doc_id = (
+            pacer_doc_id
+            if not attachment_number
+            else f"{pacer_doc_id[:3]}1{pacer_doc_id[4:]}"
+        )
+        return report.download_pdf(
+            pacer_doc_id=pacer_doc_id, pacer_case_id=pacer_case_id
+        )
+    report = FreeOpinionReport(pacer_court_id, session)
+    return report.download_pdf(
+        pacer_case_id, pacer_doc_id, magic_number, de_seq_num=de_seq_num
+    )
+
+
 def download_pacer_pdf_by_rd(
     rd_pk: int,
     pacer_case_id: str,
@@ -2281,26 +2312,16 @@ def download_pacer_pdf_by_rd(
     there was one.
     """
     rd = RECAPDocument.objects.get(pk=rd_pk)
-    pacer_court_id = map_cl_to_pacer_id(rd.docket_entry.docket.court_id)
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
+    s = get_pacer_session(session_data)
+    return download_pacer_pdf(
+        s,
+        rd.docket_entry.docket.court_id,
+        pacer_case_id,
+        pacer_doc_id,
+        rd.attachment_number,
+        magic_number,
+        de_seq_num=de_seq_num,
     )
-    if is_appellate_court(pacer_court_id):
-        report = AppellateDocketReport(pacer_court_id, s)
-        pacer_doc_id = (
-            pacer_doc_id
-            if not rd.attachment_number
-            else f"{pacer_doc_id[:3]}1{pacer_doc_id[4:]}"
-        )
-        r, r_msg = report.download_pdf(
-            pacer_doc_id=pacer_doc_id, pacer_case_id=pacer_case_id
-        )
-    else:
-        report = FreeOpinionReport(pacer_court_id, s)
-        r, r_msg = report.download_pdf(
-            pacer_case_id, pacer_doc_id, magic_number, de_seq_num=de_seq_num
-        )
-    return r, r_msg
 
 
 def download_pdf_by_magic_number(
@@ -2329,9 +2350,7 @@ def download_pdf_by_magic_number(
     or None if that wasn't possible, and a string representing the error if
     there was one.
     """
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     report = FreeOpinionReport(court_id, s)
     r, r_msg = report.download_pdf(
         pacer_case_id, pacer_doc_id, magic_number, appellate, de_seq_num, acms
@@ -2353,9 +2372,7 @@ def get_document_number_from_confirmation_page(
     session_data = get_or_cache_pacer_cookies(
         recap_email_user.pk, settings.PACER_USERNAME, settings.PACER_PASSWORD
     )
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     doc_num_report = DownloadConfirmationPage(court_id, s)
     doc_num_report.query(pacer_doc_id)
     data = doc_num_report.data
@@ -2477,9 +2494,7 @@ def is_pacer_doc_sealed(court_id: str, pacer_doc_id: str) -> bool:
     session_data = get_or_cache_pacer_cookies(
         recap_email_user.pk, settings.PACER_USERNAME, settings.PACER_PASSWORD
     )
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     receipt_report = DownloadConfirmationPage(court_id, s)
     receipt_report.query(pacer_doc_id)
     data = receipt_report.data
@@ -2510,15 +2525,13 @@ def is_docket_entry_sealed(
         recap_email_user.pk, settings.PACER_USERNAME, settings.PACER_PASSWORD
     )
 
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     report = BaseReport(court_id, s)
     return report.is_entry_sealed(case_id, doc_id)
 
 
 def update_rd_metadata(
-    self: Task,
+    self: Task | None,
     rd_pk: int,
     pdf_bytes: bytes | None,
     r_msg: str,
@@ -2531,7 +2544,7 @@ def update_rd_metadata(
 ) -> tuple[bool, str]:
     """After querying PACER and downloading a document, save it to the DB.
 
-    :param self: The celery task
+    :param self: The celery task, if called from one
     :param rd_pk: The primary key of the RECAPDocument to work on
     :param pdf_bytes: The byte array of the PDF.
     :param r_msg: A message from the download function about an error that was
@@ -2562,7 +2575,8 @@ def update_rd_metadata(
                 f"Unable to get PDF for RECAP Document '{rd_pk}' "
                 f"at '{court_id}' with doc id '{pacer_doc_id}'"
             )
-        self.request.chain = None
+        if self:
+            self.request.chain = None
         return False, msg
 
     file_name = get_document_filename(
@@ -2812,9 +2826,7 @@ def get_pacer_doc_id_with_show_case_doc_url(
     """
     rd = RECAPDocument.objects.get(pk=rd_pk)
     d = rd.docket_entry.docket
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     pacer_court_id = map_cl_to_pacer_id(d.court_id)
     report = ShowCaseDocApi(pacer_court_id, s)
     last_try = self.request.retries == self.max_retries
@@ -2927,9 +2939,7 @@ def query_and_save_list_of_creditors(
 
     :return: None
     """
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     try:
         report = ListOfCreditors(court_id, s)
     except AssertionError:
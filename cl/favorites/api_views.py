@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.conf import settings
 from django.db import transaction
 from django.db.models import F, Q
 from rest_framework import permissions
@@ -18,8 +19,10 @@ from cl.favorites.api_serializers import (
     PrayerSerializer,
     UserTagSerializer,
 )
+from cl.favorites.counters import increment_event_count
 from cl.favorites.filters import DocketTagFilter, PrayerFilter, UserTagFilter
 from cl.favorites.models import DocketTag, GenericCount, Prayer, UserTag
+from cl.favorites.utils import bump_prayer_rank_views
 from cl.lib.bot_detector import is_bot
 
 
@@ -118,7 +121,8 @@ class EventCounterViewset(CreateModelMixin, GenericViewSet):
         This method validates incoming request data, retrieves or creates a
         GenericCount record for the specified label, and atomically increments
         its value by 1. It then returns the label and the previous count value
-        before the increment.
+        before the increment. With EVENT_COUNTS_WRITE_BEHIND, the increment is
+        buffered in Redis and saved later by the flush_event_counts command.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -131,19 +135,24 @@ class EventCounterViewset(CreateModelMixin, GenericViewSet):
                 status=HTTPStatus.ACCEPTED,
             )
 
-        with transaction.atomic():
-            counter_record, _ = (
-                GenericCount.objects.select_for_update().get_or_create(
-                    label=event_data["label"]
+        label = event_data["label"]
+        if settings.EVENT_COUNTS_WRITE_BEHIND:
+            initial_count = increment_event_count(label)
+        else:
+            with transaction.atomic():
+                counter_record, _ = (
+                    GenericCount.objects.select_for_update().get_or_create(
+                        label=label
+                    )
                 )
-            )
-            initial_count = counter_record.value
-            counter_record.value = F("value") + 1
-            counter_record.save(update_fields=["value"])
+                initial_count = counter_record.value
+                counter_record.value = F("value") + 1
+                counter_record.save(update_fields=["value"])
+        bump_prayer_rank_views(label)
 
         headers = self.get_success_headers(serializer.data)
         return Response(
-            {"label": counter_record.label, "value": initial_count},
+            {"label": label, "value": initial_count},
             status=HTTPStatus.ACCEPTED,
             headers=headers,
         )
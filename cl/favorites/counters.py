@@ -0,0 +1,244 @@
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    CharField,
+    Expression,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Concat
+from redis.exceptions import ResponseError
+
+from cl.favorites.models import GenericCount
+from cl.lib.redis_utils import (
+    acquire_redis_lock,
+    get_redis_interface,
+    make_event_counts_key,
+    release_redis_lock,
+)
+
+# Increments waiting to be saved, and the ones being saved by a flush.
+PENDING_KEY = make_event_counts_key("pending")
+FLUSHING_KEY = make_event_counts_key("flushing")
+FLUSH_LOCK_KEY = make_event_counts_key("lock")
+FLUSH_LOCK_TTL = 5 * 60 * 1000
+# Running totals returned to clients, seeded from the database once per label.
+# The hash expires a day after it's created so it doesn't grow forever.
+TOTALS_KEY = make_event_counts_key("totals")
+TOTALS_TTL = 60 * 60 * 24
+# The number of flushes, saved in GenericCount with the increments of each
+# flush and in Redis once they're removed from the flushing hash. When both
+# agree, the increments being flushed aren't in the database yet.
+FLUSHES_KEY = make_event_counts_key("flushes")
+FLUSHES_LABEL = "event_counts:flushes"
+SEED_ATTEMPTS = 3
+
+# Counts one event for a label. KEYS are the pending and totals hashes. ARGV
+# is the label, then the total before this event to seed the label with, or
+# an empty string to return nil when the label hasn't been seeded. Returns
+# the total after the event.
+INCREMENT_EVENT_COUNT_SCRIPT = """
+if redis.call('HEXISTS', KEYS[2], ARGV[1]) == 0 then
+    if ARGV[2] == '' then
+        return nil
+    end
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+    if redis.call('TTL', KEYS[2]) < 0 then
+        redis.call('EXPIRE', KEYS[2], ARGV[3])
+    end
+end
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+return redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+"""
+increment_event_count_script = get_redis_interface("CACHE").register_script(
+    INCREMENT_EVENT_COUNT_SCRIPT
+)
+
+
+def get_unsaved_event_counts(labels: list[str]) -> Counter:
+    """Get the increments counted in Redis that aren't in GenericCount yet.
+
+    :param labels: The GenericCount labels to look up.
+    :return: A Counter of the unsaved increments by label.
+    """
+    counts: Counter = Counter()
+    if not settings.EVENT_COUNTS_WRITE_BEHIND:
+        return counts
+    r = get_redis_interface("CACHE")
+    pipe = r.pipeline()
+    for key in (PENDING_KEY, FLUSHING_KEY):
+        pipe.hmget(key, labels)
+    for values in pipe.execute():
+        counts.update(
+            {
+                label: int(value)
+                for label, value in zip(labels, values)
+                if value
+            }
+        )
+    return counts
+
+
+def annotate_docket_views(
+    docket_field: str, docket_ids: Iterable[int] | None = None
+) -> Expression:
+    """Build the view count of a docket, including the views counted in Redis
+    that weren't saved yet.
+
+    :param docket_field: The field of the annotated model holding the docket
+    id, e.g. "pk" for dockets.
+    :param docket_ids: The dockets to add the unsaved views of, or None to
+    only count the saved views, which lag by up to a flush interval. Only
+    read when event counts are written behind, so it can be a lazy queryset.
+    :return: An expression to annotate the queryset with.
+    """
+    saved = Subquery(
+        GenericCount.objects.filter(
+            label=Concat(
+                Value("d."),
+                OuterRef(docket_field),
+                Value(":view"),
+                output_field=CharField(),
+            )
+        ).values("value")[:1]
+    )
+    if docket_ids is None or not settings.EVENT_COUNTS_WRITE_BEHIND:
+        return saved
+    labels = {f"d.{docket_id}:view": docket_id for docket_id in docket_ids}
+    if not labels:
+        return saved
+    # Group dockets by their unsaved views to keep the expression short.
+    dockets_by_views: defaultdict[int, list[int]] = defaultdict(list)
+    for label, views in get_unsaved_event_counts(list(labels)).items():
+        dockets_by_views[views].append(labels[label])
+    if not dockets_by_views:
+        return saved
+    unsaved = Case(
+        *(
+            When(**{f"{docket_field}__in": ids}, then=Value(views))
+            for views, ids in dockets_by_views.items()
+        ),
+        default=Value(0),
+    )
+    return Coalesce(saved, Value(0)) + unsaved
+
+
+def get_event_count(label: str) -> int:
+    """Get the total count of a GenericCount label, including the increments
+    that weren't saved yet.
+
+    Redis and the database can't be read at once, so the number of flushes
+    saved with the counts tells whether a flush saved the increments of the
+    flushing hash in between, and they'd be counted twice.
+
+    :param label: The GenericCount label, e.g. "d.1234:view".
+    :return: The total count of the label.
+    """
+    r = get_redis_interface("CACHE")
+    for _ in range(SEED_ATTEMPTS):
+        pipe = r.pipeline()
+        pipe.get(FLUSHES_KEY)
+        pipe.exists(FLUSHING_KEY)
+        pipe.hget(PENDING_KEY, label)
+        pipe.hget(FLUSHING_KEY, label)
+        flushes, is_flushing, pending, flushing = pipe.execute()
+        saved = dict(
+            GenericCount.objects.filter(
+                label__in=[label, FLUSHES_LABEL]
+            ).values_list("label", "value")
+        )
+        total = saved.get(label, 0) + int(pending or 0)
+        saved_flushes = saved.get(FLUSHES_LABEL, 0)
+        if saved_flushes == int(flushes or 0):
+            return total + int(flushing or 0)
+        if saved_flushes == int(flushes or 0) + 1 and is_flushing:
+            # The flush saved the increments but didn't remove them yet.
+            return total
+        # A flush ran between the reads, so they're tried again.
+    # The number of flushes is off until the next flush, either because the
+    # last one stopped before removing the increments it saved, or Redis lost
+    # it and the increments being flushed with it.
+    return total
+
+
+def increment_event_count(label: str) -> int:
+    """Count one event for a GenericCount label without touching its row.
+
+    The increment is kept in a Redis hash until flush_event_counts adds it to
+    the database. The total returned is kept in Redis too, so the database is
+    only read the first time a label is counted.
+
+    :param label: The GenericCount label of the event, e.g. "d.1234:view".
+    :return: The count before this event, including increments that weren't
+    saved yet.
+    """
+    r = get_redis_interface("CACHE")
+    keys = [PENDING_KEY, TOTALS_KEY]
+    total = increment_event_count_script(
+        keys=keys, args=[label, "", TOTALS_TTL], client=r
+    )
+    if total is None:
+        total = increment_event_count_script(
+            keys=keys,
+            args=[label, get_event_count(label), TOTALS_TTL],
+            client=r,
+        )
+    return total - 1
+
+
+def flush_event_counts() -> int:
+    """Add the increments counted in Redis to GenericCount.
+
+    Pending increments are moved aside before they're saved, so events that
+    come in meanwhile wait for the next flush. If a flush fails, the next one
+    saves its increments first, unless it saved them but stopped before
+    removing them.
+
+    :return: The number of labels updated.
+    """
+    r = get_redis_interface("CACHE")
+    identifier = acquire_redis_lock(r, FLUSH_LOCK_KEY, FLUSH_LOCK_TTL)
+    try:
+        saved_flushes = (
+            GenericCount.objects.filter(label=FLUSHES_LABEL)
+            .values_list("value", flat=True)
+            .first()
+        ) or 0
+        # One flush more in the database means the last flush saved its
+        # increments but stopped before removing them.
+        flushes = r.get(FLUSHES_KEY)
+        if flushes is None or int(flushes) != saved_flushes:
+            pipe = r.pipeline()
+            if flushes is not None and int(flushes) + 1 == saved_flushes:
+                pipe.delete(FLUSHING_KEY)
+            pipe.set(FLUSHES_KEY, saved_flushes)
+            pipe.execute()
+        if not r.exists(FLUSHING_KEY):
+            try:
+                r.rename(PENDING_KEY, FLUSHING_KEY)
+            except ResponseError:
+                # Nothing was counted since the last flush.
+                return 0
+        counts = r.hgetall(FLUSHING_KEY)
+        table = GenericCount._meta.db_table
+        rows = [(label, int(value)) for label, value in counts.items()]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (label, value) VALUES (%s, %s) "
+                f"ON CONFLICT (label) DO UPDATE "
+                f"SET value = {table}.value + EXCLUDED.value",
+                [*rows, (FLUSHES_LABEL, 1)],
+            )
+        pipe = r.pipeline()
+        pipe.delete(FLUSHING_KEY)
+        pipe.incr(FLUSHES_KEY)
+        pipe.execute()
+    finally:
+        release_redis_lock(r, FLUSH_LOCK_KEY, identifier)
+    return len(rows)
@@ -0,0 +1,68 @@
+import signal
+import time
+
+from django.conf import settings
+from sentry_sdk import capture_exception
+
+from cl.favorites.counters import flush_event_counts
+from cl.lib.command_utils import VerboseCommand, logger
+
+shutdown_requested = False
+
+
+def _request_shutdown(signum, _frame) -> None:
+    global shutdown_requested
+    logger.info("Signal %s received. Shutting down after this flush.", signum)
+    shutdown_requested = True
+
+
+class Command(VerboseCommand):
+    help = (
+        "Save the event counts buffered in Redis to GenericCount. Run it with "
+        "--daemon to flush every EVENT_COUNTS_FLUSH_INTERVAL seconds while "
+        "EVENT_COUNTS_WRITE_BEHIND is enabled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--daemon",
+            action="store_true",
+            default=False,
+            help="Keep flushing the counts until the process is stopped.",
+        )
+        parser.add_argument(
+            "--testing-iterations",
+            type=int,
+            default=0,
+            help="Number of flushes to run as a daemon. 0 means forever.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        if not options["daemon"]:
+            updated = flush_event_counts()
+            logger.info("Updated %s event counters.", updated)
+            return
+
+        signal.signal(signal.SIGTERM, _request_shutdown)
+        signal.signal(signal.SIGINT, _request_shutdown)
+        iterations = 0
+        while not shutdown_requested and settings.EVENT_COUNTS_WRITE_BEHIND:
+            try:
+                updated = flush_event_counts()
+                logger.info("Updated %s event counters.", updated)
+            except Exception as e:
+                # Failed flushes are retried by the next one.
+                logger.exception("Failed to flush event counts.")
+                capture_exception(e)
+            iterations += 1
+            if options["testing_iterations"] and (
+                iterations >= options["testing_iterations"]
+            ):
+                break
+            for _ in range(settings.EVENT_COUNTS_FLUSH_INTERVAL):
+                if shutdown_requested:
+                    break
+                time.sleep(1)
+        # Save what was counted since the last flush before exiting.
+        flush_event_counts()
@@ -0,0 +1,14 @@
+from cl.favorites.utils import rebuild_prayer_leaderboard
+from cl.lib.command_utils import VerboseCommand, logger
+
+
+class Command(VerboseCommand):
+    help = (
+        "Compute the leaderboard of documents with open prayers from scratch. "
+        "Run it when PRAYER_LEADERBOARD_ENABLED is turned on."
+    )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        count = rebuild_prayer_leaderboard()
+        logger.info("Ranked %s documents with open prayers.", count)
@@ -13,7 +13,7 @@ from cl.lib.pacer_session import ProxyPacerSession, get_or_cache_pacer_cookies
 from cl.search.models import RECAPDocument
 
 from .models import PrayerAvailability
-from .utils import prayer_unavailable
+from .utils import prayer_unavailable, refresh_prayer_rank
 
 
 @app.task(
@@ -61,6 +61,7 @@ def check_prayer_pacer(self, rd_pk: int, user_pk: int):
         rd.is_sealed = False
         rd.save()
         PrayerAvailability.objects.filter(recap_document=rd).delete()
+        refresh_prayer_rank(rd.pk)
 
     billable_pages = int(data.get("billable_pages", 0))
     if billable_pages and billable_pages != 30:
@@ -34,6 +34,9 @@ from cl.favorites.models import (
 from cl.favorites.selectors import prayer_eligible
 from cl.favorites.tasks import check_prayer_pacer
 from cl.favorites.utils import (
+    PRAYER_RANK_VIEW_BITS,
+    PrayerLeaderboard,
+    bump_prayer_rank_views,
     compute_prayer_total_cost,
     create_prayer,
     delete_prayer,
@@ -44,7 +47,9 @@ from cl.favorites.utils import (
     get_user_prayer_history,
     get_user_prayers,
     prayer_unavailable,
+    rebuild_prayer_leaderboard,
 )
+from cl.lib.redis_utils import get_redis_interface, make_prayer_leaderboard_key
 from cl.lib.test_helpers import (
     AudioTestCase,
     PrayAndPayTestCase,
@@ -1094,6 +1099,75 @@ class RECAPPrayAndPay(SimpleUserDataMixin, PrayAndPayTestCase):
             msg="Wrong top_prayers based on all factors.",
         )
 
+    @override_settings(PRAYER_LEADERBOARD_ENABLED=True)
+    async def test_prayer_leaderboard(self) -> None:
+        """Does the leaderboard rank documents like get_top_prayers?"""
+        r = get_redis_interface("CACHE")
+        keys = [make_prayer_leaderboard_key()] + [
+            make_prayer_leaderboard_key(rd.docket_entry.docket_id)
+            for rd in (self.rd_2, self.rd_3, self.rd_4, self.rd_5)
+        ]
+        await sync_to_async(r.delete)(*keys)
+        self.addCleanup(r.delete, *keys)
+        self.assertEqual(await sync_to_async(rebuild_prayer_leaderboard)(), 0)
+
+        await sync_to_async(PrayerAvailability.objects.create)(
+            recap_document=self.rd_2,
+            last_checked=datetime.combine(
+                date(2024, 4, 15), datetime.min.time()
+            ),
+        )
+        await GenericCount.objects.acreate(
+            label=f"d.{self.rd_3.docket_entry.docket_id}:view", value=1
+        )
+        await GenericCount.objects.acreate(
+            label=f"d.{self.rd_5.docket_entry.docket_id}:view", value=8
+        )
+        await create_prayer(self.user, self.rd_2)
+        await create_prayer(self.user, self.rd_3)
+        await create_prayer(self.user, self.rd_4)
+        await create_prayer(self.user_2, self.rd_4)
+        await create_prayer(self.user, self.rd_5)
+
+        leaderboard = PrayerLeaderboard()
+        top_prayers = await get_top_prayers()
+        expected_top_prayers = [rd.pk async for rd in top_prayers]
+        self.assertEqual(await sync_to_async(leaderboard.count)(), 4)
+        ranked = await sync_to_async(leaderboard.__getitem__)(slice(0, 4))
+        self.assertEqual([rd.pk async for rd in ranked], expected_top_prayers)
+
+        # Docket views move documents up without querying the ranking.
+        for _ in range(9):
+            await sync_to_async(bump_prayer_rank_views)(
+                f"d.{self.rd_3.docket_entry.docket_id}:view"
+            )
+        ranked = await sync_to_async(leaderboard.__getitem__)(slice(1, 3))
+        self.assertEqual(
+            [rd.pk async for rd in ranked], [self.rd_3.pk, self.rd_5.pk]
+        )
+
+        # Documents without open prayers leave the leaderboard.
+        await delete_prayer(self.user, self.rd_3)
+        self.assertEqual(await sync_to_async(leaderboard.count)(), 3)
+
+        # Views never borrow from the prayer count.
+        leaderboard_key = make_prayer_leaderboard_key()
+        score = await sync_to_async(r.zscore)(leaderboard_key, self.rd_4.pk)
+        score -= score % 2**PRAYER_RANK_VIEW_BITS
+        await sync_to_async(r.zadd)(leaderboard_key, {self.rd_4.pk: score})
+        await sync_to_async(bump_prayer_rank_views)(
+            f"d.{self.rd_4.docket_entry.docket_id}:view"
+        )
+        self.assertEqual(
+            await sync_to_async(r.zscore)(leaderboard_key, self.rd_4.pk),
+            score,
+        )
+
+        # An evicted leaderboard isn't started again piecemeal.
+        await sync_to_async(r.delete)(leaderboard_key)
+        await create_prayer(self.user_2, self.rd_5)
+        self.assertFalse(await sync_to_async(leaderboard.exists)())
+
     async def test_get_user_prayers(self) -> None:
         """Does the get_user_prayer method work properly?"""
         # Create prayers for user and user_2 to establish test data.
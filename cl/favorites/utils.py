@@ -1,15 +1,16 @@
+import re
 from dataclasses import dataclass
+from datetime import date
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.db.models import (
     Case,
-    CharField,
     Count,
     F,
-    OuterRef,
     Prefetch,
     Q,
     QuerySet,
@@ -18,14 +19,16 @@ from django.db.models import (
     Value,
     When,
 )
-from django.db.models.functions import Concat, Least
+from django.db.models.functions import Least
 from django.template import loader
 
 from cl.api.models import Webhook, WebhookEventType
 from cl.api.tasks import send_pray_and_pay_webhooks
 from cl.custom_filters.templatetags.pacer import price
-from cl.favorites.models import GenericCount, Prayer, PrayerAvailability
+from cl.favorites.counters import annotate_docket_views
+from cl.favorites.models import Prayer, PrayerAvailability
 from cl.favorites.selectors import prayer_eligible
+from cl.lib.redis_utils import get_redis_interface, make_prayer_leaderboard_key
 from cl.search.models import RECAPDocument
 
 
@@ -43,6 +46,7 @@ async def create_prayer(
     if not created:
         return None
 
+    await sync_to_async(refresh_prayer_rank)(recap_document.pk)
     return new_prayer
 
 
@@ -51,6 +55,8 @@ async def delete_prayer(user: User, recap_document: RECAPDocument) -> bool:
         user=user, recap_document=recap_document, status=Prayer.WAITING
     ).adelete()
 
+    if deleted:
+        await sync_to_async(refresh_prayer_rank)(recap_document.pk)
     return deleted > 0
 
 
@@ -93,34 +99,18 @@ async def get_existing_prayers_in_bulk(
     return {rd_id: True async for rd_id in existing_prayers}
 
 
-async def get_top_prayers() -> QuerySet[RECAPDocument]:
-    """Retrieve the most desired documents that have open prayers. It first
-    ranks by the number of requests and then by the number of views the particular
-    docket has received.
+def annotate_top_prayers(
+    queryset: QuerySet[RECAPDocument],
+) -> QuerySet[RECAPDocument]:
+    """Add the fields documents with prayers are ranked and displayed by.
 
-    :return: A queryset of RECAPDocuments in descending order of preference.
+    :param queryset: The RECAPDocuments to annotate.
+    :return: The queryset with prayer_count, view_count, doc_unavailable and
+    last_checked annotations, in descending order of preference.
     """
-
-    waiting_prayers = Prayer.objects.filter(status=Prayer.WAITING).values(
-        "recap_document_id"
-    )
-
-    # Subquery to fetch the view_count from GenericCount
-    view_count_subquery = Subquery(
-        GenericCount.objects.filter(
-            label=Concat(
-                Value("d."),
-                OuterRef("docket_entry__docket_id"),
-                Value(":view"),
-                output_field=CharField(),
-            )
-        ).values("value")[:1]
-    )
-
     # Annotate each RECAPDocument with the number of prayers and the number of docket views, plus whether it is currently unavailable
     documents = (
-        RECAPDocument.objects.filter(id__in=Subquery(waiting_prayers))
-        .select_related(
+        queryset.select_related(
             "docket_entry",
             "docket_entry__docket",
             "docket_entry__docket__court",
@@ -153,7 +143,12 @@ async def get_top_prayers() -> QuerySet[RECAPDocument]:
             prayer_count=Count(
                 "prayers", filter=Q(prayers__status=Prayer.WAITING)
             ),
-            view_count=view_count_subquery,
+            view_count=annotate_docket_views(
+                "docket_entry__docket_id",
+                queryset.order_by()
+                .values_list("docket_entry__docket_id", flat=True)
+                .distinct(),
+            ),
             doc_unavailable=Case(
                 When(prayeravailability__id__isnull=False, then=Value(True)),
                 default=Value(False),
@@ -168,6 +163,206 @@ async def get_top_prayers() -> QuerySet[RECAPDocument]:
     return documents
 
 
+async def get_top_prayers() -> QuerySet[RECAPDocument]:
+    """Retrieve the most desired documents that have open prayers. It first
+    ranks by the number of requests and then by the number of views the particular
+    docket has received.
+
+    :return: A queryset of RECAPDocuments in descending order of preference.
+    """
+
+    waiting_prayers = Prayer.objects.filter(status=Prayer.WAITING).values(
+        "recap_document_id"
+    )
+    # The unsaved docket views are looked up while annotating.
+    return await sync_to_async(annotate_top_prayers)(
+        RECAPDocument.objects.filter(id__in=Subquery(waiting_prayers))
+    )
+
+
+# Bits of a leaderboard score, from the most to the least significant. Lower
+# scores rank first, like the ordering of annotate_top_prayers.
+PRAYER_RANK_DAY_BITS = 15
+PRAYER_RANK_COUNT_BITS = 12
+PRAYER_RANK_VIEW_BITS = 24
+PRAYER_RANK_EPOCH = date(2020, 1, 1).toordinal()
+# Kept in the leaderboard ahead of every document, so an empty leaderboard
+# still exists and one that was evicted from Redis can be told apart.
+PRAYER_LEADERBOARD_SENTINEL = "built"
+
+# Moves up documents in the leaderboard for one docket view, unless their view
+# field is already at zero, so it never borrows from the prayer count. KEYS is
+# the leaderboard and ARGV is the size of the view field then the documents.
+BUMP_PRAYER_RANK_VIEWS_SCRIPT = """
+local view_field = tonumber(ARGV[1])
+for i = 2, #ARGV do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if score and tonumber(score) % view_field > 0 then
+        redis.call('ZINCRBY', KEYS[1], -1, ARGV[i])
+    end
+end
+"""
+bump_prayer_rank_views_script = get_redis_interface("CACHE").register_script(
+    BUMP_PRAYER_RANK_VIEWS_SCRIPT
+)
+
+
+def get_prayer_rank_score(rd: RECAPDocument) -> int:
+    """Encode the ranking of a document with open prayers as a single number.
+
+    The score orders available documents first, then by when availability
+    was last checked, most prayers and most docket views. Each field is
+    capped to its bits, so the score stays exact as a Redis float.
+
+    :param rd: A RECAPDocument annotated by annotate_top_prayers.
+    :return: The score. Lower scores rank first.
+    """
+    days = 0
+    if rd.doc_unavailable:
+        days = rd.last_checked.toordinal() - PRAYER_RANK_EPOCH
+        days = min(max(days, 0), 2**PRAYER_RANK_DAY_BITS - 1)
+    max_count = 2**PRAYER_RANK_COUNT_BITS - 1
+    max_views = 2**PRAYER_RANK_VIEW_BITS - 1
+    score = int(rd.doc_unavailable) << PRAYER_RANK_DAY_BITS | days
+    score = score << PRAYER_RANK_COUNT_BITS | (
+        max_count - min(rd.prayer_count, max_count)
+    )
+    return score << PRAYER_RANK_VIEW_BITS | (
+        max_views - min(rd.view_count or 0, max_views)
+    )
+
+
+def refresh_prayer_rank(rd_pk: int) -> None:
+    """Update the leaderboard entry of a document after its prayers or
+    availability changed.
+
+    Documents without open prayers are removed from the leaderboard.
+
+    :param rd_pk: The primary key of the RECAPDocument.
+    :return: None
+    """
+    if not settings.PRAYER_LEADERBOARD_ENABLED:
+        return
+    r = get_redis_interface("CACHE")
+    if not r.exists(make_prayer_leaderboard_key()):
+        # Wait for rebuild_prayer_leaderboard instead of starting a partial
+        # leaderboard. get_top_prayers is used meanwhile.
+        return
+    rd = annotate_top_prayers(RECAPDocument.objects.filter(pk=rd_pk)).first()
+    pipe = r.pipeline()
+    if rd is None or not rd.prayer_count:
+        pipe.zrem(make_prayer_leaderboard_key(), rd_pk)
+        if rd is not None:
+            docket_key = make_prayer_leaderboard_key(rd.docket_entry.docket_id)
+            pipe.srem(docket_key, rd_pk)
+    else:
+        pipe.zadd(
+            make_prayer_leaderboard_key(), {rd_pk: get_prayer_rank_score(rd)}
+        )
+        pipe.sadd(
+            make_prayer_leaderboard_key(rd.docket_entry.docket_id), rd_pk
+        )
+    pipe.execute()
+
+
+def bump_prayer_rank_views(label: str) -> None:
+    """Move up the documents with open prayers of a docket that was viewed.
+
+    :param label: The GenericCount label of the event, e.g. "d.1234:view".
+    :return: None
+    """
+    if not settings.PRAYER_LEADERBOARD_ENABLED:
+        return
+    m = re.fullmatch(r"d\.(\d+):view", label)
+    if not m:
+        return
+    r = get_redis_interface("CACHE")
+    rd_pks = r.smembers(make_prayer_leaderboard_key(int(m.group(1))))
+    if not rd_pks:
+        return
+    bump_prayer_rank_views_script(
+        keys=[make_prayer_leaderboard_key()],
+        args=[2**PRAYER_RANK_VIEW_BITS, *rd_pks],
+        client=r,
+    )
+
+
+def rebuild_prayer_leaderboard() -> int:
+    """Compute the leaderboard of documents with open prayers from scratch.
+
+    :return: The number of documents in the leaderboard.
+    """
+    waiting_prayers = Prayer.objects.filter(status=Prayer.WAITING).values(
+        "recap_document_id"
+    )
+    documents = annotate_top_prayers(
+        RECAPDocument.objects.filter(id__in=Subquery(waiting_prayers))
+    )
+    r = get_redis_interface("CACHE")
+    leaderboard_key = make_prayer_leaderboard_key()
+    pipe = r.pipeline()
+    pipe.delete(leaderboard_key)
+    for key in r.scan_iter(make_prayer_leaderboard_key("*")):
+        pipe.delete(key)
+    pipe.zadd(leaderboard_key, {PRAYER_LEADERBOARD_SENTINEL: float("-inf")})
+    count = 0
+    for rd in documents.iterator():
+        pipe.zadd(leaderboard_key, {rd.pk: get_prayer_rank_score(rd)})
+        pipe.sadd(
+            make_prayer_leaderboard_key(rd.docket_entry.docket_id), rd.pk
+        )
+        count += 1
+    pipe.execute()
+    return count
+
+
+class PrayerLeaderboard:
+    """The ranking of documents with open prayers, kept up to date in Redis
+    as prayers, availability checks and docket views come in.
+
+    It can be counted and sliced, so it paginates like the queryset returned
+    by get_top_prayers without running the ranking query.
+    """
+
+    def __init__(self) -> None:
+        self.r = get_redis_interface("CACHE")
+
+    def exists(self) -> bool:
+        """Whether the leaderboard was built and wasn't evicted since."""
+        return bool(self.r.exists(make_prayer_leaderboard_key()))
+
+    def count(self) -> int:
+        # Leave out the sentinel.
+        return max(self.r.zcard(make_prayer_leaderboard_key()) - 1, 0)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, k: slice) -> QuerySet[RECAPDocument]:
+        """Get a range of the ranking.
+
+        :param k: The slice of ranks to get.
+        :return: A queryset of RECAPDocuments in the order of the leaderboard.
+        """
+        # Ranks start after the sentinel.
+        start = (k.start or 0) + 1
+        stop = -1 if k.stop is None else k.stop
+        rd_pks = [
+            int(rd_pk)
+            for rd_pk in self.r.zrange(
+                make_prayer_leaderboard_key(), start, stop
+            )
+        ]
+        if not rd_pks:
+            return RECAPDocument.objects.none()
+        rank = Case(
+            *[When(pk=rd_pk, then=Value(i)) for i, rd_pk in enumerate(rd_pks)]
+        )
+        return annotate_top_prayers(
+            RECAPDocument.objects.filter(pk__in=rd_pks)
+        ).order_by(rank)
+
+
 async def get_user_prayers(
     user: User, status: str | None = None
 ) -> QuerySet[RECAPDocument]:
@@ -258,6 +453,7 @@ def send_prayer_emails(instance: RECAPDocument) -> None:
     # Early return if no prayers were granted
     if not updated_count:
         return
+    refresh_prayer_rank(instance.pk)
 
     # Fetch granted prayers with related user and their webhooks
     granted_prayers = (
@@ -393,6 +589,7 @@ async def get_lifetime_prayer_stats(
 
 
 def prayer_unavailable(instance: RECAPDocument, user_pk: int | None) -> None:
+    refresh_prayer_rank(instance.pk)
     open_prayers = Prayer.objects.filter(
         recap_document=instance, status=Prayer.WAITING
     ).select_related("user")
@@ -1,4 +1,5 @@
 from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
@@ -21,6 +22,7 @@ from cl.favorites.forms import NoteForm
 from cl.favorites.models import DocketTag, Note, Prayer, UserTag
 from cl.favorites.selectors import prayer_eligible
 from cl.favorites.utils import (
+    PrayerLeaderboard,
     create_prayer,
     delete_prayer,
     get_existing_prayers_in_bulk,
@@ -188,7 +190,14 @@ async def view_tags(request, username):
 async def open_prayers(request: HttpRequest) -> HttpResponse:
     """Show the user top open prayer requests."""
 
-    top_prayers = await get_top_prayers()
+    top_prayers = None
+    if settings.PRAYER_LEADERBOARD_ENABLED:
+        leaderboard = PrayerLeaderboard()
+        # The leaderboard is missing until it's rebuilt if Redis evicted it.
+        if await sync_to_async(leaderboard.exists)():
+            top_prayers = leaderboard
+    if top_prayers is None:
+        top_prayers = await get_top_prayers()
 
     page = request.GET.get("page", 1)
 
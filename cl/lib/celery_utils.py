@@ -7,13 +7,14 @@ from typing import Any, Final
 
 from celery import Task
 from dateutil import parser
+from django.conf import settings
 from django.utils.timezone import now
 from redis import Redis
 
 from cl.lib.command_utils import logger
 from cl.lib.decorators import retry
 from cl.lib.ratelimiter import parse_rate
-from cl.lib.redis_utils import get_redis_interface
+from cl.lib.redis_utils import get_redis_interface, make_celery_throttle_key
 
 PRIORITY_SEP: str = "\x06\x16"
 DEFAULT_PRIORITY_STEPS: list[int] = [0, 3, 6, 9]
@@ -72,6 +73,132 @@ def get_queue_length(queue_name: str = "celery") -> int:
     return sum(r.llen(x) for x in priority_names)
 
 
+class FeedbackThrottle:
+    """Pace a producer with a token bucket whose rate follows queue depth.
+
+    Every measure_interval seconds, the depth of the watched queues is read
+    with LLEN and smoothed with an exponential moving average. The deepest
+    queue is the one that's controlled. The rate at which workers drain it is
+    estimated from the change in depth and the number of items produced.
+
+    The refill rate of the bucket is set to that drain rate, plus a
+    correction proportional to the distance from the target depth. The queue
+    settles around the target instead of oscillating between empty and full,
+    and the producer adapts as workers come and go.
+
+    Each rate decision is stored in Redis, for the cl_celery_throttle_*
+    Prometheus metrics.
+    """
+
+    def __init__(
+        self,
+        queue_names: list[str],
+        target_depth: int,
+        measure_interval: float = 3.0,
+        smoothing: float = 0.3,
+        gain: float = 0.5,
+        min_rate: float = 0.1,
+        max_rate: float = 1_000.0,
+    ) -> None:
+        """
+        :param queue_names: The queues the producer sends tasks to.
+        :param target_depth: The number of items to keep in the queues.
+        :param measure_interval: Seconds between queue depth measurements.
+        :param smoothing: The weight of a new measurement in the moving
+        averages, between 0 and 1.
+        :param gain: The fraction of the gap to the target depth to close per
+        measure_interval.
+        :param min_rate: The lowest rate to produce at, in items per second.
+        :param max_rate: The highest rate to produce at, in items per second.
+        """
+        self.queue_names = queue_names
+        self.target_depth = target_depth
+        self.measure_interval = measure_interval
+        self.smoothing = smoothing
+        self.gain = gain
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+
+        self.rate = min_rate
+        self.tokens = 0.0
+        self.depth: float | None = None
+        self.last_depth = 0
+        self.drain_rate = 0.0
+        self.produced = 0
+        self.last_measure = 0.0
+        self.last_refill = time.monotonic()
+
+    def _smooth(self, average: float, value: float) -> float:
+        return self.smoothing * value + (1 - self.smoothing) * average
+
+    def measure(self, now: float) -> None:
+        """Measure the queues and set the production rate.
+
+        :param now: The current time.monotonic() value.
+        :return: None
+        """
+        depth = max(get_queue_length(q) for q in self.queue_names)
+        if self.depth is None:
+            # Start by filling the queues up to the target.
+            self.depth = float(depth)
+            self.tokens = float(max(self.target_depth - depth, 0))
+        else:
+            elapsed = now - self.last_measure
+            consumed = max(self.last_depth + self.produced - depth, 0)
+            self.drain_rate = self._smooth(self.drain_rate, consumed / elapsed)
+            self.depth = self._smooth(self.depth, depth)
+        self.last_depth = depth
+        self.produced = 0
+        self.last_measure = now
+
+        correction = (
+            self.gain
+            * (self.target_depth - self.depth)
+            / self.measure_interval
+        )
+        self.rate = min(
+            self.max_rate, max(self.min_rate, self.drain_rate + correction)
+        )
+        self.publish()
+
+    def publish(self) -> None:
+        """Store the latest rate decision of each queue in Redis."""
+        r = get_redis_interface("CACHE")
+        pipe = r.pipeline()
+        for queue_name in self.queue_names:
+            key = make_celery_throttle_key(queue_name)
+            pipe.hset(
+                key,
+                mapping={
+                    "rate": self.rate,
+                    "depth": self.depth,
+                    "drain_rate": self.drain_rate,
+                    "target_depth": self.target_depth,
+                },
+            )
+            pipe.expire(key, int(self.measure_interval * 20))
+        pipe.execute()
+
+    def maybe_wait(self) -> None:
+        """Wait until the bucket has a token for one more item."""
+        while True:
+            now = time.monotonic()
+            if now - self.last_measure >= self.measure_interval:
+                self.measure(now)
+            self.tokens = min(
+                float(self.target_depth),
+                self.tokens + self.rate * (now - self.last_refill),
+            )
+            self.last_refill = now
+            if self.tokens >= 1:
+                break
+            time.sleep(
+                min((1 - self.tokens) / self.rate, self.measure_interval)
+            )
+        self.tokens -= 1
+        self.produced += 1
+
+
 class CeleryThrottle:
     """A class for throttling celery."""
 
@@ -80,6 +207,7 @@ class CeleryThrottle:
         poll_interval: float = 3.0,
         min_items: int = 50,
         queue_name: str = "celery",
+        feedback: bool | None = None,
     ) -> None:
         """Create a throttle to prevent celery runaways.
 
@@ -87,6 +215,9 @@ class CeleryThrottle:
         length in seconds, when you know it's greater than the min length.
         :param min_items: Generally keep the queue longer than this, and
         always shorter than 2× this value.
+        :param feedback: Whether to pace items with a FeedbackThrottle that
+        targets 1.5× min_items, instead of polling the queue length. Defaults
+        to the CELERY_THROTTLE_FEEDBACK setting.
         """
 
         # These variables are Final, i.e., they're consts.
@@ -103,6 +234,18 @@ class CeleryThrottle:
         # by the full amount. Fill it up.
         self.shortage = self.max
 
+        if feedback is None:
+            feedback = settings.CELERY_THROTTLE_FEEDBACK
+        self.feedback = (
+            FeedbackThrottle(
+                [queue_name],
+                target_depth=min_items * 3 // 2,
+                measure_interval=poll_interval,
+            )
+            if feedback
+            else None
+        )
+
     def update_min_items(self, min_value: int) -> None:
         """Update the minimum items and adjust related parameters.
 
@@ -110,11 +253,18 @@ class CeleryThrottle:
         """
         self.min = min_value
         self.max = min_value * 2
+        if self.feedback:
+            self.feedback.target_depth = min_value * 3 // 2
+            return
         # Important to update the self.shortage since the max has changed.
         self.shortage = self.max - get_queue_length(self.queue_name)
 
     def maybe_wait(self) -> None:
         """Make the user wait until the queue is short enough"""
+        if self.feedback:
+            self.feedback.maybe_wait()
+            return
+
         self.shortage -= 1
         if self.shortage > 0:
             # No need to sleep. Add items to the queue.
@@ -1,9 +1,19 @@
 import logging
+import time
+from collections.abc import Iterable
 from dataclasses import dataclass
+from datetime import date
+from types import MappingProxyType
 
 from courts_db import find_court
+from django.conf import settings
 from django.core.cache import cache
+from django.db.models import QuerySet
 
+from cl.lib.redis_utils import (
+    get_redis_interface,
+    make_court_registry_version_key,
+)
 from cl.search.models import Court
 
 logger = logging.getLogger(__name__)
@@ -27,6 +37,157 @@ class MinimalCourtData:
     parent_court_id: str | None
 
 
+@dataclass(frozen=True, slots=True)
+class CourtData:
+    """The fields of a court that search pages and the API read often."""
+
+    pk: str
+    short_name: str
+    full_name: str
+    citation_string: str
+    jurisdiction: str
+    in_use: bool
+    end_date: date | None
+    parent_court_id: str | None
+    position: float
+
+    @property
+    def is_terminated(self) -> bool:
+        return bool(self.end_date)
+
+
+class CourtRegistry:
+    """An immutable snapshot of every court, with its parent/child tree and
+    its courts grouped by jurisdiction.
+
+    Each worker keeps one in memory and replaces it when the version number
+    in Redis changes, so reading court metadata needs no I/O.
+    """
+
+    def __init__(self, version: int, courts: Iterable[CourtData]) -> None:
+        self.version = version
+        self.courts = tuple(sorted(courts, key=lambda c: c.position))
+        self.in_use = tuple(c for c in self.courts if c.in_use)
+        self.by_pk = MappingProxyType({c.pk: c for c in self.courts})
+
+        children: dict[str, list[str]] = {}
+        by_jurisdiction: dict[str, list[CourtData]] = {}
+        for court in self.courts:
+            if court.parent_court_id:
+                children.setdefault(court.parent_court_id, []).append(court.pk)
+            by_jurisdiction.setdefault(court.jurisdiction, []).append(court)
+        self.children = MappingProxyType(
+            {k: tuple(v) for k, v in children.items()}
+        )
+        self.by_jurisdiction = MappingProxyType(
+            {k: tuple(v) for k, v in by_jurisdiction.items()}
+        )
+        self.minimal = tuple(
+            MinimalCourtData(
+                pk=c.pk,
+                short_name=c.short_name,
+                in_use=c.in_use,
+                parent_court_id=c.parent_court_id,
+            )
+            for c in self.courts
+        )
+
+    @classmethod
+    def build(cls, version: int) -> "CourtRegistry":
+        """Load the courts from the database.
+
+        :param version: The registry version the courts were loaded for.
+        :return: A new registry.
+        """
+        fields = [f.name for f in CourtData.__dataclass_fields__.values()]
+        courts = Court.objects.values(*fields)
+        return cls(version, [CourtData(**court) for court in courts])
+
+    def lookup_child_courts(self, court_ids: list[str]) -> set[str]:
+        """Find all the descendants of some courts, like
+        lookup_child_courts_cache does.
+
+        :param court_ids: The courts to look up.
+        :return: A set containing the original court IDs and all their
+        descendant court IDs, or an empty set if none of them has children.
+        """
+        courts = set(court_ids)
+        if courts.isdisjoint(self.children):
+            return set()
+
+        step = courts
+        while step:
+            new_ids = {
+                child
+                for parent in step
+                for child in self.children.get(parent, ())
+            } - courts
+            courts.update(new_ids)
+            step = new_ids
+        return courts
+
+
+_court_registry: CourtRegistry | None = None
+_court_registry_checked_at = 0.0
+
+
+def get_court_registry_version() -> int:
+    """Get the current court registry version from Redis.
+
+    :return: The version, or 0 if courts were never saved since Redis was
+    emptied.
+    """
+    r = get_redis_interface("CACHE")
+    return int(r.get(make_court_registry_version_key()) or 0)
+
+
+def bump_court_registry_version() -> None:
+    """Make every worker reload its court registry on its next check."""
+    r = get_redis_interface("CACHE")
+    r.incr(make_court_registry_version_key())
+
+
+def get_court_registry() -> CourtRegistry:
+    """Get the court registry of this process.
+
+    The version in Redis is checked at most once every
+    COURT_REGISTRY_VERSION_CHECK_INTERVAL seconds, and the registry is
+    reloaded if it changed.
+
+    :return: The court registry.
+    """
+    global _court_registry, _court_registry_checked_at
+    now = time.monotonic()
+    age = now - _court_registry_checked_at
+    if (
+        _court_registry is not None
+        and age < settings.COURT_REGISTRY_VERSION_CHECK_INTERVAL
+    ):
+        return _court_registry
+
+    version = get_court_registry_version()
+    if _court_registry is None or _court_registry.version != version:
+        _court_registry = CourtRegistry.build(version)
+    _court_registry_checked_at = now
+    return _court_registry
+
+
+def clear_court_registry() -> None:
+    """Drop the court registry of this process."""
+    global _court_registry
+    _court_registry = None
+
+
+def get_courts_in_use() -> QuerySet[Court] | tuple[CourtData, ...]:
+    """Get the courts shown in the jurisdiction picker.
+
+    :return: The courts in use, from the court registry if it's enabled.
+    """
+    if settings.COURT_REGISTRY_ENABLED:
+        return get_court_registry().in_use
+    return Court.objects.filter(in_use=True)
+
+
 def get_minimal_list_of_courts() -> list[MinimalCourtData]:
     """
     Retrieves a list of courts with essential information.
@@ -37,6 +198,8 @@ def get_minimal_list_of_courts() -> list[MinimalCourtData]:
 
     :return: A list of MinimalCourtData objects
     """
+    if settings.COURT_REGISTRY_ENABLED:
+        return list(get_court_registry().minimal)
 
     data = cache.get(get_cache_key_for_court_list())
     if data is not None:
@@ -85,6 +248,9 @@ def lookup_child_courts_cache(court_ids: list[str]) -> set[str]:
     if not court_ids:
         return set()
 
+    if settings.COURT_REGISTRY_ENABLED:
+        return get_court_registry().lookup_child_courts(court_ids)
+
     courts_from_cache = get_minimal_list_of_courts()
     parent_court_ids = get_court_parent_ids(courts_from_cache)
     courts = set(court_ids)
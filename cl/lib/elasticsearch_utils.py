@@ -31,7 +31,7 @@ from elasticsearch.exceptions import ApiError, RequestError, TransportError
 
 from cl.audio.models import Audio
 from cl.custom_filters.templatetags.text_filters import html_decode
-from cl.lib.courts import lookup_child_courts_cache
+from cl.lib.courts import get_court_registry, lookup_child_courts_cache
 from cl.lib.crypto import sha256
 from cl.lib.date_time import midnight_pt
 from cl.lib.microservice_utils import microservice
@@ -1906,9 +1906,17 @@ def merge_courts_from_db(results: Page, search_type: str) -> None:
             ]
             for d in results
         ]
-        courts_in_page = Court.objects.filter(pk__in=court_ids).only(
-            "pk", "citation_string"
-        )
+        if settings.COURT_REGISTRY_ENABLED:
+            registry = get_court_registry()
+            courts_in_page = [
+                registry.by_pk[court_id]
+                for court_id in court_ids
+                if court_id in registry.by_pk
+            ]
+        else:
+            courts_in_page = Court.objects.filter(pk__in=court_ids).only(
+                "pk", "citation_string"
+            )
         courts_dict = {}
         for court in courts_in_page:
             courts_dict[court.pk] = court.citation_string
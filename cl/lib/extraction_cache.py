@@ -0,0 +1,111 @@
+from typing import Any, TypedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+
+from cl.lib.s3_cache import make_s3_cache_key
+from cl.stats.constants import StatCacheResult, StatExtractor, StatMetric
+from cl.stats.utils import tally_stat
+
+EXTRACTION_SERVICE_MODES = {
+    "document-extract": StatExtractor.TEXT,
+    "document-extract-ocr": StatExtractor.OCR,
+}
+
+
+class CachedExtraction(TypedDict):
+    """The parts of a document-extract response that callers use."""
+
+    content: str
+    page_count: int | None
+    extracted_by_ocr: bool
+    err: str | None
+
+
+def get_extraction_cache() -> BaseCache | None:
+    """Get the cache that extraction results are stored in.
+
+    Results are large and numerous, so they're only kept in S3, never in the
+    database cache that get_s3_cache falls back to.
+
+    :return: The S3 cache, or None if there's no S3 cache configured.
+    """
+    if "s3" not in settings.CACHES:
+        return None
+    return caches["s3"]
+
+
+def make_extraction_cache_key(sha1_hash: str, service: str) -> str:
+    """Build the cache key of an extraction result.
+
+    Keys are content-addressed, so every copy of a file shares one entry, and
+    versioned, so bumping EXTRACTION_CACHE_VERSION after an extractor upgrade
+    drops every older entry at once.
+
+    :param sha1_hash: The SHA1 of the extracted file.
+    :param service: The extraction service, e.g. "document-extract".
+    :return: The cache key.
+    """
+    mode = EXTRACTION_SERVICE_MODES[service]
+    return make_s3_cache_key(
+        f"extraction:v{settings.EXTRACTION_CACHE_VERSION}:{mode}:{sha1_hash}",
+        settings.EXTRACTION_CACHE_TIMEOUT,
+    )
+
+
+def get_cached_extraction(
+    sha1_hash: str, service: str
+) -> CachedExtraction | None:
+    """Look up the extraction result of a file, and tally hits and misses.
+
+    :param sha1_hash: The SHA1 of the file to extract.
+    :param service: The extraction service, e.g. "document-extract".
+    :return: The cached result, or None if the cache is disabled or
+    unavailable, the file has no SHA1, or it wasn't extracted yet.
+    """
+    cache = get_extraction_cache()
+    if not settings.EXTRACTION_CACHE_ENABLED or cache is None or not sha1_hash:
+        return None
+    cached = cache.get(make_extraction_cache_key(sha1_hash, service))
+    tally_stat(
+        StatMetric.EXTRACTION_CACHE,
+        labels={
+            "extractor": EXTRACTION_SERVICE_MODES[service],
+            "result": StatCacheResult.HIT
+            if cached is not None
+            else StatCacheResult.MISS,
+        },
+    )
+    return cached
+
+
+def cache_extraction(
+    sha1_hash: str, service: str, data: dict[str, Any]
+) -> None:
+    """Store a successful extraction result for later copies of the file.
+
+    Results with an error aren't stored, so a later attempt can succeed.
+    Entries expire after EXTRACTION_CACHE_TIMEOUT seconds.
+
+    :param sha1_hash: The SHA1 of the extracted file.
+    :param service: The extraction service, e.g. "document-extract".
+    :param data: The JSON body of the service's response.
+    :return: None
+    """
+    cache = get_extraction_cache()
+    if not settings.EXTRACTION_CACHE_ENABLED or cache is None or not sha1_hash:
+        return
+    if data.get("err"):
+        return
+    cached: CachedExtraction = {
+        "content": data["content"],
+        "page_count": data.get("page_count"),
+        "extracted_by_ocr": data["extracted_by_ocr"],
+        "err": data.get("err"),
+    }
+    cache.set(
+        make_extraction_cache_key(sha1_hash, service),
+        cached,
+        settings.EXTRACTION_CACHE_TIMEOUT,
+    )
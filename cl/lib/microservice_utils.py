@@ -1,27 +1,228 @@
+import atexit
+import io
 import json
 import logging
+import os
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
 from io import BufferedReader
-from typing import Any
+from typing import IO, Any
 
 from asgiref.sync import sync_to_async
 from botocore.exceptions import ClientError
 from django.conf import settings
+from django.db.models.fields.files import FieldFile
 from httpx import (
-    AsyncClient,
+    Client,
+    Limits,
     NetworkError,
     Response,
     TimeoutException,
 )
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
 
 from cl.audio.models import Audio
 from cl.lib.decorators import retry
 from cl.lib.exceptions import NoSuchKey
 from cl.lib.models import AbstractPDF
 from cl.search.models import Opinion, RECAPDocument
+from cl.stats.metrics import record_microservice_request
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PooledServiceClient:
+    """A pooled HTTP client for one microservice and its concurrency cap."""
+
+    client: Client
+    slots: threading.BoundedSemaphore
+
+
+_service_clients: dict[str, PooledServiceClient] = {}
+_service_clients_pid: int | None = None
+_service_clients_lock = threading.Lock()
+
+
+def get_service_client(service: str) -> PooledServiceClient:
+    """Get the process-wide pooled client for a microservice.
+
+    Clients are sync so they outlive the short-lived event loops that
+    ``async_to_sync`` creates for every call from a Celery task, which would
+    otherwise drop their connections after one request. Each service gets its
+    own keep-alive pool, capped at the service's ``max_concurrency`` entry in
+    ``MICROSERVICE_URLS`` or ``MICROSERVICE_MAX_CONNECTIONS``. Clients are
+    rebuilt after a fork, since connections can't be shared with the parent.
+
+    :param service: The service to call, a key of ``MICROSERVICE_URLS``.
+    :return: The client and the semaphore that caps in-flight requests.
+    """
+    global _service_clients_pid
+    with _service_clients_lock:
+        if _service_clients_pid != os.getpid():
+            _service_clients.clear()
+            _service_clients_pid = os.getpid()
+        pooled = _service_clients.get(service)
+        if pooled is None:
+            max_concurrency = settings.MICROSERVICE_URLS[service].get(
+                "max_concurrency", settings.MICROSERVICE_MAX_CONNECTIONS
+            )
+            pooled = PooledServiceClient(
+                client=Client(
+                    follow_redirects=True,
+                    http2=True,
+                    limits=Limits(
+                        max_connections=max_concurrency,
+                        max_keepalive_connections=settings.MICROSERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=settings.MICROSERVICE_KEEPALIVE_EXPIRY,
+                    ),
+                ),
+                slots=threading.BoundedSemaphore(max_concurrency),
+            )
+            _service_clients[service] = pooled
+    return pooled
+
+
+def close_service_clients() -> None:
+    """Close every pooled microservice client in this process.
+
+    :return: None
+    """
+    with _service_clients_lock:
+        for pooled in _service_clients.values():
+            pooled.client.close()
+        _service_clients.clear()
+
+
+atexit.register(close_service_clients)
+
+
+class SizedStream(io.RawIOBase):
+    """A forward-only stream of known length, like an S3 response body.
+
+    httpx measures a file by seeking to its end and back. Without a length it
+    sends the upload chunked, with no Content-Length, and the microservices,
+    which are WSGI apps, read that as an empty body. Seeks here only move a
+    virtual position, so measuring works, while reads must start where the
+    last read stopped.
+    """
+
+    def __init__(self, body: IO[bytes], length: int) -> None:
+        self.body = body
+        self.length = length
+        self.read_position = 0
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_END:
+            self.position = self.length + offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = offset
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if self.position != self.read_position:
+            raise io.UnsupportedOperation(
+                "The stream can only be read from where it was left."
+            )
+        data = self.body.read(len(buffer))
+        buffer[: len(data)] = data
+        self.read_position += len(data)
+        self.position = self.read_position
+        return len(data)
+
+    def close(self) -> None:
+        self.body.close()
+        super().close()
+
+
+def open_upload_stream(field_file: FieldFile) -> IO[bytes]:
+    """Open a stored file to upload it without reading it all first.
+
+    For S3 storage the upload reads straight from the GET response body, in
+    chunks, instead of ``S3File`` spooling the whole object to memory or disk
+    before the request starts. The body is wrapped in a SizedStream so the
+    request still has a Content-Length. Other storages open the file as usual.
+
+    :param field_file: The file to open.
+    :return: A binary file-like object. The caller closes it.
+    :raises FileNotFoundError: If the file isn't in the storage.
+    """
+    storage = field_file.storage
+    if not isinstance(storage, S3Storage):
+        return field_file.open(mode="rb")
+
+    obj = storage.bucket.Object(
+        storage._normalize_name(clean_name(field_file.name))
+    )
+    try:
+        obj.load()
+    except ClientError as error:
+        # Mirror S3File, which reports a missing object this way.
+        if error.response["ResponseMetadata"]["HTTPStatusCode"] == 404:
+            raise FileNotFoundError(
+                f"File does not exist: {field_file.name}"
+            ) from error
+        raise
+    return SizedStream(obj.get()["Body"], obj.content_length)
+
+
+def send_service_request(
+    service: str,
+    method: str,
+    data=None,
+    files=None,
+    params=None,
+) -> Response:
+    """Send a request with the service's pooled client and record metrics.
+
+    Blocks while the service is at its concurrency cap. The request duration
+    and whether it reused a kept-alive connection are recorded per service.
+
+    :param service: The service to call
+    :param method: The HTTP method to use
+    :param data: The data to send
+    :param files: The files to send
+    :param params: The params to send
+    :return: The response from the microservice
+    """
+    service_conf = settings.MICROSERVICE_URLS[service]
+    pooled = get_service_client(service)
+    new_connection = False
+
+    def trace(event_name: str, info: dict) -> None:
+        nonlocal new_connection
+        if event_name == "connection.connect_tcp.started":
+            new_connection = True
+
+    with pooled.slots:
+        start = time.perf_counter()
+        response = pooled.client.request(
+            method,
+            service_conf["url"],  # type: ignore
+            data=data,
+            files=files,
+            params=params,
+            timeout=service_conf["timeout"],
+            extensions={"trace": trace},
+        )
+    record_microservice_request(
+        service, time.perf_counter() - start, reused=not new_connection
+    )
+    return response
+
+
 def log_invalid_embedding_errors(embeddings: Any):
     """Log an error when the embeddings response is not a list.
 
@@ -72,7 +273,10 @@ async def microservice(
     """Call a Microservice endpoint
 
     This is a helper utility to call our microservices.  To see a list of Endpoints
-    check out the settings file cl/settings/public.py.
+    check out the settings file cl/settings/project/microservices.py.
+
+    Requests go through the service's process-wide pooled client, and stored
+    files are streamed to the service rather than read into memory first.
 
     Because of the various ways our db is setup we have a few different params we use
     in this function.
@@ -88,68 +292,62 @@ async def microservice(
     :return: The response from the microservice
     """
 
-    services = settings.MICROSERVICE_URLS
-
-    files = None
-    # Add file from filepath
-    if filepath:
-        files = {"file": (filepath, open(filepath, "rb"))}
-
-    # Handle our documents based on the type of model object
-    # Sadly these are not uniform
-    if item:
-        if isinstance(item, AbstractPDF):
-            try:
-                files = {
-                    "file": (
-                        item.filepath_local.name,
-                        item.filepath_local.open(mode="rb"),
-                    )
-                }
-            except FileNotFoundError:
-                # The file is no longer available, clean it up in DB
-                await clean_up_recap_document_file(item)
-        elif isinstance(item, Opinion):
+    with ExitStack() as stack:
+        files = None
+        # Add file from filepath
+        if filepath:
             files = {
-                "file": (
-                    item.local_path.name,
-                    item.local_path.open(mode="rb"),
-                )
+                "file": (filepath, stack.enter_context(open(filepath, "rb")))
             }
-        elif isinstance(item, Audio):
-            match service:
-                case "downsize-audio":
-                    files = {
-                        "file": (
-                            item.local_path_mp3.name,
-                            item.local_path_mp3.open(mode="rb"),
-                        )
-                    }
-                case _:
+
+        # Handle our documents based on the type of model object
+        # Sadly these are not uniform
+        if item:
+            if isinstance(item, AbstractPDF):
+                try:
                     files = {
                         "file": (
-                            item.local_path_original_file.name,
-                            item.local_path_original_file.open(mode="rb"),
+                            item.filepath_local.name,
+                            stack.enter_context(
+                                open_upload_stream(item.filepath_local)
+                            ),
                         )
                     }
-    # Sometimes we will want to pass in a filename and the file bytes
-    # to avoid writing them to disk. Filename can often be generic
-    # and is used to identify the file extension for our microservices
-    if file and file_type:
-        files = {"file": (f"dummy.{file_type}", file)}
-    elif file:
-        files = {"file": ("filename", file)}
-
-    async with AsyncClient(follow_redirects=True, http2=True) as client:
-        req = client.build_request(
-            method=method,
-            url=services[service]["url"],  # type: ignore
-            data=data,
-            files=files,
-            params=params,
-            timeout=services[service]["timeout"],
-        )
-        return await client.send(req)
+                except FileNotFoundError:
+                    # The file is no longer available, clean it up in DB
+                    await clean_up_recap_document_file(item)
+            elif isinstance(item, Opinion):
+                files = {
+                    "file": (
+                        item.local_path.name,
+                        stack.enter_context(
+                            open_upload_stream(item.local_path)
+                        ),
+                    )
+                }
+            elif isinstance(item, Audio):
+                match service:
+                    case "downsize-audio":
+                        audio_file = item.local_path_mp3
+                    case _:
+                        audio_file = item.local_path_original_file
+                files = {
+                    "file": (
+                        audio_file.name,
+                        stack.enter_context(open_upload_stream(audio_file)),
+                    )
+                }
+        # Sometimes we will want to pass in a filename and the file bytes
+        # to avoid writing them to disk. Filename can often be generic
+        # and is used to identify the file extension for our microservices
+        if file and file_type:
+            files = {"file": (f"dummy.{file_type}", file)}
+        elif file:
+            files = {"file": ("filename", file)}
+
+        return await sync_to_async(
+            send_service_request, thread_sensitive=False
+        )(service, method, data=data, files=files, params=params)
 
 
 @retry(
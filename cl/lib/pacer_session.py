@@ -1,5 +1,8 @@
 import pickle
 import random
+import threading
+import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from urllib.parse import urlparse
 
@@ -8,9 +11,16 @@ from juriscraper.pacer import PacerSession
 from redis import Redis
 from requests.cookies import RequestsCookieJar
 
-from cl.lib.redis_utils import get_redis_interface
+from cl.lib.redis_utils import (
+    acquire_redis_lock,
+    get_redis_interface,
+    make_pacer_login_lock_key,
+    release_redis_lock,
+)
 
 session_key = "session:pacer:cookies:user.%s"
+# How long a login may hold the login lock of an account, in milliseconds.
+LOGIN_LOCK_TTL = 60 * 1000
 
 
 @dataclass
@@ -186,12 +196,40 @@ def get_or_cache_pacer_cookies(
     r = get_redis_interface("CACHE", decode_responses=False)
     cookies_data = get_pacer_cookie_from_cache(user_pk, r=r)
     ttl_seconds = r.ttl(session_key % user_pk)
-    if cookies_data and ttl_seconds >= 300 and not refresh:
-        # cookies were found in cache and ttl >= 5 minutes, return them
+    min_ttl = (
+        settings.PACER_COOKIE_REFRESH_SECONDS
+        if settings.PACER_SESSION_POOL_ENABLED
+        else 300
+    )
+    if cookies_data and ttl_seconds >= min_ttl and not refresh:
+        # cookies were found in cache and ttl is long enough, return them
         return cookies_data
 
     # Unable to find cookies in cache, are about to expire or refresh needed
     # Login and cache new values.
+    if settings.PACER_SESSION_POOL_ENABLED:
+        return log_into_pacer_once(
+            r, user_pk, username, password, client_code, cookies_data, refresh
+        )
+    return cache_new_pacer_cookies(r, user_pk, username, password, client_code)
+
+
+def cache_new_pacer_cookies(
+    r: Redis,
+    user_pk: str | int,
+    username: str,
+    password: str,
+    client_code: str | None = None,
+) -> SessionData:
+    """Log into PACER and cache the new cookies of a user.
+
+    :param r: The Redis DB to connect to as a connection interface.
+    :param user_pk: The PK of the user the cookies belong to.
+    :param username: The PACER username of the user
+    :param password: The PACER password of the user
+    :param client_code: The PACER client code of the user
+    :return: A SessionData object containing the session's cookies and proxy.
+    """
     session_data = log_into_pacer(username, password, client_code)
     cookie_expiration = 60 * 60
     r.set(
@@ -202,6 +240,55 @@ def get_or_cache_pacer_cookies(
     return session_data
 
 
+def log_into_pacer_once(
+    r: Redis,
+    user_pk: str | int,
+    username: str,
+    password: str,
+    client_code: str | None,
+    cached: SessionData | None,
+    refresh: bool,
+) -> SessionData:
+    """Log into PACER, unless another task is already doing it for the user.
+
+    Logins are guarded by a lock per user. While another task holds it, the
+    cached cookies are used if they still work. Otherwise, we wait for the
+    lock and use the cookies the other task cached, if they differ from the
+    ones we had.
+
+    :param r: The Redis DB to connect to as a connection interface.
+    :param user_pk: The PK of the user the cookies belong to.
+    :param username: The PACER username of the user
+    :param password: The PACER password of the user
+    :param client_code: The PACER client code of the user
+    :param cached: The cookies that were found in cache, if any.
+    :param refresh: Whether the cached cookies were rejected by PACER.
+    :return: A SessionData object containing the session's cookies and proxy.
+    """
+    lock_key = make_pacer_login_lock_key(user_pk)
+    identifier = str(uuid.uuid4())
+    if not r.set(lock_key, identifier, nx=True, px=LOGIN_LOCK_TTL):
+        if cached is not None and not refresh:
+            # The cookies are about to expire, but still work.
+            return cached
+        identifier = acquire_redis_lock(r, lock_key, LOGIN_LOCK_TTL)
+
+    try:
+        current = get_pacer_cookie_from_cache(user_pk, r=r)
+        if current is not None and (
+            cached is None
+            or get_session_fingerprint(current)
+            != get_session_fingerprint(cached)
+        ):
+            # Another task logged in while we waited.
+            return current
+        return cache_new_pacer_cookies(
+            r, user_pk, username, password, client_code
+        )
+    finally:
+        release_redis_lock(r, lock_key, identifier)
+
+
 def get_pacer_cookie_from_cache(
     user_pk: str | int,
     r: Redis | None = None,
@@ -234,3 +321,69 @@ def delete_pacer_cookie_from_cache(
     if not r:
         r = get_redis_interface("CACHE", decode_responses=False)
     r.delete(session_key % user_pk)
+
+
+def get_session_fingerprint(session_data: SessionData) -> tuple:
+    """Get a hashable summary of the cookies and proxy of a session.
+
+    :param session_data: The session data.
+    :return: A tuple that's equal for sessions with the same cookies and proxy.
+    """
+    return (
+        session_data.proxy_address,
+        tuple(
+            sorted(
+                (c.domain, c.path, c.name, c.value or "")
+                for c in session_data.cookies
+            )
+        ),
+    )
+
+
+_pooled_sessions = threading.local()
+
+
+def get_pacer_session(session_data: SessionData) -> ProxyPacerSession:
+    """Get a session that sends requests with the given cookies and proxy.
+
+    With PACER_SESSION_POOL_ENABLED, sessions are kept by each worker thread
+    and reused by every task with the same cookies, so their connections stay
+    open between tasks. The least recently used sessions are closed once
+    there are more than PACER_SESSION_POOL_SIZE.
+
+    :param session_data: A SessionData object containing the session's cookies
+    and proxy.
+    :return: A session using the cookies and proxy.
+    """
+    if not settings.PACER_SESSION_POOL_ENABLED:
+        return ProxyPacerSession(
+            cookies=session_data.cookies, proxy=session_data.proxy_address
+        )
+
+    sessions = getattr(_pooled_sessions, "sessions", None)
+    if sessions is None:
+        sessions = _pooled_sessions.sessions = OrderedDict()
+    key = get_session_fingerprint(session_data)
+    session = sessions.get(key)
+    if session is not None:
+        sessions.move_to_end(key)
+        return session
+
+    session = ProxyPacerSession(
+        cookies=session_data.cookies, proxy=session_data.proxy_address
+    )
+    sessions[key] = session
+    while len(sessions) > settings.PACER_SESSION_POOL_SIZE:
+        _, old_session = sessions.popitem(last=False)
+        old_session.close()
+    return session
+
+
+def clear_pacer_sessions() -> None:
+    """Close the pooled sessions of this thread."""
+    sessions = getattr(_pooled_sessions, "sessions", None)
+    if not sessions:
+        return
+    for session in sessions.values():
+        session.close()
+    sessions.clear()
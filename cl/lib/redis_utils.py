@@ -78,6 +78,38 @@ def make_update_pacer_case_id_key(court_id: str) -> str:
     return f"update.pacer_case_id:{court_id}"
 
 
+def make_url_hash_stats_key(court_id: str) -> str:
+    return f"scraper.url_hash:{court_id}"
+
+
+def make_celery_throttle_key(queue_name: str) -> str:
+    return f"celery_throttle:{queue_name}"
+
+
+def make_event_counts_key(state: str) -> str:
+    return f"event_counts:{state}"
+
+
+def make_prayer_leaderboard_key(docket_id: int | str | None = None) -> str:
+    if docket_id is None:
+        return "prayers:leaderboard"
+    return f"prayers:leaderboard:d:{docket_id}"
+
+
+def make_court_registry_version_key() -> str:
+    return "courts:registry:version"
+
+
+def make_coverage_key(search_type: str, court_id: str | None = None) -> str:
+    if court_id is None:
+        return f"coverage:{search_type}"
+    return f"coverage:{search_type}:{court_id}"
+
+
+def make_pacer_login_lock_key(user_pk: str | int) -> str:
+    return f"session:pacer:login_lock:user.{user_pk}"
+
+
 def acquire_redis_lock(r: Redis, key: str, ttl: int) -> str:
     """Acquires a lock in Redis.
 
@@ -1,7 +1,8 @@
 import logging
 import pickle
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from typing import Any, TypedDict
 from urllib.parse import parse_qs, urlencode
 
@@ -23,6 +24,7 @@ from waffle import flag_is_active
 from cl.citations.match_citations_queries import es_get_query_citation
 from cl.citations.utils import get_citation_depth_between_clusters
 from cl.lib.bot_detector import is_bot
+from cl.lib.courts import CourtData, get_courts_in_use
 from cl.lib.crypto import sha256
 from cl.lib.elasticsearch_utils import (
     build_es_base_query,
@@ -117,8 +119,26 @@ def make_get_string(
     return get_string
 
 
+@dataclass
+class PickerCourt:
+    """A court in the jurisdiction picker and whether it's checked.
+
+    Other attributes are read from the court, so templates can use it like
+    the court itself. Courts from the court registry are shared by every
+    request, so they are never marked as checked directly.
+    """
+
+    court: Court | CourtData
+    checked: bool = False
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "court":
+            raise AttributeError(name)
+        return getattr(self.court, name)
+
+
 def merge_form_with_courts(
-    courts: QuerySet[Court],
+    courts: Iterable[Court | CourtData],
     search_form: SearchForm,
 ) -> tuple[dict[str, list], str, str]:
     """Merges the courts dict with the values from the search form.
@@ -168,11 +188,14 @@ def merge_form_with_courts(
     if all_facets_selected:
         court_count_human = "All"
 
+    picker_courts = []
     for court in courts:
+        picker_court = PickerCourt(court)
         if no_facets_selected:
-            court.checked = True
+            picker_court.checked = True
         elif court.pk in court_field_values:
-            court.checked = court_field_values[court.pk]
+            picker_court.checked = court_field_values[court.pk]
+        picker_courts.append(picker_court)
 
     # Build the dict with jurisdiction keys and arrange courts into tabs
     court_tabs: dict[str, list] = {
@@ -187,7 +210,7 @@ def merge_form_with_courts(
     b_bundle = []
     states = []
     territories = []
-    for court in courts:
+    for court in picker_courts:
         if court.jurisdiction == Court.FEDERAL_APPELLATE:
             court_tabs["federal"].append(court)
         elif court.jurisdiction == Court.FEDERAL_DISTRICT:
@@ -639,7 +662,7 @@ def do_es_search(
     facet: bool = True,
     cache_key: str | None = None,
     is_csv_export: bool = False,
-    courts: QuerySet[Court] | None = None,
+    courts: QuerySet[Court] | Iterable[CourtData] | None = None,
     is_semantic_frontend_active: bool = False,
 ):
     """Run Elasticsearch searching and filtering and prepare data to display
@@ -653,12 +676,12 @@ def do_es_search(
     is set or used. Results are saved for six hours.
     :param is_csv_export: Indicates if the data being processed is intended for
     an export process.
-    :param courts: QuerySet of courts used in the jurisdiction picker.
+    :param courts: The courts used in the jurisdiction picker.
     :return: A big dict of variables for use in the search results, homepage, or
     other location.
     """
     if courts is None:
-        courts = Court.objects.filter(in_use=True)
+        courts = get_courts_in_use()
     paged_results = None
     query_time: int | None = 0
     total_query_results: int | None = 0
@@ -71,6 +71,22 @@ class AWSMediaStorage(S3Storage):
         return params
 
 
+class BulkDataAWSStorage(AWSMediaStorage):
+    """Stores bulk data exports. Their data files never change, but their
+    manifests and load scripts are replaced by later exports, so caches have
+    to revalidate those.
+    """
+
+    mutable_extensions = (".json", ".sh")
+
+    def get_object_parameters(self, name: str) -> dict[str, str]:
+        if not name.endswith(self.mutable_extensions):
+            return super().get_object_parameters(name)
+        params = self.object_parameters.copy()
+        params["CacheControl"] = "no-cache"
+        return params
+
+
 class IncrementingAWSMediaStorage(AWSMediaStorage):
     file_overwrite = False
 
@@ -1,13 +1,17 @@
 import datetime
+import threading
+import time
 import unittest
 from collections.abc import Sized
 from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import cast
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from django.test.testcases import SerializeMixin
 from django.utils import timezone
 from lxml import etree
@@ -15,6 +19,7 @@ from lxml import etree
 from cl.audio.factories import AudioFactory
 from cl.audio.models import Audio
 from cl.lib.date_time import fixed_midnight_pt
+from cl.lib.microservice_utils import close_service_clients
 from cl.lib.utils import deepgetattr
 from cl.people_db.factories import (
     ABARatingFactory,
@@ -1576,3 +1581,103 @@ def generate_docket_target_sources(
             ]
 
     return target_sources
+
+
+class FakeMicroservice:
+    """A local stand-in for the microservices, for tests and benchmarks.
+
+    Runs a keep-alive HTTP/1.1 server on localhost and points every service
+    in ``MICROSERVICE_URLS`` at it, so calls go through the real pooled
+    clients and connection handling. Each service answers with its canned
+    response, after an optional delay to model the service's latency.
+
+    Usage:
+        with FakeMicroservice({"page-count": b"3"}, delay=0.01) as fake:
+            response = async_to_sync(microservice)("page-count", file=f)
+        fake.requests["page-count"], fake.connections
+
+    :param responses: Response body per service. Unlisted services answer
+    with an empty 200.
+    :param delay: Seconds to wait before answering each request.
+    """
+
+    def __init__(
+        self, responses: dict[str, bytes] | None = None, delay: float = 0.0
+    ) -> None:
+        self.responses = responses or {}
+        self.delay = delay
+        self.connections = 0
+        self.requests: dict[str, int] = {}
+        self.uploaded: dict[str, list[int]] = {}
+        self.content_lengths: dict[str, list[str | None]] = {}
+        self._lock = threading.Lock()
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+            def _read_body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding") == "chunked":
+                    body = b""
+                    while size := int(self.rfile.readline().strip(), 16):
+                        body += self.rfile.read(size)
+                        self.rfile.readline()
+                    self.rfile.readline()
+                    return body
+                return self.rfile.read(
+                    int(self.headers.get("Content-Length", 0))
+                )
+
+            def _respond(self) -> None:
+                service = self.path.strip("/").split("?")[0]
+                body = self._read_body()
+                with fake._lock:
+                    fake.requests[service] = fake.requests.get(service, 0) + 1
+                    fake.uploaded.setdefault(service, []).append(len(body))
+                    fake.content_lengths.setdefault(service, []).append(
+                        self.headers.get("Content-Length")
+                    )
+                if fake.delay:
+                    time.sleep(fake.delay)
+                payload = fake.responses.get(service, b"")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _respond
+
+        return Handler
+
+    def __enter__(self) -> "FakeMicroservice":
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), self._make_handler()
+        )
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.settings = override_settings(
+            MICROSERVICE_URLS={
+                service: {**conf, "url": f"http://{host}:{port}/{service}/"}
+                for service, conf in settings.MICROSERVICE_URLS.items()
+            }
+        )
+        self.settings.enable()
+        close_service_clients()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        close_service_clients()
+        self.settings.disable()
+        self.server.shutdown()
+        self.server.server_close()
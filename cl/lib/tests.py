@@ -1,21 +1,30 @@
+import asyncio
 import datetime
+import io
 import pickle
 from typing import TypedDict, cast
 from unittest import mock
 from unittest.mock import MagicMock, patch
 
 from asgiref.sync import async_to_sync
+from botocore.response import StreamingBody
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.fields.files import FieldFile
 from django.test import RequestFactory, SimpleTestCase, override_settings
 from django.utils.functional import SimpleLazyObject
+from prometheus_client import REGISTRY
 from requests.cookies import RequestsCookieJar
+from storages.backends.s3 import S3Storage
 
+from cl.lib.celery_utils import CeleryThrottle, FeedbackThrottle
 from cl.lib.courts import (
+    clear_court_registry,
     get_active_court_from_cache,
+    get_court_registry,
     get_minimal_list_of_courts,
     lookup_child_courts_cache,
 )
@@ -29,6 +38,7 @@ from cl.lib.file_validation import (
     validate_file_size,
 )
 from cl.lib.filesizes import convert_size_to_bytes
+from cl.lib.microservice_utils import microservice, open_upload_stream
 from cl.lib.mime_types import lookup_mime_type
 from cl.lib.model_helpers import (
     clean_docket_number,
@@ -53,7 +63,9 @@ from cl.lib.pacer import (
 from cl.lib.pacer_session import (
     ProxyPacerSession,
     SessionData,
+    clear_pacer_sessions,
     get_or_cache_pacer_cookies,
+    get_pacer_session,
     session_key,
 )
 from cl.lib.privacy_tools import anonymize
@@ -62,12 +74,16 @@ from cl.lib.recap_utils import needs_ocr
 from cl.lib.redis_utils import (
     acquire_redis_lock,
     get_redis_interface,
+    make_celery_throttle_key,
+    make_court_registry_version_key,
+    make_pacer_login_lock_key,
     release_redis_lock,
 )
 from cl.lib.s3_cache import get_s3_cache, make_s3_cache_key
 from cl.lib.search_index_utils import get_parties_from_case_name_bankr
 from cl.lib.sqlcommenter import QueryWrapper, SqlCommenter, add_sql_comment
 from cl.lib.string_utils import normalize_dashes, trunc
+from cl.lib.test_helpers import FakeMicroservice
 from cl.lib.utils import (
     check_for_proximity_tokens,
     check_unbalanced_parenthesis,
@@ -209,6 +225,71 @@ class TestCachedCourtUtils(TestCase):
         return super().tearDown()
 
 
+@override_settings(
+    COURT_REGISTRY_ENABLED=True, COURT_REGISTRY_VERSION_CHECK_INTERVAL=0
+)
+class TestCourtRegistry(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.parent_court = CourtFactory(id="parent_court", short_name="Parent")
+        cls.child_court = CourtFactory(
+            id="child_court", parent_court=cls.parent_court
+        )
+        cls.grandchild_court = CourtFactory(
+            id="grandchild_court", parent_court=cls.child_court
+        )
+        cls.court_not_in_use = CourtFactory(in_use=False)
+
+    def setUp(self):
+        self.r = get_redis_interface("CACHE")
+        self.r.delete(make_court_registry_version_key())
+        clear_court_registry()
+
+    def tearDown(self):
+        self.r.delete(make_court_registry_version_key())
+        clear_court_registry()
+        return super().tearDown()
+
+    def test_court_lookups_use_the_registry(self) -> None:
+        """Are court lists and child courts served from memory once the
+        registry is loaded?
+        """
+        get_court_registry()
+        with self.assertNumQueries(0):
+            child_ids = lookup_child_courts_cache([self.parent_court.pk])
+            courts = get_minimal_list_of_courts()
+            in_use = get_active_court_from_cache()
+
+        self.assertSetEqual(
+            child_ids,
+            {
+                self.parent_court.pk,
+                self.child_court.pk,
+                self.grandchild_court.pk,
+            },
+        )
+        self.assertEqual(len(courts), Court.objects.count())
+        self.assertNotIn(self.court_not_in_use.pk, {c.pk for c in in_use})
+
+    def test_registry_reloads_after_a_court_is_saved(self) -> None:
+        """Is the registry reloaded once a court save bumps its version?"""
+        registry = get_court_registry()
+        self.assertIs(get_court_registry(), registry)
+
+        self.parent_court.short_name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parent_court.save()
+
+        new_registry = get_court_registry()
+        self.assertIsNot(new_registry, registry)
+        self.assertEqual(
+            new_registry.by_pk[self.parent_court.pk].short_name, "Renamed"
+        )
+        self.assertEqual(
+            registry.by_pk[self.parent_court.pk].short_name, "Parent"
+        )
+
+
 @override_settings(
     EGRESS_PROXY_HOSTS=["http://proxy_1:9090", "http://proxy_2:9090"]
 )
@@ -288,6 +369,63 @@ class TestPacerSessionUtils(TestCase):
         self.assertEqual(mock_log_into_pacer.call_count, 1)
         self.assertEqual(session_data.proxy_address, "http://proxy_2:9090")
 
+    @override_settings(PACER_SESSION_POOL_ENABLED=True)
+    @patch("cl.lib.pacer_session.log_into_pacer")
+    def test_single_flight_login(self, mock_log_into_pacer):
+        """Do we leave logins to the task holding the login lock?"""
+        mock_log_into_pacer.return_value = SessionData(
+            self.test_cookies, "http://proxy_2:9090"
+        )
+        r = get_redis_interface("CACHE", decode_responses=False)
+        lock_key = make_pacer_login_lock_key("test_new_format_almost_expired")
+        r.set(lock_key, "another-task", px=5000)
+        self.addCleanup(r.delete, lock_key)
+
+        # Cookies about to expire are used while another task logs in.
+        session_data = get_or_cache_pacer_cookies(
+            "test_new_format_almost_expired",
+            username="test",
+            password="password",
+        )
+        self.assertEqual(mock_log_into_pacer.call_count, 0)
+        self.assertEqual(session_data.proxy_address, "http://proxy_1:9090")
+
+        # Once the lock is free, the next task renews them.
+        r.delete(lock_key)
+        session_data = get_or_cache_pacer_cookies(
+            "test_new_format_almost_expired",
+            username="test",
+            password="password",
+        )
+        self.assertEqual(mock_log_into_pacer.call_count, 1)
+        self.assertEqual(session_data.proxy_address, "http://proxy_2:9090")
+        self.assertIsNone(r.get(lock_key))
+
+    @override_settings(PACER_SESSION_POOL_ENABLED=True)
+    def test_reuse_pooled_sessions(self):
+        """Do tasks with the same cookies share a session?"""
+        self.addCleanup(clear_pacer_sessions)
+        session_data = SessionData(self.test_cookies, "http://proxy_1:9090")
+        session = get_pacer_session(session_data)
+        same_cookies = RequestsCookieJar()
+        same_cookies.set("PacerSession", "this-is-a-test")
+        self.assertIs(
+            get_pacer_session(
+                SessionData(same_cookies, "http://proxy_1:9090")
+            ),
+            session,
+        )
+
+        new_cookies = RequestsCookieJar()
+        new_cookies.set("PacerSession", "this-is-a-new-test")
+        new_session = get_pacer_session(
+            SessionData(new_cookies, "http://proxy_1:9090")
+        )
+        self.assertIsNot(new_session, session)
+        self.assertEqual(
+            new_session.cookies.get("PacerSession"), "this-is-a-new-test"
+        )
+
 
 class TestStringUtils(SimpleTestCase):
     def test_trunc(self) -> None:
@@ -1722,6 +1860,140 @@ class TestRedisUtils(SimpleTestCase):
         self.assertEqual(result, 1)
 
 
+@patch("cl.lib.celery_utils.get_queue_length")
+@patch("cl.lib.celery_utils.time")
+class TestFeedbackThrottle(SimpleTestCase):
+    """Test the queue-depth feedback throttle with a fake clock."""
+
+    def tearDown(self) -> None:
+        get_redis_interface("CACHE").delete(
+            make_celery_throttle_key("test_throttle")
+        )
+
+    def test_fills_queue_to_target_then_waits(
+        self, mock_time, mock_get_queue_length
+    ) -> None:
+        """An empty queue is filled up to the target without waiting."""
+        mock_time.monotonic.return_value = 100.0
+        mock_get_queue_length.return_value = 0
+        throttle = FeedbackThrottle(["test_throttle"], target_depth=30)
+
+        for _ in range(30):
+            throttle.maybe_wait()
+        mock_time.sleep.assert_not_called()
+
+        # The bucket is empty, so the next item waits for a refill.
+        mock_time.sleep.side_effect = lambda seconds: setattr(
+            mock_time.monotonic, "return_value", 100.0 + seconds
+        )
+        throttle.maybe_wait()
+        mock_time.sleep.assert_called()
+
+    def test_rate_follows_drain_and_is_published(
+        self, mock_time, mock_get_queue_length
+    ) -> None:
+        """The rate rises when workers drain the queue, and each decision is
+        stored for the metrics."""
+        throttle = FeedbackThrottle(
+            ["test_throttle"], target_depth=30, measure_interval=3.0
+        )
+        mock_get_queue_length.return_value = 30
+        throttle.measure(0.0)
+        self.assertEqual(throttle.rate, throttle.min_rate)
+
+        # Workers took all 30 items in 3 seconds.
+        mock_get_queue_length.return_value = 0
+        throttle.measure(3.0)
+        self.assertGreater(throttle.drain_rate, 0)
+        self.assertGreater(throttle.rate, throttle.drain_rate)
+
+        decision = get_redis_interface("CACHE").hgetall(
+            make_celery_throttle_key("test_throttle")
+        )
+        self.assertAlmostEqual(float(decision["rate"]), throttle.rate)
+        self.assertEqual(int(decision["target_depth"]), 30)
+
+    @override_settings(CELERY_THROTTLE_FEEDBACK=True)
+    def test_celery_throttle_opts_in_with_setting(
+        self, mock_time, mock_get_queue_length
+    ) -> None:
+        """CeleryThrottle delegates to a FeedbackThrottle when enabled."""
+        mock_time.monotonic.return_value = 100.0
+        mock_get_queue_length.return_value = 0
+        throttle = CeleryThrottle(min_items=10, queue_name="test_throttle")
+
+        self.assertEqual(throttle.feedback.target_depth, 15)
+        for _ in range(15):
+            throttle.maybe_wait()
+        mock_time.sleep.assert_not_called()
+
+
+class TestMicroserviceClients(SimpleTestCase):
+    """Test the pooled microservice clients against a fake microservice."""
+
+    def _reused_count(self) -> float:
+        return (
+            REGISTRY.get_sample_value(
+                "cl_microservice_requests_total",
+                {"service": "page-count", "connection": "reused"},
+            )
+            or 0
+        )
+
+    def test_connection_is_reused_across_calls(self) -> None:
+        """Sequential calls share one kept-alive connection."""
+        reused_before = self._reused_count()
+        with FakeMicroservice({"page-count": b"3"}) as fake:
+            for _ in range(5):
+                response = async_to_sync(microservice)(
+                    service="page-count",
+                    file=io.BytesIO(b"%PDF-1.4"),
+                    file_type="pdf",
+                )
+                self.assertEqual(response.text, "3")
+
+        self.assertEqual(fake.requests["page-count"], 5)
+        self.assertEqual(fake.connections, 1)
+        self.assertEqual(self._reused_count() - reused_before, 4)
+
+    def test_s3_uploads_have_a_content_length(self) -> None:
+        """Are files streamed from S3 sent with a Content-Length, so the
+        service doesn't read an empty body?"""
+        content = b"%PDF-1.4 streamed from S3"
+        storage = mock.Mock(spec=S3Storage)
+        storage._normalize_name.side_effect = lambda name: name
+        s3_object = storage.bucket.Object.return_value
+        s3_object.content_length = len(content)
+        s3_object.get.return_value = {
+            "Body": StreamingBody(io.BytesIO(content), len(content))
+        }
+        field_file = FieldFile(None, mock.Mock(storage=storage), "doc.pdf")
+
+        with FakeMicroservice({"page-count": b"1"}) as fake:
+            with open_upload_stream(field_file) as stream:
+                async_to_sync(microservice)(
+                    service="page-count", file=stream, file_type="pdf"
+                )
+
+        content_length = fake.content_lengths["page-count"][0]
+        self.assertIsNotNone(content_length)
+        self.assertEqual(int(content_length), fake.uploaded["page-count"][0])
+        self.assertGreater(int(content_length), len(content))
+
+    @override_settings(MICROSERVICE_MAX_CONNECTIONS=1)
+    async def test_concurrency_is_capped_per_service(self) -> None:
+        """Concurrent calls wait for the service's single slot."""
+        with FakeMicroservice(delay=0.05) as fake:
+            await asyncio.gather(
+                *(
+                    microservice(service="page-count", file=io.BytesIO(b"x"))
+                    for _ in range(3)
+                )
+            )
+        self.assertEqual(fake.requests["page-count"], 3)
+        self.assertEqual(fake.connections, 1)
+
+
 class TestLinkifyOrigDocketNumber(SimpleTestCase):
     def test_linkify_orig_docket_number(self):
         test_pairs = [
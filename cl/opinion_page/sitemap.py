@@ -2,16 +2,13 @@ from datetime import datetime, timedelta
 
 from django.contrib import sitemaps
 from django.db.models import (
-    CharField,
-    OuterRef,
     Q,
     QuerySet,
-    Subquery,
     Value,
 )
-from django.db.models.functions import Coalesce, Concat
+from django.db.models.functions import Coalesce
 
-from cl.favorites.models import GenericCount
+from cl.favorites.counters import annotate_docket_views
 from cl.search.models import (
     PRECEDENTIAL_STATUS,
     SEARCH_TYPES,
@@ -76,6 +73,7 @@ class BlockedOpinionSitemap(sitemaps.Sitemap):
 class DocketSitemap(InfinitePaginatorSitemap):
     changefreq = "weekly"
     limit = 50_000
+    watermark_field = "date_modified"
 
     @property
     def section(self) -> str:
@@ -89,24 +87,17 @@ class DocketSitemap(InfinitePaginatorSitemap):
         # Give items ten days to get some views.
         recent_date = datetime.today() - timedelta(days=30)
 
-        view_count_subquery = Subquery(
-            GenericCount.objects.filter(
-                label=Concat(
-                    Value("d."),
-                    OuterRef("pk"),
-                    Value(":view"),
-                    output_field=CharField(),
-                )
-            ).values("value")[:1]
-        )
-
         # Ordering should NOT be set here, define the ordering in the separate `ordering` property
+        # Views that weren't flushed yet are left out, so the sitemaps don't
+        # read every docket's unsaved views.
         return (
             Docket.objects.filter(
                 source__in=Docket.RECAP_SOURCES(),
                 blocked=False,
             )
-            .annotate(view_counter=Coalesce(view_count_subquery, Value(0)))
+            .annotate(
+                view_counter=Coalesce(annotate_docket_views("pk"), Value(0))
+            )
             .filter(Q(view_counter__gt=10) | Q(date_filed__gt=recent_date))
             .only("date_modified", "pk", "slug")
         )
@@ -1,5 +1,6 @@
 import asyncio
 import datetime
+import gzip
 import os
 import re
 import shutil
@@ -14,6 +15,7 @@ from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AnonymousUser, Group, Permission, User
+from django.core.files.storage import InMemoryStorage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
 from django.core.paginator import Paginator
@@ -58,6 +60,7 @@ from cl.opinion_page.forms import (
     TennWorkCompAppUploadForm,
     TennWorkCompClUploadForm,
 )
+from cl.opinion_page.sitemap import DocketSitemap
 from cl.opinion_page.utils import (
     build_docket_metadata,
     build_docket_tabs,
@@ -113,6 +116,11 @@ from cl.search.models import (
     OriginatingCourtInformation,
     RECAPDocument,
 )
+from cl.sitemaps_infinite.file_generator import (
+    generate_section_files,
+    make_pages_hash_name,
+    make_sitemap_file_path,
+)
 from cl.sitemaps_infinite.sitemap_generator import generate_urls_chunk
 from cl.tests.cases import ESIndexTestCase, SimpleTestCase, TestCase
 from cl.tests.providers import fake
@@ -1648,6 +1656,53 @@ class DocketSitemapTest(SitemapTest):
         generate_urls_chunk()
         super().assert_sitemap_has_content()
 
+    def test_sitemap_files_only_rewrite_changed_pages(self) -> None:
+        """Are sitemap files written to storage, and only written again when
+        their rows change?
+        """
+        storage = InMemoryStorage()
+        r = get_redis_interface("CACHE")
+        self.addCleanup(r.delete, make_pages_hash_name(SEARCH_TYPES.RECAP))
+        with (
+            mock.patch(
+                "cl.sitemaps_infinite.file_generator.get_sitemap_storage",
+                return_value=storage,
+            ),
+            mock.patch.object(DocketSitemap, "limit", 1),
+            self.settings(SITEMAPS_FILES_ENABLED=True),
+        ):
+            num_files = generate_section_files(
+                SEARCH_TYPES.RECAP, DocketSitemap
+            )
+            self.assertEqual(num_files, 2)
+            path = make_sitemap_file_path(SEARCH_TYPES.RECAP, 1)
+            with storage.open(path) as f:
+                content = gzip.decompress(f.read()).decode()
+            self.assertEqual(content.count("<url>"), 1)
+
+            num_files = generate_section_files(
+                SEARCH_TYPES.RECAP, DocketSitemap
+            )
+            self.assertEqual(num_files, 0, msg="Unchanged pages were written.")
+
+            Docket.objects.filter(source=Docket.RECAP, blocked=False).order_by(
+                "pk"
+            ).first().save()
+            num_files = generate_section_files(
+                SEARCH_TYPES.RECAP, DocketSitemap
+            )
+            self.assertEqual(num_files, 1)
+
+            response = self.client.get(
+                reverse(
+                    "sitemaps-pregenerated-file",
+                    kwargs={"section": SEARCH_TYPES.RECAP, "page": 2},
+                )
+            )
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            response = self.client.get("/large-sitemap.xml")
+            self.assertEqual(response.content.decode().count("<sitemap>"), 2)
+
 
 class DocketEmptySitemapTest(SitemapTest):
     @classmethod
@@ -0,0 +1,268 @@
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from nameparser import HumanName
+
+from cl.people_db.models import SUFFIX_LOOKUP, Person, Position
+
+
+@dataclass(slots=True)
+class IndexedName:
+    """A person's name, upper-cased like Postgres does for iexact lookups."""
+
+    first: str
+    middle: str
+    last: str
+    suffix: str
+
+    @classmethod
+    def from_row(cls, row: dict) -> "IndexedName":
+        return cls(
+            first=row["name_first"].upper(),
+            middle=row["name_middle"].upper(),
+            last=row["name_last"].upper(),
+            suffix=row["name_suffix"].upper(),
+        )
+
+
+@dataclass(slots=True)
+class IndexedTenure:
+    court_id: str
+    date_start: date | None
+    date_termination: date | None
+
+
+@dataclass(slots=True)
+class IndexedJudge:
+    pk: int
+    name: IndexedName
+    date_dob: date | None
+    date_dod: date | None
+    aliases: list[IndexedName] = field(default_factory=list)
+    tenures: list[IndexedTenure] = field(default_factory=list)
+
+
+NamePredicate = Callable[[IndexedName], bool]
+TenurePredicate = Callable[[IndexedTenure], bool]
+JudgePredicate = Callable[[IndexedJudge], bool]
+
+
+@dataclass
+class LookupFilters:
+    """The filters lookup_judge_by_full_name has applied so far."""
+
+    names: list[NamePredicate] = field(default_factory=list)
+    tenures: list[TenurePredicate] = field(default_factory=list)
+    judges: list[JudgePredicate] = field(default_factory=list)
+
+    def count_rows(self, judge: IndexedJudge) -> int:
+        """Count the rows the ORM query would return for a judge.
+
+        The query joins aliases and positions once, so a judge is counted
+        once for each alias and each position that match the filters. Judges
+        without aliases count as having a single empty one.
+
+        :param judge: The judge to match.
+        :return: The number of matching rows.
+        """
+        if not all(p(judge) for p in self.judges):
+            return 0
+        aliases = judge.aliases or [None]
+        alias_rows = sum(
+            1
+            for alias in aliases
+            if all(
+                p(judge.name) or (alias is not None and p(alias))
+                for p in self.names
+            )
+        )
+        if not alias_rows:
+            return 0
+        tenure_rows = sum(
+            1
+            for tenure in judge.tenures
+            if all(p(tenure) for p in self.tenures)
+        )
+        return alias_rows * tenure_rows
+
+
+class JudgeIndex:
+    """All judges with a court position, keyed by their upper-cased last names
+    and the last names of their aliases.
+
+    It answers lookup_judge_by_full_name in memory, with the same narrowing
+    filters and the same results as its queries.
+    """
+
+    def __init__(self, judges: list[IndexedJudge]) -> None:
+        self.by_last_name: dict[str, list[IndexedJudge]] = {}
+        for judge in judges:
+            last_names = {judge.name.last} | {a.last for a in judge.aliases}
+            for last_name in last_names:
+                self.by_last_name.setdefault(last_name, []).append(judge)
+
+    @classmethod
+    def build(cls) -> "JudgeIndex":
+        """Load the judges from the database.
+
+        :return: A new index.
+        """
+        tenures: dict[int, list[IndexedTenure]] = {}
+        positions = Position.objects.filter(
+            person__isnull=False, court__isnull=False
+        ).values_list(
+            "person_id", "court_id", "date_start", "date_termination"
+        )
+        for person_id, court_id, date_start, date_termination in positions:
+            tenures.setdefault(person_id, []).append(
+                IndexedTenure(court_id, date_start, date_termination)
+            )
+
+        name_fields = ("name_first", "name_middle", "name_last", "name_suffix")
+        aliases: dict[int, list[IndexedName]] = {}
+        alias_rows = Person.objects.filter(
+            is_alias_of_id__in=tenures.keys()
+        ).values("is_alias_of_id", *name_fields)
+        for row in alias_rows:
+            aliases.setdefault(row["is_alias_of_id"], []).append(
+                IndexedName.from_row(row)
+            )
+
+        people = Person.objects.filter(pk__in=tenures.keys()).values(
+            "pk", "date_dob", "date_dod", *name_fields
+        )
+        return cls(
+            [
+                IndexedJudge(
+                    pk=row["pk"],
+                    name=IndexedName.from_row(row),
+                    date_dob=row["date_dob"],
+                    date_dod=row["date_dod"],
+                    aliases=aliases.get(row["pk"], []),
+                    tenures=tenures[row["pk"]],
+                )
+                for row in people.iterator()
+            ]
+        )
+
+    def lookup(
+        self,
+        name: HumanName,
+        court_id: str,
+        event_date: date | None = None,
+        require_living_judge: bool = True,
+    ) -> int | None:
+        """Identify a judge like lookup_judge_by_full_name does.
+
+        :param name: The judge's full name.
+        :param court_id: The court where the judge did something
+        :param event_date: The date when the judge did something
+        :param require_living_judge: Whether to ensure that the judge was
+        alive on the event date, with a year of slop.
+        :return: The pk of the judge that matched, or None.
+        """
+        last = name.last.upper()
+        candidates = self.by_last_name.get(last, [])
+        filter_sets: list[LookupFilters] = []
+
+        first_filter = LookupFilters(
+            names=[lambda n: n.last == last],
+            tenures=[lambda t: t.court_id == court_id],
+        )
+        if require_living_judge and event_date:
+            died_after = event_date - timedelta(days=365)
+            born_before = event_date + timedelta(days=365)
+            first_filter.judges.append(
+                lambda j: (j.date_dod is None or j.date_dod >= died_after)
+                and (j.date_dob is None or j.date_dob <= born_before)
+            )
+        filter_sets.append(first_filter)
+
+        if event_date is not None:
+            started_before = event_date + relativedelta(years=1)
+            ended_after = event_date - relativedelta(years=1)
+            filter_sets.append(
+                LookupFilters(
+                    tenures=[
+                        lambda t: (
+                            t.date_start is None
+                            or t.date_start < started_before
+                        )
+                        and (
+                            t.date_termination is None
+                            or t.date_termination > ended_after
+                        )
+                    ]
+                )
+            )
+
+        if name.first:
+            first = name.first.upper()
+            filter_sets.append(
+                LookupFilters(names=[lambda n: n.first == first])
+            )
+
+        if name.middle:
+            stripped_middle = name.middle.strip(".,").upper()
+            if len(stripped_middle) == 1:
+                filter_sets.append(
+                    LookupFilters(
+                        names=[lambda n: n.middle.startswith(stripped_middle)]
+                    )
+                )
+            else:
+                middle = name.middle.upper()
+                filter_sets.append(
+                    LookupFilters(names=[lambda n: n.middle == middle])
+                )
+
+        if name.suffix:
+            suffix = SUFFIX_LOOKUP.get(name.suffix.lower())
+            if suffix:
+                suffix = suffix.upper()
+                filter_sets.append(
+                    LookupFilters(names=[lambda n: n.suffix == suffix])
+                )
+
+        applied = LookupFilters()
+        for filter_set in filter_sets:
+            applied.names.extend(filter_set.names)
+            applied.tenures.extend(filter_set.tenures)
+            applied.judges.extend(filter_set.judges)
+            counts = [(j, applied.count_rows(j)) for j in candidates]
+            count = sum(c for _, c in counts)
+            if count == 0:
+                return None
+            elif count == 1:
+                return next(j.pk for j, c in counts if c)
+            candidates = [j for j, c in counts if c]
+        return None
+
+
+_judge_index: JudgeIndex | None = None
+_judge_index_built_at = 0.0
+
+
+async def get_judge_index() -> JudgeIndex:
+    """Get the judge index of this process, rebuilding it once it's older
+    than JUDGE_INDEX_TTL seconds.
+
+    :return: The judge index.
+    """
+    global _judge_index, _judge_index_built_at
+    age = time.monotonic() - _judge_index_built_at
+    if _judge_index is None or age > settings.JUDGE_INDEX_TTL:
+        _judge_index = await sync_to_async(JudgeIndex.build)()
+        _judge_index_built_at = time.monotonic()
+    return _judge_index
+
+
+def clear_judge_index() -> None:
+    """Drop the judge index of this process, e.g. after judges are edited."""
+    global _judge_index
+    _judge_index = None
@@ -3,12 +3,14 @@ import re
 from datetime import date, timedelta
 
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.db.models import Q
 from django.utils.html import strip_tags
 from nameparser import HumanName
 from unidecode import unidecode
 
 from cl.lib.utils import wrap_text
+from cl.people_db.judge_index import get_judge_index
 from cl.people_db.models import SUFFIX_LOOKUP, Person
 
 # list of words that aren't judge names
@@ -448,6 +450,15 @@ async def lookup_judge_by_full_name(
     if isinstance(name, str):
         name = HumanName(name)
 
+    if settings.JUDGE_INDEX_ENABLED:
+        judge_index = await get_judge_index()
+        pk = judge_index.lookup(
+            name, court_id, event_date, require_living_judge
+        )
+        if pk is None:
+            return None
+        return await Person.objects.filter(pk=pk).afirst()
+
     filter_sets = []
 
     # check based on last name, court, and functioning flesh and blood first
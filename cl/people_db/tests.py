@@ -1,7 +1,17 @@
+from datetime import date
+
+from django.test import override_settings
 from django.urls import reverse
 
-from cl.people_db.factories import PersonFactory, PersonWithChildrenFactory
+from cl.people_db.factories import (
+    PersonFactory,
+    PersonWithChildrenFactory,
+    PositionFactory,
+)
+from cl.people_db.judge_index import clear_judge_index
+from cl.people_db.lookup_utils import lookup_judge_by_full_name
 from cl.people_db.models import Person, Position
+from cl.search.factories import CourtFactory
 from cl.tests.cases import TestCase, TransactionTestCase
 
 
@@ -57,3 +67,77 @@ class PersonPageSearchButtons(TestCase):
         )
         content = response.content.decode()
         self.assertEqual(content.count('rel="nofollow"'), 3)
+
+
+class JudgeIndexTest(TestCase):
+    """Does the judge index find the same judges as the database lookup?"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.court = CourtFactory()
+        cls.john = PersonFactory(
+            name_first="John",
+            name_middle="Quincy",
+            name_last="Smith",
+            name_suffix="",
+            date_dob=date(1950, 1, 1),
+        )
+        PersonFactory(
+            name_first="Johnny",
+            name_last="Smyth",
+            name_suffix="",
+            is_alias_of=cls.john,
+        )
+        PositionFactory(
+            person=cls.john,
+            court=cls.court,
+            date_start=date(2000, 1, 1),
+            date_termination=date(2010, 1, 1),
+        )
+        PositionFactory(
+            person=cls.john, court=cls.court, date_start=date(2012, 1, 1)
+        )
+        cls.jane = PersonFactory(
+            name_first="Jane", name_last="Smith", name_suffix=""
+        )
+        PositionFactory(
+            person=cls.jane, court=cls.court, date_start=date(2015, 1, 1)
+        )
+        cls.bob = PersonFactory(
+            name_first="Bob",
+            name_last="Smith",
+            name_suffix="",
+            date_dod=date(1990, 1, 1),
+        )
+        PositionFactory(
+            person=cls.bob,
+            court=cls.court,
+            date_start=date(1970, 1, 1),
+            date_termination=date(1989, 1, 1),
+        )
+
+    def setUp(self) -> None:
+        clear_judge_index()
+        self.addCleanup(clear_judge_index)
+
+    async def test_lookup_judge_with_index(self) -> None:
+        """Do lookups with the index return the same judges?"""
+        lookups = [
+            ("John Q. Smith", date(2005, 1, 1), self.john),
+            ("Jane Smith", date(2020, 1, 1), self.jane),
+            ("Johnny Smyth", date(2005, 1, 1), self.john),
+            ("Bob Smith", date(1985, 1, 1), self.bob),
+            ("John Smith", None, None),
+            ("Nobody Jones", date(2005, 1, 1), None),
+        ]
+        for name, event_date, judge in lookups:
+            with self.subTest(name=name, event_date=event_date):
+                expected = await lookup_judge_by_full_name(
+                    name, self.court.pk, event_date
+                )
+                with override_settings(JUDGE_INDEX_ENABLED=True):
+                    actual = await lookup_judge_by_full_name(
+                        name, self.court.pk, event_date
+                    )
+                self.assertEqual(expected, judge)
+                self.assertEqual(actual, expected)
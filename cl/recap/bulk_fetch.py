@@ -0,0 +1,513 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from typing import Any
+
+from juriscraper.lib.exceptions import PacerLoginException
+from requests import HTTPError, RequestException
+
+from cl.corpus_importer.tasks import (
+    download_acms_pdf_by_rd,
+    download_pacer_pdf,
+    update_rd_metadata,
+)
+from cl.corpus_importer.utils import is_appellate_court
+from cl.lib.pacer import is_pacer_court_accessible
+from cl.lib.pacer_session import (
+    ProxyPacerSession,
+    SessionData,
+    get_or_cache_pacer_cookies,
+)
+from cl.recap.models import PROCESSING_STATUS, REQUEST_TYPE, PacerFetchQueue
+from cl.recap.tasks import mark_fq_status, replicate_fq_pdf_to_subdocket_rds
+from cl.recap.utils import find_subdocket_pdf_rds_from_data
+from cl.scrapers.tasks import extract_pdf_document
+from cl.search.models import RECAPDocument
+from cl.stats.metrics import record_pacer_fetch
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrency:
+    """An AIMD concurrency limit for the fetches to one court.
+
+    Every healthy fetch raises the limit by 1/limit, so it grows by about one
+    slot per round of fetches. A failed fetch, or one slower than the target
+    latency, cuts the limit by a factor, so a struggling court is backed off
+    quickly and probed again slowly.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        target_latency: float,
+        minimum: int = 1,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        :param maximum: The highest number of fetches allowed in flight.
+        :param target_latency: Seconds above which a fetch counts as slow.
+        :param minimum: The lowest number of fetches allowed in flight.
+        :param decrease_factor: The factor to cut the limit by on trouble.
+        """
+        self.maximum = maximum
+        self.minimum = minimum
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.limit = float(minimum)
+
+    @property
+    def slots(self) -> int:
+        """The number of fetches currently allowed in flight."""
+        return int(self.limit)
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Adjust the limit after a fetch.
+
+        :param latency: How long the fetch took, in seconds.
+        :param ok: Whether PACER answered without an error.
+        :return: None
+        """
+        if not ok or latency > self.target_latency:
+            self.limit = max(
+                float(self.minimum), self.limit * self.decrease_factor
+            )
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+
+
+@dataclass
+class CourtFetchStats:
+    """Running totals of the fetches to one court."""
+
+    fetched: int = 0
+    failed: int = 0
+    bytes: int = 0
+    download_seconds: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def docs_per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.fetched / elapsed * 60 if elapsed else 0.0
+
+    @property
+    def average_latency(self) -> float:
+        attempts = self.fetched + self.failed
+        return self.download_seconds / attempts if attempts else 0.0
+
+
+class PacerSessionPool:
+    """Reusable PACER sessions for one account, kept per court.
+
+    Every session shares the account's cached cookies, so fetches don't log
+    in, and keeps its connections to the court open between documents.
+    """
+
+    def __init__(self, user_pk: int, username: str, password: str):
+        self.user_pk = user_pk
+        self.username = username
+        self.password = password
+        self.session_data = get_or_cache_pacer_cookies(
+            user_pk, username=username, password=password
+        )
+        self._idle: dict[str, list[ProxyPacerSession]] = defaultdict(list)
+        # Sessions created with the current cookies.
+        self._current: set[ProxyPacerSession] = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, court_id: str) -> tuple[ProxyPacerSession, SessionData]:
+        """Take an idle session for a court, or create one.
+
+        :param court_id: The court about to be queried.
+        :return: A logged-in session and the cookies it uses.
+        """
+        with self._lock:
+            if self._idle[court_id]:
+                return self._idle[court_id].pop(), self.session_data
+            session = ProxyPacerSession(
+                cookies=self.session_data.cookies,
+                proxy=self.session_data.proxy_address,
+            )
+            self._current.add(session)
+            return session, self.session_data
+
+    def release(self, court_id: str, session: ProxyPacerSession) -> None:
+        """Give a session back once its fetch is done.
+
+        :param court_id: The court the session was used for.
+        :param session: The session.
+        :return: None
+        """
+        with self._lock:
+            if session in self._current:
+                self._idle[court_id].append(session)
+                return
+        # The session predates a refresh, so drop it.
+        session.close()
+
+    def refresh(self, rejected: SessionData) -> None:
+        """Log in again after PACER rejected the cookies, unless the pool
+        already did since, so fetches that failed together log in once.
+
+        :param rejected: The cookies PACER rejected.
+        :return: None
+        """
+        with self._lock:
+            if self.session_data is not rejected:
+                return
+        session_data = get_or_cache_pacer_cookies(
+            self.user_pk,
+            username=self.username,
+            password=self.password,
+            refresh=True,
+        )
+        with self._lock:
+            self.session_data = session_data
+            idle = [s for sessions in self._idle.values() for s in sessions]
+            self._idle.clear()
+            self._current.clear()
+        for session in idle:
+            session.close()
+
+
+@dataclass
+class FetchJob:
+    """A document being fetched, with what the download needs from the DB."""
+
+    court_id: str
+    doc: dict[str, Any]
+    fq: PacerFetchQueue
+    rd: RECAPDocument
+    attempts: int = 1
+    # The cookies of the last download, set by the download thread.
+    session_data: SessionData | None = None
+
+
+# A document still to fetch, or a job to retry.
+PendingFetch = dict[str, Any] | FetchJob
+
+
+@dataclass
+class DownloadResult:
+    pdf_bytes: bytes | None
+    r_msg: str
+    latency: float
+
+
+class BulkFetchEngine:
+    """Fetch PACER documents from many courts at once, adapting per court.
+
+    Each court gets an AdaptiveConcurrency limit driven by PACER's actual
+    response times and errors. Downloads run in a thread pool with pooled
+    sessions. Everything that touches the database runs in the calling
+    thread. Each fetched document goes straight on to subdocket replication
+    and text extraction, so no separate processing pass is needed.
+    """
+
+    # PacerLoginException retries per document, after logging in again.
+    max_attempts = 2
+
+    def __init__(
+        self,
+        sessions: PacerSessionPool,
+        queue_name: str,
+        max_per_court: int = 4,
+        target_latency: float = 15.0,
+        max_workers: int = 16,
+        report_interval: float = 60.0,
+        on_fetch_queued: Callable[[int, int], None] | None = None,
+        on_fetch_failed: Callable[[int, int], None] | None = None,
+    ):
+        """
+        :param sessions: The session pool of the purchasing account.
+        :param queue_name: The Celery queue for the follow-up tasks.
+        :param max_per_court: The most fetches in flight for any one court.
+        :param target_latency: Seconds above which a fetch counts as slow.
+        :param max_workers: The most fetches in flight overall.
+        :param report_interval: Seconds between throughput reports.
+        :param on_fetch_queued: Called with (rd_pk, fq_pk) for each fetch.
+        :param on_fetch_failed: Called with (rd_pk, fq_pk) for failed fetches.
+        """
+        self.sessions = sessions
+        self.queue_name = queue_name
+        self.max_workers = max_workers
+        self.report_interval = report_interval
+        self.on_fetch_queued = on_fetch_queued
+        self.on_fetch_failed = on_fetch_failed
+        self.limits: defaultdict[str, AdaptiveConcurrency] = defaultdict(
+            lambda: AdaptiveConcurrency(max_per_court, target_latency)
+        )
+        self.stats: defaultdict[str, CourtFetchStats] = defaultdict(
+            CourtFetchStats
+        )
+        self.running: defaultdict[str, int] = defaultdict(int)
+        self._last_report = time.monotonic()
+
+    def start_job(self, court_id: str, item: PendingFetch) -> FetchJob | None:
+        """Create the fetch queue of a document and load what it needs.
+
+        Like fetch_pacer_doc_by_rd, documents that are already available or
+        lack a pacer_doc_id are settled without downloading anything.
+
+        :param court_id: The court of the document.
+        :param item: The document, as selected by pacer_bulk_fetch, or a job
+        to retry.
+        :return: The job to hand to the download threads, or None if there's
+        nothing to download.
+        """
+        if isinstance(item, FetchJob):
+            item.attempts += 1
+            mark_fq_status(item.fq, "", PROCESSING_STATUS.IN_PROGRESS)
+            return item
+
+        doc = item
+        fq = PacerFetchQueue.objects.create(
+            request_type=REQUEST_TYPE.PDF,
+            recap_document_id=doc["id"],
+            user_id=self.sessions.user_pk,
+        )
+        if self.on_fetch_queued:
+            self.on_fetch_queued(doc["id"], fq.pk)
+        try:
+            rd = RECAPDocument.objects.select_related(
+                "docket_entry__docket"
+            ).get(pk=doc["id"])
+        except RECAPDocument.DoesNotExist:
+            mark_fq_status(
+                fq, "RECAPDocument no longer exists.", PROCESSING_STATUS.FAILED
+            )
+            return None
+        mark_fq_status(fq, "", PROCESSING_STATUS.IN_PROGRESS)
+        if rd.is_available:
+            msg = "PDF already marked as 'is_available'. Doing nothing."
+            mark_fq_status(fq, msg, PROCESSING_STATUS.SUCCESSFUL)
+            return None
+        if not rd.pacer_doc_id:
+            msg = (
+                "Missing 'pacer_doc_id' attribute. Without this attribute we "
+                "cannot identify the document properly. Aborting request."
+            )
+            mark_fq_status(fq, msg, PROCESSING_STATUS.INVALID_CONTENT)
+            return None
+        return FetchJob(court_id, doc, fq, rd)
+
+    def download(self, job: FetchJob) -> DownloadResult:
+        """Download a document's PDF. Runs in a worker thread.
+
+        :param job: The fetch job.
+        :return: The PDF, if any, the download message and the latency.
+        """
+        rd = job.rd
+        session, job.session_data = self.sessions.acquire(job.court_id)
+        start = time.monotonic()
+        try:
+            if rd.is_acms_document():
+                r, r_msg = download_acms_pdf_by_rd(
+                    job.court_id,
+                    rd.pacer_doc_id,
+                    rd.acms_document_guid,
+                    session=session,
+                )
+            else:
+                r, r_msg = download_pacer_pdf(
+                    session,
+                    job.court_id,
+                    rd.docket_entry.docket.pacer_case_id,
+                    rd.pacer_doc_id,
+                    rd.attachment_number,
+                    de_seq_num=rd.docket_entry.pacer_sequence_number,
+                )
+        finally:
+            self.sessions.release(job.court_id, session)
+        return DownloadResult(
+            r.content if r else None, r_msg, time.monotonic() - start
+        )
+
+    def fail_job(self, job: FetchJob, msg: str, latency: float) -> None:
+        mark_fq_status(job.fq, msg, PROCESSING_STATUS.FAILED)
+        self.stats[job.court_id].failed += 1
+        self.stats[job.court_id].download_seconds += latency
+        record_pacer_fetch(job.court_id, latency, ok=False)
+        if self.on_fetch_failed:
+            self.on_fetch_failed(job.rd.pk, job.fq.pk)
+
+    def finish_job(
+        self, job: FetchJob, future: Future, pending: deque[PendingFetch]
+    ) -> None:
+        """Save a downloaded PDF and queue its follow-up work.
+
+        :param job: The fetch job.
+        :param future: The future of the job's download.
+        :param pending: The court's fetches still to run, to put the job back
+        on if it should be retried.
+        :return: None
+        """
+        limit = self.limits[job.court_id]
+        try:
+            result = future.result()
+        except PacerLoginException:
+            limit.record(0.0, ok=False)
+            if job.session_data is not None:
+                self.sessions.refresh(job.session_data)
+            if job.attempts < self.max_attempts:
+                mark_fq_status(
+                    job.fq,
+                    "PacerLoginException while getting document. Retrying.",
+                    PROCESSING_STATUS.QUEUED_FOR_RETRY,
+                )
+                pending.appendleft(job)
+                return
+            self.fail_job(
+                job, "PacerLoginException while getting document.", 0.0
+            )
+            return
+        except (RequestException, HTTPError):
+            limit.record(0.0, ok=False)
+            self.fail_job(job, "Failed to get PDF from network.", 0.0)
+            return
+        except Exception as e:
+            logger.exception(
+                "Unexpected error getting RECAPDocument %s.", job.rd.pk
+            )
+            limit.record(0.0, ok=False)
+            self.fail_job(job, f"Unexpected error getting PDF: {e}", 0.0)
+            return
+
+        latency = result.latency
+        limit.record(latency, ok=True)
+        rd = job.rd
+        pacer_case_id = rd.docket_entry.docket.pacer_case_id
+        success, msg = update_rd_metadata(
+            None,
+            rd.pk,
+            result.pdf_bytes,
+            result.r_msg,
+            job.court_id,
+            pacer_case_id,
+            rd.pacer_doc_id,
+            rd.document_number,
+            rd.attachment_number,
+            omit_page_count=True,
+        )
+        if not success:
+            self.fail_job(job, msg, latency)
+            return
+
+        mark_fq_status(
+            job.fq,
+            "Successfully completed fetch and save.",
+            PROCESSING_STATUS.SUCCESSFUL,
+        )
+        stats = self.stats[job.court_id]
+        stats.fetched += 1
+        stats.bytes += len(result.pdf_bytes or b"")
+        stats.download_seconds += latency
+        record_pacer_fetch(job.court_id, latency, ok=True)
+
+        if not is_appellate_court(job.court_id):
+            pq_ids = find_subdocket_pdf_rds_from_data(
+                job.fq.user_id,
+                job.court_id,
+                rd.pacer_doc_id,
+                [pacer_case_id],
+                result.pdf_bytes,
+            )
+            if pq_ids:
+                replicate_fq_pdf_to_subdocket_rds.si(pq_ids).apply_async(
+                    queue=self.queue_name
+                )
+        extract_pdf_document.si(rd.pk).apply_async(queue=self.queue_name)
+
+    def report(self, force: bool = False) -> None:
+        """Log the throughput of every court, at most once per interval.
+
+        :param force: Whether to log even if the interval hasn't elapsed.
+        :return: None
+        """
+        now = time.monotonic()
+        if not force and now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+        for court_id, stats in sorted(self.stats.items()):
+            logger.info(
+                "%s: %s fetched, %s failed, %.1f docs/min, %.1fs average "
+                "latency, concurrency %.2f",
+                court_id,
+                stats.fetched,
+                stats.failed,
+                stats.docs_per_minute,
+                stats.average_latency,
+                self.limits[court_id].limit,
+            )
+
+    def run(
+        self, docs_by_court: dict[str, list[dict[str, Any]]]
+    ) -> dict[str, CourtFetchStats]:
+        """Fetch every document, keeping each court within its limit.
+
+        :param docs_by_court: The documents to fetch, grouped by court ID.
+        :return: The fetch stats per court.
+        """
+        pending: dict[str, deque[PendingFetch]] = {}
+        for court_id, docs in docs_by_court.items():
+            if not docs:
+                continue
+            if not is_pacer_court_accessible(court_id):
+                logger.warning(
+                    "Court %s is blocked, skipping %s documents.",
+                    court_id,
+                    len(docs),
+                )
+                continue
+            pending[court_id] = deque(docs)
+
+        in_flight: dict[Future, FetchJob] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or in_flight:
+                for court_id, court_pending in pending.items():
+                    while (
+                        court_pending
+                        and self.running[court_id]
+                        < self.limits[court_id].slots
+                        and len(in_flight) < self.max_workers
+                    ):
+                        job = self.start_job(court_id, court_pending.popleft())
+                        if job is None:
+                            continue
+                        in_flight[executor.submit(self.download, job)] = job
+                        self.running[court_id] += 1
+
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    self.running[job.court_id] -= 1
+                    try:
+                        self.finish_job(
+                            job,
+                            future,
+                            pending.setdefault(job.court_id, deque()),
+                        )
+                    except Exception as e:
+                        # Don't let one document stop the other fetches.
+                        logger.exception(
+                            "Unable to save RECAPDocument %s.", job.rd.pk
+                        )
+                        self.fail_job(
+                            job, f"Unexpected error saving PDF: {e}", 0.0
+                        )
+                pending = {c: p for c, p in pending.items() if p}
+                self.report()
+        self.report(force=True)
+        return dict(self.stats)
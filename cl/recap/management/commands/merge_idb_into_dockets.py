@@ -59,6 +59,13 @@ class Command(VerboseCommand, CommandUtils):
             required=True,
             help="What task are we doing at this point?",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=25,
+            help="The number of IDB rows merged by each task. The offset and "
+            "limit parameters count chunks of this size.",
+        )
         parser.add_argument(
             "--court-id",
             type=str,
@@ -90,7 +97,7 @@ class Command(VerboseCommand, CommandUtils):
         logger.info("%s items will be merged or created.", idb_rows.count())
         q = options["queue"]
         throttle = CeleryThrottle(queue_name=q)
-        chunk_size = 25
+        chunk_size = options["chunk_size"]
         for i, idb_chunk in enumerate(chunks(idb_rows.iterator(), chunk_size)):
             # Iterate over all items in the IDB and find them in the Docket
             # table. If they're not there, create a new item.
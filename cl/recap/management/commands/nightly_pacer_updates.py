@@ -13,6 +13,7 @@ from simplejson import JSONDecodeError
 from cl.alerts.models import DocketAlert
 from cl.favorites.models import PrayerAvailability
 from cl.favorites.tasks import check_prayer_pacer
+from cl.favorites.utils import refresh_prayer_rank
 from cl.lib.celery_utils import CeleryThrottle
 from cl.lib.command_utils import VerboseCommand, logger
 from cl.scrapers.tasks import update_docket_info_iquery
@@ -279,6 +280,7 @@ class Command(VerboseCommand):
                 PrayerAvailability.objects.update_or_create(
                     recap_document=rd, defaults={"last_checked": now}
                 )
+                refresh_prayer_rank(rd.pk)
 
                 continue
 
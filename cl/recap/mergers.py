@@ -3,8 +3,9 @@ import json
 import logging
 import re
 from collections import defaultdict
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterable
 from copy import deepcopy
+from dataclasses import dataclass
 from datetime import date, timedelta
 from typing import Any
 
@@ -12,7 +13,8 @@ from asgiref.sync import async_to_sync, sync_to_async
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.db import IntegrityError, OperationalError, transaction
-from django.db.models import Count, Prefetch, Q, QuerySet
+from django.db.models import Count, F, Prefetch, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
 from django.utils.timezone import now
 from juriscraper.lib.string_utils import CaseNameTweaker
 from juriscraper.pacer import AppellateAttachmentPage, AttachmentPage
@@ -48,7 +50,7 @@ from cl.lib.pacer import (
 )
 from cl.lib.privacy_tools import anonymize
 from cl.lib.timezone_helpers import localize_date_and_time
-from cl.lib.utils import previous_and_next, remove_duplicate_dicts
+from cl.lib.utils import chunks, previous_and_next, remove_duplicate_dicts
 from cl.people_db.lookup_utils import lookup_judge_by_full_name_and_set_attr
 from cl.people_db.models import (
     Attorney,
@@ -104,32 +106,27 @@ def confirm_docket_number_core_lookup_match(
     return docket
 
 
-async def find_docket_object_query(
-    court_id: str,
+def get_docket_lookup_tiers(
     pacer_case_id: str | None,
     docket_number: str,
     docket_number_core: str | None,
-    federal_defendant_number: str | None,
-    federal_dn_judge_initials_assigned: str | None,
-    federal_dn_judge_initials_referred: str | None,
-    using: str = "default",
     skip_dn_core_confirmation: bool = False,
-    cheap_count: bool = True,
-) -> QuerySet[Docket]:
-    """Construct a queryset to be used by `find_docket_object` and other methods which need to use the same docket-finding
-    process. Parameters have the same meaning as `find_docket_object` except `skip_dn_core_confirmation`, which tells
-    the function to just return the first result with one match without doing any further verification (`True` for state
-    and SCOTUS, `False` otherwise).
-
-    The `cheap_count` parameter determines whether we use `COUNT pk WHERE ... LIMIT 2` or the length of the results from
-    `SELECT * WHERE ... LIMIT 2`. The second format can allow us to save a query in subsequent methods which may need
-    the count or elements of the results.
-
-    Will only ever return querysets with zero or one results."""
+) -> list[tuple[bool, dict[str, str | None]]]:
+    """Get the lookups used to find a docket, from the most to the least
+    specific.
 
+    :param pacer_case_id: The PACER case ID for the docket
+    :param docket_number: The docket number to lookup.
+    :param docket_number_core: The docket_number_core to lookup.
+    :param skip_dn_core_confirmation: Whether to skip confirming lookups by
+    docket_number_core with the cleaned docket number.
+    :return: A list of (confirm, fields) tuples, where fields are the exact
+    Docket field values to look up and confirm tells whether the match must be
+    confirmed.
+    """
     # Attempt several lookups of decreasing specificity. Note that
     # pacer_case_id is required for Docket and Docket History uploads.
-    lookups: list[tuple[bool, Q]] = []
+    lookups: list[tuple[bool, dict[str, str | None]]] = []
     dncc = not skip_dn_core_confirmation and bool(docket_number_core)
     if pacer_case_id:
         # Appellate RSS feeds don't contain a pacer_case_id, avoid lookups by
@@ -139,10 +136,10 @@ async def find_docket_object_query(
             lookups = [
                 (
                     False,
-                    Q(
-                        pacer_case_id=pacer_case_id,
-                        docket_number_core=docket_number_core,
-                    ),
+                    {
+                        "pacer_case_id": pacer_case_id,
+                        "docket_number_core": docket_number_core,
+                    },
                 ),
                 # Appellate docket uploads usually include a pacer_case_id.
                 # Therefore, include the following lookup to attempt matching
@@ -150,13 +147,13 @@ async def find_docket_object_query(
                 # to avoid creating duplicated dockets.
                 (
                     dncc,
-                    Q(
-                        pacer_case_id=None,
-                        docket_number_core=docket_number_core,
-                    ),
+                    {
+                        "pacer_case_id": None,
+                        "docket_number_core": docket_number_core,
+                    },
                 ),
             ]
-        lookups.append((False, Q(pacer_case_id=pacer_case_id)))
+        lookups.append((False, {"pacer_case_id": pacer_case_id}))
     elif docket_number_core:
         # Sometimes we don't know how to make core docket numbers. If that's
         # the case, we will have a blank value for the field. We must not do
@@ -164,14 +161,14 @@ async def find_docket_object_query(
         lookups = [
             (
                 dncc,
-                Q(
-                    pacer_case_id=None,
-                    docket_number_core=docket_number_core,
-                ),
+                {
+                    "pacer_case_id": None,
+                    "docket_number_core": docket_number_core,
+                },
             ),
             (
                 dncc,
-                Q(docket_number_core=docket_number_core),
+                {"docket_number_core": docket_number_core},
             ),
         ]
     elif docket_number:
@@ -181,12 +178,47 @@ async def find_docket_object_query(
         lookups = [
             (
                 dncc,
-                Q(
-                    pacer_case_id=None,
-                    docket_number_raw=docket_number,
-                ),
+                {
+                    "pacer_case_id": None,
+                    "docket_number_raw": docket_number,
+                },
             ),
         ]
+    return lookups
+
+
+async def find_docket_object_query(
+    court_id: str,
+    pacer_case_id: str | None,
+    docket_number: str,
+    docket_number_core: str | None,
+    federal_defendant_number: str | None,
+    federal_dn_judge_initials_assigned: str | None,
+    federal_dn_judge_initials_referred: str | None,
+    using: str = "default",
+    skip_dn_core_confirmation: bool = False,
+    cheap_count: bool = True,
+) -> QuerySet[Docket]:
+    """Construct a queryset to be used by `find_docket_object` and other methods which need to use the same docket-finding
+    process. Parameters have the same meaning as `find_docket_object` except `skip_dn_core_confirmation`, which tells
+    the function to just return the first result with one match without doing any further verification (`True` for state
+    and SCOTUS, `False` otherwise).
+
+    The `cheap_count` parameter determines whether we use `COUNT pk WHERE ... LIMIT 2` or the length of the results from
+    `SELECT * WHERE ... LIMIT 2`. The second format can allow us to save a query in subsequent methods which may need
+    the count or elements of the results.
+
+    Will only ever return querysets with zero or one results."""
+
+    lookups = [
+        (confirm, Q(**fields))
+        for confirm, fields in get_docket_lookup_tiers(
+            pacer_case_id,
+            docket_number,
+            docket_number_core,
+            skip_dn_core_confirmation,
+        )
+    ]
 
     confirm_query = Q()
     component_query = Q()
@@ -269,6 +301,40 @@ async def find_docket_object_query(
     return Docket.objects.none()
 
 
+def get_lookup_docket_number_core(
+    court_id: str, docket_number: str
+) -> tuple[str, bool]:
+    """Make the docket_number_core used to look up a docket in a court.
+
+    :param court_id: The CourtListener court_id to lookup
+    :param docket_number: The docket number to lookup.
+    :return: A two-tuple of the docket_number_core and whether lookups by it
+    skip the docket number confirmation.
+    """
+    if court_id == "scotus":
+        docket_number_core = make_scotus_docket_number_core(docket_number)
+        # SCOTUS docket numbers can contain multiple NN-NNNN numbers
+        # (e.g. "No. 01-8200 01-8148"). The docket_number_core is computed
+        # deterministically via lexicographic sorting, so the federal
+        # clean_docket_number confirmation would fail on multi-number
+        # inputs and must be skipped.
+        skip_dn_core_confirmation = True
+    elif is_texas_court(court_id):
+        docket_number_core = make_texas_docket_number_core(docket_number)
+        # Texas docket numbers are unique and do not need the extra
+        # confirmation that federal docket numbers require.
+        skip_dn_core_confirmation = True
+    elif is_florida_court(court_id):
+        docket_number_core = make_florida_docket_number_core(
+            docket_number, court_id=court_id
+        )
+        skip_dn_core_confirmation = True
+    else:
+        docket_number_core = make_docket_number_core(docket_number)
+        skip_dn_core_confirmation = False
+    return docket_number_core, skip_dn_core_confirmation
+
+
 async def find_docket_object(
     court_id: str,
     pacer_case_id: str | None,
@@ -297,27 +363,9 @@ async def find_docket_object(
       found
     :return The docket found or created.
     """
-    if court_id == "scotus":
-        docket_number_core = make_scotus_docket_number_core(docket_number)
-        # SCOTUS docket numbers can contain multiple NN-NNNN numbers
-        # (e.g. "No. 01-8200 01-8148"). The docket_number_core is computed
-        # deterministically via lexicographic sorting, so the federal
-        # clean_docket_number confirmation would fail on multi-number
-        # inputs and must be skipped.
-        skip_dn_core_confirmation = True
-    elif is_texas_court(court_id):
-        docket_number_core = make_texas_docket_number_core(docket_number)
-        # Texas docket numbers are unique and do not need the extra
-        # confirmation that federal docket numbers require.
-        skip_dn_core_confirmation = True
-    elif is_florida_court(court_id):
-        docket_number_core = make_florida_docket_number_core(
-            docket_number, court_id=court_id
-        )
-        skip_dn_core_confirmation = True
-    else:
-        docket_number_core = make_docket_number_core(docket_number)
-        skip_dn_core_confirmation = False
+    docket_number_core, skip_dn_core_confirmation = (
+        get_lookup_docket_number_core(court_id, docket_number)
+    )
 
     dqs = await find_docket_object_query(
         court_id,
@@ -348,6 +396,236 @@ async def find_docket_object(
     return d
 
 
+# The most candidates find_docket_objects fetches for each lookup tier before
+# it falls back to find_docket_object, and the number of keys
+# fetch_docket_candidates looks up per query.
+DOCKET_LOOKUP_MAX_CANDIDATES = 50
+DOCKET_LOOKUP_BATCH_SIZE = 100
+
+
+@dataclass
+class DocketLookup:
+    """The data find_docket_object uses to find an item's docket."""
+
+    court_id: str
+    pacer_case_id: str | None
+    docket_number: str
+    federal_defendant_number: int | None = None
+    federal_dn_judge_initials_assigned: str | None = None
+    federal_dn_judge_initials_referred: str | None = None
+
+
+@dataclass
+class DocketLookupResult:
+    """The docket found for a DocketLookup.
+
+    ambiguous is set when several dockets matched and the oldest was chosen,
+    like find_docket_object does.
+    """
+
+    docket: Docket | None
+    ambiguous: bool = False
+
+
+def docket_matches_components(
+    d: Docket, lookup: DocketLookup, confirm: bool
+) -> bool:
+    """Compare a docket's docket number components with a lookup's, in memory.
+
+    :param d: The docket to compare.
+    :param lookup: The lookup with the incoming components.
+    :param confirm: True to apply the confirmation rules of
+    find_docket_object_query, where blank docket components also match.
+    False to require the components to be equal.
+    :return: Whether the docket matches.
+    """
+    if lookup.federal_defendant_number is not None:
+        fdn = int(lookup.federal_defendant_number)
+        if d.federal_defendant_number != fdn and not (
+            confirm and d.federal_defendant_number is None
+        ):
+            return False
+    for field in (
+        "federal_dn_judge_initials_assigned",
+        "federal_dn_judge_initials_referred",
+    ):
+        value = getattr(lookup, field)
+        if not value:
+            continue
+        if getattr(d, field) != value and not (
+            confirm and getattr(d, field) == ""
+        ):
+            return False
+    return True
+
+
+def resolve_docket_lookup(
+    lookup: DocketLookup,
+    tiers: list[tuple[bool, dict[str, str | None]]],
+    dockets_by_tier: list[list[Docket]],
+) -> DocketLookupResult:
+    """Pick an item's docket among the dockets each lookup tier matched.
+
+    :param lookup: The item to find a docket for.
+    :param tiers: The lookup tiers of the item.
+    :param dockets_by_tier: For each tier, the dockets in the court matching
+    its fields, oldest first.
+    :return: The docket found, as find_docket_object_query would find it.
+    """
+    for (confirm, _), candidates in zip(tiers, dockets_by_tier, strict=True):
+        ds = [
+            d
+            for d in candidates
+            if not confirm or docket_matches_components(d, lookup, True)
+        ]
+        if not ds:
+            continue  # Try a looser lookup.
+        if len(ds) == 1:
+            if (
+                confirm
+                and confirm_docket_number_core_lookup_match(
+                    ds[0], lookup.docket_number
+                )
+                is None
+            ):
+                continue
+            return DocketLookupResult(ds[0])
+
+        # If more than one docket matches, try refining the results using
+        # available docket_number components.
+        dqs = [d for d in ds if docket_matches_components(d, lookup, False)]
+        if len(dqs) == 1:
+            return DocketLookupResult(dqs[0])
+
+        # Choose the oldest one and live with it.
+        if (
+            confirm
+            and confirm_docket_number_core_lookup_match(
+                ds[0], lookup.docket_number
+            )
+            is None
+        ):
+            continue
+        return DocketLookupResult(ds[0], ambiguous=True)
+    return DocketLookupResult(None)
+
+
+def fetch_docket_candidates(
+    queryset: QuerySet[Docket],
+    field_names: tuple[str, ...],
+    keys: Iterable[tuple],
+    order_by: str = "date_created",
+    limit: int | None = None,
+) -> defaultdict[tuple, list[Docket]]:
+    """Get the dockets matching each of many sets of exact field values.
+
+    Each key is matched as a whole, so values from different keys are never
+    combined.
+
+    :param queryset: The dockets to look in.
+    :param field_names: The Docket fields the keys have values for.
+    :param keys: Tuples of values, in the order of field_names. None matches
+    a null field.
+    :param order_by: The field to order the dockets of each key by.
+    :param limit: The most dockets to fetch for each key, or None to fetch
+    all of them.
+    :return: A dict of each key to its dockets, in order.
+    """
+    candidates: defaultdict[tuple, list[Docket]] = defaultdict(list)
+    for batch in chunks(keys, DOCKET_LOOKUP_BATCH_SIZE):
+        q = Q()
+        for key in batch:
+            q |= Q(**dict(zip(field_names, key, strict=True)))
+        ds = queryset.filter(q).order_by(order_by)
+        if limit is not None:
+            rank = Window(
+                RowNumber(),
+                partition_by=[F(field) for field in field_names],
+                order_by=F(order_by).asc(),
+            )
+            ds = ds.annotate(candidate_rank=rank).filter(
+                candidate_rank__lte=limit
+            )
+        for d in ds:
+            candidates[tuple(getattr(d, f) for f in field_names)].append(d)
+    return candidates
+
+
+async def find_docket_objects(
+    lookups: list[DocketLookup],
+) -> list[DocketLookupResult]:
+    """Find the dockets of many items at once, like find_docket_object does
+    for a single item.
+
+    Instead of running the lookup tiers item by item, the dockets matching
+    any item's tier are fetched by fetch_docket_candidates, a few queries per
+    kind of tier, and each item's tiers and confirmation rules are applied in
+    memory. Dockets are never created; items without a match get a result
+    with no docket.
+
+    :param lookups: The items to find dockets for.
+    :return: A result for each lookup, in the same order.
+    """
+    item_tiers = []
+    for lookup in lookups:
+        docket_number_core, skip_dn_core_confirmation = (
+            get_lookup_docket_number_core(
+                lookup.court_id, lookup.docket_number
+            )
+        )
+        item_tiers.append(
+            get_docket_lookup_tiers(
+                lookup.pacer_case_id,
+                lookup.docket_number,
+                docket_number_core,
+                skip_dn_core_confirmation,
+            )
+        )
+
+    # Group the tiers by the fields they look up, to query each group once.
+    tier_keys: dict[tuple[str, ...], set[tuple]] = defaultdict(set)
+    for lookup, tiers in zip(lookups, item_tiers, strict=True):
+        for _, fields in tiers:
+            field_names = tuple(sorted(fields))
+            tier_keys[field_names].add(
+                (lookup.court_id, *(fields[f] for f in field_names))
+            )
+
+    limit = DOCKET_LOOKUP_MAX_CANDIDATES
+    dockets: dict[tuple[str, ...], defaultdict[tuple, list[Docket]]] = {}
+    for field_names, keys in tier_keys.items():
+        dockets[field_names] = await sync_to_async(fetch_docket_candidates)(
+            Docket.objects.all(),
+            ("court_id", *field_names),
+            keys,
+            limit=limit,
+        )
+
+    results = []
+    for lookup, tiers in zip(lookups, item_tiers, strict=True):
+        dockets_by_tier = []
+        for _, fields in tiers:
+            field_names = tuple(sorted(fields))
+            key = (lookup.court_id, *(fields[f] for f in field_names))
+            dockets_by_tier.append(dockets[field_names].get(key, []))
+        if any(len(ds) >= limit for ds in dockets_by_tier):
+            # Some candidates may have been left out, e.g. the defendants of
+            # a large criminal case, so refine the lookup in the database.
+            d = await find_docket_object(
+                lookup.court_id,
+                lookup.pacer_case_id,
+                lookup.docket_number,
+                lookup.federal_defendant_number,
+                lookup.federal_dn_judge_initials_assigned,
+                lookup.federal_dn_judge_initials_referred,
+                allow_create=False,
+            )
+            results.append(DocketLookupResult(d))
+            continue
+        results.append(resolve_docket_lookup(lookup, tiers, dockets_by_tier))
+    return results
+
+
 def add_attorney(atty, p, d):
     """Add/update an attorney.
 
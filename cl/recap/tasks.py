@@ -4,6 +4,7 @@ import hashlib
 import json
 import logging
 import time
+from collections import Counter, defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from functools import partial
@@ -99,11 +100,11 @@ from cl.lib.microservice_utils import (
 )
 from cl.lib.pacer import is_pacer_court_accessible, map_cl_to_pacer_id
 from cl.lib.pacer_session import (
-    ProxyPacerSession,
     SessionData,
     delete_pacer_cookie_from_cache,
     get_or_cache_pacer_cookies,
     get_pacer_cookie_from_cache,
+    get_pacer_session,
 )
 from cl.lib.recap_utils import get_document_filename
 from cl.lib.storage import (
@@ -118,6 +119,7 @@ from cl.recap.mergers import (
     add_docket_entries,
     add_parties_and_attorneys,
     add_tags_to_objs,
+    fetch_docket_candidates,
     find_docket_object,
     get_data_from_appellate_att_report,
     get_data_from_att_report,
@@ -1952,33 +1954,87 @@ def do_heuristic_match(idb_row, ds):
     return d
 
 
+IDB_EXCLUDED_CASE_NAMES = ("sealed", "suppressed", "search warrant")
+
+
+def get_idb_candidate_dockets(
+    idb_rows: list[FjcIntegratedDatabase],
+) -> defaultdict[tuple[str, str], list[Docket]]:
+    """Get the dockets that might match a chunk of IDB rows in bulk.
+
+    Candidates share the court and docket_number_core of an IDB row. Criminal
+    cases and sealed or suppressed dockets are never candidates.
+
+    :param idb_rows: The FJC IDB rows to find dockets for.
+    :return: A dict of (court ID, docket_number_core) to the candidate
+    dockets.
+    """
+    keys = {(row.district_id, row.docket_number) for row in idb_rows}
+    ds = Docket.objects.exclude(docket_number_raw__icontains="cr")
+    for case_name in IDB_EXCLUDED_CASE_NAMES:
+        ds = ds.exclude(case_name__icontains=case_name)
+    # do_heuristic_match has to see every candidate, or a missed match
+    # creates a duplicate docket.
+    return fetch_docket_candidates(
+        ds,
+        ("court_id", "docket_number_core"),
+        keys,
+        order_by="pk",
+        limit=None,
+    )
+
+
+def add_idb_candidate(ds: list[Docket], d_pk: int, later_rows: int) -> None:
+    """Add a docket created from an IDB row to the candidates of its key.
+
+    Later rows of the chunk with the same key have to see it, as they would
+    if each row were looked up on its own.
+
+    :param ds: The candidate dockets of the key.
+    :param d_pk: The PK of the docket created.
+    :param later_rows: The number of rows left in the chunk with the key.
+    :return: None
+    """
+    if not later_rows:
+        return
+    d = Docket.objects.get(pk=d_pk)
+    case_name = d.case_name.lower()
+    if "cr" in d.docket_number_raw.lower() or any(
+        s in case_name for s in IDB_EXCLUDED_CASE_NAMES
+    ):
+        return
+    ds.append(d)
+
+
 @app.task
 def create_or_merge_from_idb_chunk(idb_chunk):
     """Take a chunk of IDB rows and either merge them into the Docket table or
     create new items for them in the docket table.
 
+    The rows and their candidate dockets are loaded in bulk, so larger chunks
+    cost about the same number of lookups as small ones.
+
     :param idb_chunk: A list of FjcIntegratedDatabase PKs
     :type idb_chunk: list
     :return: None
     :rtype: None
     """
-    for idb_pk in idb_chunk:
-        idb_row = FjcIntegratedDatabase.objects.get(pk=idb_pk)
-        ds = (
-            Docket.objects.filter(
-                docket_number_core=idb_row.docket_number,
-                court=idb_row.district,
-            )
-            .exclude(docket_number_raw__icontains="cr")
-            .exclude(case_name__icontains="sealed")
-            .exclude(case_name__icontains="suppressed")
-            .exclude(case_name__icontains="search warrant")
-        )
-        count = ds.count()
+    rows_by_pk = FjcIntegratedDatabase.objects.in_bulk(idb_chunk)
+    idb_rows = [rows_by_pk[pk] for pk in idb_chunk if pk in rows_by_pk]
+    candidates = get_idb_candidate_dockets(idb_rows)
+    remaining = Counter(
+        (idb_row.district_id, idb_row.docket_number) for idb_row in idb_rows
+    )
+    for idb_row in idb_rows:
+        key = (idb_row.district_id, idb_row.docket_number)
+        remaining[key] -= 1
+        ds = candidates[key]
+        count = len(ds)
         if count == 0:
             msg = "Creating new docket for IDB row: %s"
             logger.info(msg, idb_row)
-            create_new_docket_from_idb(idb_row)
+            d_pk = create_new_docket_from_idb(idb_row)
+            add_idb_candidate(ds, d_pk, remaining[key])
             continue
         elif count == 1:
             d = ds[0]
@@ -1994,7 +2050,8 @@ def create_or_merge_from_idb_chunk(idb_chunk):
         if d is not None:
             merge_docket_with_idb(d, idb_row)
         else:
-            create_new_docket_from_idb(idb_row)
+            d_pk = create_new_docket_from_idb(idb_row)
+            add_idb_candidate(ds, d_pk, remaining[key])
 
 
 @app.task
@@ -2665,9 +2722,7 @@ def fetch_appellate_docket(self, fq_pk):
         self.request.chain = None
         return None
 
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
 
     docket_number = fq.docket_number or getattr(
         fq.docket, "docket_number_raw", None
@@ -2763,9 +2818,7 @@ def fetch_docket(self, fq_pk):
         self.request.chain = None
         return None
 
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     try:
         result = fetch_pacer_case_id_and_title(s, fq, court_id)
     except (requests.RequestException, ReadTimeoutError) as exc:
@@ -3408,9 +3461,7 @@ def get_acms_pacer_case_id(
     :param docket_number: The docket_number to query.
     :return: The PACER case ID as a string if found, otherwise None.
     """
-    s = ProxyPacerSession(
-        cookies=session_data.cookies, proxy=session_data.proxy_address
-    )
+    s = get_pacer_session(session_data)
     acms_search = AcmsCaseSearch(court_id=court_id, pacer_session=s)
     acms_search.query(docket_number)
     return acms_search.data["pcx_caseid"] if acms_search.data else None
@@ -99,10 +99,13 @@ from cl.recap.management.commands.reprocess_recap_dockets import (
     extract_unextracted_rds,
 )
 from cl.recap.mergers import (
+    DocketLookup,
     add_attorney,
     add_docket_entries,
     add_parties_and_attorneys,
+    fetch_docket_candidates,
     find_docket_object,
+    find_docket_objects,
     get_data_from_appellate_att_report,
     get_data_from_att_report,
     get_order_of_docket,
@@ -5210,6 +5213,70 @@ class RecapMinuteEntriesTest(TestCase):
                 "Second pass should not attempt to resolve any dockets",
             )
 
+    @override_settings(RSS_BATCHED_MERGES=True)
+    def test_rss_batched_merges(self, mock_rss_cache_key) -> None:
+        """Are RSS items of the same docket merged together, looking up the
+        docket only once?
+        """
+        court = CourtFactory(id="ca10", jurisdiction="F")
+        rss_feed = PacerRssFeed(court.pk)
+        with open(self.make_path("rss_ca10.xml"), "rb") as f:
+            rss_text = f.read().decode()
+        rss_feed._parse_text(rss_text)
+        rss_data = rss_feed.data
+        # A later item for the same case, with a new entry.
+        extra_item = deepcopy(rss_data[0])
+        extra_item["docket_entries"][0].update(
+            {
+                "description": "Lorem ipsum",
+                "pacer_doc_id": "010010808571",
+                "document_number": "010010808571",
+            }
+        )
+        rss_data.append(extra_item)
+
+        with mock.patch(
+            "cl.recap_rss.tasks.find_docket_object",
+            side_effect=find_docket_object,
+        ) as mock_find_docket:
+            merge_rss_feed_contents(rss_data, court.pk)
+            self.assertEqual(
+                mock_find_docket.call_count,
+                3,
+                "Should resolve each docket once",
+            )
+
+        self.assertEqual(Docket.objects.count(), 3)
+        self.assertEqual(
+            sorted(d.docket_entries.count() for d in Docket.objects.all()),
+            [1, 1, 2],
+        )
+
+        # The items are cached, so merging the feed again does nothing.
+        with mock.patch(
+            "cl.recap_rss.tasks.find_docket_object",
+            side_effect=find_docket_object,
+        ) as mock_find_docket:
+            merge_rss_feed_contents(deepcopy(rss_data), court.pk)
+            mock_find_docket.assert_not_called()
+
+        # Dockets that already exist are found by the batch lookup.
+        new_item = deepcopy(extra_item)
+        new_item["docket_entries"][0].update(
+            {
+                "description": "Dolor sit",
+                "pacer_doc_id": "010010808572",
+                "document_number": "010010808572",
+            }
+        )
+        with mock.patch(
+            "cl.recap_rss.tasks.find_docket_object",
+            side_effect=find_docket_object,
+        ) as mock_find_docket:
+            merge_rss_feed_contents([new_item], court.pk)
+            mock_find_docket.assert_not_called()
+        self.assertEqual(Docket.objects.count(), 3)
+
 
 class DescriptionCleanupTest(SimpleTestCase):
     def test_cleanup(self) -> None:
@@ -6631,6 +6698,25 @@ class IdbMergeTest(TestCase):
         create_or_merge_from_idb_chunk([self.fcj_2.id])
         self.assertEqual(Docket.objects.count(), 3)
 
+    def test_rows_sharing_a_docket_in_one_chunk(self) -> None:
+        """Do later rows of a chunk match the docket an earlier row created?"""
+        fjc_3 = FjcIntegratedDatabaseFactory(
+            district=self.court,
+            jurisdiction=3,
+            nature_of_suit=440,
+            docket_number="0800012",
+        )
+        fjc_4 = FjcIntegratedDatabaseFactory(
+            district=self.court,
+            jurisdiction=3,
+            nature_of_suit=440,
+            docket_number="0800012",
+        )
+        create_or_merge_from_idb_chunk([fjc_3.id, fjc_4.id])
+        self.assertEqual(Docket.objects.count(), 3)
+        d = Docket.objects.get(docket_number_core="0800012")
+        self.assertEqual(d.idb_data_id, fjc_4.id)
+
 
 class TestRecapDocumentsExtractContentCommand(TestCase):
     """Test extraction for missed recap documents that need content
@@ -8925,6 +9011,133 @@ class LookupDocketsTest(TestCase):
             async_to_sync(update_docket_metadata)(new_d, docket_no_number_core)
             new_d.save()
 
+    def test_find_docket_objects_in_batch(self):
+        """Does the batch lookup find the same dockets as find_docket_object,
+        and flag the ambiguous ones?
+        """
+        d_1 = DocketFactory(
+            docket_number="1:03-cr-00076",
+            court=self.court_appellate,
+            source=Docket.RECAP,
+            pacer_case_id=None,
+            federal_defendant_number=2,
+            federal_dn_judge_initials_assigned="MA",
+            federal_dn_judge_initials_referred="DH",
+        )
+        d_2 = DocketFactory(
+            docket_number="1:03-cr-00076",
+            court=self.court_appellate,
+            source=Docket.RECAP,
+            pacer_case_id=None,
+            federal_defendant_number=1,
+            federal_dn_judge_initials_assigned="MR",
+            federal_dn_judge_initials_referred="DLH",
+        )
+        lookups = [
+            DocketLookup(
+                self.court.pk, "12345", "3:17-mj-01477", None, "", ""
+            ),
+            DocketLookup(
+                self.court.pk, "12346", "3:17-mj-01477", 1, "RM", "LM"
+            ),
+            DocketLookup(
+                self.court.pk, "54321", "3:17-mj-01477", 1, "RM", "LM"
+            ),
+            DocketLookup(self.court.pk, None, "3:17-CV-01477"),
+            DocketLookup(self.court.pk, None, "212-213"),
+            DocketLookup(
+                self.court_appellate.pk, None, "1:03-cr-00076", 1, "MR", "DLH"
+            ),
+            DocketLookup(self.court_appellate.pk, None, "1:03-cr-00076"),
+        ]
+
+        results = async_to_sync(find_docket_objects)(lookups)
+
+        for lookup, result in zip(lookups, results, strict=True):
+            with self.subTest(lookup=lookup):
+                d = async_to_sync(find_docket_object)(
+                    lookup.court_id,
+                    lookup.pacer_case_id,
+                    lookup.docket_number,
+                    lookup.federal_defendant_number,
+                    lookup.federal_dn_judge_initials_assigned,
+                    lookup.federal_dn_judge_initials_referred,
+                )
+                self.assertEqual(result.docket and result.docket.pk, d.pk)
+        self.assertEqual(
+            [r.docket and r.docket.pk for r in results],
+            [
+                self.docket_case_id.pk,
+                None,
+                self.docket_case_id_2.pk,
+                self.docket_1.pk,
+                self.docket_2.pk,
+                d_2.pk,
+                d_1.pk,
+            ],
+        )
+        self.assertEqual(
+            [r.ambiguous for r in results],
+            [False, False, False, False, False, False, True],
+        )
+
+    def test_fetch_docket_candidates(self):
+        """Are keys matched as a whole, with a bounded number of dockets?"""
+        d_1 = DocketFactory(court=self.court, pacer_case_id="777")
+        d_2 = DocketFactory(court=self.court_appellate, pacer_case_id="888")
+        DocketFactory(court=self.court, pacer_case_id="888")
+        DocketFactory(court=self.court_appellate, pacer_case_id="777")
+        keys = {(self.court.pk, "777"), (self.court_appellate.pk, "888")}
+
+        with self.assertNumQueries(1):
+            candidates = fetch_docket_candidates(
+                Docket.objects.all(), ("court_id", "pacer_case_id"), keys
+            )
+        self.assertEqual(
+            {key: [d.pk for d in ds] for key, ds in candidates.items()},
+            {
+                (self.court.pk, "777"): [d_1.pk],
+                (self.court_appellate.pk, "888"): [d_2.pk],
+            },
+        )
+
+        d_3 = DocketFactory(court=self.court, pacer_case_id="777")
+        with mock.patch("cl.recap.mergers.DOCKET_LOOKUP_BATCH_SIZE", 1):
+            with self.assertNumQueries(2):
+                candidates = fetch_docket_candidates(
+                    Docket.objects.all(),
+                    ("court_id", "pacer_case_id"),
+                    keys,
+                    limit=1,
+                )
+        self.assertEqual(candidates[(self.court.pk, "777")], [d_1])
+        candidates = fetch_docket_candidates(
+            Docket.objects.all(), ("court_id", "pacer_case_id"), keys
+        )
+        self.assertEqual(candidates[(self.court.pk, "777")], [d_1, d_3])
+
+    def test_find_docket_objects_past_the_candidate_limit(self):
+        """Are lookups with more candidates than fetched refined like
+        find_docket_object does?"""
+        dockets = [
+            DocketFactory(
+                docket_number="1:03-cr-00076",
+                court=self.court_appellate,
+                source=Docket.RECAP,
+                pacer_case_id=None,
+                federal_defendant_number=n,
+            )
+            for n in (1, 2, 3)
+        ]
+        lookup = DocketLookup(
+            self.court_appellate.pk, None, "1:03-cr-00076", 3
+        )
+
+        with mock.patch("cl.recap.mergers.DOCKET_LOOKUP_MAX_CANDIDATES", 2):
+            (result,) = async_to_sync(find_docket_objects)([lookup])
+        self.assertEqual(result.docket, dockets[2])
+        self.assertFalse(result.ambiguous)
+
 
 class CleanUpDuplicateAppellateEntries(TestCase):
     """Test clean_up_duplicate_appellate_entries method that finds and clean
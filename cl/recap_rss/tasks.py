@@ -4,6 +4,7 @@ import json
 import logging
 import re
 from calendar import SATURDAY, SUNDAY
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 import requests
@@ -23,20 +24,23 @@ from requests import HTTPError
 from cl.alerts.tasks import enqueue_docket_alert
 from cl.celery_init import app
 from cl.lib.crypto import sha256
+from cl.lib.model_helpers import make_docket_number_core
 from cl.lib.pacer import map_cl_to_pacer_id
 from cl.lib.redis_utils import get_redis_interface
 from cl.lib.types import EmailType
 from cl.recap.constants import COURT_TIMEZONES
 from cl.recap.mergers import (
+    DocketLookup,
     add_bankruptcy_data_to_docket,
     add_docket_entries,
     find_docket_object,
+    find_docket_objects,
     set_skip_percolation_if_bankruptcy_data,
     update_docket_metadata,
 )
 from cl.recap_rss.models import RssFeedData, RssFeedStatus, RssItemCache
 from cl.recap_rss.utils import emails
-from cl.search.models import Court
+from cl.search.models import Court, Docket
 
 logger = logging.getLogger(__name__)
 
@@ -348,66 +352,130 @@ def claim_item_hash(r: Redis, item_hash: str) -> bool:
     )
 
 
-@app.task(
-    bind=True,
-    max_retries=1,
-    queue=settings.CELERY_FEEDS_QUEUE,
-)
-def merge_rss_feed_contents(
-    self, feed_data, court_pk, metadata_only=False
-) -> list[tuple[int, datetime]]:
-    """Merge the rss feed contents into CourtListener
+def claim_item_hashes(r: Redis, item_hashes: list[str]) -> list[bool]:
+    """Claim several RSS items by their hashes in a single round trip.
 
-    :param self: The Celery task
-    :param feed_data: The data parameter of a PacerRssFeed object that has
-    already queried the feed and been parsed.
+    :param r: Redis client instance.
+    :param item_hashes: The SHA1 hashes you wish to cache.
+    :return: A list with, for each hash, True if this call claimed it, False
+    if it was already claimed.
+    """
+    pipe = r.pipeline()
+    for item_hash in item_hashes:
+        pipe.set(
+            get_rss_cache_key(item_hash), "", nx=True, ex=2 * 24 * 60 * 60
+        )
+    return [bool(claimed) for claimed in pipe.execute()]
+
+
+def get_rss_docket_key(item: dict) -> tuple:
+    """Get the values find_docket_object uses to look up an RSS item's docket.
+
+    :param item: An RSS item, as parsed by PacerRssFeed.
+    :return: A tuple of the pacer_case_id, docket_number and docket number
+    components of the item.
+    """
+    return (
+        item["pacer_case_id"],
+        item["docket_number"],
+        item.get("federal_defendant_number"),
+        item.get("federal_dn_judge_initials_assigned"),
+        item.get("federal_dn_judge_initials_referred"),
+    )
+
+
+def merge_rss_items_by_docket(
+    task: Task,
+    feed_data: list[dict],
+    court_pk: str,
+    metadata_only: bool,
+    start_time: datetime,
+) -> tuple[list[tuple[int, datetime]], list[int]]:
+    """Merge RSS items grouped by docket.
+
+    Busy cases often show up several times in a feed. Their items are merged
+    together, so each docket is looked up, saved and enqueued for alerts once
+    instead of once per item. The dockets of the whole feed are looked up at
+    the start by find_docket_objects.
+
+    :param task: The Celery task, used to retry on IntegrityError.
+    :param feed_data: The items of the feed.
     :param court_pk: The CourtListener court ID.
     :param metadata_only: Whether to only do metadata and skip docket entries.
-    :returns A list of (docket ids, alert_time) tuples for sending alerts
+    :param start_time: The time the merge started, used for alerts.
+    :return: A two-tuple of the (docket ids, alert_time) tuples for sending
+    alerts and the IDs of the RECAPDocuments created.
     """
-    start_time = now()
+    groups: dict[tuple, list[dict]] = defaultdict(list)
+    for item in feed_data:
+        groups[get_rss_docket_key(item)].append(item)
+    lookups = [DocketLookup(court_pk, *docket_key) for docket_key in groups]
+    results = dict(
+        zip(groups, async_to_sync(find_docket_objects)(lookups), strict=True)
+    )
+    # The dockets saved by this merge, which the lookups done up front either
+    # couldn't see or hold stale copies of.
+    saved_dockets: dict[int, Docket] = {}
+    created_case_ids: set[str] = set()
+    created_cores: set[str] = set()
 
-    # RSS feeds are a list of normal Juriscraper docket objects.
     all_rds_created = []
     d_pks_to_alert = []
     r = get_redis_interface("CACHE")
-    for docket in feed_data:
-        item_hash = hash_item(docket)
-        if not claim_item_hash(r, item_hash):
-            # Omit the item. It's already in the cache (already seen).
+    for docket_key, items in groups.items():
+        # Claim each group right before merging it, so a retry doesn't skip
+        # the groups that weren't merged yet.
+        claimed = claim_item_hashes(r, [hash_item(item) for item in items])
+        items = [item for item, ok in zip(items, claimed, strict=True) if ok]
+        if not items:
+            # Omit the group. Its items are already in the cache.
             continue
 
+        pacer_case_id, docket_number = docket_key[:2]
+        content_updated = False
+        rds_created = []
         with transaction.atomic():
-            d = async_to_sync(find_docket_object)(
-                court_pk,
-                docket["pacer_case_id"],
-                docket["docket_number"],
-                docket.get("federal_defendant_number"),
-                docket.get("federal_dn_judge_initials_assigned"),
-                docket.get("federal_dn_judge_initials_referred"),
-            )
+            d = results[docket_key].docket
+            if (
+                d is None
+                or pacer_case_id in created_case_ids
+                or make_docket_number_core(docket_number) in created_cores
+            ):
+                # A docket created by this merge may be the one.
+                d = async_to_sync(find_docket_object)(court_pk, *docket_key)
+            d = saved_dockets.get(d.pk, d)
+            is_new = d.pk is None
 
             d.add_recap_source()
-            async_to_sync(update_docket_metadata)(d, docket)
+            for item in items:
+                async_to_sync(update_docket_metadata)(d, item)
+                # Skip the percolator request for this save if bankruptcy
+                # data will be merged afterward.
+                set_skip_percolation_if_bankruptcy_data(item, d)
             if not d.pacer_case_id:
-                d.pacer_case_id = docket["pacer_case_id"]
+                d.pacer_case_id = pacer_case_id
 
-            # Skip the percolator request for this save if bankruptcy data will
-            # be merged afterward.
-            set_skip_percolation_if_bankruptcy_data(docket, d)
             try:
                 d.save()
-                add_bankruptcy_data_to_docket(d, docket)
+                for item in items:
+                    add_bankruptcy_data_to_docket(d, item)
             except IntegrityError as exc:
                 # The docket was created while we looked it up. Retry and it
                 # should associate with the new one instead.
-                raise self.retry(exc=exc)
-            if metadata_only:
-                continue
-
-            items_returned, rds_created, content_updated = async_to_sync(
-                add_docket_entries
-            )(d, docket["docket_entries"])
+                raise task.retry(exc=exc)
+            saved_dockets[d.pk] = d
+            if is_new and d.pacer_case_id:
+                created_case_ids.add(d.pacer_case_id)
+            if is_new and d.docket_number_core:
+                created_cores.add(d.docket_number_core)
+
+            if not metadata_only:
+                docket_entries = [
+                    de for item in items for de in item["docket_entries"]
+                ]
+                items_returned, rds_created, content_updated = async_to_sync(
+                    add_docket_entries
+                )(d, docket_entries)
 
         if content_updated:
             newly_enqueued = enqueue_docket_alert(d.pk)
@@ -415,6 +483,81 @@ def merge_rss_feed_contents(
                 d_pks_to_alert.append((d.pk, start_time))
 
         all_rds_created.extend([rd.pk for rd in rds_created])
+    return d_pks_to_alert, all_rds_created
+
+
+@app.task(
+    bind=True,
+    max_retries=1,
+    queue=settings.CELERY_FEEDS_QUEUE,
+)
+def merge_rss_feed_contents(
+    self, feed_data, court_pk, metadata_only=False
+) -> list[tuple[int, datetime]]:
+    """Merge the rss feed contents into CourtListener
+
+    :param self: The Celery task
+    :param feed_data: The data parameter of a PacerRssFeed object that has
+    already queried the feed and been parsed.
+    :param court_pk: The CourtListener court ID.
+    :param metadata_only: Whether to only do metadata and skip docket entries.
+    :returns A list of (docket ids, alert_time) tuples for sending alerts
+    """
+    start_time = now()
+
+    if settings.RSS_BATCHED_MERGES:
+        d_pks_to_alert, all_rds_created = merge_rss_items_by_docket(
+            self, feed_data, court_pk, metadata_only, start_time
+        )
+    else:
+        # RSS feeds are a list of normal Juriscraper docket objects.
+        all_rds_created = []
+        d_pks_to_alert = []
+        r = get_redis_interface("CACHE")
+        for docket in feed_data:
+            item_hash = hash_item(docket)
+            if not claim_item_hash(r, item_hash):
+                # Omit the item. It's already in the cache (already seen).
+                continue
+
+            with transaction.atomic():
+                d = async_to_sync(find_docket_object)(
+                    court_pk,
+                    docket["pacer_case_id"],
+                    docket["docket_number"],
+                    docket.get("federal_defendant_number"),
+                    docket.get("federal_dn_judge_initials_assigned"),
+                    docket.get("federal_dn_judge_initials_referred"),
+                )
+
+                d.add_recap_source()
+                async_to_sync(update_docket_metadata)(d, docket)
+                if not d.pacer_case_id:
+                    d.pacer_case_id = docket["pacer_case_id"]
+
+                # Skip the percolator request for this save if bankruptcy
+                # data will be merged afterward.
+                set_skip_percolation_if_bankruptcy_data(docket, d)
+                try:
+                    d.save()
+                    add_bankruptcy_data_to_docket(d, docket)
+                except IntegrityError as exc:
+                    # The docket was created while we looked it up. Retry and
+                    # it should associate with the new one instead.
+                    raise self.retry(exc=exc)
+                if metadata_only:
+                    continue
+
+                items_returned, rds_created, content_updated = async_to_sync(
+                    add_docket_entries
+                )(d, docket["docket_entries"])
+
+            if content_updated:
+                newly_enqueued = enqueue_docket_alert(d.pk)
+                if newly_enqueued:
+                    d_pks_to_alert.append((d.pk, start_time))
+
+            all_rds_created.extend([rd.pk for rd in rds_created])
 
     logger.info(
         "%s: Sending %s new RECAP documents for indexing and "
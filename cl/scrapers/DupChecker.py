@@ -1,5 +1,6 @@
 from juriscraper.AbstractSite import logger
 
+from cl.lib.redis_utils import get_redis_interface, make_url_hash_stats_key
 from cl.scrapers.exceptions import (
     ConsecutiveDuplicatesError,
     SingleDuplicateError,
@@ -23,6 +24,10 @@ class DupChecker(dict):
         self.url_hash = None
         self.dup_count = 0
         self.last_found_date = None
+        # Lookup values resolved in bulk by `prime`, per (model, lookup_by),
+        # and the subset of them that already exists in the DB.
+        self.primed: dict[tuple[type, str], set[str]] = {}
+        self.primed_existing: dict[tuple[type, str], set[str]] = {}
         super().__init__(*args, **kwargs)
 
     def _increment(self, current_date):
@@ -41,6 +46,47 @@ class DupChecker(dict):
         self.url_hash.sha1 = hash
         self.url_hash.save()
 
+    def prime(
+        self,
+        object_type,
+        sha1s: set[str] | None = None,
+        download_urls: set[str] | None = None,
+    ) -> None:
+        """Resolve many lookup values with one query per lookup field.
+
+        Later `press_on` calls for these values use the result instead of
+        querying the DB one item at a time. Everything else about `press_on`,
+        including when it raises `ConsecutiveDuplicatesError`, is unchanged.
+
+        :param object_type: The model to look the values up in.
+        :param sha1s: Content hashes to look up by `sha1`.
+        :param download_urls: URLs to look up by `download_url`.
+        :return: None
+        """
+        for lookup_by, values in (
+            ("sha1", sha1s),
+            ("download_url", download_urls),
+        ):
+            if not values:
+                continue
+            existing = object_type.objects.filter(
+                **{f"{lookup_by}__in": values}
+            ).values_list(lookup_by, flat=True)
+            self.primed[(object_type, lookup_by)] = set(values)
+            self.primed_existing[(object_type, lookup_by)] = set(existing)
+
+    def _exists(self, object_type, lookup_by: str, lookup_value: str) -> bool:
+        """Whether an object with the lookup value is already in the DB."""
+        primed = self.primed.get((object_type, lookup_by), set())
+        if lookup_value in primed:
+            if lookup_value in self.primed_existing[(object_type, lookup_by)]:
+                return True
+            # It's about to be saved, so a later item with the same value
+            # must check the DB again, like it did before priming.
+            primed.discard(lookup_value)
+            return False
+        return object_type.objects.filter(**{lookup_by: lookup_value}).exists()
+
     def _court_changed(self, url, hash):
         """Determines whether a court website has changed since we last saw it.
 
@@ -56,6 +102,18 @@ class DupChecker(dict):
             # It's a known URL or it's a changed hash.
             return True, url_hash
 
+    def _record_url_hash_check(self, changed: bool) -> None:
+        """Count the court's website checks and changes.
+
+        The scraper scheduler scrapes courts that change most often first.
+        """
+        r = get_redis_interface("CACHE")
+        key = make_url_hash_stats_key(self.court.pk)
+        pipe = r.pipeline()
+        pipe.hincrby(key, "checked", 1)
+        pipe.hincrby(key, "changed", int(changed))
+        pipe.execute()
+
     def abort_by_url_hash(self, url, hash):
         """Checks whether we should abort due to a hash of the site data being
         unchanged since the last time a URL was visited.
@@ -66,6 +124,7 @@ class DupChecker(dict):
         """
         changed, self.url_hash = self._court_changed(url, hash)
         if not self.full_crawl:
+            self._record_url_hash_check(changed)
             if not changed:
                 logger.info(f"Unchanged hash at: {url}")
                 return True
@@ -110,14 +169,9 @@ class DupChecker(dict):
                 - continue
         """
         # check for a duplicate in the db.
-        if lookup_by == "sha1":
-            exists = object_type.objects.filter(sha1=lookup_value).exists()
-        elif lookup_by == "download_url":
-            exists = object_type.objects.filter(
-                download_url=lookup_value
-            ).exists()
-        else:
+        if lookup_by not in ("sha1", "download_url"):
             raise NotImplementedError("Unknown lookup_by parameter.")
+        exists = self._exists(object_type, lookup_by, lookup_value)
 
         if not exists:
             return
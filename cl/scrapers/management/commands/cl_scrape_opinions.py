@@ -2,7 +2,9 @@ import signal
 import sys
 import time
 import traceback
+from contextlib import nullcontext
 from datetime import date
+from importlib import import_module
 from typing import Any
 
 from asgiref.sync import async_to_sync, sync_to_async
@@ -15,7 +17,7 @@ from juriscraper.lib.importer import build_module_list
 from juriscraper.lib.string_utils import CaseNameTweaker
 from sentry_sdk import capture_exception
 
-from cl import settings
+from cl.audio.models import Audio
 from cl.lib.command_utils import ScraperCommand, logger
 from cl.lib.crypto import sha1
 from cl.lib.string_utils import trunc
@@ -25,6 +27,13 @@ from cl.scrapers.exceptions import (
     ConsecutiveDuplicatesError,
     SingleDuplicateError,
 )
+from cl.scrapers.scheduler import (
+    HostLimiter,
+    SiteDownloader,
+    get_module_court_id,
+    order_by_change_frequency,
+    scrape_sites_concurrently,
+)
 from cl.scrapers.tasks import extract_opinion_content
 from cl.scrapers.utils import (
     check_duplicate_ingestion,
@@ -255,8 +264,18 @@ class Command(ScraperCommand):
     juriscraper_module_type = "opinions"
     scrape_target_descr = "opinions"  # for logging purposes
 
+    # Politeness limits for the concurrent scheduler, None when sequential.
+    host_limiter: HostLimiter | None = None
+    # How many upcoming items to download while the current one is ingested.
+    download_ahead = 0
+    # How many items full crawls download and check for duplicates at once.
+    prime_window = 10
+    # The model whose rows are the duplicates of scraped items.
+    dup_model: type[Opinion] | type[Audio] = Opinion
+
     def __init__(self, stdout=None, stderr=None, no_color=False):
         super().__init__(stdout=None, stderr=None, no_color=False)
+        self.site_downloaders: dict[Any, SiteDownloader] = {}
 
     def add_arguments(self, parser):
         super().add_arguments(parser)
@@ -288,6 +307,127 @@ class Command(ScraperCommand):
             default=False,
             help="Disable duplicate aborting.",
         )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help=(
+                "How many court sites to scrape at once. Above 1, all courts "
+                "are swept concurrently, the ones that change most often "
+                "first, and in daemon mode a new sweep starts every --rate "
+                "minutes. Default is 1, scraping courts one at a time."
+            ),
+        )
+        parser.add_argument(
+            "--per-host-concurrency",
+            type=int,
+            default=1,
+            help="Requests in flight per court host when --concurrency > 1.",
+        )
+        parser.add_argument(
+            "--per-host-interval",
+            type=float,
+            default=1.0,
+            help=(
+                "Minimum seconds between requests to the same court host "
+                "when --concurrency > 1."
+            ),
+        )
+        parser.add_argument(
+            "--download-ahead",
+            type=int,
+            default=0,
+            help=(
+                "How many upcoming items of a site to download while the "
+                "current one is ingested. Default is 0."
+            ),
+        )
+
+    def host_slot(self, url: str):
+        """Wait for the host's politeness limits, if there are any."""
+        if self.host_limiter is None:
+            return nullcontext()
+        return self.host_limiter.slot(url)
+
+    def get_download_urls(self, item: dict) -> list[str]:
+        """The URLs that ingesting a scraped item downloads.
+
+        :param item: The scraped item.
+        :return: A list of download URLs.
+        """
+        if item.get("content"):
+            return []
+        if item.get("sub_opinions"):
+            return [o["download_urls"] for o in item["sub_opinions"]]
+        return [item["download_urls"]]
+
+    def get_dup_lookup_field(self, court_id: str, item: dict) -> str:
+        """The field the duplicates of a scraped item are looked up by.
+
+        :param court_id: The court of the item.
+        :param item: The scraped item.
+        :return: "download_url" or "sha1".
+        """
+        if (
+            court_id == "nev"
+            and item["precedential_statuses"] == "Unpublished"
+        ) or court_id in ["neb"]:
+            # Nevada's non-precedential cases have different SHA1 sums
+            # every time.
+
+            # Nebraska updates the pdf causing the SHA1 to not match
+            # the opinions in CL causing duplicates. See CL issue #1452
+            return "download_url"
+        return "sha1"
+
+    async def prime_dup_checker(
+        self,
+        items: list[dict],
+        court_id: str,
+        dup_checker: DupChecker,
+        downloader: SiteDownloader,
+    ) -> None:
+        """Download a window of site items and check their duplicates in
+        bulk.
+
+        Only worth it when nothing stops the scrape early, as in full crawls
+        and backscrapes, where every item is downloaded anyway. The content
+        is kept until the items are ingested, so windows are kept small.
+
+        :param items: The next items of the site to ingest.
+        :param court_id: The court of the site.
+        :param dup_checker: The site's duplicate checker.
+        :param downloader: The site's downloader, which keeps the content
+        for ingestion.
+        :return: None
+        """
+        sha1_urls = []
+        download_urls = []
+        for item in items:
+            urls = self.get_download_urls(item)
+            if self.get_dup_lookup_field(court_id, item) == "download_url":
+                download_urls.extend(urls)
+            else:
+                sha1_urls.extend(urls)
+        # Items looked up by URL are only downloaded ahead for ingestion.
+        downloader.prefetch(download_urls)
+        contents = await downloader.prefetch_all(sha1_urls)
+        sha1s = {
+            sha1(force_bytes(content))
+            for content in contents
+            if not isinstance(content, BaseException)
+        }
+        if not sha1s and not download_urls:
+            return
+        await sync_to_async(dup_checker.prime)(
+            self.dup_model, sha1s=sha1s, download_urls=set(download_urls)
+        )
+
+    def get_site_downloader(self, site) -> SiteDownloader:
+        """The downloader of the site being scraped, or a new one."""
+        return self.site_downloaders.get(site) or SiteDownloader(
+            site, self.host_limiter
+        )
 
     async def scrape_court(
         self,
@@ -316,25 +456,59 @@ class Command(ScraperCommand):
         # do not update the site hash on a backscrape or manual full crawl
         update_site_hash = not full_crawl
 
+        downloader = SiteDownloader(site, self.host_limiter)
+        self.site_downloaders[site] = downloader
         added = 0
-        for i, item in enumerate(site):
-            try:
-                next_date = site[i + 1]["case_dates"]
-            except IndexError:
-                next_date = None
+        try:
+            for i, item in enumerate(site):
+                try:
+                    next_date = site[i + 1]["case_dates"]
+                except IndexError:
+                    next_date = None
+
+                if full_crawl and i % self.prime_window == 0:
+                    await self.prime_dup_checker(
+                        [
+                            site[j]
+                            for j in range(
+                                i, min(i + self.prime_window, len(site))
+                            )
+                        ],
+                        court.pk,
+                        dup_checker,
+                        downloader,
+                    )
 
-            try:
-                await self.ingest_a_case(
-                    item, next_date, ocr_available, site, dup_checker, court
-                )
-                added += 1
-            except ConsecutiveDuplicatesError:
-                break
-            except SingleDuplicateError:
-                pass
-            except (BadContentError, InvalidDocumentError):
-                # do not update site hash to ensure a retry on the next scrape
-                update_site_hash = False
+                if self.download_ahead:
+                    downloader.prefetch(
+                        url
+                        for j in range(
+                            i, min(i + 1 + self.download_ahead, len(site))
+                        )
+                        for url in self.get_download_urls(site[j])
+                    )
+
+                try:
+                    await self.ingest_a_case(
+                        item,
+                        next_date,
+                        ocr_available,
+                        site,
+                        dup_checker,
+                        court,
+                    )
+                    added += 1
+                except ConsecutiveDuplicatesError:
+                    break
+                except SingleDuplicateError:
+                    pass
+                except (BadContentError, InvalidDocumentError):
+                    # do not update site hash to ensure a retry on the next
+                    # scrape
+                    update_site_hash = False
+        finally:
+            downloader.cancel()
+            del self.site_downloaders[site]
 
         # Update the hash if everything finishes properly.
         logger.debug(
@@ -369,26 +543,25 @@ class Command(ScraperCommand):
         else:
             opinions_to_download.append(case_dict)
 
-        # download content
-        for sub_opinion in opinions_to_download:
-            content = await site.download_content(
-                sub_opinion["download_urls"], media_root=settings.MEDIA_ROOT
-            )
+        # download content, all sub opinions at once
+        contents = await self.get_site_downloader(site).download_many(
+            [
+                sub_opinion["download_urls"]
+                for sub_opinion in opinions_to_download
+            ]
+        )
+        for sub_opinion, content in zip(
+            opinions_to_download, contents, strict=True
+        ):
             opinions_content.append(
                 (sub_opinion, content, sha1(force_bytes(content)))
             )
 
         for metadata, content, sha1_hash in opinions_content:
             if (
-                court.pk == "nev"
-                and case_dict["precedential_statuses"] == "Unpublished"
-            ) or court.pk in ["neb"]:
-                # Nevada's non-precedential cases have different SHA1 sums
-                # every time.
-
-                # Nebraska updates the pdf causing the SHA1 to not match
-                # the opinions in CL causing duplicates. See CL issue #1452
-
+                self.get_dup_lookup_field(court.pk, case_dict)
+                == "download_url"
+            ):
                 lookup_params = {
                     "lookup_value": metadata["download_urls"],
                     "lookup_by": "download_url",
@@ -480,9 +653,57 @@ class Command(ScraperCommand):
             )
 
     async def parse_and_scrape_site(self, mod, options: dict):
-        site = await mod.Site(save_response_fn=save_response).parse()
+        site = mod.Site(save_response_fn=save_response)
+        async with self.host_slot(site.url):
+            site = await site.parse()
         await self.scrape_court(site, options["full_crawl"])
 
+    def scrape_concurrently(self, module_strings: list[str], options: dict):
+        """Sweep all requested courts concurrently, within host limits.
+
+        Courts whose websites change most often are started first. In daemon
+        mode, a new sweep starts every ``rate`` minutes, or right away if a
+        sweep took longer than that.
+
+        :param module_strings: The Juriscraper modules to scrape.
+        :param options: The command options.
+        :return: None
+        """
+        self.host_limiter = HostLimiter(
+            options["per_host_concurrency"], options["per_host_interval"]
+        )
+
+        async def scrape_module(module_string: str) -> None:
+            await self.parse_and_scrape_site(
+                import_module(module_string), options
+            )
+
+        while not die_now:
+            sweep_start = time.monotonic()
+            enabled = set(
+                Court.objects.filter(
+                    pk__in={get_module_court_id(m) for m in module_strings},
+                    has_opinion_scraper=True,
+                ).values_list("pk", flat=True)
+            )
+            modules = [
+                m for m in module_strings if get_module_court_id(m) in enabled
+            ]
+            async_to_sync(scrape_sites_concurrently)(
+                order_by_change_frequency(modules),
+                scrape_module,
+                options["concurrency"],
+            )
+            elapsed = time.monotonic() - sweep_start
+            logger.info(
+                "Swept %s jurisdictions in %.1f seconds.",
+                len(modules),
+                elapsed,
+            )
+            if not options["daemon"]:
+                break
+            time.sleep(max(options["rate"] * 60 - elapsed, 0))
+
     def handle(self, *args, **options):
         super().handle(*args, **options)
         global die_now
@@ -496,6 +717,12 @@ class Command(ScraperCommand):
             raise CommandError("Unable to import module or package. Aborting.")
 
         logger.info("Starting up the scraper.")
+        self.download_ahead = options["download_ahead"]
+        if options["concurrency"] > 1:
+            self.scrape_concurrently(module_strings, options)
+            logger.info("The scraper has stopped.")
+            return
+
         num_courts = len(module_strings)
         wait = (options["rate"] * 60) / num_courts
         i = 0
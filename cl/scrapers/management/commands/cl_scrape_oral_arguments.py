@@ -7,7 +7,6 @@ from django.db import transaction
 from django.utils.encoding import force_bytes
 from juriscraper.lib.string_utils import CaseNameTweaker
 
-from cl import settings
 from cl.audio.dispatch import dispatch_process_audio_file
 from cl.audio.models import Audio
 from cl.lib.command_utils import logger
@@ -104,6 +103,10 @@ def make_objects(
 class Command(cl_scrape_opinions.Command):
     scrape_target_descr = "oral arguments"
     juriscraper_module_type = "oral_args"
+    dup_model = Audio
+
+    def get_dup_lookup_field(self, court_id: str, item: dict) -> str:
+        return "sha1"
 
     async def ingest_a_case(
         self,
@@ -115,8 +118,8 @@ class Command(cl_scrape_opinions.Command):
         court: Court,
         backscrape: bool = False,
     ):
-        content = await site.download_content(
-            item["download_urls"], media_root=settings.MEDIA_ROOT
+        content = await self.get_site_downloader(site).download(
+            item["download_urls"]
         )
         # request.content is sometimes a str, sometimes unicode, so
         # force it all to be bytes, pleasing hashlib.
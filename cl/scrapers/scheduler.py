@@ -0,0 +1,205 @@
+import asyncio
+import time
+import traceback
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from typing import Any
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from juriscraper.AbstractSite import logger
+from sentry_sdk import capture_exception
+
+from cl.lib.redis_utils import get_redis_interface, make_url_hash_stats_key
+
+
+class HostLimiter:
+    """Per-host politeness limits shared by every site of a scraper run.
+
+    Caps the number of requests in flight to each host and spaces out the
+    start of consecutive requests to the same host, so running many courts at
+    once never hits a single court website harder than scraping it alone.
+    Courts hosted on the same domain share the same limits.
+    """
+
+    def __init__(self, max_concurrency: int = 1, min_interval: float = 0.0):
+        """
+        :param max_concurrency: Requests allowed in flight per host.
+        :param min_interval: Minimum seconds between request starts per host.
+        """
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._next_start: dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Wait for the host of a URL to accept one more request.
+
+        :param url: The URL about to be requested.
+        """
+        host = urlsplit(url).hostname or url
+        semaphore = self._semaphores.setdefault(
+            host, asyncio.Semaphore(self.max_concurrency)
+        )
+        async with semaphore:
+            async with self._locks.setdefault(host, asyncio.Lock()):
+                loop = asyncio.get_running_loop()
+                delay = self._next_start.get(host, 0.0) - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_start[host] = loop.time() + self.min_interval
+            yield
+
+
+class SiteDownloader:
+    """Downloads a site's content within host limits, optionally ahead of use.
+
+    Scraped items are ingested one at a time, because duplicate detection
+    depends on their order. Prefetching lets the downloads for the next few
+    items run while the current one is saved.
+
+    Downloads always go through a host limiter. Without a shared one, the
+    downloader uses its own, allowing one request at a time per host.
+    """
+
+    def __init__(self, site, limiter: HostLimiter | None = None):
+        self.site = site
+        self.limiter = limiter or HostLimiter()
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def _download(self, url: str) -> Any:
+        async with self.limiter.slot(url):
+            return await self.site.download_content(
+                url, media_root=settings.MEDIA_ROOT
+            )
+
+    def prefetch(self, urls: Iterable[str]) -> None:
+        """Start downloading URLs in the background.
+
+        :param urls: The download URLs of upcoming items.
+        """
+        for url in urls:
+            if url not in self._tasks:
+                self._tasks[url] = asyncio.create_task(self._download(url))
+
+    async def download(self, url: str) -> Any:
+        """Get a URL's content, from its prefetch if there is one.
+
+        :param url: The download URL.
+        :return: The content, as returned by ``site.download_content``.
+        """
+        task = self._tasks.pop(url, None)
+        if task is None:
+            return await self._download(url)
+        return await task
+
+    async def prefetch_all(self, urls: list[str]) -> list[Any]:
+        """Download URLs concurrently and keep them for later use.
+
+        :param urls: The download URLs.
+        :return: The contents, in the same order as the URLs. A failed
+        download is returned as its exception and raised again when the URL
+        is used.
+        """
+        self.prefetch(urls)
+        return list(
+            await asyncio.gather(
+                *(self._tasks[u] for u in urls), return_exceptions=True
+            )
+        )
+
+    async def download_many(self, urls: list[str]) -> list[Any]:
+        """Get the content of several URLs concurrently, in order.
+
+        :param urls: The download URLs.
+        :return: The contents, in the same order as the URLs.
+        """
+        return list(await asyncio.gather(*(self.download(u) for u in urls)))
+
+    def cancel(self) -> None:
+        """Cancel prefetches that won't be used, e.g. after a scrape stops."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+
+def get_court_change_rates(court_ids: Iterable[str]) -> dict[str, float]:
+    """Get how often each court's website changed when it was checked.
+
+    Rates come from the counters ``DupChecker.abort_by_url_hash`` keeps. A
+    court that was never checked gets a rate of 1, so it's scraped early.
+
+    :param court_ids: The courts to look up.
+    :return: A dict of court ID to the fraction of checks that found changes.
+    """
+    court_ids = list(court_ids)
+    r = get_redis_interface("CACHE")
+    pipe = r.pipeline()
+    for court_id in court_ids:
+        pipe.hmget(make_url_hash_stats_key(court_id), "checked", "changed")
+    rates = {}
+    for court_id, (checked, changed) in zip(
+        court_ids, pipe.execute(), strict=True
+    ):
+        rates[court_id] = int(changed or 0) / int(checked) if checked else 1.0
+    return rates
+
+
+def get_module_court_id(module_string: str) -> str:
+    """Get the court ID of a Juriscraper module.
+
+    :param module_string: e.g. "juriscraper.opinions.united_states.state.ca9_u"
+    :return: e.g. "ca9"
+    """
+    return module_string.rsplit(".", 1)[-1].split("_")[0]
+
+
+def order_by_change_frequency(module_strings: list[str]) -> list[str]:
+    """Sort Juriscraper modules so the courts that change most go first.
+
+    :param module_strings: The Juriscraper modules to scrape.
+    :return: The modules, most frequently changed court first. Ties keep the
+    original order.
+    """
+    rates = get_court_change_rates(
+        {get_module_court_id(m) for m in module_strings}
+    )
+    return sorted(module_strings, key=lambda m: -rates[get_module_court_id(m)])
+
+
+async def scrape_sites_concurrently(
+    module_strings: list[str],
+    scrape_module: Callable[[str], Awaitable[None]],
+    max_sites: int,
+) -> None:
+    """Scrape many court sites at once.
+
+    Modules are started in the given order and at most ``max_sites`` run at a
+    time. A failing site is reported and doesn't affect the others.
+
+    :param module_strings: The Juriscraper modules to scrape.
+    :param scrape_module: Coroutine function that scrapes one module.
+    :param max_sites: Number of sites to scrape at once.
+    :return: None
+    """
+    sites = asyncio.Semaphore(max_sites)
+
+    async def run(module_string: str) -> None:
+        async with sites:
+            start = time.monotonic()
+            try:
+                await scrape_module(module_string)
+            except Exception as e:
+                capture_exception(
+                    e, fingerprint=[module_string, "{{ default }}"]
+                )
+                logger.debug(traceback.format_exc())
+            logger.debug(
+                "%s: done in %.1f seconds.",
+                module_string,
+                time.monotonic() - start,
+            )
+
+    await asyncio.gather(*(run(m) for m in module_strings))
@@ -11,7 +11,7 @@ import celery
 import httpx
 import openai
 import requests
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
 from bs4 import BeautifulSoup
 from django.apps import apps
 from django.conf import settings
@@ -30,6 +30,7 @@ from cl.citations.tasks import (
 from cl.custom_filters.templatetags.text_filters import best_case_name
 from cl.lib.celery_utils import throttle_task
 from cl.lib.exceptions import ScrapeFailed
+from cl.lib.extraction_cache import cache_extraction, get_cached_extraction
 from cl.lib.juriscraper_utils import get_scraper_object_by_name
 from cl.lib.llm import call_llm_transcription
 from cl.lib.microservice_utils import microservice
@@ -64,6 +65,34 @@ logger = logging.getLogger(__name__)
 ExtractProcessResult = tuple[str, str | None]
 
 
+async def extract_document_text(
+    item, service: str, params: dict | None = None
+) -> Response:
+    """Extract a document's text with doctor, reusing earlier results.
+
+    Identical files are often extracted many times, e.g. when a court
+    republishes an opinion or several dockets share a PDF. Results are cached
+    by the file's SHA1, so only the first copy of a file goes to doctor.
+
+    :param item: The document to extract. It must have a ``sha1`` field.
+    :param service: "document-extract" or "document-extract-ocr".
+    :param params: Extra parameters for the microservice.
+    :return: The microservice response, or an equivalent one built from the
+    cache.
+    """
+    sha1_hash = getattr(item, "sha1", "")
+    cached = await sync_to_async(get_cached_extraction)(sha1_hash, service)
+    if cached is not None:
+        return Response(200, json=cached)
+
+    response = await microservice(service=service, item=item, params=params)
+    if response.is_success:
+        await sync_to_async(cache_extraction)(
+            sha1_hash, service, response.json()
+        )
+    return response
+
+
 def update_document_from_text(
     opinion: Opinion, juriscraper_module: str = ""
 ) -> dict:
@@ -175,9 +204,8 @@ def extract_opinion_content(
     opinion = Opinion.objects.get(pk=pk)
 
     # Try to extract opinion content without using OCR.
-    response = async_to_sync(microservice)(
-        service="document-extract",
-        item=opinion,
+    response = async_to_sync(extract_document_text)(
+        opinion, "document-extract"
     )
     if not response.is_success:
         logger.error(
@@ -203,9 +231,9 @@ def extract_opinion_content(
         and needs_ocr(content)
         and ".pdf" in str(opinion.local_path)
     ):
-        response = async_to_sync(microservice)(
-            service="document-extract-ocr",
-            item=opinion,
+        response = async_to_sync(extract_document_text)(
+            opinion,
+            "document-extract-ocr",
             params={"ocr_available": ocr_available},
         )
         if response.is_success:
@@ -314,9 +342,8 @@ def extract_doc_content(
     opinion = Opinion.objects.get(pk=pk)
 
     # Try to extract opinion content without using OCR.
-    response = async_to_sync(microservice)(
-        service="document-extract",
-        item=opinion,
+    response = async_to_sync(extract_document_text)(
+        opinion, "document-extract"
     )
     if not response.is_success:
         logger.error(
@@ -342,9 +369,9 @@ def extract_doc_content(
         and needs_ocr(content)
         and ".pdf" in str(opinion.local_path)
     ):
-        response = async_to_sync(microservice)(
-            service="document-extract-ocr",
-            item=opinion,
+        response = async_to_sync(extract_document_text)(
+            opinion,
+            "document-extract-ocr",
             params={"ocr_available": ocr_available},
         )
         if response.is_success:
@@ -602,10 +629,7 @@ async def extract_formatted_text_document_base(
             processed.append(pk)
             continue
 
-        response = await microservice(
-            service="document-extract",
-            item=rd,
-        )
+        response = await extract_document_text(rd, "document-extract")
         if not response.is_success:
             continue
 
@@ -615,9 +639,9 @@ async def extract_formatted_text_document_base(
             content = strip_tags(content)
         ocr_needed = needs_ocr(content, page_count=rd.page_count)
         if ocr_available and ocr_needed:
-            response = await microservice(
-                service="document-extract-ocr",
-                item=rd,
+            response = await extract_document_text(
+                rd,
+                "document-extract-ocr",
                 params={"ocr_available": ocr_available},
             )
             if response.is_success:
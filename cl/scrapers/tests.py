@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+import time
 from collections import defaultdict
 from datetime import date, datetime, timedelta
 from http import HTTPStatus
@@ -14,7 +16,7 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 from django.utils.encoding import force_bytes
 from django.utils.timezone import now
 from juriscraper.AbstractSite import logger
@@ -41,6 +43,7 @@ from cl.lib.exceptions import ScrapeFailed
 from cl.lib.juriscraper_utils import get_module_by_court_id
 from cl.lib.microservice_utils import microservice
 from cl.lib.model_helpers import make_texas_docket_number_core
+from cl.lib.redis_utils import get_redis_interface, make_url_hash_stats_key
 from cl.lib.test_helpers import generate_docket_target_sources
 from cl.people_db.factories import PersonFactory
 from cl.recap.models import (
@@ -68,6 +71,12 @@ from cl.scrapers.management.commands.merge_opinion_versions import (
     passes_length_ratio_check,
 )
 from cl.scrapers.models import AccountSubscription, Scraper, UrlHash
+from cl.scrapers.scheduler import (
+    HostLimiter,
+    SiteDownloader,
+    order_by_change_frequency,
+    scrape_sites_concurrently,
+)
 from cl.scrapers.tasks import (
     extract_formatted_text_document_base,
     extract_opinion_content,
@@ -659,6 +668,100 @@ class ExtractFormattedTextSanitizationTest(TestCase):
         self.assertIn("Courtlistener", texas_document.plain_text)
 
 
+@override_settings(
+    EXTRACTION_CACHE_ENABLED=True,
+    CACHES={
+        **settings.CACHES,
+        "s3": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "extraction-cache-test",
+        },
+    },
+)
+class ExtractionCacheTest(TestCase):
+    """Are extraction results reused across documents with the same file?"""
+
+    @mock.patch("cl.scrapers.tasks.microservice", new_callable=mock.AsyncMock)
+    def test_same_file_is_extracted_once(self, microservice_mock):
+        """Is doctor only called for the first copy of a file?"""
+        docs = TexasDocumentFactory.create_batch(2, sha1="a" * 40)
+        microservice_mock.return_value = httpx.Response(
+            200,
+            json={
+                "content": "Cached opinion text.",
+                "page_count": 1,
+                "extracted_by_ocr": False,
+                "err": None,
+            },
+        )
+
+        for doc in docs:
+            async_to_sync(extract_formatted_text_document_base)(
+                doc.pk,
+                check_if_needed=False,
+                ocr_available=False,
+                model_name="search.TexasDocument",
+            )
+
+        self.assertEqual(microservice_mock.await_count, 1)
+        for doc in docs:
+            doc.refresh_from_db()
+            self.assertEqual(doc.plain_text, "Cached opinion text.")
+
+    @mock.patch("cl.scrapers.tasks.microservice", new_callable=mock.AsyncMock)
+    def test_failed_extractions_are_not_cached(self, microservice_mock):
+        """Are results with an error extracted again next time?"""
+        doc = TexasDocumentFactory.create(sha1="b" * 40)
+        microservice_mock.return_value = httpx.Response(
+            200,
+            json={
+                "content": "",
+                "page_count": None,
+                "extracted_by_ocr": False,
+                "err": "Unable to read the file.",
+            },
+        )
+
+        for _ in range(2):
+            async_to_sync(extract_formatted_text_document_base)(
+                doc.pk,
+                check_if_needed=False,
+                ocr_available=False,
+                model_name="search.TexasDocument",
+            )
+
+        self.assertEqual(microservice_mock.await_count, 2)
+
+    @mock.patch("cl.scrapers.tasks.microservice", new_callable=mock.AsyncMock)
+    def test_no_cache_without_s3(self, microservice_mock):
+        """Are results left uncached when there's no S3 cache?"""
+        docs = TexasDocumentFactory.create_batch(2, sha1="d" * 40)
+        microservice_mock.return_value = httpx.Response(
+            200,
+            json={
+                "content": "Uncached opinion text.",
+                "page_count": 1,
+                "extracted_by_ocr": False,
+                "err": None,
+            },
+        )
+        caches_without_s3 = {
+            alias: config
+            for alias, config in settings.CACHES.items()
+            if alias != "s3"
+        }
+        with self.settings(CACHES=caches_without_s3):
+            for doc in docs:
+                async_to_sync(extract_formatted_text_document_base)(
+                    doc.pk,
+                    check_if_needed=False,
+                    ocr_available=False,
+                    model_name="search.TexasDocument",
+                )
+
+        self.assertEqual(microservice_mock.await_count, 2)
+
+
 class ExtensionIdentificationTest(SimpleTestCase):
     def setUp(self) -> None:
         self.path = os.path.join(settings.MEDIA_ROOT, "test", "search")
@@ -876,6 +979,30 @@ class DupcheckerPressOnTest(TestCase):
         except ConsecutiveDuplicatesError:
             pass
 
+    def test_primed_press_on_keeps_semantics_without_queries(self) -> None:
+        """Primed lookups raise the same errors as per-item queries."""
+        new_hash = "2" * 40
+        with self.assertNumQueries(1):
+            self.dc_not_full_crawl.prime(
+                Opinion, sha1s={self.dup_hash, new_hash}
+            )
+
+        with self.assertNumQueries(0):
+            # A new item isn't a duplicate.
+            self.dc_not_full_crawl.press_on(*self.press_on_args[:-1], new_hash)
+            with self.assertRaises(SingleDuplicateError):
+                self.dc_not_full_crawl.press_on(*self.press_on_args)
+            with self.assertRaises(ConsecutiveDuplicatesError):
+                self.dc_not_full_crawl.press_on(*self.press_on_args)
+
+        # Once a new item was seen, it's looked up in the DB again, as it
+        # may have been saved since.
+        with self.assertNumQueries(1):
+            self.dc_full_crawl.prime(Opinion, sha1s={new_hash})
+        self.dc_full_crawl.press_on(*self.press_on_args[:-1], new_hash)
+        with self.assertNumQueries(1):
+            self.dc_full_crawl.press_on(*self.press_on_args[:-1], new_hash)
+
 
 class AudioFileTaskTest(TestCase):
     @classmethod
@@ -941,6 +1068,148 @@ class AudioFileTaskTest(TestCase):
         )
 
 
+class ScraperSchedulerTest(TestCase):
+    """Tests for the concurrent scraper scheduler."""
+
+    def setUp(self) -> None:
+        self.r = get_redis_interface("CACHE")
+        self.keys = [make_url_hash_stats_key(c) for c in ("test", "ca1")]
+        self.r.delete(*self.keys)
+
+    def tearDown(self) -> None:
+        self.r.delete(*self.keys)
+
+    def test_courts_ordered_by_change_frequency(self) -> None:
+        """Courts whose websites change more often are scraped first."""
+        court = CourtFactory(id="test")
+        dup_checker = DupChecker(court)
+        dup_checker.abort_by_url_hash("http://test", "hash")
+        for _ in range(3):
+            dup_checker.abort_by_url_hash("http://test", "hash")
+        self.assertEqual(
+            self.r.hgetall(make_url_hash_stats_key("test")),
+            {"checked": "4", "changed": "1"},
+        )
+
+        modules = [
+            "juriscraper.opinions.united_states.federal_appellate.test",
+            "juriscraper.opinions.united_states.federal_appellate.ca1",
+        ]
+        self.r.hset(
+            make_url_hash_stats_key("ca1"),
+            mapping={"checked": 4, "changed": 3},
+        )
+        self.assertEqual(
+            order_by_change_frequency(modules), list(reversed(modules))
+        )
+
+    async def test_host_limiter_spaces_requests_per_host(self) -> None:
+        """Requests to one host are spaced out, other hosts don't wait."""
+        limiter = HostLimiter(max_concurrency=1, min_interval=0.1)
+        starts: dict[str, list[float]] = defaultdict(list)
+
+        async def request(url: str) -> None:
+            async with limiter.slot(url):
+                starts[url].append(time.monotonic())
+
+        await asyncio.gather(
+            *(request("https://a.gov/x") for _ in range(3)),
+            request("https://b.gov/x"),
+        )
+        a_starts = starts["https://a.gov/x"]
+        self.assertGreaterEqual(a_starts[2] - a_starts[0], 0.2)
+        self.assertLess(starts["https://b.gov/x"][0] - a_starts[0], 0.1)
+
+    async def test_sites_run_concurrently_and_failures_are_isolated(
+        self,
+    ) -> None:
+        """One failing site doesn't stop the others, which run at once."""
+        running = 0
+        peak = 0
+        done = []
+
+        async def scrape_module(module_string: str) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if module_string == "bad":
+                raise ValueError("Broken scraper")
+            done.append(module_string)
+
+        with mock.patch("cl.scrapers.scheduler.capture_exception") as capture:
+            await scrape_sites_concurrently(
+                ["a", "bad", "b", "c"], scrape_module, max_sites=2
+            )
+        self.assertEqual(sorted(done), ["a", "b", "c"])
+        self.assertEqual(peak, 2)
+        capture.assert_called_once()
+
+    async def test_site_downloader_reuses_prefetched_content(self) -> None:
+        """Prefetched content is downloaded once and handed out on use."""
+        site = MagicMock()
+        site.download_content = mock.AsyncMock(
+            side_effect=lambda url, media_root: url.encode()
+        )
+        downloader = SiteDownloader(site)
+        downloader.prefetch(["u1", "u2"])
+        self.assertEqual(
+            await downloader.download_many(["u1", "u2"]), [b"u1", b"u2"]
+        )
+        self.assertEqual(site.download_content.await_count, 2)
+
+    async def test_site_downloader_limits_hosts_by_default(self) -> None:
+        """Without a shared limiter, a host gets one request at a time."""
+        running = 0
+        peak = 0
+
+        async def download_content(url: str, media_root: str) -> bytes:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return url.encode()
+
+        site = MagicMock()
+        site.download_content = download_content
+        urls = [f"https://a.gov/{i}" for i in range(4)]
+        contents = await SiteDownloader(site).download_many(urls)
+        self.assertEqual(contents, [url.encode() for url in urls])
+        self.assertEqual(peak, 1)
+
+    async def test_prime_dup_checker_by_lookup_field(self) -> None:
+        """Only items looked up by sha1 are downloaded to prime them, and
+        only items looked up by URL are primed by URL.
+        """
+        dup_checker = MagicMock()
+        downloader = MagicMock()
+        downloader.prefetch_all = mock.AsyncMock(return_value=[b"pdf"])
+        items = [
+            {
+                "download_urls": "https://nev.gov/1.pdf",
+                "precedential_statuses": "Unpublished",
+            },
+            {
+                "download_urls": "https://nev.gov/2.pdf",
+                "precedential_statuses": "Published",
+            },
+        ]
+        await cl_scrape_opinions.Command().prime_dup_checker(
+            items, "nev", dup_checker, downloader
+        )
+        downloader.prefetch.assert_called_once_with(["https://nev.gov/1.pdf"])
+        downloader.prefetch_all.assert_awaited_once_with(
+            ["https://nev.gov/2.pdf"]
+        )
+        dup_checker.prime.assert_called_once_with(
+            Opinion,
+            sha1s={sha1(b"pdf")},
+            download_urls={"https://nev.gov/1.pdf"},
+        )
+
+
 class ScraperContentTypeTest(TestCase):
     def setUp(self):
         # Common mock setup for all tests
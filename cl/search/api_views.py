@@ -17,8 +17,10 @@ from rest_framework.serializers import ValidationError
 from cl.api.api_permissions import V3APIPermission
 from cl.api.pagination import ESCursorPagination
 from cl.api.utils import (
+    BatchRetrieveMixin,
     DeferredFieldsMixin,
     LoggingMixin,
+    NDJSONStreamMixin,
     NoFilterCacheListMixin,
 )
 from cl.lib.elasticsearch_utils import do_es_api_query
@@ -136,6 +138,8 @@ class BankruptcyInformationViewSet(
 class DocketViewSet(
     LoggingMixin,
     NoFilterCacheListMixin,
+    NDJSONStreamMixin,
+    BatchRetrieveMixin,
     DeferredFieldsMixin,
     viewsets.ModelViewSet,
 ):
@@ -179,6 +183,8 @@ class DocketViewSet(
 class DocketEntryViewSet(
     LoggingMixin,
     NoFilterCacheListMixin,
+    NDJSONStreamMixin,
+    BatchRetrieveMixin,
     DeferredFieldsMixin,
     viewsets.ModelViewSet,
 ):
@@ -217,6 +223,8 @@ class DocketEntryViewSet(
 class RECAPDocumentViewSet(
     LoggingMixin,
     NoFilterCacheListMixin,
+    NDJSONStreamMixin,
+    BatchRetrieveMixin,
     DeferredFieldsMixin,
     viewsets.ModelViewSet,
 ):
@@ -267,6 +275,7 @@ class CourtViewSet(LoggingMixin, DeferredFieldsMixin, viewsets.ModelViewSet):
 class OpinionClusterViewSet(
     LoggingMixin,
     NoFilterCacheListMixin,
+    NDJSONStreamMixin,
     DeferredFieldsMixin,
     viewsets.ModelViewSet,
 ):
@@ -339,6 +348,7 @@ class OpinionClusterViewSet(
 class OpinionViewSet(
     LoggingMixin,
     NoFilterCacheListMixin,
+    NDJSONStreamMixin,
     DeferredFieldsMixin,
     viewsets.ModelViewSet,
 ):
@@ -377,6 +387,7 @@ class OpinionViewSet(
 class OpinionsCitedViewSet(
     LoggingMixin,
     NoFilterCacheListMixin,
+    NDJSONStreamMixin,
     DeferredFieldsMixin,
     viewsets.ModelViewSet,
 ):
@@ -0,0 +1,216 @@
+from collections import defaultdict
+from datetime import date
+
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncMonth
+
+from cl.lib.redis_utils import get_redis_interface, make_coverage_key
+from cl.search.models import SEARCH_TYPES, Opinion, OpinionCluster
+
+# The per-court hashes of the opinions store hold a field per month, like
+# "2024-05", with the number of opinions filed that month, and the "first"
+# and "last" dates opinions were filed.
+FIRST_FIELD = "first"
+LAST_FIELD = "last"
+
+
+def month_field(date_filed: date) -> str:
+    return f"{date_filed:%Y-%m}"
+
+
+# Counts opinions in, or out of, the coverage store. KEYS are the hash of
+# court totals and the hash of the court. ARGV is the court, the number of
+# opinions added or removed, their month and filing date, or empty strings
+# when the date is unknown, then the first and last fields. ISO dates sort as
+# strings, so the first and last dates can be compared in place, and never
+# move backwards when opinions are saved concurrently.
+UPDATE_OPINION_COVERAGE_SCRIPT = """
+local delta = tonumber(ARGV[2])
+redis.call('HINCRBY', KEYS[1], ARGV[1], delta)
+if ARGV[4] == '' then
+    return
+end
+redis.call('HINCRBY', KEYS[2], ARGV[3], delta)
+local first = redis.call('HGET', KEYS[2], ARGV[5])
+local last = redis.call('HGET', KEYS[2], ARGV[6])
+if delta > 0 then
+    if first and ARGV[4] < first then
+        redis.call('HSET', KEYS[2], ARGV[5], ARGV[4])
+    end
+    if last and ARGV[4] > last then
+        redis.call('HSET', KEYS[2], ARGV[6], ARGV[4])
+    end
+else
+    if first == ARGV[4] then
+        redis.call('HDEL', KEYS[2], ARGV[5])
+    end
+    if last == ARGV[4] then
+        redis.call('HDEL', KEYS[2], ARGV[6])
+    end
+end
+"""
+update_opinion_coverage_script = get_redis_interface("CACHE").register_script(
+    UPDATE_OPINION_COVERAGE_SCRIPT
+)
+
+# Saves the first and last dates looked up in the database. KEYS is the hash
+# of the court. ARGV is the first and last fields, then the dates. A date
+# saved meanwhile by an added opinion is kept if it's further out.
+SAVE_FIRST_LAST_DATES_SCRIPT = """
+local first = redis.call('HGET', KEYS[1], ARGV[1])
+if not first or ARGV[3] < first then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+end
+local last = redis.call('HGET', KEYS[1], ARGV[2])
+if not last or ARGV[4] > last then
+    redis.call('HSET', KEYS[1], ARGV[2], ARGV[4])
+end
+"""
+save_first_last_dates_script = get_redis_interface("CACHE").register_script(
+    SAVE_FIRST_LAST_DATES_SCRIPT
+)
+
+
+def update_opinion_coverage(
+    court_id: str, date_filed: date | None, delta: int
+) -> None:
+    """Add opinions to, or remove them from, the coverage store.
+
+    Added opinions extend the first and last dates of their court when they
+    are known. Removing opinions filed on the first or last date drops that
+    date, so it's looked up again the next time it's needed.
+
+    :param court_id: The court of the opinions.
+    :param date_filed: The date the opinions were filed.
+    :param delta: The number of opinions added, or removed if negative.
+    :return: None
+    """
+    if not delta:
+        return
+    update_opinion_coverage_script(
+        keys=[
+            make_coverage_key(SEARCH_TYPES.OPINION),
+            make_coverage_key(SEARCH_TYPES.OPINION, court_id),
+        ],
+        args=[
+            court_id,
+            delta,
+            month_field(date_filed) if date_filed else "",
+            date_filed.isoformat() if date_filed else "",
+            FIRST_FIELD,
+            LAST_FIELD,
+        ],
+        client=get_redis_interface("CACHE"),
+    )
+
+
+def get_court_opinion_counts() -> dict[str, int]:
+    """Get the number of opinions of each court from the coverage store.
+
+    :return: A dict mapping court IDs to their counts of opinions.
+    """
+    r = get_redis_interface("CACHE")
+    counts = r.hgetall(make_coverage_key(SEARCH_TYPES.OPINION))
+    return {court_id: int(count) for court_id, count in counts.items()}
+
+
+def get_court_monthly_opinion_counts(court_id: str) -> dict[str, int]:
+    """Get the number of opinions a court filed each month.
+
+    :param court_id: The court to look up.
+    :return: A dict mapping months, like "2024-05", to their counts of
+    opinions, in order. Months without opinions are left out.
+    """
+    r = get_redis_interface("CACHE")
+    fields = r.hgetall(make_coverage_key(SEARCH_TYPES.OPINION, court_id))
+    return {
+        month: int(count)
+        for month, count in sorted(fields.items())
+        if month not in (FIRST_FIELD, LAST_FIELD) and int(count) > 0
+    }
+
+
+def get_first_last_date_filed(
+    court_id: str,
+) -> tuple[date | None, date | None]:
+    """Get the first and last dates a court filed opinions.
+
+    Dates that are missing from the coverage store are looked up in the
+    database and saved for the next time.
+
+    :param court_id: The court to look up.
+    :return: First/last date filed, if any
+    """
+    r = get_redis_interface("CACHE")
+    key = make_coverage_key(SEARCH_TYPES.OPINION, court_id)
+    first, last = r.hmget(key, FIRST_FIELD, LAST_FIELD)
+    if first and last:
+        return date.fromisoformat(first), date.fromisoformat(last)
+
+    dates = OpinionCluster.objects.filter(docket__court=court_id).aggregate(
+        first=Min("date_filed"), last=Max("date_filed")
+    )
+    if dates["first"] is None:
+        return None, None
+    save_first_last_dates_script(
+        keys=[key],
+        args=[
+            FIRST_FIELD,
+            LAST_FIELD,
+            dates["first"].isoformat(),
+            dates["last"].isoformat(),
+        ],
+        client=r,
+    )
+    return dates["first"], dates["last"]
+
+
+def rebuild_opinion_coverage() -> int:
+    """Compute the coverage store of opinions from scratch.
+
+    :return: The number of courts with opinions.
+    """
+    courts: dict[str, dict[str, int | str]] = defaultdict(dict)
+    totals: dict[str, int] = defaultdict(int)
+    monthly_counts = (
+        Opinion.objects.values(
+            "cluster__docket__court_id",
+            month=TruncMonth("cluster__date_filed"),
+        )
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    for row in monthly_counts.iterator():
+        court_id = row["cluster__docket__court_id"]
+        totals[court_id] += row["count"]
+        if row["month"] is not None:
+            courts[court_id][month_field(row["month"])] = row["count"]
+
+    first_last_dates = (
+        OpinionCluster.objects.values("docket__court_id")
+        .annotate(first=Min("date_filed"), last=Max("date_filed"))
+        .order_by()
+    )
+    for row in first_last_dates.iterator():
+        if row["first"] is None:
+            continue
+        court_id = row["docket__court_id"]
+        courts[court_id][FIRST_FIELD] = row["first"].isoformat()
+        courts[court_id][LAST_FIELD] = row["last"].isoformat()
+
+    r = get_redis_interface("CACHE")
+    old_keys = list(
+        r.scan_iter(match=make_coverage_key(SEARCH_TYPES.OPINION, "*"))
+    )
+    pipe = r.pipeline()
+    if old_keys:
+        pipe.delete(*old_keys)
+    pipe.delete(make_coverage_key(SEARCH_TYPES.OPINION))
+    if totals:
+        pipe.hset(make_coverage_key(SEARCH_TYPES.OPINION), mapping=totals)
+    for court_id, fields in courts.items():
+        pipe.hset(
+            make_coverage_key(SEARCH_TYPES.OPINION, court_id), mapping=fields
+        )
+    pipe.execute()
+    return len(totals)
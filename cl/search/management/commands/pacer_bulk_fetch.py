@@ -16,6 +16,7 @@ from cl.lib.celery_utils import CeleryThrottle
 from cl.lib.command_utils import VerboseCommand, logger
 from cl.lib.pacer_session import get_or_cache_pacer_cookies
 from cl.lib.utils import append_value_in_cache
+from cl.recap.bulk_fetch import BulkFetchEngine, PacerSessionPool
 from cl.recap.models import PROCESSING_STATUS, REQUEST_TYPE, PacerFetchQueue
 from cl.recap.tasks import fetch_pacer_doc_by_rd_and_mark_fq_completed
 from cl.scrapers.tasks import extract_pdf_document
@@ -161,6 +162,34 @@ class Command(VerboseCommand):
             type=str,
             help="Useful for testing purposes. Reduce retries to 1.",
         )
+        parser.add_argument(
+            "--adaptive",
+            action="store_true",
+            default=False,
+            help="Fetch with pooled PACER sessions in this process, adapting "
+            "the concurrency per court to PACER's response times. Fetched "
+            "documents are queued for extraction right away, so the process "
+            "stage isn't needed.",
+        )
+        parser.add_argument(
+            "--max-per-court",
+            type=int,
+            default=4,
+            help="With --adaptive, the most concurrent fetches per court.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=16,
+            help="With --adaptive, the most concurrent fetches overall.",
+        )
+        parser.add_argument(
+            "--target-latency",
+            type=float,
+            default=15.0,
+            help="With --adaptive, the download time in seconds above which "
+            "a court's concurrency is reduced.",
+        )
         parser.add_argument(
             "--stage",
             type=str,
@@ -494,6 +523,26 @@ class Command(VerboseCommand):
             )
             time.sleep(wait)
 
+    def fetch_docs_adaptively(self) -> None:
+        """Fetch documents with BulkFetchEngine instead of Celery tasks."""
+        engine = BulkFetchEngine(
+            PacerSessionPool(
+                self.user.pk, self.pacer_username, self.pacer_password
+            ),
+            self.queue_name,
+            max_per_court=self.options["max_per_court"],
+            target_latency=self.options["target_latency"],
+            max_workers=self.options["max_workers"],
+            on_fetch_queued=lambda rd_pk, fq_pk: append_value_in_cache(
+                self.docs_to_process_cache_key(), (rd_pk, fq_pk)
+            ),
+            on_fetch_failed=lambda rd_pk, fq_pk: append_value_in_cache(
+                self.failed_docs_cache_key(), (rd_pk, fq_pk)
+            ),
+        )
+        stats = engine.run(self.courts_with_docs)
+        self.total_launched = sum(s.fetched + s.failed for s in stats.values())
+
     def handle_process_docs(self):
         """Apply tasks to process docs that were successfully fetched from PACER."""
         cached_fetches = cache.get(self.docs_to_process_cache_key(), [])
@@ -547,7 +596,10 @@ class Command(VerboseCommand):
             len(self.courts_with_docs),
         )
 
-        self.fetch_docs_from_pacer()
+        if self.options["adaptive"]:
+            self.fetch_docs_adaptively()
+        else:
+            self.fetch_docs_from_pacer()
 
         logger.info(
             "Created %s processing queues for a total of %s docs found.",
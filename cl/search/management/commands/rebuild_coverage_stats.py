@@ -0,0 +1,15 @@
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.search.coverage import rebuild_opinion_coverage
+
+
+class Command(VerboseCommand):
+    help = (
+        "Compute the coverage stats of opinions from scratch. Run it when "
+        "COVERAGE_STATS_ENABLED is turned on, and after bulk changes that "
+        "skip model signals."
+    )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        count = rebuild_opinion_coverage()
+        logger.info("Saved the opinion coverage of %s courts.", count)
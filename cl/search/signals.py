@@ -1,8 +1,10 @@
 import logging
+from datetime import date
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 
 from cl.audio.models import Audio
@@ -14,7 +16,10 @@ from cl.citations.tasks import (
     find_citations_and_parantheticals_for_recap_documents,
 )
 from cl.favorites.utils import send_prayer_emails
-from cl.lib.courts import get_cache_key_for_court_list
+from cl.lib.courts import (
+    bump_court_registry_version,
+    get_cache_key_for_court_list,
+)
 from cl.lib.es_signal_processor import ESSignalProcessor
 from cl.people_db.models import (
     ABARating,
@@ -24,6 +29,7 @@ from cl.people_db.models import (
     Position,
     School,
 )
+from cl.search.coverage import update_opinion_coverage
 from cl.search.docket_number_cleaner import (
     clean_docket_number_raw_and_update_redis_cache,
 )
@@ -657,10 +663,11 @@ def update_unmatched_citation(
 )
 def update_court_cache(sender, instance: Court, created: bool, **kwargs):
     """
-    Invalidates the cached court list to ensure data consistency when a Court
-    instance is created or updated.
+    Invalidates the cached court list and the court registry of every worker
+    to ensure data consistency when a Court instance is created or updated.
     """
     cache.delete(get_cache_key_for_court_list())
+    transaction.on_commit(bump_court_registry_version)
 
 
 @receiver(
@@ -702,3 +709,86 @@ def handle_docket_number_raw_cleaning(
 
     if created or instance.docket_number_raw_tracker.changed():
         clean_docket_number_raw_and_update_redis_cache(instance)
+
+
+def get_cluster_court_and_date(cluster_id: int) -> tuple[str, date]:
+    return (
+        OpinionCluster.objects.filter(pk=cluster_id)
+        .values_list("docket__court_id", "date_filed")
+        .get()
+    )
+
+
+@receiver(
+    post_save,
+    sender=Opinion,
+    dispatch_uid="count_new_opinion_coverage",
+)
+def count_new_opinion_coverage(
+    sender, instance: Opinion, created: bool, **kwargs
+):
+    """Add new opinions to the coverage store once they're committed."""
+    if not settings.COVERAGE_STATS_ENABLED or not created:
+        return
+
+    court_id, date_filed = get_cluster_court_and_date(instance.cluster_id)
+    transaction.on_commit(
+        lambda: update_opinion_coverage(court_id, date_filed, 1)
+    )
+
+
+@receiver(
+    pre_delete,
+    sender=Opinion,
+    dispatch_uid="uncount_deleted_opinion_coverage",
+)
+def uncount_deleted_opinion_coverage(sender, instance: Opinion, **kwargs):
+    """Remove deleted opinions from the coverage store once the deletion is
+    committed.
+    """
+    if not settings.COVERAGE_STATS_ENABLED:
+        return
+
+    court_id, date_filed = get_cluster_court_and_date(instance.cluster_id)
+    transaction.on_commit(
+        lambda: update_opinion_coverage(court_id, date_filed, -1)
+    )
+
+
+@receiver(
+    post_save,
+    sender=OpinionCluster,
+    dispatch_uid="move_cluster_opinion_coverage",
+)
+def move_cluster_opinion_coverage(
+    sender, instance: OpinionCluster, created: bool, **kwargs
+):
+    """Move the opinions of a cluster in the coverage store when its date
+    filed or its docket changes.
+    """
+    if not settings.COVERAGE_STATS_ENABLED or created:
+        return
+
+    tracker = instance.es_o_field_tracker
+    if not (
+        tracker.has_changed("date_filed") or tracker.has_changed("docket_id")
+    ):
+        return
+
+    count = Opinion.objects.filter(cluster=instance).count()
+    if not count:
+        return
+    old_date_filed = tracker.previous("date_filed")
+    old_court_id, new_court_id = (
+        Docket.objects.filter(pk=docket_id)
+        .values_list("court_id", flat=True)
+        .first()
+        for docket_id in (tracker.previous("docket_id"), instance.docket_id)
+    )
+
+    def move_coverage() -> None:
+        if old_court_id:
+            update_opinion_coverage(old_court_id, old_date_filed, -count)
+        update_opinion_coverage(new_court_id, instance.date_filed, count)
+
+    transaction.on_commit(move_coverage)
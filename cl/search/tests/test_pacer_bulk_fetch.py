@@ -6,9 +6,11 @@ from django.core.cache import cache as django_cache
 from django.core.management import call_command
 from django.utils import timezone
 from django.utils.timezone import now
+from juriscraper.lib.exceptions import PacerLoginException
 from requests import HTTPError
 
 from cl.lib.utils import append_value_in_cache
+from cl.recap.bulk_fetch import AdaptiveConcurrency
 from cl.recap.factories import PacerFetchQueueFactory
 from cl.recap.models import PROCESSING_STATUS, PacerFetchQueue
 from cl.search.factories import (
@@ -22,7 +24,7 @@ from cl.search.management.commands.pacer_bulk_fetch import (
     is_retry_interval_elapsed,
 )
 from cl.search.models import RECAPDocument
-from cl.tests.cases import TestCase
+from cl.tests.cases import SimpleTestCase, TestCase
 from cl.tests.utils import MockResponse
 from cl.users.factories import UserFactory
 
@@ -855,6 +857,176 @@ class BulkFetchPacerIntegrationTest(TestCase):
         rds_fetched = set(rd_fq_pair[0] for rd_fq_pair in docs_to_process)
         self.assertEqual(rds_fetched, {rd.pk for rd in self.rds_to_retrieve})
 
+    @patch("cl.recap.bulk_fetch.extract_pdf_document.si")
+    @patch(
+        "cl.recap.bulk_fetch.download_pacer_pdf",
+        side_effect=lambda *args, **kwargs: (
+            MockResponse(200, b"binary content"),
+            "OK",
+        ),
+    )
+    @patch("cl.recap.bulk_fetch.ProxyPacerSession")
+    @patch("cl.recap.bulk_fetch.is_pacer_court_accessible", return_value=True)
+    @patch("cl.recap.bulk_fetch.get_or_cache_pacer_cookies")
+    @patch("cl.corpus_importer.tasks.microservice")
+    def test_adaptive_bulk_fetch(
+        self,
+        microservice_mock,
+        mock_engine_cookies,
+        mock_engine_court_accessible,
+        mock_session,
+        mock_download_pacer_pdf,
+        mock_extract,
+        mock_is_pacer_court_accessible,
+        mock_pacer_cookies,
+        mock_get_or_cache_pacer_cookies,
+        mock_sleep,
+        mock_failed_docs_cache_key,
+        mock_fetched_cache_key,
+    ):
+        """Does the adaptive engine purchase every document, log in once and
+        queue each document for extraction right away?"""
+        call_command(
+            "pacer_bulk_fetch",
+            min_page_count=1000,
+            stage="fetch",
+            adaptive=True,
+            username=self.user.username,
+        )
+
+        rds_purchased = RECAPDocument.objects.filter(is_available=True)
+        self.assertEqual(
+            set(rds_purchased.values_list("pk", flat=True)),
+            {rd.pk for rd in self.rds_to_retrieve},
+        )
+        self.assertEqual(
+            PacerFetchQueue.objects.filter(
+                status=PROCESSING_STATUS.SUCCESSFUL
+            ).count(),
+            len(self.rds_to_retrieve),
+        )
+        mock_engine_cookies.assert_called_once()
+        self.assertEqual(mock_extract.call_count, len(self.rds_to_retrieve))
+        microservice_mock.assert_not_called()
+        self.assertFalse(
+            django_cache.get(mock_failed_docs_cache_key.return_value, [])
+        )
+
+    @patch("cl.recap.bulk_fetch.extract_pdf_document.si")
+    @patch("cl.recap.bulk_fetch.download_pacer_pdf")
+    @patch("cl.recap.bulk_fetch.ProxyPacerSession")
+    @patch("cl.recap.bulk_fetch.is_pacer_court_accessible", return_value=True)
+    @patch("cl.recap.bulk_fetch.get_or_cache_pacer_cookies")
+    @patch("cl.corpus_importer.tasks.microservice")
+    def test_adaptive_bulk_fetch_survives_unexpected_errors(
+        self,
+        microservice_mock,
+        mock_engine_cookies,
+        mock_engine_court_accessible,
+        mock_session,
+        mock_download_pacer_pdf,
+        mock_extract,
+        mock_is_pacer_court_accessible,
+        mock_pacer_cookies,
+        mock_get_or_cache_pacer_cookies,
+        mock_sleep,
+        mock_failed_docs_cache_key,
+        mock_fetched_cache_key,
+    ):
+        """Does an unexpected error fail its own fetch only, leaving no fetch
+        queue in progress?"""
+        broken_rd = self.rds_to_retrieve[0]
+
+        def download(
+            session, court_id, pacer_case_id, pacer_doc_id, *args, **kwargs
+        ):
+            if pacer_doc_id == broken_rd.pacer_doc_id:
+                raise ValueError("Unexpected response.")
+            return MockResponse(200, b"binary content"), "OK"
+
+        mock_download_pacer_pdf.side_effect = download
+        call_command(
+            "pacer_bulk_fetch",
+            min_page_count=1000,
+            stage="fetch",
+            adaptive=True,
+            username=self.user.username,
+        )
+
+        self.assertEqual(
+            set(
+                RECAPDocument.objects.filter(is_available=True).values_list(
+                    "pk", flat=True
+                )
+            ),
+            {rd.pk for rd in self.rds_to_retrieve[1:]},
+        )
+        self.assertEqual(
+            PacerFetchQueue.objects.get(recap_document=broken_rd).status,
+            PROCESSING_STATUS.FAILED,
+        )
+        self.assertFalse(
+            PacerFetchQueue.objects.filter(
+                status=PROCESSING_STATUS.IN_PROGRESS
+            ).exists()
+        )
+
+    @patch("cl.recap.bulk_fetch.extract_pdf_document.si")
+    @patch("cl.recap.bulk_fetch.download_pacer_pdf")
+    @patch("cl.recap.bulk_fetch.ProxyPacerSession")
+    @patch("cl.recap.bulk_fetch.is_pacer_court_accessible", return_value=True)
+    @patch("cl.recap.bulk_fetch.get_or_cache_pacer_cookies")
+    @patch("cl.corpus_importer.tasks.microservice")
+    def test_adaptive_bulk_fetch_logs_in_once_per_rejection(
+        self,
+        microservice_mock,
+        mock_engine_cookies,
+        mock_engine_court_accessible,
+        mock_session,
+        mock_download_pacer_pdf,
+        mock_extract,
+        mock_is_pacer_court_accessible,
+        mock_pacer_cookies,
+        mock_get_or_cache_pacer_cookies,
+        mock_sleep,
+        mock_failed_docs_cache_key,
+        mock_fetched_cache_key,
+    ):
+        """Do fetches rejected with the same cookies log in again once, and
+        retry with the new cookies?"""
+        mock_engine_cookies.side_effect = lambda *args, **kwargs: MagicMock()
+        mock_session.side_effect = lambda cookies, proxy: MagicMock(
+            cookies=cookies
+        )
+        # PACER rejects the cookies the first download is made with.
+        rejected_cookies = []
+
+        def download(session, *args, **kwargs):
+            if not rejected_cookies:
+                rejected_cookies.append(session.cookies)
+            if session.cookies is rejected_cookies[0]:
+                raise PacerLoginException("Cookies expired.")
+            return MockResponse(200, b"binary content"), "OK"
+
+        mock_download_pacer_pdf.side_effect = download
+        call_command(
+            "pacer_bulk_fetch",
+            min_page_count=1000,
+            stage="fetch",
+            adaptive=True,
+            username=self.user.username,
+        )
+
+        self.assertEqual(mock_engine_cookies.call_count, 2)
+        self.assertEqual(
+            set(
+                RECAPDocument.objects.filter(is_available=True).values_list(
+                    "pk", flat=True
+                )
+            ),
+            {rd.pk for rd in self.rds_to_retrieve},
+        )
+
     @patch(
         "cl.recap.tasks.download_pacer_pdf_by_rd",
         side_effect=HTTPError("Failed to connect."),
@@ -1069,3 +1241,27 @@ class BulkFetchPacerIntegrationTest(TestCase):
         failed_fqs = PacerFetchQueue.objects.all()
         fq_status = set(fq.status for fq in failed_fqs)
         self.assertEqual(fq_status, {PROCESSING_STATUS.ENQUEUED})
+
+
+class AdaptiveConcurrencyTest(SimpleTestCase):
+    def test_grows_additively_and_backs_off(self):
+        """Does the limit grow by about one slot per round of healthy fetches
+        and halve on errors or slow fetches?"""
+        limit = AdaptiveConcurrency(maximum=4, target_latency=10.0)
+        self.assertEqual(limit.slots, 1)
+
+        limit.record(1.0, ok=True)
+        self.assertEqual(limit.slots, 2)
+        for _ in range(3):
+            limit.record(1.0, ok=True)
+        self.assertEqual(limit.slots, 3)
+
+        limit.record(30.0, ok=True)
+        self.assertEqual(limit.slots, 1)
+
+        for _ in range(20):
+            limit.record(1.0, ok=True)
+        self.assertEqual(limit.slots, 4)
+
+        limit.record(1.0, ok=False)
+        self.assertEqual(limit.slots, 2)
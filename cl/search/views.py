@@ -21,6 +21,7 @@ from cl.alerts.forms import CreateAlertForm
 from cl.alerts.models import Alert
 from cl.donate.models import NeonMembershipLevel
 from cl.lib.bot_detector import is_bot
+from cl.lib.courts import get_courts_in_use
 from cl.lib.ratelimiter import ratelimiter_unsafe_5_per_d
 from cl.lib.search_utils import (
     do_es_search,
@@ -313,7 +314,7 @@ def show_results(request: HttpRequest) -> HttpResponse:
 @never_cache
 def advanced(request: HttpRequest, search_type: str) -> HttpResponse:
     render_dict = {"private": False}
-    courts = courts_in_use = Court.objects.filter(in_use=True)
+    courts = courts_in_use = get_courts_in_use()
 
     if search_type == SEARCH_TYPES.OPINION:
         search_form = SearchForm({"type": search_type}, courts=courts)
@@ -362,7 +363,7 @@ def es_search(request: HttpRequest) -> HttpResponse:
     :return: HttpResponse
     """
     render_dict = {"private": False}
-    courts = Court.objects.filter(in_use=True)
+    courts = get_courts_in_use()
     render_dict.update({"search_type": "parenthetical"})
     obj_type = SEARCH_TYPES.PARENTHETICAL
     search_form = SearchForm({"type": obj_type}, courts=courts)
@@ -17,6 +17,21 @@ PLAUSIBLE_API_TOKEN = env("PLAUSIBLE_API_TOKEN", default="")
 # PACER
 PACER_USERNAME = env("PACER_USERNAME", default="")
 PACER_PASSWORD = env("PACER_PASSWORD", default="")
+# Reuse warm PACER sessions within each worker, keyed by their cookies, and
+# let a single task log in per account at a time. Cached cookies are renewed
+# once they have fewer than PACER_COOKIE_REFRESH_SECONDS left.
+PACER_SESSION_POOL_ENABLED = env.bool(
+    "PACER_SESSION_POOL_ENABLED", default=False
+)
+PACER_SESSION_POOL_SIZE = env.int("PACER_SESSION_POOL_SIZE", default=32)
+PACER_COOKIE_REFRESH_SECONDS = env.int(
+    "PACER_COOKIE_REFRESH_SECONDS", default=10 * 60
+)
+
+# RSS feeds
+# Merge each feed's items grouped by docket, with one lookup query for the
+# whole feed, instead of one transaction and lookup per item.
+RSS_BATCHED_MERGES = env.bool("RSS_BATCHED_MERGES", default=False)
 
 # Internet Archive
 # See: https://archive.org/details/uscourtsoralargumentsdev
@@ -80,6 +95,37 @@ FTM_LAST_UPDATED = env("FTM_LAST_UPDATED", default=date.today())
 
 # Pay and Pray quota
 ALLOWED_PRAYER_COUNT = env.int("ALLOWED_PRAYER_COUNT", default=5)
+# Rank open prayers from a leaderboard kept in Redis instead of querying the
+# ranking on each request. Run rebuild_prayer_leaderboard after enabling it.
+PRAYER_LEADERBOARD_ENABLED = env.bool(
+    "PRAYER_LEADERBOARD_ENABLED", default=False
+)
+
+# Event counters
+# Count events in Redis and save them to GenericCount in bulk with the
+# flush_event_counts command, instead of locking the counter row on each hit.
+EVENT_COUNTS_WRITE_BEHIND = env.bool(
+    "EVENT_COUNTS_WRITE_BEHIND", default=False
+)
+# Seconds between flushes when flush_event_counts runs as a daemon.
+EVENT_COUNTS_FLUSH_INTERVAL = env.int(
+    "EVENT_COUNTS_FLUSH_INTERVAL", default=60
+)
+
+# Court registry
+# Serve court metadata from a snapshot kept in each worker's memory. Workers
+# check a version number in Redis at most once per interval, in seconds, and
+# reload the snapshot after a court is saved.
+COURT_REGISTRY_ENABLED = env.bool("COURT_REGISTRY_ENABLED", default=False)
+COURT_REGISTRY_VERSION_CHECK_INTERVAL = env.int(
+    "COURT_REGISTRY_VERSION_CHECK_INTERVAL", default=30
+)
+
+# Coverage stats
+# Keep per court opinion counts and first/last dates in Redis, updated as
+# opinions are saved, and read the coverage pages from there instead of
+# aggregating on each cache miss. Run rebuild_coverage_stats after enabling it.
+COVERAGE_STATS_ENABLED = env.bool("COVERAGE_STATS_ENABLED", default=False)
 
 
 # CAP
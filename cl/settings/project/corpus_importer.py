@@ -75,3 +75,9 @@ AUDIO_REENQUEUE_WAIT = env.int("AUDIO_REENQUEUE_WAIT", default=60)
 AUDIO_REENQUEUE_MAX_PER_SWEEP = env.int(
     "AUDIO_REENQUEUE_MAX_PER_SWEEP", default=5
 )
+
+# Match judges by name in an in-process index of judges and their positions,
+# refreshed every JUDGE_INDEX_TTL seconds, instead of querying the people DB
+# for each lookup.
+JUDGE_INDEX_ENABLED = env.bool("JUDGE_INDEX_ENABLED", default=False)
+JUDGE_INDEX_TTL = env.int("JUDGE_INDEX_TTL", default=60 * 60)
@@ -34,6 +34,11 @@ EMAIL_EMERGENCY_THRESHOLD = env.int(
 )
 EMAIL_MAX_TEMP_COUNTER = env.int("EMAIL_MAX_TEMP_COUNTER", default=10)
 
+# Number of docket alert emails rendered and sent at a time for a docket.
+DOCKET_ALERT_SEND_BATCH_SIZE = env.int(
+    "DOCKET_ALERT_SEND_BATCH_SIZE", default=100
+)
+
 SERVER_EMAIL = "CourtListener <noreply@courtlistener.com>"
 DEFAULT_FROM_EMAIL = "CourtListener <noreply@courtlistener.com>"
 DEFAULT_ALERTS_EMAIL = "CourtListener Alerts <alerts@courtlistener.com>"
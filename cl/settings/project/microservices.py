@@ -22,6 +22,28 @@ INCEPTION_BATCH_TIMEOUT_MULTIPLIER = env.int(
     "INCEPTION_BATCH_TIMEOUT_MULTIPLIER", default=1
 )
 
+# Each service has a pooled client per process. Services can cap their
+# in-flight requests with a "max_concurrency" entry below, which otherwise
+# defaults to MICROSERVICE_MAX_CONNECTIONS.
+MICROSERVICE_MAX_CONNECTIONS = env.int(
+    "MICROSERVICE_MAX_CONNECTIONS", default=10
+)
+MICROSERVICE_MAX_KEEPALIVE_CONNECTIONS = env.int(
+    "MICROSERVICE_MAX_KEEPALIVE_CONNECTIONS", default=5
+)
+MICROSERVICE_KEEPALIVE_EXPIRY = env.float(
+    "MICROSERVICE_KEEPALIVE_EXPIRY", default=60.0
+)
+
+# Results of document-extract and document-extract-ocr are cached by the
+# file's SHA1, so copies of a file are only extracted once. Bump the version
+# to drop every cached result, e.g. after upgrading the extractor.
+EXTRACTION_CACHE_ENABLED = env.bool("EXTRACTION_CACHE_ENABLED", default=False)
+EXTRACTION_CACHE_TIMEOUT = env.int(
+    "EXTRACTION_CACHE_TIMEOUT", default=60 * 60 * 24 * 90
+)
+EXTRACTION_CACHE_VERSION = env.int("EXTRACTION_CACHE_VERSION", default=1)
+
 MICROSERVICE_URLS = {
     # DOCTOR Endpoints
     "doctor-heartbeat": {
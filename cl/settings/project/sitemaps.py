@@ -4,3 +4,9 @@ env = environ.FileAwareEnv()
 
 # The number of sitemap 'files' (pages) to cache per sitemap generation call
 SITEMAPS_FILES_PER_CALL = env.int("SITEMAPS_FILES_PER_CALL", default=10)
+
+# Write the large sitemaps to gzipped files on storage, regenerating only the
+# pages whose rows changed, and serve them instead of the cached pages
+SITEMAPS_FILES_ENABLED = env.bool("SITEMAPS_FILES_ENABLED", default=False)
+# The number of sitemap sections to write files for at once
+SITEMAPS_SECTION_WORKERS = env.int("SITEMAPS_SECTION_WORKERS", default=4)
@@ -25,6 +25,10 @@ CELERY_QUEUES = (
     "recap_fetch",
 )
 
+# Have CeleryThrottle pace producers with a queue-depth feedback loop instead
+# of polling the queue length. See FeedbackThrottle.
+CELERY_THROTTLE_FEEDBACK = env.bool("CELERY_THROTTLE_FEEDBACK", default=False)
+
 # This can be useful in a dev environment:
 # .virtualenvs/courtlistener/bin/celery worker -n w1 --app=cl  --loglevel=INFO
 if DEVELOPMENT:
@@ -33,6 +33,8 @@ REST_FRAMEWORK = {
         # the global "user" rate and not gated by membership: see #7503.
         "fetch": "30/min",
         "events": "60/hour",
+        # NDJSON streams of the DB endpoints. Each one can emit many rows.
+        "stream": "60/hour",
     },
     # Auth
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -78,3 +80,21 @@ if "test" in sys.argv:
     REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]["user"] = "5000/day"  # type: ignore
 
 BLOCK_NEW_V3_USERS = env.bool("BLOCK_NEW_V3_USERS", default=False)
+
+# API request stats are buffered per process and written to Redis once this
+# many requests are buffered, or this many seconds passed since the last write.
+API_STATS_FLUSH_MAX_REQUESTS = env.int(
+    "API_STATS_FLUSH_MAX_REQUESTS", default=1
+)
+API_STATS_FLUSH_INTERVAL = env.float("API_STATS_FLUSH_INTERVAL", default=5.0)
+
+# Keep per-user throttle state as bucketed sliding-window counters in Redis,
+# checked atomically in one round trip, instead of a cached list with one
+# timestamp per request. Each rate window is split into this many buckets, so
+# requests are held at most one bucket longer than their exact expiry.
+API_THROTTLE_REDIS_COUNTERS = env.bool(
+    "API_THROTTLE_REDIS_COUNTERS", default=False
+)
+API_THROTTLE_BUCKETS_PER_WINDOW = env.int(
+    "API_THROTTLE_BUCKETS_PER_WINDOW", default=60
+)
@@ -95,6 +95,10 @@ class InfinitePaginatorSitemap(sitemaps.Sitemap):
     # make cache key with p=1 by default (to simplify the handling, @see `make_cache_key` in `sitemap.py`)
     force_page_in_cache = True
 
+    # A timestamp field of the items that changes when their URL entries do,
+    # used to skip unchanged pages when generating sitemap files
+    watermark_field: str | None = None
+
     @property
     def section(self) -> str:
         """
@@ -188,9 +192,8 @@ class InfinitePaginatorSitemap(sitemaps.Sitemap):
         paginator_page = self.paginator.page(first=self.limit, after=cursor)
 
         for item in paginator_page:
-            loc = f"{protocol}://{domain}{self._location(item)}"
-            priority = self._get("priority", item)
-            lastmod = self._get("lastmod", item)
+            url_info = self._url_info(item, protocol, domain)
+            lastmod = url_info["lastmod"]
 
             if all_items_lastmod:
                 all_items_lastmod = lastmod is not None
@@ -199,36 +202,6 @@ class InfinitePaginatorSitemap(sitemaps.Sitemap):
                 ):
                     latest_lastmod = lastmod
 
-            url_info = {
-                "item": item,
-                "location": loc,
-                "lastmod": lastmod,
-                "changefreq": self._get("changefreq", item),
-                "priority": str(priority if priority is not None else ""),
-                "alternates": [],
-            }
-
-            if self.i18n and self.alternates:
-                item_languages = self.get_languages_for_item(item[0])
-                for lang_code in item_languages:
-                    loc = f"{protocol}://{domain}{self._location(item, lang_code)}"
-                    url_info["alternates"].append(
-                        {
-                            "location": loc,
-                            "lang_code": lang_code,
-                        }
-                    )
-                if self.x_default and settings.LANGUAGE_CODE in item_languages:
-                    lang_code = settings.LANGUAGE_CODE
-                    loc = f"{protocol}://{domain}{self._location(item, lang_code)}"
-                    loc = loc.replace(f"/{lang_code}/", "/", 1)
-                    url_info["alternates"].append(
-                        {
-                            "location": loc,
-                            "lang_code": "x-default",
-                        }
-                    )
-
             urls.append(url_info)
 
         if all_items_lastmod and latest_lastmod:
@@ -248,3 +221,49 @@ class InfinitePaginatorSitemap(sitemaps.Sitemap):
             next_cursor,
             paginator_page.has_next,
         )
+
+    def _url_info(
+        self, item: Any, protocol: str, domain: str
+    ) -> dict[str, Any]:
+        """Build the sitemap entry of an item.
+
+        :param item: An item of the sitemap.
+        :param protocol: The protocol of the URL.
+        :param domain: The domain of the URL.
+        :return: A dict like the ones django's sitemap.xml template renders.
+        """
+        loc = f"{protocol}://{domain}{self._location(item)}"
+        priority = self._get("priority", item)
+        lastmod = self._get("lastmod", item)
+
+        url_info = {
+            "item": item,
+            "location": loc,
+            "lastmod": lastmod,
+            "changefreq": self._get("changefreq", item),
+            "priority": str(priority if priority is not None else ""),
+            "alternates": [],
+        }
+
+        if self.i18n and self.alternates:
+            item_languages = self.get_languages_for_item(item[0])
+            for lang_code in item_languages:
+                loc = f"{protocol}://{domain}{self._location(item, lang_code)}"
+                url_info["alternates"].append(
+                    {
+                        "location": loc,
+                        "lang_code": lang_code,
+                    }
+                )
+            if self.x_default and settings.LANGUAGE_CODE in item_languages:
+                lang_code = settings.LANGUAGE_CODE
+                loc = f"{protocol}://{domain}{self._location(item, lang_code)}"
+                loc = loc.replace(f"/{lang_code}/", "/", 1)
+                url_info["alternates"].append(
+                    {
+                        "location": loc,
+                        "lang_code": "x-default",
+                    }
+                )
+
+        return url_info
@@ -0,0 +1,373 @@
+import gzip
+import json
+import logging
+import tempfile
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.db import connections
+from django.db.models import Count, Max, QuerySet
+from redis import Redis
+
+from cl.lib.redis_utils import get_redis_interface
+from cl.lib.storage import AWSMediaStorage
+from cl.sitemaps_infinite.base_sitemap import InfinitePaginatorSitemap
+
+logger = logging.getLogger(__name__)
+
+REDIS_DB = "CACHE"
+HASH_NAME_PREFIX = "large-sitemaps:files"
+
+URLSET_START = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+    b'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n'
+)
+URLSET_END = b"</urlset>\n"
+
+
+@dataclass
+class SitemapFilePage:
+    """A sitemap file and the range of rows it was rendered from.
+
+    Pages cover the rows whose keyset field is greater than `after` and up to
+    `last`, so a page keeps its rows when other pages change.
+    """
+
+    after: Any
+    last: Any
+    count: int
+    watermark: str | None
+
+
+def get_sitemap_storage() -> Storage:
+    return AWSMediaStorage()
+
+
+def make_pages_hash_name(section: str) -> str:
+    return f"{HASH_NAME_PREFIX}:{section}"
+
+
+def make_sitemap_file_path(section: str, page: int) -> str:
+    return f"sitemaps/{section}/{page}.xml.gz"
+
+
+def load_sitemap_pages(r: Redis, section: str) -> list[SitemapFilePage]:
+    """Load the pages of a section generated so far.
+
+    :param r: The Redis DB to connect to as a connection interface.
+    :param section: The sitemap section.
+    :return: The pages, in order.
+    """
+    pages = r.hgetall(make_pages_hash_name(section))
+    return [
+        SitemapFilePage(**json.loads(pages[str(number)]))
+        for number in range(1, len(pages) + 1)
+    ]
+
+
+def save_sitemap_pages(
+    r: Redis, section: str, pages: list[SitemapFilePage]
+) -> None:
+    """Replace the pages of a section in Redis.
+
+    :param r: The Redis DB to connect to as a connection interface.
+    :param section: The sitemap section.
+    :param pages: The pages, in order.
+    :return: None
+    """
+    pipe = r.pipeline()
+    pipe.delete(make_pages_hash_name(section))
+    if pages:
+        pipe.hset(
+            make_pages_hash_name(section),
+            mapping={
+                str(number): json.dumps(asdict(page))
+                for number, page in enumerate(pages, start=1)
+            },
+        )
+    pipe.execute()
+
+
+def get_keyset_field(sitemap: InfinitePaginatorSitemap) -> str:
+    """Get the field the rows of a sitemap are paged by.
+
+    :param sitemap: The sitemap.
+    :return: The name of the field.
+    """
+    if (
+        sitemap.i18n
+        or len(sitemap.ordering) != 1
+        or sitemap.ordering[0].startswith("-")
+    ):
+        raise ValueError(
+            f"Sitemap files need a single ascending ordering field, got "
+            f"{sitemap.ordering} for section {sitemap.section}."
+        )
+    return sitemap.ordering[0]
+
+
+def format_watermark(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def render_url_entry(url: dict[str, Any]) -> bytes:
+    """Render a URL entry like django's sitemap.xml template does.
+
+    :param url: A URL entry, as built by InfinitePaginatorSitemap._url_info.
+    :return: The XML of the entry.
+    """
+    parts = [f"<url><loc>{escape(url['location'])}</loc>"]
+    if url["lastmod"]:
+        parts.append(f"<lastmod>{url['lastmod']:%Y-%m-%d}</lastmod>")
+    if url["changefreq"]:
+        parts.append(f"<changefreq>{url['changefreq']}</changefreq>")
+    if url["priority"]:
+        parts.append(f"<priority>{url['priority']}</priority>")
+    for alternate in url["alternates"]:
+        parts.append(
+            f'<xhtml:link rel="alternate" '
+            f"hreflang={quoteattr(alternate['lang_code'])} "
+            f"href={quoteattr(alternate['location'])}/>"
+        )
+    parts.append("</url>\n")
+    return "".join(parts).encode()
+
+
+def write_sitemap_file(
+    sitemap: InfinitePaginatorSitemap,
+    rows: Iterable[Any],
+    storage: Storage,
+    path: str,
+    after: Any,
+) -> SitemapFilePage:
+    """Render rows to a gzipped sitemap file as they are read.
+
+    :param sitemap: The sitemap the rows belong to.
+    :param rows: The rows, in keyset order.
+    :param storage: The storage to save the file to.
+    :param path: The path of the file in the storage.
+    :param after: The keyset value the rows start after.
+    :return: The page that was written. Its `last` is None if there were no
+    rows.
+    """
+    field = get_keyset_field(sitemap)
+    protocol = sitemap.get_protocol()
+    domain = sitemap.get_domain()
+    last = None
+    count = 0
+    watermark = None
+    with tempfile.TemporaryFile() as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode="wb") as gz:
+            gz.write(URLSET_START)
+            for item in rows:
+                gz.write(
+                    render_url_entry(sitemap._url_info(item, protocol, domain))
+                )
+                last = getattr(item, field)
+                count += 1
+                if sitemap.watermark_field:
+                    modified = getattr(item, sitemap.watermark_field)
+                    if modified is not None and (
+                        watermark is None or modified > watermark
+                    ):
+                        watermark = modified
+            gz.write(URLSET_END)
+
+        tmp.seek(0)
+        if storage.exists(path):
+            storage.delete(path)
+        storage.save(path, File(tmp))
+
+    return SitemapFilePage(
+        after=after,
+        last=last,
+        count=count,
+        watermark=format_watermark(watermark),
+    )
+
+
+def get_page_rows(
+    sitemap: InfinitePaginatorSitemap, page: SitemapFilePage
+) -> QuerySet:
+    """Get the rows in the keyset range of a page.
+
+    :param sitemap: The sitemap.
+    :param page: The page.
+    :return: A queryset of the rows, in keyset order.
+    """
+    field = get_keyset_field(sitemap)
+    rows = sitemap.items().filter(**{f"{field}__lte": page.last})
+    if page.after is not None:
+        rows = rows.filter(**{f"{field}__gt": page.after})
+    return rows.order_by(field)
+
+
+def get_page_stats(
+    sitemap: InfinitePaginatorSitemap, rows: QuerySet
+) -> tuple[int, str | None]:
+    """Get the row count and the watermark of the rows in a page's range.
+
+    Rows that were added, removed or modified in the range change one of
+    them.
+
+    :param sitemap: The sitemap.
+    :param rows: The rows in the page's range.
+    :return: A tuple of the row count and the formatted watermark, or None
+    as the watermark if the sitemap has no watermark field.
+    """
+    if not sitemap.watermark_field:
+        return rows.count(), None
+    stats = rows.aggregate(
+        count=Count("pk"), watermark=Max(sitemap.watermark_field)
+    )
+    return stats["count"], format_watermark(stats["watermark"])
+
+
+def generate_section_files(
+    section: str,
+    sitemap_class: type[InfinitePaginatorSitemap],
+    force_regenerate: bool = False,
+) -> int:
+    """Write the sitemap files of a section, skipping unchanged pages.
+
+    Pages that were already written are checked against their row count and
+    watermark, and only the changed ones are written again. The last page,
+    which is usually partial, is always written again together with the new
+    pages after it.
+
+    :param section: The sitemap section.
+    :param sitemap_class: The sitemap class of the section.
+    :param force_regenerate: Write every page again.
+    :return: The number of files written.
+    """
+    sitemap = sitemap_class()
+    field = get_keyset_field(sitemap)
+    r = get_redis_interface(REDIS_DB)
+    storage = get_sitemap_storage()
+    old_pages = load_sitemap_pages(r, section)
+    pages = [] if force_regenerate else list(old_pages)
+    if pages and pages[-1].count < sitemap.limit:
+        pages.pop()
+
+    num_files = 0
+    for number, page in enumerate(pages, start=1):
+        rows = get_page_rows(sitemap, page)
+        count, watermark = get_page_stats(sitemap, rows)
+        if (
+            sitemap.watermark_field
+            and count == page.count
+            and watermark == page.watermark
+        ):
+            continue
+        if count > sitemap.limit:
+            # Rows were added to the range and the page no longer fits in a
+            # file. Write it and the following pages from scratch.
+            logger.info(
+                "Page %d of section %s outgrew its file, splitting it.",
+                number,
+                section,
+            )
+            pages = pages[: number - 1]
+            break
+
+        path = make_sitemap_file_path(section, number)
+        new_page = write_sitemap_file(sitemap, rows, storage, path, page.after)
+        # Keep the page's range even if its last rows were removed, so the
+        # following pages don't change.
+        new_page.last = page.last
+        pages[number - 1] = new_page
+        num_files += 1
+
+    after = pages[-1].last if pages else None
+    while True:
+        rows = sitemap.items().order_by(field)
+        if after is not None:
+            rows = rows.filter(**{f"{field}__gt": after})
+        rows = rows[: sitemap.limit].iterator(chunk_size=2_000)
+        path = make_sitemap_file_path(section, len(pages) + 1)
+        page = write_sitemap_file(sitemap, rows, storage, path, after)
+        if not page.count:
+            storage.delete(path)
+            break
+        pages.append(page)
+        num_files += 1
+        logger.info(
+            "Wrote sitemap file %d for section %s.", len(pages), section
+        )
+        if page.count < sitemap.limit:
+            break
+        after = page.last
+
+    for number in range(len(pages) + 1, len(old_pages) + 1):
+        storage.delete(make_sitemap_file_path(section, number))
+    save_sitemap_pages(r, section, pages)
+    return num_files
+
+
+def _generate_section_files_in_thread(
+    section: str,
+    sitemap_class: type[InfinitePaginatorSitemap],
+    force_regenerate: bool,
+) -> int:
+    try:
+        return generate_section_files(section, sitemap_class, force_regenerate)
+    finally:
+        connections.close_all()
+
+
+def generate_sitemap_files(
+    sitemaps: dict[str, type[InfinitePaginatorSitemap]],
+    force_regenerate: bool = False,
+) -> None:
+    """Write the sitemap files of every section.
+
+    Sections are generated concurrently, each in its own thread, with up to
+    SITEMAPS_SECTION_WORKERS at a time. A failing section is logged and
+    doesn't stop the others.
+
+    :param sitemaps: The sitemap classes, keyed by section.
+    :param force_regenerate: Write every page again.
+    :return: None
+    """
+    workers = min(settings.SITEMAPS_SECTION_WORKERS, len(sitemaps))
+    if workers <= 1:
+        for section, sitemap_class in sitemaps.items():
+            num_files = generate_section_files(
+                section, sitemap_class, force_regenerate
+            )
+            logger.info(
+                "Wrote %d sitemap files for section %s.", num_files, section
+            )
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                _generate_section_files_in_thread,
+                section,
+                sitemap_class,
+                force_regenerate,
+            ): section
+            for section, sitemap_class in sitemaps.items()
+        }
+        for future in as_completed(futures):
+            section = futures[future]
+            try:
+                num_files = future.result()
+            except Exception:
+                logger.exception(
+                    "Error while generating sitemap files for section %s.",
+                    section,
+                )
+                continue
+            logger.info(
+                "Wrote %d sitemap files for section %s.", num_files, section
+            )
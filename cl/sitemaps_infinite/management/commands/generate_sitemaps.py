@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.core.management.base import CommandParser
 
 from cl.lib.command_utils import VerboseCommand, logger
+from cl.sitemaps_infinite.file_generator import generate_sitemap_files
 from cl.sitemaps_infinite.sitemap_generator import (
     generate_urls_chunk,
     reset_sitemaps_cursor,
 )
+from cl.sitemaps_infinite.urls import pregenerated_sitemaps
 
 
 class Command(VerboseCommand):
@@ -20,6 +23,12 @@ class Command(VerboseCommand):
         )
 
     def handle(self, *args, **options):
+        if settings.SITEMAPS_FILES_ENABLED:
+            generate_sitemap_files(
+                pregenerated_sitemaps, options["force_regenerate"]
+            )
+            return
+
         if options["force_regenerate"]:
             reset_sitemaps_cursor()
             logger.info("Sitemaps cursor was reset successfully.")
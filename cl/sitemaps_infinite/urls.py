@@ -1,12 +1,12 @@
 from collections import OrderedDict
 
-from django.contrib.sitemaps import views as sitemaps_views
 from django.urls import path
 from django.views.decorators.cache import cache_page
 
 from cl.opinion_page.sitemap import DocketSitemap
 from cl.search.models import SEARCH_TYPES
 from cl.sitemap import cached_sitemap
+from cl.sitemaps_infinite.views import large_sitemap_index, sitemap_file
 
 # List the models that should use pregenerated sitemaps
 pregenerated_sitemaps = OrderedDict(
@@ -19,12 +19,18 @@ pregenerated_sitemaps = OrderedDict(
 urlpatterns = [
     path(
         "large-sitemap.xml",
-        cache_page(60 * 60 * 24, cache="db_cache")(sitemaps_views.index),
+        cache_page(60 * 60 * 24, cache="db_cache")(large_sitemap_index),
         {
             "sitemaps": pregenerated_sitemaps,
             "sitemap_url_name": "sitemaps-pregenerated",
         },
     ),
+    path(
+        "large-sitemap-<str:section>-<int:page>.xml.gz",
+        sitemap_file,
+        {"sitemaps": pregenerated_sitemaps},
+        name="sitemaps-pregenerated-file",
+    ),
     path(
         "large-sitemap-<str:section>.xml",
         cached_sitemap,
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.sitemaps import views as sitemaps_views
+from django.contrib.sitemaps.views import SitemapIndexItem, x_robots_tag
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import reverse
+
+from cl.lib.redis_utils import get_redis_interface
+from cl.sitemaps_infinite.base_sitemap import InfinitePaginatorSitemap
+from cl.sitemaps_infinite.file_generator import (
+    REDIS_DB,
+    get_sitemap_storage,
+    load_sitemap_pages,
+    make_sitemap_file_path,
+)
+
+
+@x_robots_tag
+def sitemap_files_index(
+    request: HttpRequest,
+    sitemaps: dict[str, type[InfinitePaginatorSitemap]],
+) -> HttpResponse:
+    """List the sitemap files written by generate_sitemap_files.
+
+    :param request: The HttpRequest from the client
+    :param sitemaps: The sitemap classes, keyed by section.
+    :return: The sitemap index.
+    """
+    r = get_redis_interface(REDIS_DB)
+    items = []
+    for section in sitemaps:
+        pages = load_sitemap_pages(r, section)
+        for number, page in enumerate(pages, start=1):
+            location = request.build_absolute_uri(
+                reverse(
+                    "sitemaps-pregenerated-file",
+                    kwargs={"section": section, "page": number},
+                )
+            )
+            last_mod = (
+                datetime.fromisoformat(page.watermark)
+                if page.watermark
+                else None
+            )
+            items.append(SitemapIndexItem(location, last_mod))
+    return TemplateResponse(
+        request,
+        "sitemap_index.xml",
+        {"sitemaps": items},
+        content_type="application/xml",
+    )
+
+
+def large_sitemap_index(
+    request: HttpRequest,
+    sitemaps: dict[str, type[InfinitePaginatorSitemap]],
+    sitemap_url_name: str,
+) -> HttpResponse:
+    """Serve the index of the sitemap files if they are enabled, or the index
+    of the sitemap pages cached by generate_urls_chunk otherwise.
+    """
+    if settings.SITEMAPS_FILES_ENABLED:
+        return sitemap_files_index(request, sitemaps)
+    return sitemaps_views.index(
+        request, sitemaps=sitemaps, sitemap_url_name=sitemap_url_name
+    )
+
+
+@x_robots_tag
+def sitemap_file(
+    request: HttpRequest,
+    section: str,
+    page: int,
+    sitemaps: dict[str, type[InfinitePaginatorSitemap]],
+) -> FileResponse:
+    """Serve a gzipped sitemap file from storage.
+
+    :param request: The HttpRequest from the client
+    :param section: The section of the sitemap
+    :param page: The number of the file in the section
+    :param sitemaps: The sitemap classes, keyed by section.
+    :return: The gzipped sitemap file.
+    """
+    if section not in sitemaps:
+        raise Http404(f"No sitemap available for section: {section!r}")
+    storage = get_sitemap_storage()
+    path = make_sitemap_file_path(section, page)
+    if not storage.exists(path):
+        raise Http404(f"Page {page} empty")
+    return FileResponse(storage.open(path), content_type="application/gzip")
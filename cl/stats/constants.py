@@ -7,6 +7,7 @@ class StatMetric(StrEnum):
     SEARCH_RESULTS = "search.results"
     ALERTS_SENT = "alerts.sent"
     WEBHOOKS_SENT = "webhooks.sent"
+    EXTRACTION_CACHE = "extraction_cache.lookups"
 
 
 # Label names per metric (order matters for key parsing)
@@ -15,6 +16,7 @@ STAT_LABELS: dict[str, list[str]] = {
     "search.results": ["query_type", "method"],
     "alerts.sent": ["alert_type"],
     "webhooks.sent": ["event_type"],
+    "extraction_cache.lookups": ["extractor", "result"],
 }
 
 
@@ -42,12 +44,24 @@ class StatWebhookEventType(StrEnum):
     PRAY_AND_PAY = "pray_and_pay"
 
 
+class StatExtractor(StrEnum):
+    TEXT = "text"
+    OCR = "ocr"
+
+
+class StatCacheResult(StrEnum):
+    HIT = "hit"
+    MISS = "miss"
+
+
 # For validation: allowed values per label
 STAT_LABEL_VALUES: dict[str, type[StrEnum]] = {
     "query_type": StatQueryType,
     "method": StatMethod,
     "alert_type": StatAlertType,
     "event_type": StatWebhookEventType,
+    "extractor": StatExtractor,
+    "result": StatCacheResult,
 }
 
 
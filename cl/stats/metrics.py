@@ -10,7 +10,7 @@ from prometheus_client.core import (
 from sentry_sdk import capture_exception
 
 from cl.lib.celery_utils import get_queue_length
-from cl.lib.redis_utils import get_redis_interface
+from cl.lib.redis_utils import get_redis_interface, make_celery_throttle_key
 from cl.stats.constants import STAT_LABELS, get_stat_metrics_prefix
 
 logger = logging.getLogger(__name__)
@@ -30,6 +30,50 @@ Labels:
     method: 'web' | 'api'
 """
 
+# Microservice metrics
+microservice_request_duration_seconds = Histogram(
+    "cl_microservice_request_duration_seconds",
+    "Duration of microservice requests in seconds",
+    ["service"],
+)
+"""
+Usage:
+    microservice_request_duration_seconds.labels(service='page-count').observe(0.5)
+
+Labels:
+    service: A key of MICROSERVICE_URLS, e.g. 'document-extract'
+"""
+
+microservice_requests_total = Counter(
+    "cl_microservice_requests_total",
+    "Total number of microservice requests",
+    ["service", "connection"],
+)
+"""
+Usage:
+    microservice_requests_total.labels(service='page-count', connection='reused').inc()
+
+Labels:
+    service: A key of MICROSERVICE_URLS, e.g. 'document-extract'
+    connection: 'reused' | 'new'
+"""
+
+# PACER metrics
+pacer_fetch_duration_seconds = Histogram(
+    "cl_pacer_fetch_duration_seconds",
+    "Duration of PACER document downloads in seconds",
+    ["court_id", "result"],
+    buckets=(0.5, 1, 2.5, 5, 10, 15, 30, 60, 120, 300),
+)
+"""
+Usage:
+    pacer_fetch_duration_seconds.labels(court_id='cand', result='success').observe(8.2)
+
+Labels:
+    court_id: The CourtListener ID of the court
+    result: 'success' | 'failure'
+"""
+
 # Account metrics
 accounts_created_total = Counter(
     "cl_accounts_created_total",
@@ -75,6 +119,44 @@ class CeleryQueueCollector:
         yield gauge
 
 
+class CeleryThrottleCollector:
+    """Custom Prometheus collector for FeedbackThrottle rate decisions.
+
+    Producers store their latest decision per queue in Redis, and they expire
+    shortly after the producer stops. Like CeleryQueueCollector, values are
+    read at scrape time.
+    """
+
+    fields = {
+        "rate": "Items per second the throttle lets producers enqueue",
+        "depth": "Smoothed queue depth measured by the throttle",
+        "drain_rate": "Estimated items per second taken off the queue",
+        "target_depth": "Queue depth the throttle aims for",
+    }
+
+    def collect(self):
+        gauges = {
+            field: GaugeMetricFamily(
+                f"cl_celery_throttle_{field}", description, labels=["queue"]
+            )
+            for field, description in self.fields.items()
+        }
+        try:
+            r = get_redis_interface("CACHE")
+            pipe = r.pipeline()
+            for queue in settings.CELERY_QUEUES:
+                pipe.hgetall(make_celery_throttle_key(queue))
+            decisions = pipe.execute()
+        except Exception as e:
+            capture_exception(e)
+            decisions = []
+        for queue, decision in zip(settings.CELERY_QUEUES, decisions):
+            for field, gauge in gauges.items():
+                if field in decision:
+                    gauge.add_metric([queue], float(decision[field]))
+        yield from gauges.values()
+
+
 class StatMetricsCollector:
     """Collects tally_stat metrics from Redis for Prometheus."""
 
@@ -146,8 +228,18 @@ def register_celery_queue_collector(registry=REGISTRY) -> bool:
     return True
 
 
+def register_celery_throttle_collector(registry=REGISTRY) -> bool:
+    """Register CeleryThrottleCollector once per registry."""
+    if getattr(registry, "_cl_celery_throttle_collector_registered", False):
+        return False
+    registry.register(CeleryThrottleCollector())
+    registry._cl_celery_throttle_collector_registered = True
+    return True
+
+
 register_stat_metrics_collector()
 register_celery_queue_collector()
+register_celery_throttle_collector()
 
 
 def record_search_duration(
@@ -162,3 +254,32 @@ def record_search_duration(
     search_duration_seconds.labels(
         query_type=query_type, method=method
     ).observe(duration_seconds)
+
+
+def record_microservice_request(
+    service: str, duration_seconds: float, reused: bool
+):
+    """Record a microservice request's duration and connection reuse.
+
+    :param service: The service called, a key of MICROSERVICE_URLS.
+    :param duration_seconds: The duration of the request in seconds.
+    :param reused: Whether the request went over a kept-alive connection.
+    """
+    microservice_request_duration_seconds.labels(service=service).observe(
+        duration_seconds
+    )
+    microservice_requests_total.labels(
+        service=service, connection="reused" if reused else "new"
+    ).inc()
+
+
+def record_pacer_fetch(court_id: str, duration_seconds: float, ok: bool):
+    """Record the duration and outcome of a PACER document download.
+
+    :param court_id: The CourtListener ID of the court.
+    :param duration_seconds: The duration of the download in seconds.
+    :param ok: Whether the document was fetched and saved.
+    """
+    pacer_fetch_duration_seconds.labels(
+        court_id=court_id, result="success" if ok else "failure"
+    ).observe(duration_seconds)
@@ -15,7 +15,7 @@ from django.utils.timezone import now
 from prometheus_client import CollectorRegistry
 from waffle.testutils import override_flag, override_switch
 
-from cl.lib.redis_utils import get_redis_interface
+from cl.lib.redis_utils import get_redis_interface, make_celery_throttle_key
 from cl.search.models import SEARCH_TYPES
 from cl.stats.constants import (
     StatAlertType,
@@ -27,6 +27,7 @@ from cl.stats.constants import (
 )
 from cl.stats.metrics import (
     CeleryQueueCollector,
+    CeleryThrottleCollector,
     StatMetricsCollector,
     accounts_created_total,
     accounts_deleted_total,
@@ -428,6 +429,38 @@ class CeleryQueueCollectorTests(TestCase):
         self.assertNotIn("bad_queue", samples_by_queue)
 
 
+class CeleryThrottleCollectorTests(TestCase):
+    """Unit tests for CeleryThrottleCollector"""
+
+    def tearDown(self) -> None:
+        get_redis_interface("CACHE").delete(make_celery_throttle_key("batch0"))
+
+    @patch("cl.stats.metrics.settings")
+    def test_collector_returns_throttle_decisions(self, mock_settings) -> None:
+        """Are stored rate decisions exported for queues that have them?"""
+        mock_settings.CELERY_QUEUES = ["celery", "batch0"]
+        get_redis_interface("CACHE").hset(
+            make_celery_throttle_key("batch0"),
+            mapping={
+                "rate": 4.5,
+                "depth": 21.0,
+                "drain_rate": 3.0,
+                "target_depth": 30,
+            },
+        )
+
+        metrics = {m.name: m for m in CeleryThrottleCollector().collect()}
+
+        rate = metrics["cl_celery_throttle_rate"]
+        self.assertEqual(
+            {s.labels["queue"]: s.value for s in rate.samples},
+            {"batch0": 4.5},
+        )
+        self.assertEqual(
+            metrics["cl_celery_throttle_target_depth"].samples[0].value, 30
+        )
+
+
 class CeleryQueueCollectorIntegrationTests(TestCase):
     """Integration test for CeleryQueueCollector via prometheus endpoint"""
 
@@ -1,7 +1,10 @@
+import logging
 from typing import Any
 
 from uvicorn.workers import UvicornWorker as BaseUvicornWorker
 
+logger = logging.getLogger(__name__)
+
 
 class UvicornWorker(BaseUvicornWorker):
     CONFIG_KWARGS: dict[str, Any] = {
@@ -9,3 +12,15 @@ class UvicornWorker(BaseUvicornWorker):
         "http": "auto",
         "lifespan": "off",
     }
+
+    def run(self) -> None:
+        try:
+            super().run()
+        finally:
+            # Write the API stats buffered by this worker before it exits.
+            from cl.api.utils import api_stats_buffer
+
+            try:
+                api_stats_buffer.flush()
+            except Exception as e:
+                logger.exception("Unable to flush API stats on exit: %s", e)